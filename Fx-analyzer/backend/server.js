@@ -115,17 +115,54 @@ function generateTickerData() {
 
 
 // --- ZeroMQ Subscriber (Python Bridge) ---
+
+// snap.bin payload: 16-byte header (magic "FXTK", u8 version, pad, u16 count,
+// i64 sent_ms) followed by 28-byte records (12-byte symbol, f64 price, i64 ts_ms).
+function decodeTickerSnapshot(buf) {
+    if (buf.toString('ascii', 0, 4) !== 'FXTK' || buf.readUInt8(4) !== 1) {
+        throw new Error('Unsupported ticker snapshot');
+    }
+    const count = buf.readUInt16LE(6);
+    const tickers = [];
+    for (let i = 0, off = 16; i < count; i++, off += 28) {
+        tickers.push({
+            symbol: buf.toString('ascii', off, off + 12).replace(/\0+$/, ''),
+            price: buf.readDoubleLE(off + 12),
+            timestamp: Number(buf.readBigInt64LE(off + 20)),
+        });
+    }
+    return tickers;
+}
+
+// Engine jobs by command id (echoed in every job update) -> submitting socket id
+const jobOwners = new Map();
+const JOB_FINAL_STATES = ['done', 'error', 'cancelled'];
+
 async function startZMQ() {
     const sock = new zmq.Subscriber();
 
     try {
         sock.connect("tcp://127.0.0.1:5555");
         sock.subscribe("signal");
-        sock.subscribe("ticker");
+        sock.subscribe("snap.bin"); // batched binary tickers (see engine/publisher.py)
         sock.subscribe("vibe-research");
+        sock.subscribe("job"); // async command progress / results
         console.log("🔌 Connected to Python Engine via ZeroMQ");
 
         for await (const parts of sock) {
+            if (parts.length >= 2 && parts[0].toString() === 'snap.bin') {
+                try {
+                    for (const t of decodeTickerSnapshot(parts[1])) {
+                        if (basePrices[t.symbol]) {
+                            basePrices[t.symbol] = t.price;
+                        }
+                    }
+                } catch (e) {
+                    console.error("Error decoding ticker snapshot:", e);
+                }
+                continue;
+            }
+
             let topicStr = "";
             let msgStr = "";
 
@@ -160,6 +197,17 @@ async function startZMQ() {
                 } else if (topicStr === 'vibe-research') {
                     io.emit('vibe-research-update', data);
                     console.log(`🔬 [PY-RESEARCH] New Vibe research update: ${data.run_type} -> ${data.status}`);
+                } else if (topicStr === 'job') {
+                    // Only the sockets that submitted the job get its updates
+                    // (identical analyses share one job: `ids` lists them all)
+                    for (const id of data.ids || [data.id]) {
+                        const owner = jobOwners.get(id);
+                        if (!owner) continue;
+                        io.to(owner).emit('engine-job-update', { ...data, id });
+                        if (JOB_FINAL_STATES.includes(data.state)) {
+                            jobOwners.delete(id);
+                        }
+                    }
                 }
             } catch (e) {
                 console.error("Error parsing ZMQ message:", e);
@@ -198,23 +246,55 @@ app.post('/api/admin/upgrade', async (req, res) => {
 });
 
 // --- ZMQ Engine Communication ---
-const zmqReq = new zmq.Request();
+// DEALER against the engine's ROUTER: requests are pipelined and replies
+// matched by id, so a long command never holds up the others.
+const zmqReq = new zmq.Dealer();
 let zmqReqConnected = false;
+let nextCommandId = 1;
+const pendingCommands = new Map();
+const COMMAND_TIMEOUT_MS = 30000;
 
-async function sendCommand(payload) {
+async function receiveReplies() {
+    for await (const [result] of zmqReq) {
+        let reply;
+        try {
+            reply = JSON.parse(result.toString());
+        } catch (e) {
+            console.error("Bad engine reply:", e);
+            continue;
+        }
+        const pending = pendingCommands.get(reply.id);
+        if (pending) {
+            pendingCommands.delete(reply.id);
+            clearTimeout(pending.timer);
+            pending.resolve(reply);
+        }
+    }
+}
+
+async function sendCommand(payload, id = nextCommandId++) {
     if (!zmqReqConnected) {
         console.log("Connecting to Engine Command Socket...");
         zmqReq.connect("tcp://127.0.0.1:5556");
         zmqReqConnected = true;
+        receiveReplies().catch(e => console.error("Engine reply loop stopped:", e));
     }
+    const reply = new Promise(resolve => {
+        const timer = setTimeout(() => {
+            pendingCommands.delete(id);
+            resolve({ status: "error", message: "Engine Unreachable" });
+        }, COMMAND_TIMEOUT_MS);
+        pendingCommands.set(id, { resolve, timer });
+    });
     try {
-        await zmqReq.send(JSON.stringify(payload));
-        const [result] = await zmqReq.receive();
-        return JSON.parse(result.toString());
+        await zmqReq.send(JSON.stringify({ ...payload, id }));
     } catch (e) {
         console.error("ZMQ Command Failed:", e);
+        clearTimeout(pendingCommands.get(id)?.timer);
+        pendingCommands.delete(id);
         return { status: "error", message: "Engine Unreachable" };
     }
+    return reply;
 }
 
 // --- WebSocket Connection Handling ---
@@ -406,6 +486,21 @@ io.on('connection', async (socket) => {
         }
     });
 
+    // TradingAgents analysis runs as an engine job; its queued/running/
+    // progress/done updates arrive as 'engine-job-update' on this socket only
+    socket.on('engine-agent-analyze', async (request) => {
+        const id = nextCommandId++;
+        // Registered before sending: the first update can beat the reply
+        jobOwners.set(id, socket.id);
+        const result = await sendCommand({ ...request, cmd: 'ENGINE_AGENT_ANALYZE' }, id);
+        if (result.status === 'accepted') {
+            socket.emit('engine-job-accepted', { id, job_id: result.job_id });
+        } else {
+            jobOwners.delete(id);
+            socket.emit('engine-job-update', { id, state: 'error', error: result.message });
+        }
+    });
+
     socket.on('disconnect', () => {
         clearInterval(tickerInterval);
         console.log('❌ Client disconnected:', socket.id);
@@ -5,6 +5,13 @@ Wraps the TradingAgents WorkflowOrchestrator alongside the deep-learning
 agents (LSTM, CNN, Sentiment) so the Fx-analyzer ZeroMQ bridge can trigger
 a combined multi-agent analysis on-demand.
 
+Analyst reports are reused per symbol across queries (see
+report_cache.py) so a debate on a recently analysed ticker starts from
+the cached reports. Only queries naming a single ticker in capitals
+read or fill that cache. Identical requests are coalesced where they are
+submitted: the command server runs one job for them, keyed by
+``AgentAnalysisBridge.request_key``.
+
 Usage (from bridge.py):
     self.agent_bridge = AgentAnalysisBridge()
     await self.agent_bridge.initialize()
@@ -17,7 +24,12 @@ import sys
 import json
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from engine.report_cache import ReportCache
+except ImportError:
+    from report_cache import ReportCache
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +50,7 @@ class AgentAnalysisBridge:
         self.initialized = False
         self._deep_agents: list = []
         self._data_pipeline = None
+        self.report_cache = ReportCache()
 
     async def initialize(self) -> bool:
         """Initialize TradingAgents orchestrator + deep agents + data pipeline."""
@@ -150,12 +163,26 @@ class AgentAnalysisBridge:
     # Public analysis API
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def request_key(msg: Dict[str, Any]) -> Tuple:
+        """Identifies ENGINE_AGENT_ANALYZE requests that would produce the
+        same analysis (query compared case- and whitespace-insensitively)."""
+        return (
+            " ".join(str(msg.get("query", "")).split()).lower(),
+            tuple(sorted(msg.get("active_agents") or [])),
+            msg.get("debate_rounds"), msg.get("risk_rounds"), msg.get("parallel_debate"),
+            bool(msg.get("refresh", False)),
+        )
+
     async def analyze(
         self,
         query: str,
         active_agents: Optional[List[str]] = None,
         debate_rounds: Optional[int] = None,
         risk_rounds: Optional[int] = None,
+        parallel_debate: Optional[bool] = None,
+        progress: Optional[Callable[..., Awaitable]] = None,
+        refresh: bool = False,
     ) -> Dict[str, Any]:
         """Run full multi-agent analysis pipeline and return serialisable result.
 
@@ -164,15 +191,32 @@ class AgentAnalysisBridge:
           2. Run TradingAgents LLM pipeline (if available).
           3. Run deep agents (LSTM, CNN, Sentiment) in parallel.
           4. Merge results into a single dict.
+
+        ``progress(stage=..., status=...)`` is awaited as each pipeline
+        finishes (the command server publishes it as a job update).
+        ``parallel_debate`` switches the debates to concurrent rounds
+        (None keeps the orchestrator's current mode). ``refresh`` re-runs
+        every analyst instead of reusing cached reports.
         """
         symbol = self._extract_symbol(query)
 
+        async def _tracked(stage: str, coro):
+            result = await coro
+            if progress is not None:
+                status = result.get("status", "ok") if isinstance(result, dict) else "ok"
+                await progress(stage=stage, status=status, symbol=symbol)
+            return result
+
         # --- Run both pipelines concurrently ---
-        trading_task = asyncio.create_task(
-            self._run_trading_agents(query, active_agents, debate_rounds, risk_rounds)
-        )
+        trading_task = asyncio.create_task(_tracked(
+            "trading_agents",
+            self._run_trading_agents(
+                query, active_agents, debate_rounds, risk_rounds, parallel_debate,
+                self._extract_symbol(query, strict=True), refresh,
+            ),
+        ))
         deep_task = asyncio.create_task(
-            self._run_deep_agents(symbol, query)
+            _tracked("deep_agents", self._run_deep_agents(symbol, query))
         )
 
         trading_result, deep_result = await asyncio.gather(
@@ -200,8 +244,13 @@ class AgentAnalysisBridge:
         active_agents: Optional[List[str]] = None,
         debate_rounds: Optional[int] = None,
         risk_rounds: Optional[int] = None,
+        parallel_debate: Optional[bool] = None,
+        symbol: str = "",
+        refresh: bool = False,
     ) -> Dict[str, Any]:
-        """Run TradingAgents-MCPmode LLM pipeline."""
+        """Run TradingAgents-MCPmode LLM pipeline, reusing cached analyst
+        reports for *symbol* and caching the fresh ones. *symbol* is empty
+        (no reuse, nothing stored) unless the query names exactly one ticker."""
         if not self.orchestrator:
             return {
                 "status": "unavailable",
@@ -211,11 +260,18 @@ class AgentAnalysisBridge:
         try:
             if debate_rounds is not None or risk_rounds is not None:
                 self.orchestrator.set_debate_rounds(debate_rounds, risk_rounds)
+            if parallel_debate is not None:
+                self.orchestrator.set_parallel_debate(parallel_debate)
 
+            cached = self.report_cache.get(symbol) if symbol and not refresh else {}
             result = await self.orchestrator.run_analysis(
-                query, active_agents=active_agents
+                query, active_agents=active_agents, cached_reports=cached
             )
-            return self._state_to_dict(result)
+            if symbol:
+                self.report_cache.put(symbol, result, skip=cached)
+            output = self._state_to_dict(result)
+            output["cached_analysts"] = sorted(cached)
+            return output
         except Exception as e:
             logger.error("TradingAgents analysis failed: %s", e)
             return {"status": "error", "error": str(e)}
@@ -285,23 +341,34 @@ class AgentAnalysisBridge:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _extract_symbol(query: str) -> str:
+    def _extract_symbol(query: str, strict: bool = False) -> str:
         """Naively extract a ticker symbol from a query string.
 
         Looks for uppercase 1-5 letter tokens (AAPL, TSLA, BTCUSD, etc.)
-        that are common ticker patterns.
+        that are common ticker patterns. Tokens already written in capitals
+        win over ordinary words ("should I buy AAPL" -> AAPL).
+
+        ``strict`` is what keys the report cache: only tokens written in
+        capitals count, and a query naming more than one ("Compare AAPL and
+        MSFT", "Is NOW a good time for TSLA") returns "" -- its reports were
+        written for the whole question, not for any one of the tickers.
         """
         import re
         # Split on whitespace and common punctuation
-        tokens = re.split(r"[,\s;:!?()]+", query)
+        tokens = [token.strip() for token in re.split(r"[,\s;:!?()]+", query)]
+        candidates = []
         for token in tokens:
-            t = token.strip().upper()
+            t = token.upper()
             # Filter: 1-5 alphanumeric chars, not purely numeric
             if t and len(t) <= 5 and not t.isdigit() and t.isalnum():
                 # Skip common stop-words
-                if t not in {"A", "AN", "THE", "FOR", "IS", "IT", "AT", "TO", "IN", "AND", "OR", "OF", "ON", "BY", "BE", "DO", "GO", "NO", "SO", "UP", "US"}:
-                    return t
-        return ""
+                if t not in {"A", "AN", "I", "THE", "FOR", "IS", "IT", "AT", "TO", "IN", "AND", "OR", "OF", "ON", "BY", "BE", "DO", "GO", "NO", "SO", "UP", "US"}:
+                    candidates.append((token != t, t))
+        if strict:
+            tickers = {t for lowered, t in candidates if not lowered}
+            return tickers.pop() if len(tickers) == 1 else ""
+        # Written-in-capitals first, otherwise the first plausible token
+        return min(candidates, key=lambda c: c[0])[1] if candidates else ""
 
     def _state_to_dict(self, state) -> Dict[str, Any]:
         """Convert AgentState (LangGraph dict or object) to JSON-safe dict."""
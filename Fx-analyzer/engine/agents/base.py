@@ -1,22 +1,23 @@
 import os
-import asyncio
 import logging
-import time
 import json
 import warnings
 from dotenv import load_dotenv
 
-# Gemini
 try:
-    import google.generativeai as genai
+    from engine.llm_cache import get_llm_cache
+    from engine.llm_client import LLM_STREAM, get_http_pool
+    from engine.llm_scheduler import PRIORITY_NORMAL, estimate_tokens, get_scheduler
 except ImportError:
-    genai = None
+    from llm_cache import get_llm_cache
+    from llm_client import LLM_STREAM, get_http_pool
+    from llm_scheduler import PRIORITY_NORMAL, estimate_tokens, get_scheduler
 
-# OpenRouter via OpenAI-compatible SDK
+# Gemini
 try:
-    from openai import OpenAI
+    import google.generativeai as genai
 except ImportError:
-    OpenAI = None
+    genai = None
 
 warnings.filterwarnings("ignore", category=FutureWarning, module="google.generativeai")
 load_dotenv()
@@ -60,10 +61,15 @@ class BaseAgent:
     def __init__(self, name: str, role: str, model_name: str = "gemini:gemini-1.5-flash"):
         self.name = name
         self.role = role
-        self.rate_limited_until = 0
         self.consecutive_errors = 0
         self.base_backoff = 5
         self.max_backoff = 120
+        self.max_tokens = 1024
+        self.cache = get_llm_cache()
+        # Budgets are shared with every other agent on the same key / model
+        self.scheduler = get_scheduler()
+        # Same-provider models to spread onto when ours is out of budget
+        self.fallback_models = []
 
         # Parse provider + model
         self.provider = PROVIDER_PREFIX_GEMINI
@@ -87,19 +93,8 @@ class BaseAgent:
         elif self.gemini_key and not genai:
             logging.warning(f"Agent {self.name}: GEMINI_API_KEY set but google.generativeai not installed")
 
-        # --- Initialize OpenRouter client ---
-        self.openrouter_client = None
-        if self.openrouter_key and OpenAI:
-            try:
-                self.openrouter_client = OpenAI(
-                    api_key=self.openrouter_key,
-                    base_url="https://openrouter.ai/api/v1"
-                )
-                logging.info(f"Agent {self.name}: OpenRouter client ready")
-            except Exception as e:
-                logging.error(f"Agent {self.name} OpenRouter init failed: {e}")
-        elif self.openrouter_key and not OpenAI:
-            logging.warning(f"Agent {self.name}: OPENROUTER_API_KEY set but openai package not installed")
+        # --- OpenRouter: requests go through the shared async HTTP pool ---
+        self.http = get_http_pool()
 
         logging.info(f"Agent {self.name} initialized — provider={self.provider}, model={self.model_name}")
 
@@ -186,10 +181,9 @@ class BaseAgent:
                     return False
                 genai.configure(api_key=self.gemini_key)
                 self.gemini_model = genai.GenerativeModel(self.model_name)
-                self.openrouter_client = None  # not needed for Gemini
 
             elif self.provider == PROVIDER_PREFIX_OPENROUTER:
-                if not self.openrouter_key or not self.openrouter_client:
+                if not self.openrouter_key:
                     logging.warning(f"Cannot switch {self.name} to OpenRouter: OPENROUTER_API_KEY missing")
                     self.provider, self.model_name = old_provider, old_model
                     return False
@@ -203,21 +197,45 @@ class BaseAgent:
             self.provider, self.model_name = old_provider, old_model
             return False
 
-    async def _call_llm_async(self, prompt: str, system_prompt: str = None) -> str:
-        """Route to provider-specific implementation."""
+    async def _call_llm_async(self, prompt: str, system_prompt: str = None, priority: int = PRIORITY_NORMAL) -> str:
+        """
+        Route to provider-specific implementation, via the shared response
+        cache and the LLM scheduler. Returns None when no model has budget
+        within the priority's maximum wait.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(self.name, self.provider, self.model_name, prompt, system_prompt)
+            if cached is not None:
+                logging.debug(f"Agent {self.name}: LLM cache hit")
+                return cached
+
+        if self.provider == PROVIDER_PREFIX_OPENROUTER:
+            models = [self.model_name] + self.fallback_models
+        else:
+            models = [self.model_name]  # the Gemini client is bound to one model
+        model = await self.scheduler.acquire(
+            self.provider, models, estimate_tokens(prompt, system_prompt) + self.max_tokens, priority
+        )
+        if model is None:
+            logging.warning(f"Agent {self.name}: no {self.provider} budget available, skipping call")
+            return None
+
         if self.provider == PROVIDER_PREFIX_OPENROUTER:
-            return await self._call_openrouter(prompt, system_prompt=system_prompt)
-        return await self._call_gemini(prompt)
+            response = await self._call_openrouter(prompt, system_prompt=system_prompt, model=model)
+        else:
+            response = await self._call_gemini(prompt)
+
+        if self.cache is not None:
+            # Keyed by the model that answered: a fallback's response must
+            # not be served later as the primary model's
+            self.cache.put(self.name, self.provider, model, prompt, response, system_prompt)
+        return response
 
     async def _call_gemini(self, prompt: str) -> str:
         """Call Gemini via google.generativeai."""
         if not self.gemini_model:
             return None
 
-        if time.time() < self.rate_limited_until:
-            logging.warning(f"Agent {self.name} is rate limited (Gemini).")
-            return None
-
         try:
             response = await self.gemini_model.generate_content_async(prompt)
             if self.consecutive_errors > 0:
@@ -232,20 +250,17 @@ class BaseAgent:
                     self.base_backoff * (2 ** (self.consecutive_errors - 1)),
                     self.max_backoff,
                 )
-                self.rate_limited_until = time.time() + backoff
+                self.scheduler.penalise(self.provider, self.model_name, backoff)
                 logging.error(f"Agent {self.name} hit Gemini rate limit. Backoff {backoff}s.")
             else:
                 logging.error(f"Agent {self.name} Gemini error: {e}")
             return None
 
-    async def _call_openrouter(self, prompt: str, system_prompt: str = None) -> str:
-        """Call OpenRouter via OpenAI-compatible API (offloaded to thread to avoid blocking)."""
-        if not self.openrouter_client:
-            return None
-
-        if time.time() < self.rate_limited_until:
-            logging.warning(f"Agent {self.name} is rate limited (OpenRouter).")
+    async def _call_openrouter(self, prompt: str, system_prompt: str = None, model: str = None) -> str:
+        """Call OpenRouter through the shared async HTTP pool (streamed when LLM_STREAM=1)."""
+        if not self.openrouter_key:
             return None
+        model = model or self.model_name
 
         try:
             messages = [
@@ -253,18 +268,21 @@ class BaseAgent:
                 {"role": "user", "content": prompt}
             ]
 
-            response = await asyncio.to_thread(
-                self.openrouter_client.chat.completions.create,
-                model=self.model_name,
-                messages=messages,
+            content = await self.http.chat(
+                PROVIDER_PREFIX_OPENROUTER,
+                model,
+                messages,
                 temperature=0.1,
-                max_tokens=1024,
+                max_tokens=self.max_tokens,
+                stream=LLM_STREAM,
+                stop_when_complete=LLM_STREAM,
+                api_key=self.openrouter_key,
             )
 
             if self.consecutive_errors > 0:
                 self.consecutive_errors = 0
 
-            return response.choices[0].message.content
+            return content
 
         except Exception as e:
             error_msg = str(e)
@@ -274,8 +292,8 @@ class BaseAgent:
                     self.base_backoff * (2 ** (self.consecutive_errors - 1)),
                     self.max_backoff,
                 )
-                self.rate_limited_until = time.time() + backoff
-                logging.error(f"Agent {self.name} hit OpenRouter rate limit. Backoff {backoff}s.")
+                self.scheduler.penalise(self.provider, model, backoff)
+                logging.error(f"Agent {self.name} hit OpenRouter rate limit on {model}. Backoff {backoff}s.")
             else:
                 logging.error(f"Agent {self.name} OpenRouter error: {e}")
             return None
@@ -4,6 +4,13 @@ from ta.momentum import RSIIndicator
 from ta.trend import MACD, EMAIndicator
 from ta.volatility import BollingerBands
 
+try:
+    from engine.indicator_engine import StreamingIndicatorEngine
+    from engine import batch_indicators
+except ImportError:
+    from indicator_engine import StreamingIndicatorEngine
+    import batch_indicators
+
 class TechnicalAnalyzer:
     """
     Performs technical analysis on OHLCV data using the 'ta' library.
@@ -11,15 +18,23 @@ class TechnicalAnalyzer:
     """
     
     def __init__(self):
-        pass
+        # Per-symbol incremental indicators for the live scan loop
+        self.stream = StreamingIndicatorEngine()
 
-    def analyze(self, df: pd.DataFrame) -> pd.DataFrame:
+    def analyze(self, df: pd.DataFrame, symbol: str = None) -> pd.DataFrame:
         """
         Applies technical indicators to the DataFrame.
         Expects columns: ['time', 'open', 'high', 'low', 'close', 'tick_volume']
+
+        When a symbol is given, indicators are updated incrementally from that
+        symbol's streaming state (only new bars are processed); otherwise the
+        whole frame is recomputed with 'ta'.
         """
         if df.empty:
             return df
+
+        if symbol is not None and 'time' in df.columns:
+            return self.stream.update(symbol, df)
         
         # Ensure correct types
         df['close'] = df['close'].astype(float)
@@ -107,6 +122,30 @@ class TechnicalAnalyzer:
             
         return None
 
+    def analyze_batch(self, frames: dict, bars: int = 500) -> dict:
+        """
+        Computes the indicator set for many symbols at once over a stacked
+        (symbols x bars) close matrix.
+        Returns {"symbols": [...], "times": [...], "indicators": {column: ndarray[S, B]}}.
+        """
+        symbols, closes, last_times = batch_indicators.stack_frames(frames, bars)
+        return {
+            "symbols": symbols,
+            "times": last_times,
+            "indicators": batch_indicators.compute_indicators(closes),
+        }
+
+    def check_signals_batch(self, batch: dict) -> dict:
+        """
+        check_signals for every symbol of an analyze_batch result in one call.
+        Returns {symbol: signal} for the symbols that fire.
+        """
+        if not batch["symbols"]:
+            return {}
+        return batch_indicators.check_signals_batch(
+            batch["indicators"], batch["symbols"], batch["times"]
+        )
+
     def analyze_daily(self, df: pd.DataFrame) -> dict:
         """
         Performs a simplified D1 trend analysis.
@@ -0,0 +1,236 @@
+"""
+Bar Aggregator - M5/M15/H1/D1 bars built incrementally from the M1 stream.
+
+DataFeed hands every M1 frame it serves to ``update``; only the M1 bars
+closed since the previous call are folded into the higher timeframes, and
+the still-forming M1 bar is applied on read without being committed (the
+same split the streaming indicator engine uses). On first sight of a symbol
+the series are seeded from the M1 history already in the BarStore.
+
+M1 history rarely reaches back far enough for a useful daily series, so a
+timeframe can also be given provider history once (``set_history``); it
+only fills buckets older than the first aggregated one. Symbols with no M1
+stream at all (e.g. a deep agent asking for AAPL) are served from that
+history alone, refreshed after ``history_ttl`` seconds.
+
+Buckets are aligned on UTC epoch multiples of the timeframe length, so
+D1 bars run from UTC midnight.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from engine.bar_store import BarStore
+    from engine.market_data import TIMEFRAME_SECONDS, normalize_bars
+except ImportError:
+    from bar_store import BarStore
+    from market_data import TIMEFRAME_SECONDS, normalize_bars
+
+AGGREGATED_TIMEFRAMES = ("M5", "M15", "H1", "D1")
+
+_FIELDS = ("open", "high", "low", "close", "tick_volume")
+
+
+class _Series:
+    """Committed aggregated bars for one symbol/timeframe as column arrays."""
+
+    def __init__(self, step: int, max_bars: int):
+        self.step = step
+        self.max_bars = max_bars
+        self.time = np.empty(0, dtype=np.int64)
+        self.cols = {
+            f: np.empty(0, dtype=np.int64 if f == "tick_volume" else np.float64) for f in _FIELDS
+        }
+
+    def __len__(self):
+        return len(self.time)
+
+    def _aggregate(self, t: np.ndarray, cols: Dict[str, np.ndarray]):
+        buckets = t - t % self.step
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:] - 1, len(t) - 1]
+        return buckets[starts], {
+            "open": cols["open"][starts],
+            "high": np.maximum.reduceat(cols["high"], starts),
+            "low": np.minimum.reduceat(cols["low"], starts),
+            "close": cols["close"][ends],
+            "tick_volume": np.add.reduceat(cols["tick_volume"], starts),
+        }
+
+    def commit(self, t: np.ndarray, cols: Dict[str, np.ndarray], drop_partial_head: bool = False):
+        """Folds closed M1 bars (sorted, newer than anything committed) in."""
+        if drop_partial_head and len(t) and t[0] % self.step:
+            # History starts mid-bucket; that bucket would be incomplete
+            keep = t >= t[0] - t[0] % self.step + self.step
+            t, cols = t[keep], {f: v[keep] for f, v in cols.items()}
+        if not len(t):
+            return
+        times, agg = self._aggregate(t, cols)
+
+        if len(self.time) and times[0] == self.time[-1]:
+            self.cols["high"][-1] = max(self.cols["high"][-1], agg["high"][0])
+            self.cols["low"][-1] = min(self.cols["low"][-1], agg["low"][0])
+            self.cols["close"][-1] = agg["close"][0]
+            self.cols["tick_volume"][-1] += agg["tick_volume"][0]
+            times, agg = times[1:], {f: v[1:] for f, v in agg.items()}
+
+        self.time = np.concatenate([self.time, times])[-self.max_bars:]
+        for f in _FIELDS:
+            self.cols[f] = np.concatenate([self.cols[f], agg[f].astype(self.cols[f].dtype)])[-self.max_bars:]
+
+    def with_forming(self, bar: Optional[Tuple]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Committed bars plus the forming M1 bar, without mutating state."""
+        t = self.time.copy()
+        cols = {f: v.copy() for f, v in self.cols.items()}
+        if bar is None:
+            return t, cols
+        bar_time, o, h, l, c, v = bar
+        bucket = bar_time - bar_time % self.step
+        if len(t) and bucket == t[-1]:
+            cols["high"][-1] = max(cols["high"][-1], h)
+            cols["low"][-1] = min(cols["low"][-1], l)
+            cols["close"][-1] = c
+            cols["tick_volume"][-1] += v
+        elif not len(t) or bucket > t[-1]:
+            t = np.append(t, bucket)
+            for f, x in zip(_FIELDS, (o, h, l, c, v)):
+                cols[f] = np.append(cols[f], x).astype(cols[f].dtype)
+        return t, cols
+
+
+class BarAggregator:
+    """Shared higher-timeframe view of every symbol's M1 stream."""
+
+    def __init__(
+        self,
+        store: Optional[BarStore] = None,
+        timeframes=AGGREGATED_TIMEFRAMES,
+        max_bars: int = 5000,
+        history_ttl: float = 900,
+    ):
+        self.store = store
+        self.timeframes = tuple(timeframes)
+        self.max_bars = max_bars
+        self.history_ttl = history_ttl
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._last_m1: Dict[str, int] = {}
+        self._forming: Dict[str, Tuple] = {}
+        self._history: Dict[Tuple[str, str], Tuple[float, pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # M1 stream
+    # ------------------------------------------------------------------
+
+    def _reset(self, symbol: str):
+        for tf in self.timeframes:
+            self._series[(symbol, tf)] = _Series(TIMEFRAME_SECONDS[tf] * 1_000_000_000, self.max_bars)
+        self._last_m1.pop(symbol, None)
+        self._forming.pop(symbol, None)
+
+    def _commit(self, symbol: str, t: np.ndarray, cols: Dict[str, np.ndarray], seed: bool):
+        for tf in self.timeframes:
+            self._series[(symbol, tf)].commit(t, cols, drop_partial_head=seed)
+        if len(t):
+            self._last_m1[symbol] = int(t[-1])
+
+    def _seed_history(self, symbol: str, before: int) -> pd.DataFrame:
+        if self.store is None:
+            return pd.DataFrame()
+        stored = self.store.read(symbol, "M1")
+        return stored[pd.DatetimeIndex(stored["time"]).as_unit("ns").asi8 < before]
+
+    def update(self, symbol: str, m1: pd.DataFrame):
+        """Folds the M1 bars of *m1* that closed since the last call into
+        every timeframe; its last bar is treated as still forming."""
+        if m1 is None or m1.empty:
+            return
+        times = pd.DatetimeIndex(m1["time"]).as_unit("ns").asi8
+        cols = {f: m1[f].to_numpy(dtype=np.int64 if f == "tick_volume" else float) for f in _FIELDS}
+
+        with self._lock:
+            last = self._last_m1.get(symbol)
+            if last is not None and times[-1] < last:
+                # Feed went backwards (replay rewound, mock re-seeded)
+                last = None
+            if last is None:
+                self._reset(symbol)
+                history = self._seed_history(symbol, int(times[0]))
+                if not history.empty:
+                    self._commit(
+                        symbol,
+                        pd.DatetimeIndex(history["time"]).as_unit("ns").asi8,
+                        {f: history[f].to_numpy(dtype=cols[f].dtype) for f in _FIELDS},
+                        seed=True,
+                    )
+                    seed = False
+                else:
+                    seed = True
+                start = 0
+            else:
+                seed = False
+                start = int(np.searchsorted(times, last, side="right"))
+
+            closed = slice(start, len(times) - 1)
+            if closed.start < closed.stop:
+                self._commit(symbol, times[closed], {f: v[closed] for f, v in cols.items()}, seed)
+
+            if times[-1] > self._last_m1.get(symbol, -1):
+                self._forming[symbol] = (int(times[-1]),) + tuple(cols[f][-1] for f in _FIELDS)
+            else:
+                self._forming.pop(symbol, None)
+
+    # ------------------------------------------------------------------
+    # Provider history
+    # ------------------------------------------------------------------
+
+    def needs_history(self, symbol: str, timeframe: str) -> bool:
+        """True until history was set, and for symbols with no M1 stream
+        once it is older than ``history_ttl``."""
+        entry = self._history.get((symbol, timeframe))
+        if entry is None:
+            return True
+        if symbol in self._last_m1:
+            return False
+        return time.monotonic() - entry[0] > self.history_ttl
+
+    def set_history(self, symbol: str, timeframe: str, df: pd.DataFrame):
+        with self._lock:
+            self._history[(symbol, timeframe)] = (time.monotonic(), normalize_bars(df))
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def bars(self, symbol: str, timeframe: str, limit: Optional[int] = None,
+             since: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Bars for *timeframe* in the DataFeed schema: provider history for
+        buckets before the M1 stream began, aggregated bars after."""
+        with self._lock:
+            series = self._series.get((symbol, timeframe))
+            if series is not None:
+                t, cols = series.with_forming(self._forming.get(symbol))
+            else:
+                t, cols = np.empty(0, dtype=np.int64), None
+            entry = self._history.get((symbol, timeframe))
+
+        frames = []
+        if entry is not None:
+            history = entry[1]
+            if len(t):
+                history = history[history["time"] < pd.Timestamp(int(t[0]))]
+            frames.append(history)
+        if len(t):
+            data = {"time": t.astype("datetime64[ns]")}
+            data.update(cols)
+            frames.append(pd.DataFrame(data))
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return normalize_bars(None)
+        df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        return normalize_bars(df, limit=limit, since=since)
@@ -0,0 +1,197 @@
+"""
+Bar Store - persistent, columnar OHLCV history shared by the engine.
+
+Each symbol/timeframe pair is one partition directory holding one flat
+binary file per column::
+
+    data/bars/EURUSD/M1/time.bin          int64  (UTC epoch nanoseconds)
+    data/bars/EURUSD/M1/open.bin          float64
+    ...
+    data/bars/EURUSD/M1/tick_volume.bin   int64
+
+Appends are plain file appends and reads are ``np.memmap`` views, so topping
+up a partition with a handful of new bars and reading its tail both stay
+cheap regardless of how much history is stored. DataFeed uses it to fetch
+only the bars after the last stored timestamp; any other component (deep
+agents, aggregators) can read the same partitions.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.getenv(
+    "BAR_STORE_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "data", "bars"),
+)
+
+COLUMNS = {
+    "time": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "tick_volume": np.int64,
+}
+
+
+class BarStore:
+    """Append-only columnar bar partitions with memory-mapped reads.
+
+    The last stored bar may still be forming when it is written, so an
+    append whose first bar has the same timestamp replaces it in place.
+    Partitions are compacted to ``max_bars`` once they grow past twice that.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, max_bars: int = 200_000):
+        self.root = os.path.abspath(root)
+        self.max_bars = max_bars
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Partition helpers
+    # ------------------------------------------------------------------
+
+    def _dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol, timeframe)
+
+    def _path(self, symbol: str, timeframe: str, column: str) -> str:
+        return os.path.join(self._dir(symbol, timeframe), f"{column}.bin")
+
+    def _lock(self, symbol: str, timeframe: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, timeframe), threading.Lock())
+
+    def _length(self, symbol: str, timeframe: str) -> int:
+        """Rows present in every column (repairs a torn append)."""
+        lengths = []
+        for column, dtype in COLUMNS.items():
+            path = self._path(symbol, timeframe, column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            lengths.append(size // np.dtype(dtype).itemsize)
+        n = min(lengths)
+        if any(length != n for length in lengths):
+            logger.warning("BarStore: repairing torn partition %s/%s", symbol, timeframe)
+            self._truncate(symbol, timeframe, n)
+        return n
+
+    def _truncate(self, symbol: str, timeframe: str, n: int):
+        for column, dtype in COLUMNS.items():
+            path = self._path(symbol, timeframe, column)
+            if os.path.exists(path):
+                with open(path, "r+b") as f:
+                    f.truncate(n * np.dtype(dtype).itemsize)
+
+    def _column(self, symbol: str, timeframe: str, column: str, n: int) -> np.ndarray:
+        if n == 0:
+            return np.empty(0, dtype=COLUMNS[column])
+        return np.memmap(
+            self._path(symbol, timeframe, column), dtype=COLUMNS[column], mode="r", shape=(n,)
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def last_time(self, symbol: str, timeframe: str = "M1") -> Optional[pd.Timestamp]:
+        """Timestamp (UTC, naive) of the newest stored bar, or None."""
+        with self._lock(symbol, timeframe):
+            n = self._length(symbol, timeframe)
+            if n == 0:
+                return None
+            return pd.Timestamp(int(self._column(symbol, timeframe, "time", n)[-1]))
+
+    def count(self, symbol: str, timeframe: str = "M1") -> int:
+        with self._lock(symbol, timeframe):
+            return self._length(symbol, timeframe)
+
+    def append(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Appends bars newer than the last stored one (re-writing the last bar
+        if it is repeated). Returns the number of bars written.
+        """
+        if df is None or df.empty:
+            return 0
+
+        times = _to_utc_ns(df["time"])
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+
+        with self._lock(symbol, timeframe):
+            os.makedirs(self._dir(symbol, timeframe), exist_ok=True)
+            n = self._length(symbol, timeframe)
+            start = 0
+            if n:
+                last = int(self._column(symbol, timeframe, "time", n)[-1])
+                start = int(np.searchsorted(times, last, side="left"))
+                if start < len(times) and times[start] == last:
+                    # Forming bar revised: drop the stored copy, rewrite it
+                    n -= 1
+                    self._truncate(symbol, timeframe, n)
+            if start >= len(times):
+                return 0
+
+            for column, dtype in COLUMNS.items():
+                if column == "time":
+                    values = times[start:]
+                else:
+                    values = df[column].to_numpy()[order][start:]
+                with open(self._path(symbol, timeframe, column), "ab") as f:
+                    f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+            written = len(times) - start
+            if n + written > 2 * self.max_bars:
+                self._compact(symbol, timeframe, n + written)
+            return written
+
+    def read(self, symbol: str, timeframe: str = "M1", limit: Optional[int] = None,
+             start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        Returns stored bars as a DataFrame with the DataFeed schema
+        (time, open, high, low, close, tick_volume); the newest *limit* bars
+        and/or bars at or after *start*.
+        """
+        with self._lock(symbol, timeframe):
+            n = self._length(symbol, timeframe)
+            lo = 0
+            if start is not None and n:
+                t = self._column(symbol, timeframe, "time", n)
+                lo = int(np.searchsorted(t, _to_utc_ns(pd.Series([start]))[0], side="left"))
+            if limit is not None:
+                lo = max(lo, n - limit)
+            data = {
+                column: np.array(self._column(symbol, timeframe, column, n)[lo:])
+                for column in COLUMNS
+            }
+        df = pd.DataFrame(data)
+        df["time"] = pd.to_datetime(df["time"], unit="ns")
+        return df
+
+    def _compact(self, symbol: str, timeframe: str, n: int):
+        keep = {
+            column: np.array(self._column(symbol, timeframe, column, n)[-self.max_bars:])
+            for column in COLUMNS
+        }
+        for column, values in keep.items():
+            path = self._path(symbol, timeframe, column)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(values.tobytes())
+            os.replace(tmp, path)
+        logger.info("BarStore: compacted %s/%s to %d bars", symbol, timeframe, len(keep["time"]))
+
+
+def _to_utc_ns(times: pd.Series) -> np.ndarray:
+    """Epoch nanoseconds; naive timestamps are taken as UTC."""
+    index = pd.DatetimeIndex(pd.to_datetime(times))
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.as_unit("ns").asi8.copy()
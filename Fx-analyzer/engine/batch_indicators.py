@@ -0,0 +1,120 @@
+"""
+Batch Indicator Kernel - the TechnicalAnalyzer indicator set for many
+symbols at once.
+
+OHLCV frames are stacked into a (symbols x bars) close matrix, right-aligned
+on the latest bar and left-padded with NaN for shorter histories. Every
+indicator is then computed in one pass over the whole matrix, so the cost of
+a scan grows with the number of bars, not with Python overhead per symbol.
+Results match the per-symbol 'ta' pipeline (fillna=False) column for column.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def stack_frames(frames: dict, bars: int = 500):
+    """
+    Stacks {symbol: OHLCV DataFrame} into arrays.
+    Returns (symbols, closes[S, B], last_times[S]).
+    """
+    symbols = [s for s, df in frames.items() if df is not None and not df.empty]
+    closes = np.full((len(symbols), bars), np.nan)
+    last_times = []
+    for i, symbol in enumerate(symbols):
+        df = frames[symbol]
+        tail = df["close"].to_numpy(dtype=float)[-bars:]
+        closes[i, bars - len(tail):] = tail
+        last_times.append(df["time"].iloc[-1] if "time" in df.columns else None)
+    return symbols, closes, last_times
+
+
+def _ewm(matrix: pd.DataFrame, min_periods: int, span=None, alpha=None) -> pd.DataFrame:
+    return matrix.ewm(span=span, alpha=alpha, min_periods=min_periods, adjust=False).mean()
+
+
+def compute_indicators(closes: np.ndarray) -> dict:
+    """
+    Computes RSI(14), MACD(12,26,9), Bollinger(20,2) and EMA 50/200 for a
+    (symbols x bars) close matrix. Returns {column: ndarray[S, B]} using the
+    same column names as TechnicalAnalyzer.analyze.
+    """
+    # Bars x symbols, so pandas' window kernels run down every column at once
+    close = pd.DataFrame(np.asarray(closes, dtype=float).T)
+    padding = close.isna()
+
+    # RSI (14, Wilder smoothing); the first real bar is a zero observation
+    diff = close.diff(1)
+    up = diff.where(diff > 0, 0.0).mask(padding)
+    down = (-diff).where(diff < 0, 0.0).mask(padding)
+    ema_up = _ewm(up, 14, alpha=1 / 14)
+    ema_down = _ewm(down, 14, alpha=1 / 14)
+    rsi = np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_down))
+
+    # MACD (12, 26, 9)
+    macd = _ewm(close, 12, span=12) - _ewm(close, 26, span=26)
+    macd_signal = _ewm(macd, 9, span=9)
+
+    # Bollinger Bands (20, 2)
+    mavg = close.rolling(20, min_periods=20).mean()
+    mstd = close.rolling(20, min_periods=20).std(ddof=0)
+
+    columns = {
+        "RSI": rsi,
+        "MACD_12_26_9": macd,
+        "MACDs_12_26_9": macd_signal,
+        "MACDh_12_26_9": macd - macd_signal,
+        "BBL_20_2.0": mavg - 2 * mstd,
+        "BBM_20_2.0": mavg,
+        "BBU_20_2.0": mavg + 2 * mstd,
+        "EMA_50": _ewm(close, 50, span=50),
+        "EMA_200": _ewm(close, 200, span=200),
+    }
+    out = {name: np.asarray(values, dtype=float).T for name, values in columns.items()}
+    out["close"] = np.asarray(closes, dtype=float)
+    return out
+
+
+def check_signals_batch(indicators: dict, symbols: list, last_times: list = None) -> dict:
+    """
+    Vectorized TechnicalAnalyzer.check_signals over the last bar of every
+    symbol. Returns {symbol: signal dict} for symbols that fire only.
+    """
+    rsi = indicators["RSI"][:, -1]
+    close = indicators["close"][:, -1]
+    ema_50 = indicators["EMA_50"][:, -1]
+    ema_200 = indicators["EMA_200"][:, -1]
+
+    valid = ~np.isnan(rsi)
+    oversold = valid & (rsi < 30)
+    overbought = valid & (rsi > 70)
+    has_trend = ~np.isnan(ema_50) & ~np.isnan(ema_200)
+    bullish = has_trend & (close > ema_50) & (ema_50 > ema_200)
+    bearish = has_trend & (close < ema_50) & (ema_50 < ema_200)
+
+    confidence = 0.3 + 0.2 * ((oversold & bullish) | (overbought & bearish))
+
+    signals = {}
+    for i in np.flatnonzero(oversold | overbought):
+        reasoning = []
+        if oversold[i]:
+            action = "BUY"
+            reasoning.append(f"RSI Oversold ({rsi[i]:.1f})")
+        else:
+            action = "SELL"
+            reasoning.append(f"RSI Overbought ({rsi[i]:.1f})")
+        if bullish[i]:
+            reasoning.append("Price above EMA 50 & 200 (Bullish Trend)")
+        elif bearish[i]:
+            reasoning.append("Price below EMA 50 & 200 (Bearish Trend)")
+
+        last_time = last_times[i] if last_times else None
+        signals[symbols[i]] = {
+            "symbol": symbols[i],
+            "action": action,
+            "confidence": min(float(confidence[i]) + 0.2, 0.99),  # Base boost
+            "price": float(close[i]),
+            "ai_reasoning": " + ".join(reasoning),
+            "timestamp": str(last_time) if last_time is not None else None,
+        }
+    return signals
@@ -3,6 +3,8 @@ import zmq
 import zmq.asyncio
 import json
 import logging
+import os
+import time
 from datetime import datetime
 import pandas as pd
 
@@ -16,6 +18,13 @@ try:
     from engine import database
     from engine.vibe_research_service import VibeResearchService
     from engine.agent_bridge import AgentAnalysisBridge
+    from engine.scan_scheduler import ScanScheduler, batched
+    from engine.market_data import set_history_source
+    from engine.tick_feed import MT5TickSource, SimulatedTickSource, TickIngestor
+    from engine.publisher import MarketPublisher
+    from engine.command_server import CommandServer
+    from engine.llm_cache import get_llm_cache
+    from engine.llm_scheduler import get_scheduler
 except ImportError:
     # Fallback for running inside engine/ dir
     from analyzer import TechnicalAnalyzer
@@ -26,6 +35,13 @@ except ImportError:
     import database
     from vibe_research_service import VibeResearchService
     from agent_bridge import AgentAnalysisBridge
+    from scan_scheduler import ScanScheduler, batched
+    from market_data import set_history_source
+    from tick_feed import MT5TickSource, SimulatedTickSource, TickIngestor
+    from publisher import MarketPublisher
+    from command_server import CommandServer
+    from llm_cache import get_llm_cache
+    from llm_scheduler import get_scheduler
 
 # Setup Logging
 logging.basicConfig(
@@ -47,133 +63,177 @@ SYMBOLS = [
     "TSLA",
 ]
 
+# Scan cadence: tickers publish every SCAN_INTERVAL seconds regardless of
+# how long MoE escalations take.
+SCAN_INTERVAL = float(os.getenv("SCAN_INTERVAL", "2"))
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "4"))
+# A stalled provider falls back to the last frames after this many seconds
+SCAN_FETCH_TIMEOUT = float(os.getenv("SCAN_FETCH_TIMEOUT", "5"))
+MOE_WORKERS = int(os.getenv("MOE_WORKERS", "2"))
+# Tickers analysed within this many seconds of each other share one snapshot
+SCAN_PUBLISH_WINDOW = float(os.getenv("SCAN_PUBLISH_WINDOW", "0.05"))
+
+# "poll" rescans every SCAN_INTERVAL; "ticks" reacts to quote moves only
+# (TICK_SOURCE: "mt5" or "simulated")
+INGEST_MODE = os.getenv("INGEST_MODE", "poll")
+TICK_SOURCE = os.getenv("TICK_SOURCE", "mt5")
+
+# Command socket: concurrent quick commands / long-running analysis jobs
+CMD_MAX_INFLIGHT = int(os.getenv("CMD_MAX_INFLIGHT", "32"))
+CMD_MAX_JOBS = int(os.getenv("CMD_MAX_JOBS", "2"))
+
 
 class AsyncEngineBridge:
     def __init__(self):
         self.context = zmq.asyncio.Context()
-        self.socket = self.context.socket(zmq.PUB)
-        self.socket.bind(f"tcp://*:{ZMQ_PORT}")
+        # XPUB: ticker/signal formats are only encoded for topics with subscribers
+        self.publisher = MarketPublisher.bind(self.context, f"tcp://*:{ZMQ_PORT}")
+        self.socket = self.publisher.socket
         logging.info(f"ZeroMQ Publisher bound to port {ZMQ_PORT}")
 
         self.analyzer = TechnicalAnalyzer()
         self.executor = MT5Executor()
         self.moe = MoEOrchestrator()  # Replaces LLMAnalyzer
         self.data_feed = DataFeed()
+        # Deep agents read daily history from the same bar cache
+        set_history_source(self.data_feed.history)
         self.calendar = CalendarService()
         self.vibe_research = VibeResearchService()
         self.agent_bridge = AgentAnalysisBridge()
+        self.scheduler = ScanScheduler(
+            self.data_feed,
+            self.analyzer,
+            max_workers=SCAN_WORKERS,
+            fetch_timeout=SCAN_FETCH_TIMEOUT,
+        )
 
         # Initialize Database
         database.init_db()
 
-        # Command Socket (REP)
-        self.cmd_socket = self.context.socket(zmq.REP)
-        self.cmd_socket.bind("tcp://*:5556")
+        # Command Socket (ROUTER): each request runs as its own task
+        self.command_server = CommandServer(
+            self.context,
+            "tcp://*:5556",
+            publish=self.socket.send_string,
+            max_inflight=CMD_MAX_INFLIGHT,
+            max_jobs=CMD_MAX_JOBS,
+        )
+        self._register_commands()
+
+    def _register_commands(self):
+        server = self.command_server
+        server.register("SET_LLM_MODEL", self._cmd_set_llm_model)
+        server.register("GET_MODELS", self._cmd_get_models)
+        server.register("EXECUTE_TRADE", self._cmd_execute_trade)
+        server.register("MT5_STATUS", self._cmd_mt5_status)
+        server.register("AGENT_BRIDGE_STATUS", self._cmd_agent_bridge_status)
+        server.register("LLM_CACHE_STATS", self._cmd_llm_cache_stats)
+        server.register("LLM_SCHEDULER_STATS", self._cmd_llm_scheduler_stats)
+        # Runs the full debate + deep agents; acknowledged with a job id.
+        # One at a time: the shared TradingAgents orchestrator keeps per-run
+        # state (active agents, progress manager, debate mode) on itself.
+        # Identical requests join the job already queued or running.
+        server.register(
+            "ENGINE_AGENT_ANALYZE", self._cmd_agent_analyze, job=True, max_concurrent=1,
+            coalesce=AgentAnalysisBridge.request_key,
+        )
 
     async def listen_commands(self):
         """
         Listens for commands from Node.js interface async.
         """
-        logging.info("Command Socket (REP) listening on 5556")
-        while True:
-            try:
-                msg = await self.cmd_socket.recv_json()
-                cmd = msg.get("cmd")
-
-                response = {"status": "error", "message": "Unknown command"}
-
-                if cmd == "SET_LLM_MODEL":
-                    model = msg.get("model")
-                    if model:
-                        result = self.moe.set_global_model(model)
-                        if result["success"]:
-                            response = {"status": "ok", "message": result["message"]}
-                        else:
-                            response = {
-                                "status": "error",
-                                "message": "Failed to update some agents",
-                            }
-                    else:
-                        response = {"status": "error", "message": "No model specified"}
-
-                elif cmd == "GET_MODELS":
-                    # Return all models whose API keys are configured
-                    try:
-                        from engine.agents.base import BaseAgent
-                    except ImportError:
-                        from agents.base import BaseAgent
-                    configured = BaseAgent.get_configured_models()
-                    response = {
-                        "status": "ok",
-                        "models": configured,
-                        "models_list": list(configured.values()),
-                    }
-
-                elif cmd == "EXECUTE_TRADE":
-                    sys_symbol = msg.get("symbol")
-                    sys_action = msg.get("action")
-                    sys_volume = msg.get("volume", 0.01)
-                    
-                    if sys_symbol and sys_action:
-                        logging.info(f"Executing MT5 trade: {sys_symbol} {sys_action}")
-                        exec_res = self.executor.execute_order(sys_symbol, sys_action, volume=sys_volume)
-                        if exec_res["status"] in ["filled", "mock_filled"]:
-                            response = {"status": "filled", "ticket": exec_res.get("ticket", 0)}
-                        else:
-                            response = {"status": "error", "message": exec_res.get("reason", "Execution Failed")}
-                    else:
-                        response = {"status": "error", "message": "Missing symbol or action"}
-
-                elif cmd == "MT5_STATUS":
-                    status = {
-                        "connected": getattr(self.executor, 'connected', False),
-                        "account": None,
-                        "server": None,
-                        "balance": 0.0,
-                        "equity": 0.0,
-                    }
-                    # Try to fetch account info if connected
-                    if self.executor.connected:
-                        try:
-                            import MetaTrader5 as mt5
-                            account_info = mt5.account_info()
-                            if account_info:
-                                status["account"] = account_info.login
-                                status["server"] = account_info.server
-                                status["balance"] = account_info.balance
-                                status["equity"] = account_info.equity
-                        except Exception:
-                            pass
-                    response = {"status": "ok", "info": status}
-
-                elif cmd == "ENGINE_AGENT_ANALYZE":
-                    query = msg.get("query", "")
-                    active_agents = msg.get("active_agents")
-                    debate_rounds = msg.get("debate_rounds")
-                    risk_rounds = msg.get("risk_rounds")
-
-                    if not query:
-                        response = {"status": "error", "message": "No query provided"}
-                    else:
-                        logging.info(f"Agent analysis requested: {query[:80]}")
-                        result = await self.agent_bridge.analyze(
-                            query,
-                            active_agents=active_agents,
-                            debate_rounds=debate_rounds,
-                            risk_rounds=risk_rounds,
-                        )
-                        response = result
-
-                elif cmd == "AGENT_BRIDGE_STATUS":
-                    response = {
-                        "status": "ok",
-                        "initialized": self.agent_bridge.initialized,
-                    }
+        await self.command_server.serve()
+
+    async def _cmd_set_llm_model(self, msg):
+        model = msg.get("model")
+        if not model:
+            return {"status": "error", "message": "No model specified"}
+        result = self.moe.set_global_model(model)
+        if result["success"]:
+            return {"status": "ok", "message": result["message"]}
+        return {"status": "error", "message": "Failed to update some agents"}
+
+    async def _cmd_get_models(self, msg):
+        # Return all models whose API keys are configured
+        try:
+            from engine.agents.base import BaseAgent
+        except ImportError:
+            from agents.base import BaseAgent
+        configured = BaseAgent.get_configured_models()
+        return {
+            "status": "ok",
+            "models": configured,
+            "models_list": list(configured.values()),
+        }
 
-                await self.cmd_socket.send_json(response)
+    async def _cmd_execute_trade(self, msg):
+        sys_symbol = msg.get("symbol")
+        sys_action = msg.get("action")
+        sys_volume = msg.get("volume", 0.01)
+
+        if not (sys_symbol and sys_action):
+            return {"status": "error", "message": "Missing symbol or action"}
+
+        logging.info(f"Executing MT5 trade: {sys_symbol} {sys_action}")
+        exec_res = self.executor.execute_order(sys_symbol, sys_action, volume=sys_volume)
+        if exec_res["status"] in ["filled", "mock_filled"]:
+            return {"status": "filled", "ticket": exec_res.get("ticket", 0)}
+        return {"status": "error", "message": exec_res.get("reason", "Execution Failed")}
+
+    async def _cmd_mt5_status(self, msg):
+        status = {
+            "connected": getattr(self.executor, 'connected', False),
+            "account": None,
+            "server": None,
+            "balance": 0.0,
+            "equity": 0.0,
+        }
+        # Try to fetch account info if connected
+        if self.executor.connected:
+            try:
+                import MetaTrader5 as mt5
+                account_info = mt5.account_info()
+                if account_info:
+                    status["account"] = account_info.login
+                    status["server"] = account_info.server
+                    status["balance"] = account_info.balance
+                    status["equity"] = account_info.equity
+            except Exception:
+                pass
+        return {"status": "ok", "info": status}
+
+    async def _cmd_agent_bridge_status(self, msg):
+        return {
+            "status": "ok",
+            "initialized": self.agent_bridge.initialized,
+            "report_cache": self.agent_bridge.report_cache.stats(),
+            "coalesced": self.command_server.coalesced,
+        }
 
-            except Exception as e:
-                logging.error(f"Command Error: {e}")
+    async def _cmd_llm_cache_stats(self, msg):
+        cache = get_llm_cache()
+        if cache is None:
+            return {"status": "ok", "enabled": False}
+        return {"status": "ok", "enabled": True, "stats": cache.stats()}
+
+    async def _cmd_llm_scheduler_stats(self, msg):
+        return {"status": "ok", "stats": get_scheduler().stats()}
+
+    async def _cmd_agent_analyze(self, msg, progress):
+        query = msg.get("query", "")
+        if not query:
+            return {"status": "error", "message": "No query provided"}
+
+        logging.info(f"Agent analysis requested: {query[:80]}")
+        return await self.agent_bridge.analyze(
+            query,
+            active_agents=msg.get("active_agents"),
+            debate_rounds=msg.get("debate_rounds"),
+            risk_rounds=msg.get("risk_rounds"),
+            parallel_debate=msg.get("parallel_debate"),
+            refresh=bool(msg.get("refresh", False)),
+            progress=progress,
+        )
 
     async def generate_daily_briefing(self):
         """
@@ -182,10 +242,16 @@ class AsyncEngineBridge:
         logging.info("Generating Daily Briefing...")
         briefing_data = self.calendar.get_todays_events()
 
+        loop = asyncio.get_running_loop()
+        daily = await loop.run_in_executor(
+            None, self.data_feed.fetch_many, SYMBOLS[:5], "D1", 200
+        )
+
         scan_results = []
-        for symbol in SYMBOLS[:5]:
-            df = self.data_feed.fetch_data(symbol)
-            analysis = self.analyzer.analyze_daily(df)
+        for symbol, df in daily.items():
+            if df is None or df.empty:
+                continue
+            analysis = self.analyzer.analyze_daily(self.analyzer.analyze(df))
             if analysis:
                 scan_results.append(
                     {
@@ -205,6 +271,49 @@ class AsyncEngineBridge:
         await self.socket.send_string(f"notification {json.dumps(briefing)}")
         logging.info("Daily Briefing Sent")
 
+    async def _handle_escalation(self, result):
+        """
+        Runs the MoE consensus for a technical signal and publishes it.
+        Consumed from the scheduler's escalation queue, off the ticker path.
+        """
+        symbol = result.symbol
+        signal = result.signal
+        logging.info(f"Signal Triggered: {symbol} {signal['action']}")
+
+        # The TechnicalAgent receives the already-analyzed frame
+        moe_result = await self.moe.get_consensus_signal(
+            symbol, result.df, direction=signal["action"]
+        )
+
+        # A reused decision was stored and published when it was made; the
+        # setup keeps triggering on every scan until it goes stale
+        if moe_result.get("cached"):
+            logging.debug(f"MoE decision for {symbol} unchanged, not republished")
+            return
+
+        # Merge Results
+        signal["ai_reasoning"] = moe_result.get("reasoning")
+        signal["agent_breakdown"] = moe_result.get("agent_breakdown", {})
+        signal["risk_factors"] = (
+            f"Lev: {moe_result.get('risk_parameters', {}).get('leverage')}x"
+        )
+        signal["confidence"] = moe_result.get("confidence", 0.5)
+
+        # Re-evaluate Action based on Consensus
+        # If MoE says HOLD/NEUTRAL but Tech said BUY, we kill the trade.
+        if moe_result.get("action") == "HOLD":
+            logging.info(f"MoE vetoed {symbol} trade.")
+            return  # Skip publishing
+
+        # Store & Publish
+        signal["id"] = int(time.time() * 1000)
+        signal["source"] = "MOE_ENGINE"
+
+        database.store_signal(signal)
+        logging.info(f"MoE Signal Published: {signal['id']}")
+
+        await self.publisher.publish_signal(signal)
+
     async def run_loop(self):
         logging.info("Engine Bridge Running...")
 
@@ -213,79 +322,97 @@ class AsyncEngineBridge:
         await self.generate_daily_briefing()
 
         try:
-            while True:
-                for symbol in SYMBOLS:
-                    # 1. Fetch
-                    df = self.data_feed.fetch_data(symbol)
-
-                    # 2. Analyze Technicals (Fast check first)
-                    analyzed_df = self.analyzer.analyze(df)
-                    signal = self.analyzer.check_signals(analyzed_df, symbol)
-
-                    # 3. If Signal -> Engage MoE
-                    if signal:
-                        logging.info(f"Signal Triggered: {symbol} {signal['action']}")
-
-                        # Call MoE Consensus (Async)
-                        # We pass 'df' which the TechnicalAgent will re-analyze,
-                        # but we could optimize by passing pre-calced data.
-                        # For now, following the test_moe pattern:
-                        moe_result = await self.moe.get_consensus_signal(
-                            symbol, analyzed_df
-                        )
-
-                        # Merge Results
-                        signal["ai_reasoning"] = moe_result.get("reasoning")
-                        signal["agent_breakdown"] = moe_result.get(
-                            "agent_breakdown", {}
-                        )
-                        signal["risk_factors"] = (
-                            f"Lev: {moe_result.get('risk_parameters', {}).get('leverage')}x"
-                        )
-                        signal["confidence"] = moe_result.get("confidence", 0.5)
-
-                        # Re-evaluate Action based on Consensus
-                        # If MoE says HOLD/NEUTRAL but Tech said BUY, we might kill the trade
-                        # or just downgrade confidence.
-                        if moe_result.get("action") == "HOLD":
-                            logging.info(f"MoE vetoed {symbol} trade.")
-                            continue  # Skip publishing
-
-                        # Store & Publish
-                        signal["id"] = int(time.time() * 1000)
-                        signal["source"] = "MOE_ENGINE"
-
-                        database.store_signal(signal)
-                        logging.info(f"MoE Signal Published: {signal['id']}")
-
-                        await self.socket.send_string(f"signal {json.dumps(signal)}")
-
-                    # 4. Ticker Update
-                    current_price = float(df.iloc[-1]["close"])
-                    ticker = {
-                        "symbol": symbol,
-                        "price": current_price,
-                        "timestamp": datetime.now().isoformat(),
-                    }
-                    await self.socket.send_string(f"ticker {json.dumps(ticker)}")
-
-                await asyncio.sleep(2)
+            if INGEST_MODE == "ticks":
+                await self._run_tick_loop()
+            else:
+                await self._run_poll_loop()
 
         except asyncio.CancelledError:
             logging.info("Loop cancelled")
         finally:
+            self.scheduler.shutdown()
             self.data_feed.shutdown()
             self.executor.shutdown()
 
+    async def _publish_results(self, results, on_published=None):
+        tickers = []
+        for result in results:
+            if result.error:
+                continue
+
+            # If Signal -> queue for MoE (never awaited here)
+            if result.signal:
+                self.scheduler.escalate(result)
+
+            # Ticker Update
+            now = datetime.now()
+            tickers.append({
+                "symbol": result.symbol,
+                "price": result.price,
+                "timestamp": now.isoformat(),
+                "timestamp_ms": int(now.timestamp() * 1000),
+            })
+
+        # One batch per call, encoded per subscribed topic
+        await self.publisher.publish_tickers(tickers)
+        if on_published:
+            for ticker in tickers:
+                on_published(ticker["symbol"])
+
+    async def _publish_stream(self, results, on_published=None):
+        """Publishes a scan as its results arrive: the symbols analysed within
+        SCAN_PUBLISH_WINDOW of each other go out as one snapshot, a slow
+        symbol follows in its own."""
+        async for batch in batched(results, SCAN_PUBLISH_WINDOW):
+            await self._publish_results(batch, on_published)
+
+    async def _run_poll_loop(self):
+        while True:
+            cycle_start = time.monotonic()
+
+            # Fetch + Analyze Technicals for all symbols (worker pool); tickers
+            # go out in snapshots as the symbols finish
+            await self._publish_stream(self.scheduler.scan_iter(SYMBOLS))
+
+            elapsed = time.monotonic() - cycle_start
+            await asyncio.sleep(max(0.0, SCAN_INTERVAL - elapsed))
+
+    async def _run_tick_loop(self):
+        source = SimulatedTickSource() if TICK_SOURCE == "simulated" else MT5TickSource()
+        if not source.available():
+            logging.warning(f"Tick source '{source.name}' unavailable, falling back to polling")
+            return await self._run_poll_loop()
+
+        ingestor = TickIngestor(source, self.data_feed, SYMBOLS)
+        ingestor.start(asyncio.get_running_loop())
+        last_stats = time.monotonic()
+        try:
+            while True:
+                # Only symbols whose quote moved are analysed and published
+                frames = await ingestor.next_frames()
+                await self._publish_stream(
+                    self.scheduler.analyze_iter(frames), ingestor.mark_published
+                )
+
+                if time.monotonic() - last_stats > 60:
+                    logging.info(f"Tick ingestion: {ingestor.stats()}")
+                    last_stats = time.monotonic()
+        finally:
+            ingestor.stop()
+
     async def main(self):
         # Start agent bridge initialisation in background (non-blocking)
         init_task = asyncio.create_task(self.agent_bridge.initialize())
 
-        # Run Command Listener, Main Loop and Vibe Research background tasks concurrently
+        # Run Command Listener, Main Loop, MoE escalation workers, Vibe
+        # Research and news ingestion background tasks concurrently
         await asyncio.gather(
+            self.publisher.track_subscriptions(),
             self.listen_commands(),
             self.run_loop(),
+            self.scheduler.run_escalations(self._handle_escalation, MOE_WORKERS),
             self.vibe_research.run_research_tasks(),
+            self.moe.rss.ingester.run(),
             init_task,
         )
 
@@ -0,0 +1,324 @@
+"""
+Command Server - concurrent request handling on the command port.
+
+The command socket is a ROUTER, so any number of clients can have requests
+in flight and a slow command never holds up the others. Every request is
+dispatched as its own task; replies go back to the requesting peer with its
+routing envelope, so plain REQ clients keep working and DEALER clients can
+pipeline requests (an ``id`` field in the request is echoed in the reply).
+
+Commands registered as jobs (e.g. ENGINE_AGENT_ANALYZE, which runs for
+minutes) are acknowledged immediately with a job id:
+
+    -> {"cmd": "ENGINE_AGENT_ANALYZE", "query": "..."}
+    <- {"status": "accepted", "job_id": "3f2a..."}
+
+and their progress and result are published on the PUB socket as
+``job {json}`` messages (``state``: queued / running / progress / done /
+error / cancelled). Clients that cannot subscribe can poll with JOB_STATUS, or send
+``"wait": true`` to get the result inline as before. JOB_CANCEL cancels a
+queued or running job; the cancellation reaches whatever the job is
+awaiting (LLM requests, scheduler queues, tool calls) straight away.
+
+Concurrency is bounded: at most ``max_inflight`` quick commands and
+``max_jobs`` jobs run at once, further requests queue. A job command can be
+limited further with ``register(..., max_concurrent=n)``, e.g. when its
+handler keeps per-run state on a shared object. With
+``register(..., coalesce=key_fn)`` a request whose key matches a job of the
+same command that is still queued or running joins that job instead of
+starting another: it is acknowledged with the existing job id (and
+``"coalesced": true``), and the job's updates list every submitter's
+request id in ``ids``. Cancelling a shared job cancels it for all of them.
+COMMAND_STATS returns per-command latency percentiles.
+
+Usage (from bridge.py):
+    server = CommandServer(self.context, "tcp://*:5556", publish=self.socket.send_string)
+    server.register("MT5_STATUS", self._cmd_mt5_status)
+    server.register("ENGINE_AGENT_ANALYZE", self._cmd_agent_analyze, job=True,
+                    max_concurrent=1, coalesce=AgentAnalysisBridge.request_key)
+    await server.serve()
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import zmq
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[..., Awaitable[dict]]
+
+
+class CommandStats:
+    """Rolling latency samples per command."""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+
+    def record(self, cmd: str, seconds: float, ok: bool = True):
+        self._samples.setdefault(cmd, deque(maxlen=self.window)).append(seconds)
+        self._counts[cmd] = self._counts.get(cmd, 0) + 1
+        if not ok:
+            self._errors[cmd] = self._errors.get(cmd, 0) + 1
+
+    def snapshot(self) -> dict:
+        stats = {}
+        for cmd, samples in self._samples.items():
+            lat = sorted(samples)
+            stats[cmd] = {
+                "count": self._counts[cmd],
+                "errors": self._errors.get(cmd, 0),
+                "p50_ms": round(lat[len(lat) // 2] * 1000, 2),
+                "p99_ms": round(lat[int(len(lat) * 0.99)] * 1000, 2),
+                "max_ms": round(lat[-1] * 1000, 2),
+            }
+        return stats
+
+
+class CommandServer:
+    """ROUTER command socket with per-request tasks and background jobs."""
+
+    def __init__(
+        self,
+        context,
+        endpoint: str,
+        publish: Optional[Callable[[str], Awaitable]] = None,
+        max_inflight: int = 32,
+        max_jobs: int = 2,
+        job_history: int = 100,
+    ):
+        self.socket = context.socket(zmq.ROUTER)
+        self.socket.bind(endpoint)
+        self.endpoint = endpoint
+        self.publish = publish
+        self.stats = CommandStats()
+        self._handlers: Dict[str, Handler] = {}
+        self._job_commands = set()
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self._job_slots = asyncio.Semaphore(max_jobs)
+        self._command_slots: Dict[str, asyncio.Semaphore] = {}
+        self._coalesce_keys: Dict[str, Callable[[dict], Hashable]] = {}
+        self._active_keys: Dict[Tuple[str, Hashable], str] = {}
+        self.coalesced = 0
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._job_history = job_history
+        self._tasks = set()
+        self._send_lock = asyncio.Lock()
+
+        self.register("JOB_STATUS", self._cmd_job_status)
+        self.register("JOB_CANCEL", self._cmd_job_cancel)
+        self.register("COMMAND_STATS", self._cmd_stats)
+
+    def register(self, cmd: str, handler: Handler, job: bool = False,
+                 max_concurrent: Optional[int] = None,
+                 coalesce: Optional[Callable[[dict], Hashable]] = None):
+        """*handler(msg)* returns the reply dict. Job handlers are called as
+        *handler(msg, progress)* where ``await progress(**fields)`` publishes
+        a progress update. At most *max_concurrent* jobs of this command run
+        at once (on top of the server-wide ``max_jobs``). Job requests with
+        the same *coalesce(msg)* key share one job while it is unfinished."""
+        self._handlers[cmd] = handler
+        if max_concurrent:
+            self._command_slots[cmd] = asyncio.Semaphore(max_concurrent)
+        else:
+            self._command_slots.pop(cmd, None)
+        if coalesce:
+            self._coalesce_keys[cmd] = coalesce
+        else:
+            self._coalesce_keys.pop(cmd, None)
+        if job:
+            self._job_commands.add(cmd)
+        else:
+            self._job_commands.discard(cmd)
+
+    # ------------------------------------------------------------------
+    # Socket loop
+    # ------------------------------------------------------------------
+
+    async def serve(self):
+        logger.info("Command Socket (ROUTER) listening on %s", self.endpoint)
+        while True:
+            frames = await self.socket.recv_multipart()
+            # [peer identity, (REQ delimiter), body]
+            envelope, body = frames[:-1], frames[-1]
+            self._spawn(self._dispatch(envelope, body))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _reply(self, envelope: List[bytes], response: dict):
+        payload = json.dumps(response, default=str).encode()
+        async with self._send_lock:
+            await self.socket.send_multipart(envelope + [payload])
+
+    async def _dispatch(self, envelope: List[bytes], body: bytes):
+        start = time.monotonic()
+        try:
+            msg = json.loads(body)
+        except ValueError:
+            msg = None
+        # Valid JSON that is not an object ([1], "x") gets the same answer
+        if not isinstance(msg, dict):
+            await self._reply(envelope, {"status": "error", "message": "Invalid JSON"})
+            return
+        cmd = msg.get("cmd")
+        handler = self._handlers.get(cmd)
+
+        if handler is None:
+            response = {"status": "error", "message": "Unknown command"}
+        elif cmd in self._job_commands and not msg.get("wait"):
+            job, joined = self._start_job(cmd, handler, msg)
+            response = {"status": "accepted", "job_id": job["job_id"]}
+            if joined:
+                response["coalesced"] = True
+        elif cmd in self._job_commands:
+            job, _ = self._start_job(cmd, handler, msg)
+            # A joined job is shared: one waiter going away must not cancel it
+            await asyncio.shield(job["task"])
+            response = job["result"] if job["state"] == "done" else {
+                "status": "error", "message": job.get("error", "Job failed")
+            }
+        else:
+            async with self._inflight:
+                try:
+                    response = await handler(msg)
+                except Exception as e:
+                    logger.error("Command %s failed: %s", cmd, e)
+                    response = {"status": "error", "message": str(e)}
+
+        if "id" in msg and isinstance(response, dict):
+            response = {**response, "id": msg["id"]}
+        await self._reply(envelope, response)
+        if cmd not in self._job_commands:
+            ok = isinstance(response, dict) and response.get("status") != "error"
+            self.stats.record(cmd or "?", time.monotonic() - start, ok)
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def _start_job(self, cmd: str, handler: Handler, msg: dict) -> Tuple[dict, bool]:
+        """Starts a job for *msg*, or joins the unfinished job with the same
+        coalesce key. Returns (job, joined)."""
+        key = None
+        if cmd in self._coalesce_keys:
+            key = (cmd, self._coalesce_keys[cmd](msg))
+            existing = self._jobs.get(self._active_keys.get(key, ""))
+            if existing is not None and existing["state"] in ("queued", "running"):
+                self.coalesced += 1
+                if "id" in msg:
+                    existing.setdefault("ids", []).append(msg["id"])
+                logger.info("Job %s (%s) joined by another request", existing["job_id"], cmd)
+                return existing, True
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "cmd": cmd,
+            "state": "queued",
+            "submitted": time.time(),
+        }
+        # Set here, not in the task: a request joining this job before it
+        # starts must see the first submitter's id
+        if "id" in msg:
+            job["id"] = msg["id"]
+            job["ids"] = [msg["id"]]
+        if key is not None:
+            job["key"] = key
+            self._active_keys[key] = job["job_id"]
+        self._jobs[job["job_id"]] = job
+        while len(self._jobs) > self._job_history:
+            oldest = next(iter(self._jobs.values()))
+            if oldest["state"] in ("queued", "running"):
+                break
+            self._jobs.popitem(last=False)
+        job["task"] = self._spawn(self._run_job(job, handler, msg))
+        return job, False
+
+    async def _publish_job(self, job: dict, **fields):
+        if self.publish is None:
+            return
+        event = {"job_id": job["job_id"], "cmd": job["cmd"], "state": job["state"], **fields}
+        if "id" in job:
+            event["id"] = job["id"]
+        if "ids" in job:
+            event["ids"] = job["ids"]
+        try:
+            await self.publish(f"job {json.dumps(event, default=str)}")
+        except Exception as e:
+            logger.warning("Job %s publish failed: %s", job["job_id"], e)
+
+    async def _run_job(self, job: dict, handler: Handler, msg: dict):
+        async def progress(**fields):
+            await self._publish_job(job, state="progress", **fields)
+
+        start = time.monotonic()
+        command_slot = self._command_slots.get(job["cmd"]) or contextlib.nullcontext()
+        try:
+            await self._publish_job(job)
+            # Per-command slot first, so a queued job never holds a shared one
+            async with command_slot, self._job_slots:
+                job["state"] = "running"
+                job["started"] = time.time()
+                await self._publish_job(job)
+                job["result"] = await handler(msg, progress)
+                job["state"] = "done"
+        except asyncio.CancelledError:
+            # JOB_CANCEL, whether the job was still queued or already running
+            logger.info("Job %s (%s) cancelled", job["job_id"], job["cmd"])
+            job["state"] = "cancelled"
+            job["error"] = "Job cancelled"
+        except Exception as e:
+            logger.error("Job %s (%s) failed: %s", job["job_id"], job["cmd"], e)
+            job["state"] = "error"
+            job["error"] = str(e)
+        job["finished"] = time.time()
+        if self._active_keys.get(job.get("key")) == job["job_id"]:
+            del self._active_keys[job["key"]]
+        self.stats.record(job["cmd"], time.monotonic() - start, job["state"] == "done")
+        await self._publish_job(job, result=job.get("result"), error=job.get("error"))
+
+    def job_status(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {k: v for k, v in job.items() if k not in ("task", "key")}
+
+    async def _cmd_job_status(self, msg: dict) -> dict:
+        job = self.job_status(msg.get("job_id", ""))
+        if job is None:
+            return {"status": "error", "message": "Unknown job"}
+        return {"status": "ok", "job": job}
+
+    def cancel_job(self, job_id: str) -> bool:
+        """Cancels a queued or running job; False if it is unknown or finished."""
+        job = self._jobs.get(job_id)
+        if job is None or job["state"] not in ("queued", "running"):
+            return False
+        job["task"].cancel()
+        return True
+
+    async def _cmd_job_cancel(self, msg: dict) -> dict:
+        if not self.cancel_job(msg.get("job_id", "")):
+            return {"status": "error", "message": "Unknown or finished job"}
+        return {"status": "ok"}
+
+    async def _cmd_stats(self, msg: dict) -> dict:
+        running = sum(1 for j in self._jobs.values() if j["state"] == "running")
+        queued = sum(1 for j in self._jobs.values() if j["state"] == "queued")
+        return {
+            "status": "ok",
+            "commands": self.stats.snapshot(),
+            "jobs": {"running": running, "queued": queued, "coalesced": self.coalesced},
+        }
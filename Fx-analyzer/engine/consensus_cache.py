@@ -0,0 +1,165 @@
+"""
+Consensus Cache - reuse MoE decisions across repeated triggers.
+
+While a setup persists, ``check_signals`` keeps firing for the same symbol
+on every scan, and each escalation would re-run all four LLM experts plus
+the synthesis. Decisions are cached per (symbol, direction, fingerprint),
+where the fingerprint quantises what the experts actually react to: the
+RSI bucket, the EMA trend label and a volatility regime computed from the
+bars. A cached decision is reused until it is older than ``ttl`` or price
+has moved more than ``max_move`` (fraction) from where it was made.
+
+Identical requests that arrive while one is already running await that
+run instead of starting their own. Every decision carries ``cached``: False
+for the caller whose run produced it, True for cache hits and coalesced
+waiters, so callers can act on (store, publish) each decision only once.
+
+Usage (from orchestrator.py):
+    decision = await self.cache.get_or_compute(key, price, lambda: self._run_experts(...))
+"""
+
+import asyncio
+import copy
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CONSENSUS_TTL = float(os.getenv("CONSENSUS_TTL", "300"))
+CONSENSUS_MAX_MOVE = float(os.getenv("CONSENSUS_MAX_MOVE", "0.002"))  # 0.2%
+CONSENSUS_RSI_BUCKET = float(os.getenv("CONSENSUS_RSI_BUCKET", "10"))
+
+Key = Tuple[str, str, Tuple]
+
+
+def volatility_regime(df: pd.DataFrame, fast: int = 20, slow: int = 100) -> str:
+    """HIGH_VOL / LOW_VOL / NORMAL from recent vs longer-run realised
+    volatility of close-to-close returns."""
+    if df is None or len(df) < slow + 1:
+        return "NORMAL"
+    returns = np.diff(np.log(df["close"].to_numpy(dtype=float)[-(slow + 1):]))
+    slow_vol = returns.std()
+    if not slow_vol:
+        return "NORMAL"
+    ratio = returns[-fast:].std() / slow_vol
+    if ratio > 1.5:
+        return "HIGH_VOL"
+    if ratio < 0.67:
+        return "LOW_VOL"
+    return "NORMAL"
+
+
+def fingerprint(tech_data: Dict[str, Any], df: Optional[pd.DataFrame] = None,
+                rsi_bucket: float = CONSENSUS_RSI_BUCKET) -> Tuple:
+    rsi = tech_data.get("rsi")
+    bucket = int(float(rsi) // rsi_bucket) if rsi is not None else None
+    return (bucket, tech_data.get("trend"), volatility_regime(df))
+
+
+@dataclass
+class _Entry:
+    decision: Dict[str, Any]
+    price: Optional[float]
+    created: float
+
+
+class ConsensusCache:
+    """TTL + price-move invalidated decision cache with in-flight dedupe."""
+
+    def __init__(self, ttl: float = CONSENSUS_TTL, max_move: float = CONSENSUS_MAX_MOVE,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_move = max_move
+        self.clock = clock
+        self._entries: Dict[Key, _Entry] = {}
+        self._inflight: Dict[Key, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale = 0
+
+    @staticmethod
+    def key(symbol: str, direction: Optional[str], tech_data: Dict[str, Any],
+            df: Optional[pd.DataFrame] = None) -> Key:
+        return (symbol, (direction or "ANY").upper(), fingerprint(tech_data, df))
+
+    def _fresh(self, entry: _Entry, price: Optional[float]) -> bool:
+        if self.clock() - entry.created > self.ttl:
+            return False
+        if price is not None and entry.price:
+            return abs(price - entry.price) / entry.price <= self.max_move
+        return True
+
+    def get(self, key: Key, price: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not self._fresh(entry, price):
+            del self._entries[key]
+            self.stale += 1
+            return None
+        return copy.deepcopy(entry.decision)
+
+    async def get_or_compute(self, key: Key, price: Optional[float],
+                             compute: Callable[[], Awaitable[Dict[str, Any]]],
+                             cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Dict[str, Any]:
+        """Cached decision for *key*, else the result of ``compute()``
+        (stored unless ``cacheable(decision)`` is False). The returned copy's
+        ``cached`` flag is False only for the run that computed it."""
+        cached = self.get(key, price)
+        if cached is not None:
+            self.hits += 1
+            logger.debug("Consensus cache hit for %s", key)
+            return {**cached, "cached": True}
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return {**copy.deepcopy(await asyncio.shield(pending)), "cached": True}
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this waiter was cancelled
+                # The run we joined was cancelled; start our own
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            decision = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        if cacheable is None or cacheable(decision):
+            self._entries[key] = _Entry(decision, price, self.clock())
+        future.set_result(decision)
+        return {**copy.deepcopy(decision), "cached": False}
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drops cached decisions for *symbol* (all symbols if None)."""
+        if symbol is None:
+            self._entries.clear()
+        else:
+            for key in [k for k in self._entries if k[0] == symbol]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale": self.stale,
+        }
@@ -1,162 +1,207 @@
-import MetaTrader5 as mt5
+import os
 import pandas as pd
-import numpy as np
-import random
-from datetime import datetime
 import logging
-import yfinance as yf
-
-# Mapping between internal symbols and Yahoo Finance tickers
-YF_MAPPING = {
-    "EURUSD": "EURUSD=X",
-    "GBPUSD": "GBPUSD=X",
-    "USDJPY": "USDJPY=X",
-    "AUDUSD": "AUDUSD=X",
-    "BTCUSD": "BTC-USD",
-    "ETHUSD": "ETH-USD",
-    "US30": "^DJI",
-    "US500": "^GSPC",
-    "AAPL": "AAPL",
-    "TSLA": "TSLA"
-}
+from typing import Dict, List, Optional
+
+try:
+    from engine.bar_aggregator import BarAggregator
+    from engine.bar_store import BarStore
+    from engine.market_data import MarketDataProvider, build_providers
+    from engine.mock_bars import MockBarGenerator
+except ImportError:
+    from bar_aggregator import BarAggregator
+    from bar_store import BarStore
+    from market_data import MarketDataProvider, build_providers
+    from mock_bars import MockBarGenerator
+
+# Synthetic fallback feed (MOCK_SEED makes runs reproducible)
+MOCK_SEED = int(os.environ["MOCK_SEED"]) if os.getenv("MOCK_SEED") else None
+MOCK_REGIME = os.getenv("MOCK_REGIME", "random")
+MOCK_VOLATILITY = float(os.getenv("MOCK_VOLATILITY", "1.0"))
+MOCK_GAP_PROBABILITY = float(os.getenv("MOCK_GAP_PROBABILITY", "0"))
+
+# Provider bars fetched once per symbol to back the aggregated timeframes
+# (750 daily bars covers the deep agents' 2 years)
+HISTORY_BARS = int(os.getenv("HISTORY_BARS", "750"))
 
 class DataFeed:
     """
-    Handles data ingestion from MetaTrader 5 or falls back to Yahoo Finance / mock data.
+    Fetches OHLCV bars through a chain of market-data providers (MT5, then
+    Yahoo Finance by default; see engine.market_data) with mock data as the
+    last resort. Bars from live providers are persisted in a BarStore; each
+    call only fetches the bars after the last stored timestamp and serves
+    the frame from the store.
+
+    Only M1 is fetched continuously. M5/M15/H1/D1 are served by a
+    BarAggregator built from the same M1 stream, backed by one provider
+    history download per symbol and timeframe.
     """
-    def __init__(self):
-        self.use_mt5 = False
-        self.initialize_mt5()
-
-    def initialize_mt5(self):
-        try:
-            if mt5.initialize():
-                logging.info("DataFeed: MT5 Initialized Successfully")
-                self.use_mt5 = True
-            else:
-                logging.warning(f"DataFeed: MT5 Init Failed ({mt5.last_error()}), falling back to Yahoo Finance")
-                self.use_mt5 = False
-        except Exception as e:
-            logging.error(f"DataFeed: MT5 Error {e}, falling back to Yahoo Finance")
-            self.use_mt5 = False
-
-    def fetch_data(self, symbol: str, timeframe=None, limit=500) -> pd.DataFrame:
-        if timeframe is None:
-            timeframe = mt5.TIMEFRAME_M1
+    def __init__(self, store: BarStore = None, providers: List[MarketDataProvider] = None,
+                 mock: MockBarGenerator = None):
+        self.store = store if store is not None else BarStore()
+        self.providers = providers if providers is not None else build_providers()
+        self._mocks: Dict[str, MockBarGenerator] = {}
+        if mock is not None:
+            self._mocks[mock.timeframe] = mock
+        self.aggregator = BarAggregator(self.store)
+        self._mocked = set()  # (symbol, timeframe) currently served mock data
+        logging.info(f"DataFeed: providers {[p.name for p in self.providers if p.available()]}")
+
+    def fetch_data(self, symbol: str, timeframe: str = "M1", limit=500) -> pd.DataFrame:
         """
         Fetches OHLCV data. 
         """
-        if self.use_mt5:
-            rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, limit)
-            if rates is not None and len(rates) > 0:
-                df = pd.DataFrame(rates)
-                df['time'] = pd.to_datetime(df['time'], unit='s')
-                return df[['time', 'open', 'high', 'low', 'close', 'tick_volume']]
-            else:
-                logging.warning(f"DataFeed: Failed to fetch {symbol} from MT5, falling back to yfinance")
-                return self.fetch_yfinance_data(symbol, limit)
-        
-        return self.fetch_yfinance_data(symbol, limit)
+        return self.fetch_many([symbol], timeframe, limit)[symbol]
+
+    def fetch_many(self, symbols: List[str], timeframe: str = "M1", limit=500) -> Dict[str, pd.DataFrame]:
+        """
+        Fetches OHLCV data for several symbols. M1 comes from the provider
+        chain (and feeds the aggregator); other timeframes from the aggregator.
+        """
+        if timeframe in self.aggregator.timeframes:
+            return self._fetch_aggregated(symbols, timeframe, limit)
+        frames = self._fetch_chain(symbols, timeframe, limit)
+        if timeframe == "M1":
+            for symbol, df in frames.items():
+                # Mock bars never leak into the aggregated timeframes
+                if (symbol, timeframe) not in self._mocked:
+                    self.aggregator.update(symbol, df)
+        return frames
+
+    def _fetch_aggregated(self, symbols: List[str], timeframe: str, limit) -> Dict[str, pd.DataFrame]:
+        stale = [s for s in symbols if self.aggregator.needs_history(s, timeframe)]
+        if stale:
+            bars = max(limit or 0, HISTORY_BARS)
+            for symbol, df in self._fetch_chain(stale, timeframe, bars).items():
+                self.aggregator.set_history(symbol, timeframe, df)
+        return {s: self.aggregator.bars(s, timeframe, limit) for s in symbols}
+
+    def history(self, symbol: str, days: int, timeframe: str = "D1") -> pd.DataFrame:
+        """
+        The last *days* of *timeframe* bars for *symbol*. Registered as the
+        engine.market_data history source so the deep agents share this cache.
+        """
+        since = pd.Timestamp.now(tz="UTC").tz_localize(None) - pd.Timedelta(days=days)
+        df = self.fetch_many([symbol], timeframe, limit=None)[symbol]
+        if (symbol, timeframe) in self._mocked:
+            return df.iloc[0:0]
+        return df[df["time"] >= since].reset_index(drop=True)
 
-    def fetch_yfinance_data(self, symbol: str, limit=500) -> pd.DataFrame:
+    def _fetch_chain(self, symbols: List[str], timeframe: str, limit) -> Dict[str, pd.DataFrame]:
         """
-        Fetches live real-time/historical data from Yahoo Finance as a fallback.
+        One batched request per provider. Symbols a provider cannot serve
+        fall through to the next, then to stored or mock data.
         """
-        yf_symbol = YF_MAPPING.get(symbol, symbol)
-        logging.info(f"DataFeed: Fetching {symbol} ({yf_symbol}) live data from Yahoo Finance...")
-        
-        try:
-            # Fetch 1-minute interval data (available for the last 7 days)
-            ticker = yf.Ticker(yf_symbol)
-            df = ticker.history(period="2d", interval="1m")
-            
+        frames = {}
+        pending = list(symbols)
+        for provider in self.providers:
+            if not pending:
+                break
+            if not provider.available():
+                continue
+            try:
+                frames.update(self._fetch_from(provider, pending, timeframe, limit))
+            except Exception as e:
+                logging.error(f"DataFeed: {provider.name} error: {e}")
+            missing = [s for s in pending if s not in frames]
+            if missing:
+                logging.warning(f"DataFeed: {provider.name} had no data for {missing}, falling back")
+            pending = missing
+
+        for symbol in symbols:
+            self._mocked.discard((symbol, timeframe))
+        if pending:
+            frames.update(self._fallback(pending, timeframe, limit))
+        return {symbol: frames[symbol] for symbol in symbols}
+
+    def _fetch_from(self, provider: MarketDataProvider, symbols: List[str], timeframe: str, limit) -> Dict[str, pd.DataFrame]:
+        """
+        Live providers top up the store from each symbol's last stored bar
+        (full `limit` bars on first use); recorded ones are served as-is.
+        """
+        if not provider.persist:
+            fetched = provider.fetch_bars(symbols, timeframe, limit)
+            return {s: df for s, df in fetched.items() if not df.empty}
+
+        since = {}
+        for symbol in symbols:
+            last = self.store.last_time(symbol, timeframe)
+            if last is not None:
+                since[symbol] = last
+
+        fetched = provider.fetch_bars(symbols, timeframe, limit, since=since)
+        frames = {}
+        for symbol in symbols:
+            df = fetched.get(symbol)
             if df is not None and not df.empty:
-                df = df.tail(limit).reset_index()
-                
-                # Standardize datetime column
-                time_col = 'Datetime' if 'Datetime' in df.columns else 'Date' if 'Date' in df.columns else df.columns[0]
-                
-                df = df.rename(columns={
-                    time_col: 'time',
-                    'Open': 'open',
-                    'High': 'high',
-                    'Low': 'low',
-                    'Close': 'close',
-                    'Volume': 'tick_volume'
-                })
-                
-                # Ensure types
-                df['time'] = pd.to_datetime(df['time'])
-                df['open'] = df['open'].astype(float)
-                df['high'] = df['high'].astype(float)
-                df['low'] = df['low'].astype(float)
-                df['close'] = df['close'].astype(float)
-                
-                # Forex volume is often 0 in yfinance. Fill with random values.
-                df['tick_volume'] = df['tick_volume'].fillna(0).astype(int)
-                zero_mask = df['tick_volume'] == 0
-                if zero_mask.any():
-                    df.loc[zero_mask, 'tick_volume'] = [random.randint(10, 100) for _ in range(zero_mask.sum())]
-                
-                logging.info(f"DataFeed: Successfully fetched {len(df)} live rows for {symbol} from yfinance")
-                return df[['time', 'open', 'high', 'low', 'close', 'tick_volume']]
+                written = self.store.append(symbol, timeframe, df)
+                logging.debug(f"DataFeed: Stored {written} new rows for {symbol} from {provider.name}")
+            elif symbol not in since:
+                continue
+            frames[symbol] = self.store.read(symbol, timeframe, limit)
+        return frames
+
+    def _fallback(self, symbols: List[str], timeframe: str, limit) -> Dict[str, pd.DataFrame]:
+        """
+        Previously stored bars if there are any, otherwise one batched call
+        to the mock generator for every remaining symbol.
+        """
+        frames = {}
+        mocked = []
+        for symbol in symbols:
+            stored = self.store.read(symbol, timeframe, limit)
+            if not stored.empty:
+                frames[symbol] = stored
             else:
-                logging.warning(f"DataFeed: Empty history from yfinance for {symbol}. Market might be closed.")
-                # Fetch last daily close price to seed mock generator
-                daily_history = ticker.history(period="5d")
-                if not daily_history.empty:
-                    last_price = float(daily_history['Close'].iloc[-1])
-                    logging.info(f"DataFeed: Seeding mock data with last daily close price: {last_price}")
-                    return self.generate_mock_data(symbol, start_price=last_price)
-        except Exception as e:
-            logging.error(f"DataFeed: yfinance error for {symbol}: {e}")
-            
-        logging.warning(f"DataFeed: yfinance failed for {symbol}, falling back to default mock data")
-        return self.generate_mock_data(symbol)
-
-    def generate_mock_data(self, symbol, start_price=None) -> pd.DataFrame:
+                mocked.append(symbol)
+
+        if mocked:
+            mock = self._mock(timeframe)
+            # Only new mock series need a seed price; known ones just stream on
+            seeds = {}
+            for symbol in mocked:
+                if not mock.has(symbol):
+                    logging.warning(f"DataFeed: No provider data for {symbol}, falling back to mock data")
+                    seeds[symbol] = self._last_daily_close(symbol)
+            frames.update(mock.frames(mocked, limit, start_prices=seeds))
+            self._mocked.update((symbol, timeframe) for symbol in mocked)
+        return frames
+
+    def _last_daily_close(self, symbol: str) -> Optional[float]:
+        """Last daily close from any live provider, to seed the mock generator."""
+        for provider in self.providers:
+            if not provider.persist or not provider.available():
+                continue
+            try:
+                daily = provider.fetch(symbol, "D1", limit=5)
+            except Exception:
+                continue
+            if not daily.empty:
+                last_price = float(daily['close'].iloc[-1])
+                logging.info(f"DataFeed: Seeding mock data for {symbol} with last daily close price: {last_price}")
+                return last_price
+        return None
+
+    def _mock(self, timeframe: str) -> MockBarGenerator:
+        mock = self._mocks.get(timeframe)
+        if mock is None:
+            mock = self._mocks.setdefault(timeframe, MockBarGenerator(
+                seed=MOCK_SEED,
+                timeframe=timeframe,
+                regime=MOCK_REGIME,
+                volatility=MOCK_VOLATILITY,
+                gap_probability=MOCK_GAP_PROBABILITY,
+            ))
+        return mock
+
+    def generate_mock_data(self, symbol, start_price=None, timeframe: str = "M1", limit=500) -> pd.DataFrame:
         """
-        Generates realistic mock data.
+        Generates realistic mock data: a fresh series on first use, then
+        only the bars elapsed since the previous call.
         """
-        if start_price is not None:
-            base = start_price
-        else:
-            # Realistic starting prices
-            base = 1.0800 if 'EUR' in symbol else 1.2600 if 'GBP' in symbol else 150.00
-            if 'JPY' in symbol: base = 155.00
-        
-        data = []
-        current = base + (random.random() - 0.5) * 0.01
-        
-        # Determine pip size
-        pip_size = 0.01 if 'JPY' in symbol or symbol in ['US30', 'US500', 'AAPL', 'TSLA'] else 0.0001
-        
-        start_time = int(datetime.now().timestamp()) - (500 * 60) # 500 minutes ago
-        
-        for i in range(500):
-            open_p = current
-            # Random walk
-            change = (random.random() - 0.5) * (pip_size * 10)
-            close_p = open_p + change
-            
-            high_p = max(open_p, close_p) + random.random() * (pip_size * 5)
-            low_p = min(open_p, close_p) - random.random() * (pip_size * 5)
-            
-            # Simulated time
-            t = datetime.fromtimestamp(start_time + (i * 60))
-            
-            data.append({
-                "time": t,
-                "open": open_p,
-                "high": high_p,
-                "low": low_p,
-                "close": close_p,
-                "tick_volume": random.randint(100, 1000)
-            })
-            current = close_p
-            
-        return pd.DataFrame(data)
+        seeds = {symbol: start_price} if start_price is not None else None
+        return self._mock(timeframe).frames([symbol], limit, start_prices=seeds)[symbol]
 
     def shutdown(self):
-        if self.use_mt5:
-            mt5.shutdown()
+        for provider in self.providers:
+            provider.shutdown()
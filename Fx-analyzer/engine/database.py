@@ -1,11 +1,335 @@
+import os
+import glob
 import sqlite3
 import json
+import queue
+import atexit
+import asyncio
 import hashlib
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 DB_FILE = "fx_analyzer.db"
 
+# Write-behind group commit: a batch is committed once DB_WRITE_BATCH
+# statements are waiting or DB_FLUSH_INTERVAL seconds after its first one
+DB_WRITE_BATCH = int(os.getenv("DB_WRITE_BATCH", "200"))
+DB_FLUSH_INTERVAL = float(os.getenv("DB_FLUSH_INTERVAL", "0.25"))
+# Append-only journal of queued writes, replayed on restart ("0" disables)
+DB_JOURNAL = os.getenv("DB_JOURNAL", "1") != "0"
+
+INSERT_SIGNAL = """
+    INSERT INTO signals (timestamp, symbol, action, price, confidence, reasoning, risk_factors, raw_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_TRADE = """
+    INSERT INTO trades (timestamp, symbol, action, entry_price, exit_price, pl, status, regime)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_VIBE_RESEARCH = """
+    INSERT INTO vibe_research (timestamp, run_type, prompt, command, output, status)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+SELECT_LATEST_VIBE_RESEARCH = """
+    SELECT id, timestamp, run_type, prompt, command, output, status
+    FROM vibe_research ORDER BY id DESC LIMIT ?
+"""
+SELECT_CLOSED_TRADES = """
+    SELECT action, entry_price, exit_price, pl, status, timestamp, regime
+    FROM trades
+    WHERE symbol = ? AND status = 'closed'
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+SELECT_SIGNALS_RAW = """
+    SELECT id, timestamp, symbol, raw_data FROM signals WHERE timestamp >= ? ORDER BY id
+"""
+
+# Journal entries name their statement instead of carrying the SQL
+STATEMENTS = {
+    "signal": INSERT_SIGNAL,
+    "trade": INSERT_TRADE,
+    "vibe_research": INSERT_VIBE_RESEARCH,
+}
+
+CREATE_JOURNAL_STATE = """
+    CREATE TABLE IF NOT EXISTS journal_state (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        seq INTEGER
+    )
+"""
+
+_FLUSH = object()
+_STOP = object()
+
+
+class Persistence:
+    """Long-lived WAL-mode connections to one SQLite file.
+
+    Writes are appended to a journal file and queued; a single writer thread
+    group-commits them (size or time trigger) and records the last committed
+    journal sequence number in the same transaction. Entries the process
+    never committed are replayed from the journal on the next start, so a
+    crash loses nothing without paying an fsync per row. After each commit
+    the journal sheds what was committed: it is emptied when the writer has
+    caught up, otherwise sealed as a numbered segment (deleted once fully
+    committed) while appends continue in a fresh file, so it stays as small
+    as the backlog under sustained writes. Reads use one
+    connection per thread; sqlite3 caches the prepared statements.
+    """
+
+    def __init__(self, path: str, batch_size: int = DB_WRITE_BATCH,
+                 flush_interval: float = DB_FLUSH_INTERVAL, journal: bool = DB_JOURNAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.journal_path = f"{path}.wb.jsonl" if journal else None
+        self.batches = 0  # committed writer transactions
+        self.replayed = 0  # journal entries recovered on start
+        self._queue: queue.Queue = queue.Queue()
+        self._local = threading.local()
+        self._writer = None
+        self._journal = None
+        self._seq = 0
+        self._sealed = []  # (last seq, path) of journal segments not yet committed
+        self._lock = threading.Lock()
+        self._read_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-read")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, cached_statements=64)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Replays the journal and starts the writer thread (idempotent)."""
+        with self._lock:
+            if self._writer is not None:
+                return
+            conn = self._connect()
+            try:
+                conn.execute(CREATE_JOURNAL_STATE)
+                self._recover(conn)
+            finally:
+                conn.close()
+            if self.journal_path:
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._writer = threading.Thread(target=self._run_writer, name="db-writer", daemon=True)
+            self._writer.start()
+
+    def write(self, statement: str, params=()):
+        """Journals one STATEMENTS entry and queues it; returns immediately."""
+        if self._writer is None:
+            self.start()
+        with self._lock:
+            self._seq += 1
+            entry = (self._seq, statement, tuple(params))
+            if self._journal is not None:
+                # Flushed to the OS (survives a process crash), not fsynced
+                self._journal.write(json.dumps(entry, default=str) + "\n")
+                self._journal.flush()
+            self._queue.put(entry)
+
+    def _committed_seq(self, conn) -> int:
+        row = conn.execute("SELECT seq FROM journal_state WHERE id = 0").fetchone()
+        return row[0] if row else 0
+
+    def _apply(self, conn, entries):
+        """Applies *entries* and advances the checkpoint in one transaction."""
+        with conn:
+            for seq, statement, params in entries:
+                try:
+                    conn.execute(STATEMENTS[statement], params)
+                except (sqlite3.Error, KeyError) as e:
+                    logging.error(f"Database write failed ({statement} #{seq}): {e}")
+            conn.execute(
+                "INSERT OR REPLACE INTO journal_state (id, seq) VALUES (0, ?)", (entries[-1][0],)
+            )
+        self.batches += 1
+
+    def _segments(self):
+        """Sealed journal segments, oldest first."""
+        paths = glob.glob(glob.escape(self.journal_path) + ".*")
+        return sorted(
+            (p for p in paths if p.rsplit(".", 1)[1].isdigit()),
+            key=lambda p: int(p.rsplit(".", 1)[1]),
+        )
+
+    def _recover(self, conn):
+        committed = self._committed_seq(conn)
+        self._seq = committed
+        if not self.journal_path:
+            return
+        segments = self._segments()
+        pending = []
+        for path in segments + [self.journal_path]:
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        seq, statement, params = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash mid-append
+                    self._seq = max(self._seq, seq)
+                    if seq > committed:
+                        pending.append((seq, statement, params))
+        if pending:
+            self._apply(conn, pending)
+            self.replayed = len(pending)
+            logging.info(f"Replayed {len(pending)} uncommitted journal entries into {self.path}")
+        for path in segments:
+            os.remove(path)
+        open(self.journal_path, "w").close()
+
+    def _checkpoint_journal(self, seq: int):
+        """Drops the journal entries committed up to *seq*."""
+        with self._lock:
+            if self._journal is None:
+                return
+            if seq == self._seq:
+                # Caught up: nothing in any segment is still needed
+                self._journal.seek(0)
+                self._journal.truncate()
+                done, self._sealed = self._sealed, []
+            else:
+                # Seal the current file (it holds entries past *seq*) and
+                # keep appending to a fresh one
+                self._journal.close()
+                sealed = f"{self.journal_path}.{self._seq}"
+                try:
+                    os.replace(self.journal_path, sealed)
+                    self._sealed.append((self._seq, sealed))
+                except OSError as e:
+                    # Keep appending to the unsealed file; emptied once caught up
+                    logging.error(f"Journal rotation failed: {e}")
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+                done = [s for s in self._sealed if s[0] <= seq]
+                self._sealed = [s for s in self._sealed if s[0] > seq]
+        for _, path in done:
+            os.remove(path)
+
+    def _run_writer(self):
+        conn = self._connect()
+        stop = False
+        retry = []
+        while not stop:
+            batch, retry = retry, []
+            item = self._queue.get()
+            items = 1
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif item is not _FLUSH:
+                    batch.append(item)
+                if stop or item is _FLUSH or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    items += 1
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._apply(conn, batch)
+                    self._checkpoint_journal(batch[-1][0])
+                except sqlite3.Error as e:
+                    # Still in the journal; retried with the next batch
+                    logging.error(f"Database batch commit failed ({len(batch)} statements): {e}")
+                    retry = batch
+            for _ in range(items):
+                self._queue.task_done()
+        conn.close()
+
+    def flush(self):
+        """Commits everything queued so far and waits for it."""
+        if self._writer is not None:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self):
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=5.0)
+        self._writer = None
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        self._read_executor.shutdown(wait=False)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def query(self, sql: str, params=()) -> list:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn.execute(sql, params).fetchall()
+
+    async def run_read(self, fn, *args):
+        """Runs a blocking read helper on the database read thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, fn, *args)
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_db() -> Persistence:
+    """Process-wide persistence service for DB_FILE, created on first use."""
+    global _db
+    if _db is None or _db.path != DB_FILE:
+        with _db_lock:
+            if _db is None or _db.path != DB_FILE:
+                if _db is not None:
+                    _db.close()
+                _db = Persistence(DB_FILE)
+    return _db
+
+
+def configure(path: str):
+    """Points the module at another database file (tests, tools)."""
+    global DB_FILE
+    close()
+    DB_FILE = path
+
+
+def flush():
+    if _db is not None:
+        _db.flush()
+
+
+def close():
+    """Commits pending writes and closes the connections."""
+    global _db
+    if _db is not None:
+        _db.close()
+        _db = None
+
+
+atexit.register(close)
+
+
+async def run_read(fn, *args):
+    """Awaitable wrapper for the blocking read helpers below, e.g.
+    ``await database.run_read(database.get_latest_vibe_research)``."""
+    return await get_db().run_read(fn, *args)
+
 
 def _hash_password(password: str, salt: str) -> str:
     """Hash a password using PBKDF2-SHA256 with the email as salt."""
@@ -15,6 +339,7 @@ def _hash_password(password: str, salt: str) -> str:
 def init_db():
     try:
         conn = sqlite3.connect(DB_FILE)
+        conn.execute("PRAGMA journal_mode=WAL")
         cursor = conn.cursor()
 
         # Signals Table
@@ -42,9 +367,14 @@ def init_db():
                 entry_price REAL,
                 exit_price REAL,
                 pl REAL,
-                status TEXT
+                status TEXT,
+                regime TEXT
             )
         """)
+        # Databases created before trades carried the market regime
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(trades)")}
+        if "regime" not in columns:
+            cursor.execute("ALTER TABLE trades ADD COLUMN regime TEXT")
 
         # Users Table (SaaS Auth)
         cursor.execute("""
@@ -71,7 +401,15 @@ def init_db():
                 status TEXT
             )
         """)
-        
+
+        # Indexes for the per-symbol lookups (memory, dashboards)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_trades_symbol_status_ts ON trades (symbol, status, timestamp)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_signals_symbol_ts ON signals (symbol, timestamp)"
+        )
+
         # Insert Default Admin & User if empty
         cursor.execute("SELECT COUNT(*) FROM users")
         if cursor.fetchone()[0] == 0:
@@ -85,21 +423,18 @@ def init_db():
 
         conn.commit()
         conn.close()
+        # Replays writes a previous run queued but never committed
+        get_db().start()
         logging.info("Database initialized successfully.")
     except Exception as e:
         logging.error(f"Database initialization failed: {e}")
 
 
 def store_signal(signal_data):
+    """Queues the signal for the writer thread (never blocks)."""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            INSERT INTO signals (timestamp, symbol, action, price, confidence, reasoning, risk_factors, raw_data)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+        get_db().write(
+            "signal",
             (
                 signal_data.get("timestamp") or datetime.now().isoformat(),
                 signal_data.get("symbol"),
@@ -111,78 +446,111 @@ def store_signal(signal_data):
                 json.dumps(signal_data),
             ),
         )
-
-        conn.commit()
-        conn.close()
     except Exception as e:
         logging.error(f"Failed to store signal: {e}")
 
 
+_trade_listeners = []
+# Held while a trade is handed to the listeners and queued: a reader that
+# loads trades under it (PerformanceCache) sees each trade either through
+# its listener or in the table, never both and never neither
+trade_lock = threading.RLock()
+
+
 def store_trade(trade_data):
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
+    """Notifies the trade listeners, then queues the trade for the writer
+    thread (never blocks on SQLite)."""
+    trade_data = {**trade_data, "timestamp": trade_data.get("timestamp") or datetime.now().isoformat()}
+    with trade_lock:
+        for listener in _trade_listeners:
+            try:
+                listener(trade_data)
+            except Exception as e:
+                logging.error(f"Trade listener failed: {e}")
+        try:
+            get_db().write(
+                "trade",
+                (
+                    trade_data["timestamp"],
+                    trade_data.get("symbol"),
+                    trade_data.get("action"),
+                    trade_data.get("entry_price") or trade_data.get("price"),
+                    trade_data.get("exit_price"),
+                    trade_data.get("pl"),
+                    trade_data.get("status", "OPEN"),
+                    trade_data.get("regime"),
+                ),
+            )
+        except Exception as e:
+            logging.error(f"Failed to store trade: {e}")
 
-        cursor.execute(
-            """
-            INSERT INTO trades (timestamp, symbol, action, entry_price, exit_price, pl, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                trade_data.get("timestamp") or datetime.now().isoformat(),
-                trade_data.get("symbol"),
-                trade_data.get("action"),
-                trade_data.get("entry_price") or trade_data.get("price"),
-                trade_data.get("exit_price"),
-                trade_data.get("pl"),
-                trade_data.get("status", "OPEN"),
-            ),
-        )
 
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        logging.error(f"Failed to store trade: {e}")
+def add_trade_listener(listener):
+    """Calls *listener(trade_data)* for every trade stored from now on
+    (e.g. MemoryService keeping its performance cache current)."""
+    if listener not in _trade_listeners:
+        _trade_listeners.append(listener)
 
 
 def store_vibe_research(run_type, prompt, command, output, status):
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO vibe_research (timestamp, run_type, prompt, command, output, status)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (datetime.now().isoformat(), run_type, prompt, command, output, status)
+        get_db().write(
+            "vibe_research",
+            (datetime.now().isoformat(), run_type, prompt, command, output, status),
         )
-        conn.commit()
-        conn.close()
         logging.info(f"Stored vibe research run: {run_type}")
     except Exception as e:
         logging.error(f"Failed to store vibe research: {e}")
 
 
-def get_latest_vibe_research():
+def get_latest_vibe_research(limit=10):
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM vibe_research ORDER BY id DESC LIMIT 10")
-        rows = cursor.fetchall()
-        conn.close()
-        
-        results = []
-        for r in rows:
-            results.append({
-                "id": r[0],
-                "timestamp": r[1],
-                "run_type": r[2],
-                "prompt": r[3],
-                "command": r[4],
-                "output": r[5],
-                "status": r[6]
-            })
-        return results
+        return [dict(r) for r in get_db().query(SELECT_LATEST_VIBE_RESEARCH, (limit,))]
     except Exception as e:
         logging.error(f"Failed to get vibe research: {e}")
         return []
+
+
+def get_closed_trades(symbol, limit=5):
+    """Most recent closed trades for *symbol*, newest first."""
+    return [dict(r) for r in get_db().query(SELECT_CLOSED_TRADES, (symbol, limit))]
+
+
+def export_signals(path, since=""):
+    """Writes the signals' raw_data as a columnar file, one column per
+    (flattened) signal field: Parquet for ``.parquet`` paths (needs
+    pyarrow), otherwise compressed NumPy columns (``.npz``). Returns the
+    number of rows exported."""
+    import numpy as np
+    import pandas as pd
+
+    flush()
+    rows = get_db().query(SELECT_SIGNALS_RAW, (since,))
+    records = []
+    for r in rows:
+        try:
+            data = json.loads(r["raw_data"] or "{}")
+        except ValueError:
+            data = {}
+        data.update({"id": r["id"], "timestamp": r["timestamp"], "symbol": r["symbol"]})
+        records.append(data)
+    df = pd.json_normalize(records)
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].map(
+                lambda v: v if v is None or isinstance(v, str) else json.dumps(v, default=str)
+            )
+
+    if str(path).endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        columns = {}
+        for col in df.columns:
+            values = df[col]
+            if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+                columns[col] = values.to_numpy()
+            else:
+                # Fixed-width unicode, so the archive loads without pickle
+                columns[col] = np.asarray(values.fillna("").astype(str).tolist(), dtype=str)
+        np.savez_compressed(path, **columns)
+    return len(df)
@@ -18,7 +18,8 @@ from typing import Any, Callable
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
+
+from engine.market_data import fetch_history
 
 logger = logging.getLogger(__name__)
 
@@ -85,7 +86,7 @@ class MultiModalDataPipeline:
     """Unified access to OHLCV, technical indicators, and alternative data.
 
     Data sources (all optional):
-      - yfinance   — free OHLCV (no key needed)
+      - OHLCV      — engine.market_data provider chain (MT5 / yfinance / replay)
       - Alpha Vantage — technical indicators via ``ALPHA_VANTAGE_KEY`` env var
       - FRED       — economic indicators via ``FRED_API_KEY`` env var
       - Google Trends — search interest via pytrends (optional dep)
@@ -108,16 +109,16 @@ class MultiModalDataPipeline:
     async def fetch_market_data(self, symbol: str, days: int = 365) -> pd.DataFrame:
         """Return a DataFrame with OHLCV + Alpha Vantage technical indicators.
 
-        Primary source is yfinance (no key needed). If ``ALPHA_VANTAGE_KEY``
-        is set, SMA(20), EMA(20), RSI(14), MACD, and BBands(20,2) are
-        appended as extra columns.
+        OHLCV comes from the engine.market_data provider chain. If
+        ``ALPHA_VANTAGE_KEY`` is set, SMA(20), EMA(20), RSI(14), MACD, and
+        BBands(20,2) are appended as extra columns.
         """
         cache_key = f"market_data:{symbol}:{days}"
         cached = self.store.get(cache_key)
         if cached is not None:
             return cached
 
-        df = await self._fetch_yfinance(symbol, days)
+        df = await self._fetch_ohlcv(symbol, days)
 
         # Augment with Alpha Vantage technical indicators if key is set
         if self._alpha_key and len(df) > 30:
@@ -129,20 +130,14 @@ class MultiModalDataPipeline:
         self.store.set(cache_key, df, ttl_seconds=300)
         return df
 
-    # -- yfinance OHLCV ---------------------------------------------------
+    # -- OHLCV via the market-data provider chain --------------------------
 
-    async def _fetch_yfinance(self, symbol: str, days: int) -> pd.DataFrame:
+    async def _fetch_ohlcv(self, symbol: str, days: int) -> pd.DataFrame:
         loop = asyncio.get_event_loop()
         try:
-            ticker = yf.Ticker(symbol)
-            df = await loop.run_in_executor(
-                None, lambda: ticker.history(period=f"{days}d")
-            )
-            if df.empty:
-                return pd.DataFrame()
-            return df
+            return await loop.run_in_executor(None, fetch_history, symbol, days)
         except Exception as exc:
-            logger.warning("yfinance fetch failed for %s: %s", symbol, exc)
+            logger.warning("Market data fetch failed for %s: %s", symbol, exc)
             return pd.DataFrame()
 
     # -- Alpha Vantage technical indicators -------------------------------
@@ -13,13 +13,13 @@ from typing import Any
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
 
 import torch
 import torch.nn as nn
 import torch.optim as optim
 
 from engine.deep.base import DeepAgent
+from engine.market_data import fetch_history
 
 logger = logging.getLogger(__name__)
 
@@ -192,13 +192,12 @@ class LSTMTradingAgent(DeepAgent):
 
 def _fetch_data(symbol: str) -> pd.DataFrame | None:
     try:
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period="2y")
+        df = fetch_history(symbol, days=730)
         if df.empty or len(df) < 100:
             return None
         return df
     except Exception as exc:
-        logger.warning("yfinance fetch failed for %s: %s", symbol, exc)
+        logger.warning("Market data fetch failed for %s: %s", symbol, exc)
         return None
 
 
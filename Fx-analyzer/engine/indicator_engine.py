@@ -0,0 +1,289 @@
+"""
+Streaming Indicator Engine - O(1) per-bar technical indicators.
+
+Keeps per-symbol indicator state (Wilder RSI, EMA 50/200, MACD 12/26/9 and
+Bollinger 20/2) so each loop only pays for the bars that actually changed
+instead of recomputing the whole frame with the 'ta' library. Values match
+TechnicalAnalyzer.analyze (ta, fillna=False) run over every bar streamed so
+far, not over the frame passed in: once older bars have scrolled out of the
+DataFeed window, the RSI and EMA state still carries them, so a batch run
+over the window alone differs (by less as the seed bars recede).
+
+The last bar of a DataFeed frame is usually still forming, so it is applied
+provisionally: its values are computed from the committed state without
+mutating it, and are recomputed on the next call once the bar closes.
+"""
+
+import math
+import threading
+from collections import deque
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+# Output columns, same names TechnicalAnalyzer.analyze produces
+INDICATOR_COLUMNS = [
+    "RSI",
+    "MACD_12_26_9",
+    "MACDs_12_26_9",
+    "MACDh_12_26_9",
+    "BBL_20_2.0",
+    "BBM_20_2.0",
+    "BBU_20_2.0",
+    "EMA_50",
+    "EMA_200",
+]
+
+
+class StreamingEMA:
+    """EMA with adjust=False, seeded on the first value (pandas ewm semantics)."""
+
+    def __init__(self, span=None, alpha=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.min_periods = span if span is not None else int(round(1 / self.alpha))
+        self.value = None
+        self.count = 0
+
+    def _next(self, x):
+        if self.value is None:
+            return x
+        return self.value + self.alpha * (x - self.value)
+
+    def peek(self, x):
+        """Value after *x* without committing it."""
+        if x is None or math.isnan(x):
+            return self.output(self.value, self.count)
+        return self.output(self._next(x), self.count + 1)
+
+    def update(self, x):
+        if x is not None and not math.isnan(x):
+            self.value = self._next(x)
+            self.count += 1
+        return self.output(self.value, self.count)
+
+    def output(self, value, count):
+        return value if count >= self.min_periods else NAN
+
+
+class StreamingRSI:
+    """
+    Wilder RSI: EMA(alpha=1/window) of gains and losses, as in ta.RSIIndicator.
+    Like ta, the first bar counts as a zero gain / zero loss observation.
+    """
+
+    def __init__(self, window=14):
+        self.up = StreamingEMA(alpha=1.0 / window)
+        self.down = StreamingEMA(alpha=1.0 / window)
+        self.up.min_periods = self.down.min_periods = window
+        self.prev_close = None
+
+    def _split(self, close):
+        if self.prev_close is None:
+            return 0.0, 0.0
+        diff = close - self.prev_close
+        return (diff if diff > 0 else 0.0), (-diff if diff < 0 else 0.0)
+
+    @staticmethod
+    def _rsi(up, down):
+        if math.isnan(up) or math.isnan(down):
+            return NAN
+        if down == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + up / down)
+
+    def peek(self, close):
+        gain, loss = self._split(close)
+        return self._rsi(self.up.peek(gain), self.down.peek(loss))
+
+    def update(self, close):
+        gain, loss = self._split(close)
+        self.prev_close = close
+        return self._rsi(self.up.update(gain), self.down.update(loss))
+
+
+class StreamingMACD:
+    """MACD line, signal and histogram from three chained streaming EMAs."""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = StreamingEMA(span=fast)
+        self.slow = StreamingEMA(span=slow)
+        self.signal = StreamingEMA(span=signal)
+
+    @staticmethod
+    def _combine(macd, signal):
+        return macd, signal, macd - signal
+
+    def peek(self, close):
+        macd = self.fast.peek(close) - self.slow.peek(close)
+        return self._combine(macd, self.signal.peek(macd))
+
+    def update(self, close):
+        macd = self.fast.update(close) - self.slow.update(close)
+        return self._combine(macd, self.signal.update(macd))
+
+
+class StreamingBollinger:
+    """Rolling mean / population std over a fixed window (sliding Welford)."""
+
+    def __init__(self, window=20, window_dev=2):
+        self.window = window
+        self.window_dev = window_dev
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def _step(self, x):
+        """Return (mean, m2, n) after adding *x* (and evicting the oldest)."""
+        n = len(self.values)
+        if n < self.window:
+            n += 1
+            delta = x - self.mean
+            mean = self.mean + delta / n
+            m2 = self.m2 + delta * (x - mean)
+        else:
+            old = self.values[0]
+            mean = self.mean + (x - old) / n
+            m2 = self.m2 + (x - old) * (x - mean + old - self.mean)
+        return mean, max(m2, 0.0), n
+
+    def _bands(self, mean, m2, n):
+        if n < self.window:
+            return NAN, NAN, NAN
+        std = math.sqrt(m2 / n)
+        return mean - self.window_dev * std, mean, mean + self.window_dev * std
+
+    def peek(self, x):
+        return self._bands(*self._step(x))
+
+    def update(self, x):
+        self.mean, self.m2, n = self._step(x)
+        self.values.append(x)
+        if len(self.values) > self.window:
+            self.values.popleft()
+        return self._bands(self.mean, self.m2, n)
+
+
+class SymbolIndicatorState:
+    """All indicator state for one symbol plus a history of committed rows."""
+
+    def __init__(self, history=1000):
+        self.rsi = StreamingRSI(14)
+        self.macd = StreamingMACD(12, 26, 9)
+        self.bb = StreamingBollinger(20, 2)
+        self.ema_50 = StreamingEMA(span=50)
+        self.ema_200 = StreamingEMA(span=200)
+        self.rows = deque(maxlen=history)
+        self.last_time = None
+        self.last_close = None
+
+    def _row(self, rsi, macd, bb, ema_50, ema_200):
+        macd_line, macd_signal, macd_hist = macd
+        bb_lower, bb_mid, bb_upper = bb
+        return (rsi, macd_line, macd_signal, macd_hist, bb_lower, bb_mid, bb_upper, ema_50, ema_200)
+
+    def update(self, time, close):
+        """Commit a closed bar."""
+        row = self._row(
+            self.rsi.update(close),
+            self.macd.update(close),
+            self.bb.update(close),
+            self.ema_50.update(close),
+            self.ema_200.update(close),
+        )
+        self.rows.append(row)
+        self.last_time = time
+        self.last_close = close
+        return row
+
+    def peek(self, close):
+        """Indicator values for a still-forming bar, state untouched."""
+        return self._row(
+            self.rsi.peek(close),
+            self.macd.peek(close),
+            self.bb.peek(close),
+            self.ema_50.peek(close),
+            self.ema_200.peek(close),
+        )
+
+
+class StreamingIndicatorEngine:
+    """
+    Per-symbol incremental indicator engine fed with DataFeed frames.
+
+    Every call to ``update`` receives the latest OHLCV frame for a symbol;
+    only bars newer than the last committed one are processed. If the frame
+    no longer overlaps the committed history (first call, data gap, or the
+    feed re-seeded its mock series) the symbol is rebuilt from the frame.
+    """
+
+    def __init__(self, history=1000):
+        self.history = history
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def reset(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                self._states.pop(symbol, None)
+
+    def _get_state(self, symbol):
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is None:
+                state = self._states[symbol] = SymbolIndicatorState(self.history)
+            return state
+
+    def _new_bars_start(self, state, times, closes):
+        """Index of the first uncommitted bar, or None if a rebuild is needed."""
+        if state.last_time is None:
+            return None
+        pos = int(np.searchsorted(times, state.last_time, side="left"))
+        if pos >= len(times) or times[pos] != state.last_time:
+            return None
+        if not math.isclose(closes[pos], state.last_close, rel_tol=1e-12, abs_tol=1e-12):
+            return None
+        return pos + 1
+
+    def update(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies new bars from *df* and returns it with the indicator columns
+        check_signals / get_technical_summary expect.
+        """
+        if df.empty:
+            return df
+
+        df["close"] = df["close"].astype(float)
+        closes = df["close"].to_numpy()
+        # Epoch nanoseconds, comparable across naive / tz-aware feeds
+        times = pd.DatetimeIndex(df["time"]).as_unit("ns").asi8
+
+        state = self._get_state(symbol)
+        start = self._new_bars_start(state, times, closes)
+        if start is None:
+            state = SymbolIndicatorState(self.history)
+            with self._lock:
+                self._states[symbol] = state
+            start = 0
+
+        # Commit every bar except the last, which may still be forming
+        last = len(df) - 1
+        for i in range(start, last):
+            state.update(int(times[i]), float(closes[i]))
+
+        n = len(df)
+        tail = [state.peek(float(closes[last]))] if start <= last else []
+        k = min(n, len(state.rows) + len(tail))
+        committed = list(islice(reversed(state.rows), k - len(tail)))[::-1]
+
+        values = np.full((n, len(INDICATOR_COLUMNS)), np.nan)
+        if k:
+            values[n - k:] = np.asarray(committed + tail, dtype=float)
+
+        for j, col in enumerate(INDICATOR_COLUMNS):
+            df[col] = values[:, j]
+        return df
@@ -1,4 +1,5 @@
 import os
+import asyncio
 import logging
 import time
 import json
@@ -24,13 +25,27 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+try:
+    from engine.llm_cache import get_llm_cache
+    from engine.llm_scheduler import PRIORITY_BACKGROUND, estimate_tokens, get_scheduler
+except ImportError:
+    from llm_cache import get_llm_cache
+    from llm_scheduler import PRIORITY_BACKGROUND, estimate_tokens, get_scheduler
+
+SYSTEM_PROMPT = "You are a specialized Forex Analyst. Output strictly JSON."
+
 class LLMAnalyzer:
     """
     Analyzes market data using multiple Cloud LLM providers.
     Supports: OpenRouter (free models), DeepSeek (Reasoner), Groq (Llama3/Mixtral), Gemini (Flash).
     """
     def __init__(self):
-        self.cache = {} # (symbol, action) -> {data, timestamp}
+        self.cache = get_llm_cache() # shared with the MoE agents
+        self.scheduler = get_scheduler() # shared RPM/TPM budgets, as for the MoE agents
+        self.max_tokens = 1024
+        self.consecutive_errors = 0
+        self.base_backoff = 5
+        self.max_backoff = 120
         self.provider = "openrouter" # Default
         self.model_name = "google/gemma-4-26b-a4b-it:free" # Default
         
@@ -121,71 +136,87 @@ class LLMAnalyzer:
         logging.info(f"Switched to {friendly_name} ({self.provider}/{self.model_name})")
         return True
 
-    def analyze_signal(self, symbol: str, action: str, technical_context: dict) -> dict:
-        """Route analysis to the active provider."""
+    async def analyze_signal(self, symbol: str, action: str, technical_context: dict) -> dict:
+        """
+        Route analysis to the active provider, via the shared response cache
+        and the LLM scheduler (background priority: the MoE experts and the
+        trade synthesis go first).
+        """
         client = self.clients.get(self.provider)
         if not client:
             return self._get_fallback_response(symbol, action, technical_context, reason=f"{self.provider} Config Missing")
 
         prompt = self._construct_prompt(symbol, action, technical_context)
+        if self.cache is not None:
+            cached = self.cache.get("LLMAnalyzer", self.provider, self.model_name, prompt, SYSTEM_PROMPT)
+            if cached is not None:
+                return self._parse_response(cached)
+
+        model = await self.scheduler.acquire(
+            self.provider, [self.model_name],
+            estimate_tokens(prompt, SYSTEM_PROMPT) + self.max_tokens, PRIORITY_BACKGROUND,
+        )
+        if model is None:
+            return self._get_fallback_response(symbol, action, technical_context, reason=f"{self.provider} Budget Exhausted")
         start_time = time.time()
-        
+
         try:
-            raw_response = ""
-            
-            # --- OpenRouter Execution ---
-            if self.provider == "openrouter":
-                response = client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[
-                        {"role": "system", "content": "You are a specialized Forex Analyst. Output strictly JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.1,
-                    max_tokens=1024
-                )
-                raw_response = response.choices[0].message.content
-
-            # --- DeepSeek Execution ---
-            elif self.provider == "deepseek":
-                response = client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[
-                        {"role": "system", "content": "You are a specialized Forex Analyst. Output strictly JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    stream=False
-                )
-                raw_response = response.choices[0].message.content
-
-            # --- Groq Execution ---
-            elif self.provider == "groq":
-                response = client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[
-                        {"role": "system", "content": "You are a specialized Forex Analyst. Output strictly JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.1,
-                    max_tokens=1024
-                )
-                raw_response = response.choices[0].message.content
-
-            # --- Gemini Execution ---
-            elif self.provider == "gemini":
-                model = genai.GenerativeModel(self.model_name)
-                response = model.generate_content(prompt)
-                raw_response = response.text
+            # The provider SDKs are blocking; keep them off the event loop
+            raw_response = await asyncio.to_thread(self._complete, client, model, prompt)
+            self.consecutive_errors = 0
 
             duration = time.time() - start_time
             logging.info(f"Analysis via {self.provider} took {duration:.2f}s")
+
+            if self.cache is not None:
+                self.cache.put("LLMAnalyzer", self.provider, model, prompt, raw_response, SYSTEM_PROMPT)
             
             return self._parse_response(raw_response)
 
         except Exception as e:
-            logging.error(f"Analysis Error ({self.provider}): {e}")
+            error_msg = str(e)
+            if "429" in error_msg or "Rate limit" in error_msg or "ResourceExhausted" in error_msg:
+                self.consecutive_errors += 1
+                backoff = min(self.base_backoff * (2 ** (self.consecutive_errors - 1)), self.max_backoff)
+                self.scheduler.penalise(self.provider, model, backoff)
+                logging.error(f"Analysis rate limited ({self.provider}/{model}). Backoff {backoff}s.")
+            else:
+                logging.error(f"Analysis Error ({self.provider}): {e}")
             return self._get_fallback_response(symbol, action, technical_context, reason=f"{self.provider} Error")
 
+    def _complete(self, client, model: str, prompt: str) -> str:
+        """One blocking completion on the active provider's client."""
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+        # --- OpenRouter / Groq Execution ---
+        if self.provider in ("openrouter", "groq"):
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=self.max_tokens
+            )
+            return response.choices[0].message.content
+
+        # --- DeepSeek Execution ---
+        if self.provider == "deepseek":
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                stream=False
+            )
+            return response.choices[0].message.content
+
+        # --- Gemini Execution ---
+        if self.provider == "gemini":
+            response = genai.GenerativeModel(model).generate_content(prompt)
+            return response.text
+
+        return ""
+
     def _construct_prompt(self, symbol, action, context):
         return f"""
         Analyze this Forex setup and output valid JSON only.
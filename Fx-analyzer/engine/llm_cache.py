@@ -0,0 +1,277 @@
+"""
+LLM Cache - persistent prompt/response cache shared by every LLM caller.
+
+The MoE experts (agents/base.py) and LLMAnalyzer look prompts up here
+before calling Gemini / OpenRouter / Groq / DeepSeek. Two keys are tried:
+
+  - exact: hash of provider, model, system prompt and prompt
+  - normalised: the same with whitespace collapsed, case folded and every
+    number (prices included) rounded to ``LLM_CACHE_DIGITS`` significant
+    digits, so a prompt that differs only in indentation or in digits past
+    that precision is a hit. With the default of 4, EURUSD 1.08512 and
+    1.08471 both become 1.085: prices in the same 10-pip bucket share an
+    entry. Raise ``LLM_CACHE_DIGITS`` to tell closer prices apart
+
+Entries expire after a per-agent TTL (``LLM_CACHE_TTLS``, e.g.
+``TechnicalExpert=120,FundamentalExpert=1800``; ``LLM_CACHE_TTL`` for the
+rest) and the cache is bounded to ``LLM_CACHE_MAX_ENTRIES`` with LRU
+eviction. Entries live in memory and are written to SQLite
+(``LLM_CACHE_PATH``) by a background writer thread, so they survive
+restarts without a commit on the caller's (event loop) thread. Failed
+calls (None / empty responses) are never cached.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "300"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_DIGITS = int(os.getenv("LLM_CACHE_DIGITS", "4"))
+
+# Seconds; technical reads go stale fastest, macro views slowest
+DEFAULT_TTLS = {
+    "TechnicalExpert": 120,
+    "SentimentExpert": 600,
+    "RiskManager": 300,
+    "FundamentalExpert": 1800,
+    "LLMAnalyzer": 120,
+}
+
+_FLUSH = object()
+_STOP = object()
+_CLEAR = object()
+
+_NUMBER = re.compile(r"-?\d+\.\d+|-?\d+")
+_SPACE = re.compile(r"\s+")
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    ttls = {}
+    for part in (spec or "").split(","):
+        name, _, seconds = part.partition("=")
+        if name.strip() and seconds.strip():
+            ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+def normalise_prompt(text: str, digits: int = LLM_CACHE_DIGITS) -> str:
+    def _round(match):
+        value = float(match.group())
+        return f"{value:.{digits}g}" if value else "0"
+
+    return _NUMBER.sub(_round, _SPACE.sub(" ", text or "").strip().lower())
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(p or "" for p in parts).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """LRU + TTL prompt cache, written behind to SQLite by one writer thread."""
+
+    def __init__(self, path: Optional[str] = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 default_ttl: float = LLM_CACHE_TTL, ttls: Optional[Dict[str, float]] = None,
+                 digits: int = LLM_CACHE_DIGITS, clock=time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls if ttls is not None else parse_ttls(os.getenv("LLM_CACHE_TTLS", "")))
+        self.digits = digits
+        self.clock = clock
+        # key -> (agent, response, expires_at); exact and normalised keys
+        # of one entry point at the same response
+        self._entries: "OrderedDict[str, Tuple[str, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self.metrics: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "normalised_hits": 0, "misses": 0, "stores": 0}
+        )
+        self.evictions = 0
+        if path:
+            self._open()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _open(self):
+        try:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    agent TEXT,
+                    response TEXT,
+                    expires_at REAL
+                )
+            """)
+            now = self.clock()
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+            rows = self._conn.execute(
+                "SELECT key, agent, response, expires_at FROM llm_cache ORDER BY expires_at"
+            ).fetchall()
+            for key, agent, response, expires_at in rows[-self.max_entries:]:
+                self._entries[key] = (agent, response, expires_at)
+            self._conn.commit()
+            logger.info("LLM cache: %d entries loaded from %s", len(self._entries), self.path)
+        except sqlite3.Error as e:
+            logger.warning("LLM cache persistence disabled (%s): %s", self.path, e)
+            self._conn = None
+            return
+        # From here on the connection is only used by the writer thread
+        self._writer = threading.Thread(target=self._run_writer, name="llm-cache-writer", daemon=True)
+        self._writer.start()
+
+    def _persist(self, rows, deleted):
+        """Queues one put's rows for the writer thread; returns immediately."""
+        if self._writer is not None:
+            self._queue.put((rows, deleted))
+
+    def _run_writer(self):
+        stop = False
+        while not stop:
+            items = [self._queue.get()]
+            # Group-commit everything queued meanwhile
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in items)
+            writes = [item for item in items if item is _CLEAR or isinstance(item, tuple)]
+            if writes:
+                self._write(writes)
+            for _ in items:
+                self._queue.task_done()
+
+    def _write(self, writes):
+        try:
+            with self._conn:
+                for item in writes:
+                    if item is _CLEAR:
+                        self._conn.execute("DELETE FROM llm_cache")
+                        continue
+                    rows, deleted = item
+                    if deleted:
+                        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", [(k,) for k in deleted])
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO llm_cache (key, agent, response, expires_at) VALUES (?, ?, ?, ?)",
+                        rows,
+                    )
+        except sqlite3.Error as e:
+            logger.warning("LLM cache write failed: %s", e)
+
+    def flush(self):
+        """Waits until everything queued so far is committed."""
+        if self._writer is not None:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self):
+        """Commits queued writes, stops the writer and closes the database."""
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join(timeout=5.0)
+            self._writer = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def keys(self, provider: str, model: str, prompt: str, system_prompt: Optional[str] = None) -> Tuple[str, str]:
+        exact = _hash("x", provider, model, system_prompt, prompt)
+        normalised = _hash(
+            "n", provider, model,
+            normalise_prompt(system_prompt, self.digits), normalise_prompt(prompt, self.digits),
+        )
+        return exact, normalised
+
+    def ttl(self, agent: str) -> float:
+        return self.ttls.get(agent, self.default_ttl)
+
+    def get(self, agent: str, provider: str, model: str, prompt: str,
+            system_prompt: Optional[str] = None) -> Optional[str]:
+        exact, normalised = self.keys(provider, model, prompt, system_prompt)
+        now = self.clock()
+        with self._lock:
+            for key, metric in ((exact, "hits"), (normalised, "normalised_hits")):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[2] < now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                self.metrics[agent][metric] += 1
+                return entry[1]
+            self.metrics[agent]["misses"] += 1
+        return None
+
+    def put(self, agent: str, provider: str, model: str, prompt: str, response: Optional[str],
+            system_prompt: Optional[str] = None):
+        if not response or not response.strip():
+            return
+        expires_at = self.clock() + self.ttl(agent)
+        rows, evicted = [], []
+        with self._lock:
+            for key in self.keys(provider, model, prompt, system_prompt):
+                self._entries[key] = (agent, response, expires_at)
+                self._entries.move_to_end(key)
+                rows.append((key, agent, response, expires_at))
+            while len(self._entries) > self.max_entries:
+                key, _ = self._entries.popitem(last=False)
+                evicted.append(key)
+            self.evictions += len(evicted)
+            self.metrics[agent]["stores"] += 1
+            self._persist(rows, evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._writer is not None:
+                self._queue.put(_CLEAR)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "evictions": self.evictions,
+            "agents": {agent: dict(m) for agent, m in self.metrics.items()},
+        }
+
+
+_shared: Optional[LLMResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache (None when LLM_CACHE=0)."""
+    global _shared
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = LLMResponseCache()
+                atexit.register(_shared.close)
+    return _shared
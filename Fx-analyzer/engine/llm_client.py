@@ -0,0 +1,387 @@
+"""
+LLM Client - shared async HTTP pool for OpenAI-compatible chat endpoints.
+
+All agents send OpenRouter requests through one pool instead of each
+holding its own synchronous OpenAI client on an ``asyncio.to_thread``
+worker. Connections are kept alive and reused. Each provider has its own
+concurrency limit (``OPENROUTER_MAX_CONCURRENCY``) and every request is
+bounded by ``LLM_HTTP_TIMEOUT`` seconds.
+
+With ``stream=True`` the completion is read as server-sent events. With
+``stop_when_complete=True`` the stream is also dropped as soon as the
+first top-level JSON object in the reply is closed. Agents only parse that
+object, so any trailing text is never waited for.
+
+The pool uses httpx (with HTTP/2 when ``h2`` is installed). When httpx is
+missing it falls back to a small HTTP/1.1 keep-alive client built on
+asyncio streams.
+
+Usage (from agents/base.py):
+    content = await get_http_pool().chat("openrouter", model, messages, stream=LLM_STREAM)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import ssl
+import weakref
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401 - lets httpx negotiate HTTP/2
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+logger = logging.getLogger(__name__)
+
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "60"))
+LLM_STREAM = os.getenv("LLM_STREAM", "0") == "1"
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+OPENROUTER_MAX_CONCURRENCY = int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "4"))
+
+
+@dataclass
+class ProviderConfig:
+    base_url: str
+    api_key_env: str
+    max_concurrency: int = 4
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+PROVIDERS = {
+    "openrouter": ProviderConfig(OPENROUTER_BASE_URL, "OPENROUTER_API_KEY", OPENROUTER_MAX_CONCURRENCY),
+}
+
+
+class LLMHTTPError(Exception):
+    """Non-2xx reply; the message starts with the status code (e.g. 'HTTP 429')."""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+
+
+class JSONObjectScanner:
+    """Detects when the first top-level JSON object in a text stream closes."""
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        for ch in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"' and self.started:
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+                self.started = True
+            elif ch == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+# ----------------------------------------------------------------------
+# asyncio-streams fallback transport
+# ----------------------------------------------------------------------
+
+
+class _Response:
+    def __init__(self, transport, reader, writer, status: int, headers: Dict[str, str]):
+        self._transport = transport
+        self._reader = reader
+        self._writer = writer
+        self._done = False
+        self.status = status
+        self.headers = headers
+        self.chunked = headers.get("transfer-encoding", "").lower() == "chunked"
+        self.length = int(headers["content-length"]) if "content-length" in headers else None
+        self.keep_alive = headers.get("connection", "").lower() != "close" and (self.chunked or self.length is not None)
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        reader = self._reader
+        if self.chunked:
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass  # trailers
+                    break
+                data = await reader.readexactly(size)
+                await reader.readexactly(2)
+                yield data
+        elif self.length is not None:
+            remaining = self.length
+            while remaining:
+                data = await reader.read(min(remaining, 65536))
+                if not data:
+                    raise ConnectionError("connection closed mid-body")
+                remaining -= len(data)
+                yield data
+        else:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                yield data
+        self._done = True
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.iter_bytes()])
+
+    async def iter_lines(self) -> AsyncIterator[str]:
+        buffer = b""
+        async for chunk in self.iter_bytes():
+            buffer += chunk
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                yield line.rstrip(b"\r").decode("utf-8")
+        if buffer:
+            yield buffer.decode("utf-8")
+
+    def close(self):
+        """Returns the connection to the pool if the body was fully read."""
+        self._transport.release(self._reader, self._writer, self._done and self.keep_alive)
+
+
+class _StreamsTransport:
+    """Minimal HTTP/1.1 keep-alive client, used when httpx is not installed."""
+
+    def __init__(self, base_url: str, max_connections: int):
+        parts = urlsplit(base_url)
+        self.tls = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.tls else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.max_connections = max_connections
+        self.opened = 0
+        self._idle: List[tuple] = []
+
+    async def _connect(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        self.opened += 1
+        ctx = ssl.create_default_context() if self.tls else None
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=ctx)
+        return reader, writer, False
+
+    async def post(self, path: str, body: bytes, headers: Dict[str, str]) -> _Response:
+        host = self.host if self.port in (80, 443) else f"{self.host}:{self.port}"
+        head = [f"POST {self.prefix}{path} HTTP/1.1", f"Host: {host}", f"Content-Length: {len(body)}"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        request = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+        while True:
+            reader, writer, reused = await self._connect()
+            try:
+                writer.write(request)
+                await writer.drain()
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionError("connection closed before response")
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection; retry fresh
+            except BaseException:
+                writer.close()  # cancelled / timed out mid-request
+                raise
+        response_headers = {}
+        try:
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+        except BaseException:
+            writer.close()
+            raise
+        return _Response(self, reader, writer, int(status_line.split()[1]), response_headers)
+
+    def release(self, reader, writer, reusable: bool):
+        if reusable and len(self._idle) < self.max_connections:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+
+    async def aclose(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+# ----------------------------------------------------------------------
+# Pool
+# ----------------------------------------------------------------------
+
+
+class _LoopState:
+    """Connections and semaphores belong to one event loop."""
+
+    def __init__(self):
+        self.clients: Dict[str, object] = {}
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+class LLMHTTPPool:
+    """Shared keep-alive connections with per-provider concurrency limits."""
+
+    def __init__(self, providers: Optional[Dict[str, ProviderConfig]] = None, timeout: float = LLM_HTTP_TIMEOUT):
+        self.providers = dict(PROVIDERS if providers is None else providers)
+        self.timeout = timeout
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self.metrics: Dict[str, Dict[str, int]] = {}
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState()
+        return state
+
+    def _client(self, state: _LoopState, provider: str):
+        client = state.clients.get(provider)
+        if client is None:
+            cfg = self.providers[provider]
+            if httpx is not None:
+                client = httpx.AsyncClient(
+                    base_url=cfg.base_url,
+                    http2=HTTP2,
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=cfg.max_concurrency,
+                                        max_keepalive_connections=cfg.max_concurrency),
+                )
+            else:
+                client = _StreamsTransport(cfg.base_url, cfg.max_concurrency)
+            state.clients[provider] = client
+        return client
+
+    def _metric(self, provider: str, name: str, delta: int = 1):
+        m = self.metrics.setdefault(provider, {"requests": 0, "errors": 0, "early_stops": 0, "in_flight": 0, "waiting": 0})
+        m[name] += delta
+
+    async def chat(self, provider: str, model: str, messages: List[dict], temperature: float = 0.1,
+                   max_tokens: int = 1024, stream: bool = False, stop_when_complete: bool = False,
+                   api_key: Optional[str] = None) -> str:
+        """Completion text of a chat request; raises LLMHTTPError on non-2xx."""
+        cfg = self.providers[provider]
+        state = self._state()
+        semaphore = state.semaphores.get(provider)
+        if semaphore is None:
+            semaphore = state.semaphores[provider] = asyncio.Semaphore(cfg.max_concurrency)
+        payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        if stream:
+            payload["stream"] = True
+        headers = {
+            "Authorization": f"Bearer {api_key or os.getenv(cfg.api_key_env, '')}",
+            "Content-Type": "application/json",
+            **cfg.headers,
+        }
+
+        self._metric(provider, "waiting")
+        async with semaphore:
+            self._metric(provider, "waiting", -1)
+            self._metric(provider, "in_flight")
+            self._metric(provider, "requests")
+            try:
+                return await asyncio.wait_for(
+                    self._send(self._client(state, provider), provider, payload, headers, stream, stop_when_complete),
+                    self.timeout,
+                )
+            except Exception:
+                self._metric(provider, "errors")
+                raise
+            finally:
+                self._metric(provider, "in_flight", -1)
+
+    async def _send(self, client, provider, payload, headers, stream, stop_when_complete) -> str:
+        if httpx is not None and isinstance(client, httpx.AsyncClient):
+            if stream:
+                async with client.stream("POST", "/chat/completions", json=payload, headers=headers) as response:
+                    if response.status_code >= 400:
+                        raise LLMHTTPError(response.status_code, (await response.aread()).decode("utf-8", "replace"))
+                    return await self._read_events(response.aiter_lines(), provider, stop_when_complete)
+            response = await client.post("/chat/completions", json=payload, headers=headers)
+            if response.status_code >= 400:
+                raise LLMHTTPError(response.status_code, response.text)
+            return _message_content(response.json())
+
+        response = await client.post("/chat/completions", json.dumps(payload).encode("utf-8"), headers)
+        try:
+            if response.status >= 400:
+                raise LLMHTTPError(response.status, (await response.read()).decode("utf-8", "replace"))
+            if stream:
+                return await self._read_events(response.iter_lines(), provider, stop_when_complete)
+            return _message_content(json.loads(await response.read()))
+        finally:
+            response.close()
+
+    async def _read_events(self, lines: AsyncIterator[str], provider: str, stop_when_complete: bool) -> str:
+        parts = []
+        scanner = JSONObjectScanner() if stop_when_complete else None
+        try:
+            async for line in lines:
+                if not line.startswith("data:"):
+                    continue  # blank separators and ": keep-alive" comments
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                delta = (choices[0].get("delta") or {}).get("content") or ""
+                parts.append(delta)
+                if scanner is not None and scanner.feed(delta):
+                    self._metric(provider, "early_stops")
+                    break
+        finally:
+            await lines.aclose()
+        return "".join(parts)
+
+    async def close(self):
+        """Closes the connections opened from the running loop."""
+        state = self._states.pop(asyncio.get_running_loop(), None)
+        if state is None:
+            return
+        for client in state.clients.values():
+            await client.aclose()
+
+    def stats(self) -> dict:
+        return {provider: dict(m) for provider, m in self.metrics.items()}
+
+
+def _message_content(data: dict) -> str:
+    return data["choices"][0]["message"]["content"]
+
+
+_pool: Optional[LLMHTTPPool] = None
+
+
+def get_http_pool() -> LLMHTTPPool:
+    """Process-wide pool shared by all agents."""
+    global _pool
+    if _pool is None:
+        _pool = LLMHTTPPool()
+    return _pool
@@ -0,0 +1,246 @@
+"""
+LLM Scheduler - shared RPM / TPM budgets and priority queueing for LLM calls.
+
+Every agent asks the scheduler for a slot before calling a provider,
+instead of firing the request and reacting to a 429 on its own. Each model
+has token buckets for requests per minute and tokens per minute
+(``LLM_MODEL_LIMITS``, defaulting per provider to ``DEFAULT_MODEL_LIMITS``).
+An optional provider-wide budget for the shared API key can be set with
+``LLM_PROVIDER_LIMITS``. Both settings use the ``key=rpm/tpm,...`` format,
+where 0 means unlimited.
+
+Waiting requests are granted in priority order (PRIORITY_CRITICAL for the
+trade synthesis, PRIORITY_NORMAL for the experts, PRIORITY_BACKGROUND for
+everything else), and a request may list alternative models: when its
+first choice is out of budget it is granted the first alternative that is
+not. A request whose expected wait exceeds its ``max_wait`` is refused
+up front (``acquire`` returns None) so callers fall back immediately
+rather than stalling. A 429 still happens occasionally; ``penalise``
+blocks that model for every agent.
+
+Usage (from agents/base.py):
+    model = await get_scheduler().acquire("openrouter", [model, *fallbacks], tokens, PRIORITY_NORMAL)
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CRITICAL = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+
+# Seconds a request may queue before the caller degrades, by priority
+MAX_WAIT = {
+    PRIORITY_CRITICAL: float(os.getenv("LLM_MAX_WAIT_CRITICAL", "30")),
+    PRIORITY_NORMAL: float(os.getenv("LLM_MAX_WAIT", "15")),
+    PRIORITY_BACKGROUND: float(os.getenv("LLM_MAX_WAIT_BACKGROUND", "5")),
+}
+
+# Per-model (rpm, tpm) when nothing more specific is configured;
+# OpenRouter free models allow 20 requests/min each
+DEFAULT_MODEL_LIMITS = {
+    "openrouter": (20, 0),
+    "gemini": (15, 1_000_000),
+}
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """'gemini=15/1000000,google/gemma-4-31b-it:free=10/0' -> {key: (rpm, tpm)}"""
+    limits = {}
+    for part in (spec or "").split(","):
+        key, _, value = part.strip().rpartition("=")
+        if not key or not value:
+            continue
+        rpm, _, tpm = value.partition("/")
+        limits[key.strip()] = (int(rpm or 0), int(tpm or 0))
+    return limits
+
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    """Rough prompt size (~4 characters per token)."""
+    return sum(len(t or "") for t in texts) // 4
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units per minute, up to one minute's worth."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class Budget:
+    """RPM and TPM buckets (either may be unlimited) plus a 429 block."""
+
+    def __init__(self, rpm: int, tpm: int, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.requests = TokenBucket(rpm, clock) if rpm else None
+        self.tokens = TokenBucket(tpm, clock) if tpm else None
+        self.blocked_until = 0.0
+
+    def wait_time(self, tokens: int) -> float:
+        wait = max(0.0, self.blocked_until - self.clock())
+        if self.requests is not None:
+            wait = max(wait, self.requests.time_until(1))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.time_until(tokens))
+        return wait
+
+    def take(self, tokens: int):
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None and tokens:
+            self.tokens.take(tokens)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    models: List[str] = field(compare=False)
+    tokens: int = field(compare=False)
+    event: asyncio.Event = field(compare=False)
+    granted: Optional[str] = field(default=None, compare=False)
+    eta: Optional[float] = field(default=None, compare=False)
+
+
+class LLMScheduler:
+    """Grants LLM calls against shared budgets, highest priority first."""
+
+    def __init__(self, model_limits: Optional[Dict[str, Tuple[int, int]]] = None,
+                 provider_limits: Optional[Dict[str, Tuple[int, int]]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.model_limits = model_limits if model_limits is not None else parse_limits(os.getenv("LLM_MODEL_LIMITS", ""))
+        self.provider_limits = (provider_limits if provider_limits is not None
+                                else parse_limits(os.getenv("LLM_PROVIDER_LIMITS", "")))
+        self.clock = clock
+        self._budgets: Dict[Tuple[str, Optional[str]], Budget] = {}
+        self._queues: Dict[str, List[_Waiter]] = {}
+        self._seq = itertools.count()
+        self.metrics = {"granted": 0, "spread": 0, "refused": 0, "penalised": 0, "queued_seconds": 0.0}
+
+    def _budget(self, provider: str, model: Optional[str] = None) -> Budget:
+        key = (provider, model)
+        budget = self._budgets.get(key)
+        if budget is None:
+            if model is None:
+                rpm, tpm = self.provider_limits.get(provider, (0, 0))
+            else:
+                rpm, tpm = self.model_limits.get(model, DEFAULT_MODEL_LIMITS.get(provider, (0, 0)))
+            budget = self._budgets[key] = Budget(rpm, tpm, self.clock)
+        return budget
+
+    def _dispatch(self, provider: str):
+        """Grants whatever the budgets allow, in priority order. A waiting
+        request keeps lower-priority ones off the models it asked for."""
+        shared = self._budget(provider)
+        claimed = set()
+        for waiter in sorted(self._queues.get(provider, [])):
+            if waiter.granted:
+                continue
+            provider_wait = shared.wait_time(waiter.tokens)
+            eta = None
+            for model in waiter.models:
+                if model in claimed:
+                    continue
+                wait = max(provider_wait, self._budget(provider, model).wait_time(waiter.tokens))
+                if wait <= 0:
+                    shared.take(waiter.tokens)
+                    self._budget(provider, model).take(waiter.tokens)
+                    waiter.granted = model
+                    waiter.event.set()
+                    break
+                eta = wait if eta is None else min(eta, wait)
+            if waiter.granted:
+                continue
+            waiter.eta = eta
+            claimed.update(waiter.models)
+            if provider_wait > 0:
+                break  # the shared key is exhausted for everyone below too
+
+    async def acquire(self, provider: str, models: List[str], tokens: int = 0,
+                      priority: int = PRIORITY_NORMAL, max_wait: Optional[float] = None) -> Optional[str]:
+        """Waits for budget on one of *models* (in preference order) and
+        returns the one granted, or None if that would take over *max_wait*
+        seconds (``MAX_WAIT[priority]`` by default)."""
+        if max_wait is None:
+            max_wait = MAX_WAIT.get(priority, MAX_WAIT[PRIORITY_NORMAL])
+        queue = self._queues.setdefault(provider, [])
+        waiter = _Waiter(priority, next(self._seq), list(dict.fromkeys(models)), tokens, asyncio.Event())
+        heapq.heappush(queue, waiter)
+        start = self.clock()
+        try:
+            while True:
+                self._dispatch(provider)
+                if waiter.granted:
+                    self.metrics["granted"] += 1
+                    self.metrics["queued_seconds"] += self.clock() - start
+                    if waiter.granted != waiter.models[0]:
+                        self.metrics["spread"] += 1
+                    return waiter.granted
+                remaining = max_wait - (self.clock() - start)
+                if remaining <= 0 or (waiter.eta is not None and waiter.eta > remaining):
+                    self.metrics["refused"] += 1
+                    logger.warning("LLM scheduler: no %s budget for %s within %.0fs", provider, waiter.models, max_wait)
+                    return None
+                timeout = remaining if waiter.eta is None else waiter.eta
+                waiter.event.clear()
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if waiter in queue:
+                queue.remove(waiter)
+                heapq.heapify(queue)
+            # Our place may have been holding others back
+            for other in queue:
+                other.event.set()
+
+    def penalise(self, provider: str, model: str, seconds: float):
+        """Blocks *model* for every caller after a 429."""
+        budget = self._budget(provider, model)
+        budget.blocked_until = max(budget.blocked_until, self.clock() + seconds)
+        self.metrics["penalised"] += 1
+
+    def stats(self) -> dict:
+        return {
+            **self.metrics,
+            "queued": {provider: len(queue) for provider, queue in self._queues.items() if queue},
+        }
+
+
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_scheduler() -> LLMScheduler:
+    """Process-wide scheduler shared by all agents."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler()
+    return _scheduler
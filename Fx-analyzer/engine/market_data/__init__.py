@@ -0,0 +1,129 @@
+"""Market-data providers behind one batched interface.
+
+  - MT5Provider     → running MetaTrader 5 terminal
+  - YahooProvider   → yfinance (no key needed)
+  - ReplayProvider  → recorded CSV bars, for offline load tests / benchmarks
+
+``build_providers`` returns the fallback chain selected by the
+``MARKET_DATA_PROVIDER`` env var: ``auto`` (MT5, then yfinance), ``replay``,
+or a comma-separated list of provider names. DataFeed and the deep agents
+both fetch through this chain; once the engine registers its DataFeed with
+``set_history_source``, ``fetch_history`` is served from the DataFeed's
+shared bar cache instead.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Callable
+
+import pandas as pd
+
+from .base import (
+    BAR_COLUMNS,
+    TIMEFRAME_SECONDS,
+    MarketDataProvider,
+    empty_bars,
+    normalize_bars,
+    to_yfinance_frame,
+)
+from .metatrader import MT5Provider
+from .replay import DEFAULT_REPLAY_DIR, ReplayProvider
+from .yahoo import YF_MAPPING, YahooProvider
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "BAR_COLUMNS",
+    "TIMEFRAME_SECONDS",
+    "YF_MAPPING",
+    "MarketDataProvider",
+    "MT5Provider",
+    "YahooProvider",
+    "ReplayProvider",
+    "build_providers",
+    "default_providers",
+    "empty_bars",
+    "fetch_history",
+    "normalize_bars",
+    "set_history_source",
+    "to_yfinance_frame",
+]
+
+
+def build_providers(mode: str | None = None) -> list[MarketDataProvider]:
+    """Provider fallback chain for *mode* (defaults to ``MARKET_DATA_PROVIDER``)."""
+    mode = (mode or os.getenv("MARKET_DATA_PROVIDER", "auto")).strip().lower()
+    if mode == "auto":
+        names = ["mt5", "yfinance"]
+    else:
+        names = [n.strip() for n in mode.split(",") if n.strip()]
+
+    providers: list[MarketDataProvider] = []
+    for name in names:
+        if name == "mt5":
+            providers.append(MT5Provider())
+        elif name in ("yfinance", "yahoo"):
+            providers.append(YahooProvider())
+        elif name == "replay":
+            providers.append(ReplayProvider(
+                DEFAULT_REPLAY_DIR,
+                speed=float(os.getenv("REPLAY_SPEED", "60")),
+                warmup=int(os.getenv("REPLAY_WARMUP", "500")),
+            ))
+        else:
+            logger.warning("Unknown market data provider '%s', skipping", name)
+    return providers
+
+
+_default_chain: list[MarketDataProvider] | None = None
+
+
+def default_providers() -> list[MarketDataProvider]:
+    """Process-wide provider chain, built on first use."""
+    global _default_chain
+    if _default_chain is None:
+        _default_chain = build_providers()
+    return _default_chain
+
+
+_history_source: Callable[[str, int, str], pd.DataFrame] | None = None
+
+
+def set_history_source(source: Callable[[str, int, str], pd.DataFrame] | None) -> None:
+    """Route ``fetch_history`` through *source(symbol, days, timeframe)*
+    (e.g. ``DataFeed.history``) so every consumer shares one bar cache."""
+    global _history_source
+    _history_source = source
+
+
+def fetch_history(
+    symbol: str,
+    days: int,
+    timeframe: str = "D1",
+    providers: list[MarketDataProvider] | None = None,
+) -> pd.DataFrame:
+    """The last *days* of bars for *symbol*, as a yfinance-style frame (empty
+    if nobody has them): from the registered history source, else the first
+    provider that has them."""
+    if _history_source is not None and providers is None:
+        try:
+            df = _history_source(symbol, days, timeframe)
+            if not df.empty:
+                return to_yfinance_frame(df)
+        except Exception as exc:
+            logger.warning("History source failed for %s: %s", symbol, exc)
+
+    since = pd.Timestamp.now(tz="UTC").tz_localize(None) - pd.Timedelta(days=days)
+    for provider in providers if providers is not None else default_providers():
+        if not provider.available():
+            continue
+        try:
+            df = provider.fetch(symbol, timeframe, limit=None, since=since)
+        except Exception as exc:
+            logger.warning("%s history fetch failed for %s: %s", provider.name, symbol, exc)
+            continue
+        if not df.empty:
+            return to_yfinance_frame(df)
+    return pd.DataFrame()
@@ -0,0 +1,113 @@
+"""Provider interface shared by every market-data source.
+
+All providers return bars in the DataFeed schema (``time`` naive UTC,
+``open``/``high``/``low``/``close`` float, ``tick_volume`` int), keyed by the
+engine's internal symbol name.
+"""
+
+from __future__ import annotations
+
+import abc
+
+import pandas as pd
+
+BAR_COLUMNS = ["time", "open", "high", "low", "close", "tick_volume"]
+
+# Bar length per timeframe name (same names as the BarStore partitions)
+TIMEFRAME_SECONDS = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "H1": 3600,
+    "D1": 86400,
+}
+
+
+class MarketDataProvider(abc.ABC):
+    """One source of OHLCV bars.
+
+    ``fetch_bars`` is batched: callers pass the whole watchlist and the
+    provider decides whether to serve it in one request or symbol by symbol.
+    Symbols it cannot serve are simply missing from the result, so the
+    caller can fall through to the next provider.
+    """
+
+    name = "base"
+    # Live sources are persisted to the BarStore; recorded ones are not
+    persist = True
+
+    def available(self) -> bool:
+        return True
+
+    @abc.abstractmethod
+    def fetch_bars(
+        self,
+        symbols: list[str],
+        timeframe: str = "M1",
+        limit: int | None = 500,
+        since: dict[str, pd.Timestamp] | None = None,
+    ) -> dict[str, pd.DataFrame]:
+        """Return ``{symbol: bars}`` for the newest *limit* bars.
+
+        ``since`` maps symbols to a naive UTC timestamp; only bars at or after
+        it are needed for those symbols (the bar at ``since`` may have been
+        forming when it was stored). ``limit=None`` means no cap.
+        """
+
+    def fetch(self, symbol: str, timeframe: str = "M1", limit: int | None = 500,
+              since: pd.Timestamp | None = None) -> pd.DataFrame:
+        """Single-symbol convenience wrapper around ``fetch_bars``."""
+        frames = self.fetch_bars(
+            [symbol], timeframe, limit, since={symbol: since} if since is not None else None
+        )
+        return frames.get(symbol, empty_bars())
+
+    def shutdown(self) -> None:
+        pass
+
+
+def empty_bars() -> pd.DataFrame:
+    return pd.DataFrame({
+        "time": pd.Series(dtype="datetime64[ns]"),
+        "open": pd.Series(dtype=float),
+        "high": pd.Series(dtype=float),
+        "low": pd.Series(dtype=float),
+        "close": pd.Series(dtype=float),
+        "tick_volume": pd.Series(dtype="int64"),
+    })
+
+
+def normalize_bars(df: pd.DataFrame, limit: int | None = None,
+                   since: pd.Timestamp | None = None) -> pd.DataFrame:
+    """Coerce *df* to the bar schema, sorted and de-duplicated on time."""
+    if df is None or df.empty:
+        return empty_bars()
+    df = df[BAR_COLUMNS].copy()
+    times = pd.DatetimeIndex(pd.to_datetime(df["time"]))
+    if times.tz is not None:
+        times = times.tz_convert("UTC").tz_localize(None)
+    df["time"] = times.as_unit("ns")
+    for col in ("open", "high", "low", "close"):
+        df[col] = df[col].astype(float)
+    df["tick_volume"] = df["tick_volume"].fillna(0).astype("int64")
+    df = df.sort_values("time", kind="stable").drop_duplicates("time", keep="last")
+    if since is not None:
+        df = df[df["time"] >= since]
+    if limit is not None:
+        df = df.tail(limit)
+    return df.reset_index(drop=True)
+
+
+def to_yfinance_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Bars as a yfinance ``history()`` frame (``Date`` index, capitalised
+    Open/High/Low/Close/Volume), the layout the deep agents were built on."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    out = pd.DataFrame({
+        "Open": df["open"].to_numpy(),
+        "High": df["high"].to_numpy(),
+        "Low": df["low"].to_numpy(),
+        "Close": df["close"].to_numpy(),
+        "Volume": df["tick_volume"].to_numpy(),
+    }, index=pd.DatetimeIndex(df["time"], name="Date"))
+    return out
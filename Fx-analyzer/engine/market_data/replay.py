@@ -0,0 +1,139 @@
+"""File-backed replay provider for offline, reproducible engine runs.
+
+Recordings are plain CSV files, one per symbol and timeframe::
+
+    data/replay/EURUSD_M1.csv    time,open,high,low,close,tick_volume
+
+Each symbol starts with ``warmup`` bars visible and then reveals further
+bars as the replay advances:
+
+  - ``speed > 0``: wall-clock driven, ``speed`` times faster than real time
+    (``speed=60`` releases one M1 bar per second).
+  - ``speed == 0``: step mode, every fetch of a symbol releases exactly one
+    bar. Runs are fully deterministic regardless of machine speed, which is
+    what benchmarks and load tests want.
+
+Once a recording is exhausted its final frame keeps being served.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Callable
+
+import pandas as pd
+
+from .base import BAR_COLUMNS, TIMEFRAME_SECONDS, MarketDataProvider, normalize_bars
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLAY_DIR = os.getenv(
+    "REPLAY_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "replay"),
+)
+
+
+class ReplayProvider(MarketDataProvider):
+    """Serves recorded bars as if they were arriving live."""
+
+    name = "replay"
+    persist = False
+
+    def __init__(
+        self,
+        root: str = DEFAULT_REPLAY_DIR,
+        speed: float = 60.0,
+        warmup: int = 500,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.root = os.path.abspath(root)
+        self.speed = speed
+        self.warmup = warmup
+        self.clock = clock
+        self._frames: dict[tuple, pd.DataFrame] = {}
+        self._steps: dict[tuple, int] = {}
+        self._started: float | None = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return os.path.isdir(self.root)
+
+    def _path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, f"{symbol}_{timeframe}.csv")
+
+    def symbols(self, timeframe: str = "M1") -> list[str]:
+        """Symbols with a recording for *timeframe*."""
+        if not self.available():
+            return []
+        suffix = f"_{timeframe}.csv"
+        return sorted(f[: -len(suffix)] for f in os.listdir(self.root) if f.endswith(suffix))
+
+    def _load(self, symbol: str, timeframe: str) -> pd.DataFrame | None:
+        key = (symbol, timeframe)
+        if key not in self._frames:
+            path = self._path(symbol, timeframe)
+            if not os.path.exists(path):
+                return None
+            self._frames[key] = normalize_bars(pd.read_csv(path, parse_dates=["time"]))
+            logger.info("ReplayProvider: loaded %d %s bars for %s", len(self._frames[key]), timeframe, symbol)
+        return self._frames[key]
+
+    def _visible(self, symbol: str, timeframe: str, total: int) -> int:
+        """Number of bars released so far for one recording."""
+        if self.speed > 0:
+            if self._started is None:
+                self._started = self.clock()
+            elapsed = (self.clock() - self._started) * self.speed
+            released = int(elapsed // TIMEFRAME_SECONDS[timeframe])
+        else:
+            key = (symbol, timeframe)
+            released = self._steps.get(key, -1) + 1
+            self._steps[key] = released
+        return min(total, self.warmup + released)
+
+    def exhausted(self, symbol: str, timeframe: str = "M1") -> bool:
+        with self._lock:
+            df = self._load(symbol, timeframe)
+            if df is None:
+                return True
+            if self.speed > 0:
+                if self._started is None:
+                    return False
+                elapsed = (self.clock() - self._started) * self.speed
+                released = int(elapsed // TIMEFRAME_SECONDS[timeframe])
+            else:
+                released = self._steps.get((symbol, timeframe), 0)
+            return self.warmup + released >= len(df)
+
+    def fetch_bars(self, symbols, timeframe="M1", limit=500, since=None):
+        since = since or {}
+        frames = {}
+        with self._lock:
+            for symbol in symbols:
+                df = self._load(symbol, timeframe)
+                if df is None or df.empty:
+                    continue
+                visible = df.iloc[: self._visible(symbol, timeframe, len(df))]
+                frames[symbol] = normalize_bars(visible, limit=limit, since=since.get(symbol))
+        return frames
+
+    def rewind(self) -> None:
+        """Restart every recording from its warmup window."""
+        with self._lock:
+            self._steps.clear()
+            self._started = None
+
+    @staticmethod
+    def record(frames: dict[str, pd.DataFrame], root: str = DEFAULT_REPLAY_DIR,
+               timeframe: str = "M1") -> list[str]:
+        """Write ``{symbol: bars}`` as replay recordings. Returns the paths."""
+        os.makedirs(root, exist_ok=True)
+        paths = []
+        for symbol, df in frames.items():
+            path = os.path.join(root, f"{symbol}_{timeframe}.csv")
+            normalize_bars(df)[BAR_COLUMNS].to_csv(path, index=False)
+            paths.append(path)
+        return paths
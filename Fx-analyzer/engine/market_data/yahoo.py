@@ -0,0 +1,182 @@
+"""Yahoo Finance provider (no key needed)."""
+
+from __future__ import annotations
+
+import logging
+import math
+import random
+
+import pandas as pd
+
+from .base import TIMEFRAME_SECONDS, MarketDataProvider, normalize_bars
+
+try:
+    import yfinance as yf
+except ImportError:
+    yf = None
+
+logger = logging.getLogger(__name__)
+
+# Mapping between internal symbols and Yahoo Finance tickers
+YF_MAPPING = {
+    "EURUSD": "EURUSD=X",
+    "GBPUSD": "GBPUSD=X",
+    "USDJPY": "USDJPY=X",
+    "AUDUSD": "AUDUSD=X",
+    "BTCUSD": "BTC-USD",
+    "ETHUSD": "ETH-USD",
+    "US30": "^DJI",
+    "US500": "^GSPC",
+    "AAPL": "AAPL",
+    "TSLA": "TSLA"
+}
+
+# yfinance interval and how far back (days) Yahoo serves it
+YF_INTERVALS = {
+    "M1": ("1m", 6),
+    "M5": ("5m", 59),
+    "M15": ("15m", 59),
+    "H1": ("60m", 729),
+    "D1": ("1d", None),
+}
+
+
+class YahooProvider(MarketDataProvider):
+    """Bars from batched ``yf.download`` requests.
+
+    Symbols with a ``since`` inside Yahoo's lookback window are topped up
+    from that timestamp; everything else gets a period sized to *limit*.
+    Either way the whole batch costs one or two HTTP round trips instead of
+    one per symbol.
+    """
+
+    name = "yfinance"
+
+    def available(self) -> bool:
+        return yf is not None
+
+    def _period_days(self, timeframe: str, limit: int | None) -> int:
+        _, max_days = YF_INTERVALS[timeframe]
+        bars = limit or 500
+        # Twice the span covers weekends and closed sessions
+        days = max(2, math.ceil(bars * TIMEFRAME_SECONDS[timeframe] * 2 / 86400))
+        return min(days, max_days) if max_days else days
+
+    def fetch_bars(self, symbols, timeframe="M1", limit=500, since=None):
+        """One ``yf.download`` for symbols being topped up (from the oldest
+        ``since`` among them) and one for symbols needing a full window."""
+        if yf is None:
+            return {}
+        interval, max_days = YF_INTERVALS[timeframe]
+        now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        since = since or {}
+
+        top_up, full = [], []
+        for symbol in symbols:
+            start = since.get(symbol)
+            if start is not None and (max_days is None or now - start < pd.Timedelta(days=max_days)):
+                top_up.append(symbol)
+            else:
+                full.append(symbol)
+
+        frames = {}
+        if top_up:
+            start = min(since[s] for s in top_up)
+            logger.debug("YahooProvider: topping up %d symbols from %s", len(top_up), start)
+            frames.update(self._download(
+                top_up, timeframe, limit, since, start=start.tz_localize("UTC"), interval=interval
+            ))
+        if full:
+            period = f"{self._period_days(timeframe, limit)}d"
+            logger.info("YahooProvider: fetching %d symbols %s %s", len(full), period, interval)
+            frames.update(self._download(full, timeframe, limit, {}, period=period, interval=interval))
+        return frames
+
+    def _download(self, symbols, timeframe, limit, since, **kwargs) -> dict[str, pd.DataFrame]:
+        tickers = {YF_MAPPING.get(s, s): s for s in symbols}
+        try:
+            data = yf.download(
+                list(tickers), group_by="ticker", auto_adjust=True,
+                threads=True, progress=False, **kwargs,
+            )
+        except Exception as e:
+            logger.error("YahooProvider: batched download failed (%s), fetching one by one", e)
+            return self._history_each(symbols, timeframe, limit, since, **kwargs)
+
+        frames = {}
+        for yf_symbol, symbol in tickers.items():
+            df = _ticker_slice(data, yf_symbol, single=len(tickers) == 1)
+            if df is None or df.empty:
+                continue
+            frames[symbol] = normalize_history(
+                df, limit=limit, since=since.get(symbol), daily=timeframe == "D1"
+            )
+        return frames
+
+    def _history_each(self, symbols, timeframe, limit, since, **kwargs) -> dict[str, pd.DataFrame]:
+        """Per-symbol ``Ticker.history`` fallback when a batched download fails."""
+        frames = {}
+        for symbol in symbols:
+            yf_symbol = YF_MAPPING.get(symbol, symbol)
+            try:
+                df = yf.Ticker(yf_symbol).history(**kwargs)
+            except Exception as e:
+                logger.error("YahooProvider: yfinance error for %s: %s", symbol, e)
+                continue
+            if df is None or df.empty:
+                continue
+            frames[symbol] = normalize_history(
+                df, limit=limit, since=since.get(symbol), daily=timeframe == "D1"
+            )
+        return frames
+
+
+def _ticker_slice(data: pd.DataFrame, yf_symbol: str, single: bool) -> pd.DataFrame | None:
+    """One ticker's OHLCV columns out of a ``yf.download`` result."""
+    if data is None or data.empty:
+        return None
+    if isinstance(data.columns, pd.MultiIndex):
+        for level in range(data.columns.nlevels):
+            if yf_symbol in data.columns.get_level_values(level):
+                df = data.xs(yf_symbol, axis=1, level=level)
+                break
+        else:
+            return None
+    elif single:
+        df = data
+    else:
+        return None
+    # Tickers with no data come back as all-NaN rows
+    return df.dropna(how="all", subset=[c for c in ("Open", "High", "Low", "Close") if c in df.columns])
+
+
+def normalize_history(df: pd.DataFrame, limit: int | None = None,
+                      since: pd.Timestamp | None = None, daily: bool = False) -> pd.DataFrame:
+    """Maps a yfinance history frame onto the bar schema.
+
+    Daily bars keep their exchange-local session date rather than being
+    shifted to UTC, so they still line up with other date-indexed sources.
+    """
+    if daily and isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df = df.tz_localize(None)
+    df = df.reset_index()
+
+    # Standardize datetime column
+    time_col = 'Datetime' if 'Datetime' in df.columns else 'Date' if 'Date' in df.columns else df.columns[0]
+
+    df = df.rename(columns={
+        time_col: 'time',
+        'Open': 'open',
+        'High': 'high',
+        'Low': 'low',
+        'Close': 'close',
+        'Volume': 'tick_volume'
+    })
+
+    # Forex volume is often 0 in yfinance. Fill with random values.
+    df['tick_volume'] = df['tick_volume'].fillna(0).astype(int)
+    zero_mask = df['tick_volume'] == 0
+    if zero_mask.any():
+        df.loc[zero_mask, 'tick_volume'] = [random.randint(10, 100) for _ in range(zero_mask.sum())]
+
+    return normalize_bars(df, limit=limit, since=since)
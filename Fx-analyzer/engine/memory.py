@@ -1,14 +1,179 @@
-import sqlite3
-import sqlite3
+import os
 import logging
+import threading
+from bisect import insort
 try:
-    from engine.database import DB_FILE
+    from engine import database
 except ImportError:
-    from database import DB_FILE
+    import database
+
+# Closed trades loaded per symbol when its cache entry is first built
+MEMORY_WARM_TRADES = int(os.getenv("MEMORY_WARM_TRADES", "1000"))
+# Closed trades kept verbatim per symbol for the "lessons learned" text
+MEMORY_RECENT_TRADES = int(os.getenv("MEMORY_RECENT_TRADES", "20"))
+
+
+class _Aggregate:
+    """Running count / win / P&L totals."""
+
+    __slots__ = ("trades", "wins", "total_pl", "win_pl", "loss_pl")
 
-class MemoryService:
     def __init__(self):
-        self.db_path = DB_FILE
+        self.trades = 0
+        self.wins = 0
+        self.total_pl = 0.0
+        self.win_pl = 0.0
+        self.loss_pl = 0.0
+
+    def add(self, pl: float):
+        self.trades += 1
+        self.total_pl += pl
+        if pl > 0:
+            self.wins += 1
+            self.win_pl += pl
+        else:
+            self.loss_pl += pl
+
+    def as_dict(self) -> dict:
+        losses = self.trades - self.wins
+        win_rate = self.wins / self.trades if self.trades else 0.0
+        avg_win = self.win_pl / self.wins if self.wins else 0.0
+        avg_loss = self.loss_pl / losses if losses else 0.0
+        return {
+            "trades": self.trades,
+            "wins": self.wins,
+            "losses": losses,
+            "win_rate": win_rate,
+            "total_pl": self.total_pl,
+            "avg_win": avg_win,
+            "avg_loss": avg_loss,
+            # Average P/L per trade: win_rate * avg_win + loss_rate * avg_loss
+            "expectancy": self.total_pl / self.trades if self.trades else 0.0,
+            "profit_factor": self.win_pl / -self.loss_pl if self.loss_pl else None,
+        }
+
+
+class SymbolPerformance:
+    """Incrementally maintained closed-trade stats for one symbol."""
+
+    def __init__(self, recent: int = MEMORY_RECENT_TRADES):
+        self.overall = _Aggregate()
+        self.by_regime = {}
+        self.recent_limit = recent
+        self.recent = []  # sorted by timestamp, newest last
+        self.streak = 0  # +n consecutive wins, -n consecutive losses
+        self.best_streak = 0
+        self.worst_streak = 0
+        self._summary = {}  # limit -> rendered lessons text
+
+    def add(self, trade: dict):
+        pl = float(trade.get("pl") or 0)
+        regime = str(trade.get("regime") or "UNKNOWN").upper()
+        self.overall.add(pl)
+        self.by_regime.setdefault(regime, _Aggregate()).add(pl)
+        # Trades can arrive out of order (e.g. backfilled closes); keep the
+        # same order as "ORDER BY timestamp"
+        insort(self.recent, {
+            "timestamp": str(trade.get("timestamp") or ""),
+            "action": trade.get("action"),
+            "entry_price": trade.get("entry_price") or trade.get("price"),
+            "exit_price": trade.get("exit_price"),
+            "pl": trade.get("pl"),
+            "regime": regime,
+        }, key=lambda row: row["timestamp"])
+        if len(self.recent) > self.recent_limit:
+            del self.recent[0]
+        if pl > 0:
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+        else:
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+        self.best_streak = max(self.best_streak, self.streak)
+        self.worst_streak = min(self.worst_streak, self.streak)
+        self._summary.clear()
+
+    def stats(self) -> dict:
+        stats = self.overall.as_dict()
+        stats.update({
+            "streak": self.streak,
+            "best_streak": self.best_streak,
+            "worst_streak": self.worst_streak,
+            "by_regime": {r: agg.as_dict() for r, agg in self.by_regime.items()},
+        })
+        return stats
+
+    def summary(self, limit: int) -> str:
+        text = self._summary.get(limit)
+        if text is None:
+            text = self._render(limit)
+            self._summary[limit] = text
+        return text
+
+    def _render(self, limit: int) -> str:
+        rows = self.recent[-limit:][::-1]
+        if not rows:
+            return "No past trade history for this symbol."
+
+        summary = []
+        wins = 0
+        for row in rows:
+            outcome = "WON" if (row['pl'] or 0) > 0 else "LOST"
+            if outcome == "WON": wins += 1
+            summary.append(f"- {row['timestamp'][:10]}: {row['action']} resulted in {outcome} (${row['pl']})")
+
+        win_rate = (wins / len(rows)) * 100
+
+        return f"Past Performance ({len(rows)} trades, {win_rate:.0f}% WR):\n" + "\n".join(summary)
+
+
+class PerformanceCache:
+    """Per-symbol SymbolPerformance, loaded from SQLite once and then kept
+    current by ``database.store_trade``."""
+
+    def __init__(self, warm_trades: int = MEMORY_WARM_TRADES):
+        self.warm_trades = warm_trades
+        self._symbols = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> SymbolPerformance:
+        perf = self._symbols.get(symbol)
+        if perf is not None:
+            return perf
+        # trade_lock first (store_trade holds it while calling on_trade): a
+        # trade being stored right now is either read here or added by its
+        # listener after the load, never both
+        with database.trade_lock, self._lock:
+            perf = self._symbols.get(symbol)
+            if perf is None:
+                perf = SymbolPerformance()
+                # Queued trades must be in the table before it is read
+                database.flush()
+                for trade in reversed(database.get_closed_trades(symbol, self.warm_trades)):
+                    perf.add(trade)
+                self._symbols[symbol] = perf
+        return perf
+
+    def on_trade(self, trade: dict):
+        """Trade listener: folds closed trades into loaded symbols."""
+        if trade.get("status") != "closed":
+            return
+        with self._lock:
+            perf = self._symbols.get(trade.get("symbol"))
+            if perf is not None:
+                perf.add(trade)
+
+    def clear(self):
+        with self._lock:
+            self._symbols.clear()
+
+
+performance_cache = PerformanceCache()
+database.add_trade_listener(performance_cache.on_trade)
+
+
+class MemoryService:
+    def __init__(self, cache: PerformanceCache = None):
+        self.db_path = database.DB_FILE
+        self.cache = cache or performance_cache
 
     def get_recent_performance(self, symbol: str, limit: int = 5):
         """
@@ -16,36 +181,12 @@ class MemoryService:
         Returns a formatted string summarizing the "lessons learned".
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Query finished trades (status 'closed' or similar implies we know the P/L)
-            cursor.execute('''
-                SELECT action, entry_price, pl, status, timestamp 
-                FROM trades 
-                WHERE symbol = ? AND status = 'closed'
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            ''', (symbol, limit))
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
-            if not rows:
-                return "No past trade history for this symbol."
-
-            summary = []
-            wins = 0
-            for row in rows:
-                outcome = "WON" if (row['pl'] or 0) > 0 else "LOST"
-                if outcome == "WON": wins += 1
-                summary.append(f"- {row['timestamp'][:10]}: {row['action']} resulted in {outcome} (${row['pl']})")
-            
-            win_rate = (wins / len(rows)) * 100
-            
-            return f"Past Performance ({len(rows)} trades, {win_rate:.0f}% WR):\n" + "\n".join(summary)
-
+            return self.cache.get(symbol).summary(limit)
         except Exception as e:
             logging.error(f"Memory Retrieval Error: {e}")
             return "Could not retrieve memory."
+
+    def get_performance_stats(self, symbol: str) -> dict:
+        """Win rate, P/L, expectancy, streaks and per-regime stats for the
+        symbol's closed trades."""
+        return self.cache.get(symbol).stats()
@@ -0,0 +1,248 @@
+"""
+Mock Bar Generator - seeded, vectorized synthetic OHLCV for many symbols.
+
+Every symbol is one row of a (symbols x bars) matrix, so a whole watchlist
+is simulated with a handful of NumPy calls. Each symbol keeps its last close
+and timestamp, which lets the generator stream: later calls only simulate
+the bars that are new since the previous one instead of rebuilding the
+whole window.
+
+Regimes (in pips, per bar):
+  - ``random``: driftless random walk (the old generate_mock_data behaviour)
+  - ``trend``: random walk plus a per-symbol drift of +/- ``trend_pips``
+  - ``range``: mean-reverting (AR(1)) around the symbol's starting price
+
+``volatility`` scales bar noise and wicks; ``gap_probability`` /
+``gap_pips`` open a bar away from the previous close.
+
+Usage:
+    gen = MockBarGenerator(seed=42, regime="trend")
+    frames = gen.frames(["EURUSD", "GBPUSD"])      # 500-bar windows ending now
+    frames = gen.frames(["EURUSD", "GBPUSD"])      # same windows + elapsed bars
+    new = gen.next_bars(["EURUSD", "GBPUSD"], 10)  # soak tests: 10 more bars each
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from engine.market_data import TIMEFRAME_SECONDS
+except ImportError:
+    from market_data import TIMEFRAME_SECONDS
+
+REGIMES = ("random", "trend", "range")
+
+
+def pip_size(symbol: str) -> float:
+    return 0.01 if 'JPY' in symbol or symbol in ['US30', 'US500', 'AAPL', 'TSLA'] else 0.0001
+
+
+def base_price(symbol: str) -> float:
+    """Realistic starting price when nothing better is known."""
+    if 'JPY' in symbol:
+        return 155.00
+    return 1.0800 if 'EUR' in symbol else 1.2600 if 'GBP' in symbol else 150.00
+
+
+@dataclass
+class _SymbolState:
+    time: int          # epoch ns of the newest bar
+    close: float
+    anchor: float      # mean level for the range regime
+    pip: float
+    drift: float       # pips per bar (trend regime)
+    window: Optional[Dict[str, np.ndarray]] = None  # column arrays, time in ns
+
+
+class MockBarGenerator:
+    """Streams synthetic bars for any number of symbols from one seeded RNG."""
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        timeframe: str = "M1",
+        regime: str = "random",
+        volatility: float = 1.0,
+        trend_pips: float = 0.5,
+        reversion: float = 0.05,
+        gap_probability: float = 0.0,
+        gap_pips: float = 20.0,
+        window: int = 500,
+    ):
+        if regime not in REGIMES:
+            raise ValueError(f"Unknown mock regime '{regime}', expected one of {REGIMES}")
+        self.rng = np.random.default_rng(seed)
+        self.timeframe = timeframe
+        self.step = TIMEFRAME_SECONDS[timeframe] * 1_000_000_000
+        self.regime = regime
+        self.volatility = volatility
+        self.trend_pips = trend_pips
+        self.reversion = reversion
+        self.gap_probability = gap_probability
+        self.gap_pips = gap_pips
+        self.window = window
+        self._states: Dict[str, _SymbolState] = {}
+        self._lock = threading.Lock()
+
+    def has(self, symbol: str) -> bool:
+        return symbol in self._states
+
+    def reset(self, symbol: Optional[str] = None):
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                self._states.pop(symbol, None)
+
+    # ------------------------------------------------------------------
+    # Simulation kernel
+    # ------------------------------------------------------------------
+
+    def _simulate(self, states: List[_SymbolState], n: int) -> Dict[str, np.ndarray]:
+        """Simulates *n* bars after each state. Returns {column: [S, n]}."""
+        S = len(states)
+        closes = np.array([s.close for s in states])
+        pips = np.array([s.pip for s in states])[:, None]
+        rng = self.rng
+
+        # Same spread as the old uniform +/-5 pip step (std ~2.9 pips)
+        shocks = rng.standard_normal((S, n)) * (2.9 * self.volatility)
+        gaps = np.where(
+            rng.random((S, n)) < self.gap_probability,
+            rng.standard_normal((S, n)) * self.gap_pips,
+            0.0,
+        )
+
+        if self.regime == "range":
+            # AR(1) on the deviation from the anchor: d_t = (1 - k) d_{t-1} + e_t.
+            # ewm(adjust=False) computes exactly that recursion down every column.
+            anchors = np.array([s.anchor for s in states])
+            k = self.reversion
+            seeded = np.column_stack([(closes - anchors) / pips[:, 0], (shocks + gaps) / k])
+            dev = pd.DataFrame(seeded.T).ewm(alpha=k, adjust=False).mean().to_numpy().T[:, 1:]
+            close = anchors[:, None] + dev * pips
+        else:
+            drift = np.array([s.drift for s in states])[:, None]
+            close = closes[:, None] + np.cumsum((shocks + gaps + drift) * pips, axis=1)
+
+        prev = np.column_stack([closes, close[:, :-1]])
+        open_ = prev + gaps * pips
+        wick = 5 * self.volatility * pips
+        high = np.maximum(open_, close) + rng.random((S, n)) * wick
+        low = np.minimum(open_, close) - rng.random((S, n)) * wick
+        volume = rng.integers(100, 1000, (S, n))
+        return {"open": open_, "high": high, "low": low, "close": close, "tick_volume": volume}
+
+    def _advance(self, symbols: List[str], n: int) -> Dict[str, Dict[str, np.ndarray]]:
+        """Appends *n* bars to every symbol's state and returns the new bars as
+        column arrays. Caller holds the lock."""
+        states = [self._states[s] for s in symbols]
+        bars = self._simulate(states, n)
+        offsets = np.arange(1, n + 1, dtype=np.int64) * self.step
+
+        new = {}
+        for i, (symbol, state) in enumerate(zip(symbols, states)):
+            columns = {"time": state.time + offsets}
+            columns.update((column, values[i]) for column, values in bars.items())
+            state.time += n * self.step
+            state.close = float(bars["close"][i, -1])
+            if state.window is None:
+                state.window = {c: v[-self.window:] for c, v in columns.items()}
+            else:
+                state.window = {
+                    c: np.concatenate([state.window[c], v])[-self.window:] for c, v in columns.items()
+                }
+            new[symbol] = columns
+        return new
+
+    @staticmethod
+    def _frame(columns: Dict[str, np.ndarray], bars: Optional[int] = None) -> pd.DataFrame:
+        start = -bars if bars else None
+        data = {c: v[start:] for c, v in columns.items()}
+        data["time"] = data["time"].astype("datetime64[ns]")
+        return pd.DataFrame(data)
+
+    def _advance_grouped(self, counts: Dict[str, int]) -> Dict[str, Dict[str, np.ndarray]]:
+        """Advances symbols that need the same number of bars in one batch."""
+        new = {}
+        by_count: Dict[int, List[str]] = {}
+        for symbol, n in counts.items():
+            if n > 0:
+                by_count.setdefault(n, []).append(symbol)
+        for n, group in by_count.items():
+            new.update(self._advance(group, n))
+        return new
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def _now(self) -> int:
+        now = pd.Timestamp.now(tz="UTC").tz_localize(None).value
+        return now - now % self.step
+
+    def _seed(self, symbols: List[str], bars: int, start_prices: Dict[str, float], end: int):
+        """Creates state for new symbols and fills a *bars* history ending at *end*."""
+        for symbol in symbols:
+            pip = pip_size(symbol)
+            start = start_prices.get(symbol) or base_price(symbol)
+            start += (self.rng.random() - 0.5) * 0.01
+            drift = self.trend_pips * self.rng.choice([-1.0, 1.0]) if self.regime == "trend" else 0.0
+            self._states[symbol] = _SymbolState(
+                time=end - bars * self.step,
+                close=start,
+                anchor=start,
+                pip=pip,
+                drift=drift,
+            )
+        self._advance_grouped({s: bars for s in symbols})
+
+    def frames(
+        self,
+        symbols: List[str],
+        bars: Optional[int] = 500,
+        start_prices: Optional[Dict[str, float]] = None,
+        now: Optional[pd.Timestamp] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Latest *bars* bars per symbol (the whole window if None), ending at
+        the current bar. New symbols get a fresh history; known ones only gain
+        the bars elapsed since the previous call.
+        """
+        end = self._now() if now is None else pd.Timestamp(now).value
+        end -= end % self.step
+        with self._lock:
+            bars = self.window if bars is None else bars
+            self.window = max(self.window, bars)
+            fresh = [s for s in symbols if s not in self._states]
+            if fresh:
+                self._seed(fresh, bars, start_prices or {}, end)
+            counts = {}
+            for symbol in symbols:
+                if symbol in fresh:
+                    continue
+                state = self._states[symbol]
+                elapsed = int((end - state.time) // self.step)
+                if elapsed > self.window:
+                    # Idle for longer than the window: skip ahead
+                    state.time = end - self.window * self.step
+                    elapsed = self.window
+                counts[symbol] = elapsed
+            self._advance_grouped(counts)
+            return {s: self._frame(self._states[s].window, bars) for s in symbols}
+
+    def next_bars(self, symbols: List[str], count: int = 1) -> Dict[str, pd.DataFrame]:
+        """
+        Simulates *count* more bars per symbol regardless of the wall clock
+        and returns only the new bars. Unknown symbols are seeded first.
+        """
+        with self._lock:
+            fresh = [s for s in symbols if s not in self._states]
+            if fresh:
+                self._seed(fresh, self.window, {}, self._now())
+            new = self._advance(list(symbols), count)
+        return {s: self._frame(columns) for s, columns in new.items()}
@@ -12,6 +12,8 @@ try:
     from engine.rag.rss_loader import RSSLoader
     from engine.analyzer import TechnicalAnalyzer
     from engine.memory import MemoryService
+    from engine.consensus_cache import ConsensusCache
+    from engine.llm_scheduler import PRIORITY_CRITICAL
 except ImportError:
     from agents.technical import TechnicalAgent
     from agents.fundamental import FundamentalAgent
@@ -21,6 +23,10 @@ except ImportError:
     from rag.rss_loader import RSSLoader
     from analyzer import TechnicalAnalyzer
     from memory import MemoryService
+    from consensus_cache import ConsensusCache
+    from llm_scheduler import PRIORITY_CRITICAL
+
+SYNTHESIS_FALLBACK_REASONING = "Synthesis Failed or Fallback Triggered"
 
 
 class MoEOrchestrator:
@@ -58,22 +64,58 @@ class MoEOrchestrator:
         self.rss = RSSLoader()
         self.analyzer = TechnicalAnalyzer()
         self.memory = MemoryService()
-
-    async def get_consensus_signal(self, symbol: str, df, news: list = None):
+        self.consensus_cache = ConsensusCache()
+        self._spread_models()
+
+    def _spread_models(self):
+        """Lets each agent fall back onto the other experts' models (same
+        provider) when the scheduler has no budget left for its own."""
+        agents = [self.tech_agent, self.fund_agent, self.sent_agent, self.risk_agent]
+        for agent in agents:
+            agent.fallback_models = list(dict.fromkeys(
+                other.model_name for other in agents
+                if other.provider == agent.provider and other.model_name != agent.model_name
+            ))
+
+    async def get_consensus_signal(self, symbol: str, df, news: list = None, direction: str = None):
         """
         Main entry point. Queries all experts and synthesizes a decision.
+
+        Decisions are reused from the consensus cache while the setup
+        (symbol, *direction*, RSI bucket, trend, volatility regime) is
+        unchanged and price has not moved materially; concurrent identical
+        requests share one run. ``cached`` in the result is True when the
+        decision was not made by this call.
         """
+        df = self.analyzer.analyze(df)
+        tech_data = self.analyzer.get_technical_summary(df, symbol)
+        if not tech_data:
+            return await self._run_consensus(symbol, df, tech_data, news)
+
+        key = self.consensus_cache.key(symbol, direction, tech_data, df)
+        return await self.consensus_cache.get_or_compute(
+            key,
+            tech_data.get("price"),
+            lambda: self._run_consensus(symbol, df, tech_data, news),
+            cacheable=lambda d: d.get("reasoning") != SYNTHESIS_FALLBACK_REASONING,
+        )
+
+    async def _run_consensus(self, symbol: str, df, tech_data: dict, news: list = None):
         # 0. Fetch External Data if missing
         if not news:
-            # Run in thread/executor if blocking, but fetch_news is synchronous requests mostly
-            # For now, running sync is okay or we can offload
+            # Served from the background news ingester's store (no network)
             news = self.rss.fetch_news()
 
         # 1. Prepare Data
-        df = self.analyzer.analyze(df)
-        tech_data = self.analyzer.get_technical_summary(df, symbol)
-        macro_context = self.rag.get_summary_context()
-        memory_context = self.memory.get_recent_performance(symbol)
+        macro_context = self.rag.get_summary_context(
+            symbol, query=f"{tech_data.get('trend', '')} macro outlook rates inflation"
+        )
+        try:
+            import database
+        except ImportError:
+            from engine import database
+        # SQLite reads run on the database read thread, off the event loop
+        memory_context = await database.run_read(self.memory.get_recent_performance, symbol)
 
         # 2. Parallel Agent Calls
         results = await asyncio.gather(
@@ -91,12 +133,7 @@ class MoEOrchestrator:
         tech_res, fund_res, sent_res, risk_res = results
 
         # 3. Fetch Vibe Research Context
-        try:
-            import database
-        except ImportError:
-            from engine import database
-
-        vibe_research_list = database.get_latest_vibe_research()
+        vibe_research_list = await database.run_read(database.get_latest_vibe_research)
         vibe_context = ""
         if vibe_research_list:
             vibe_context = "\n[Vibe AI Research Backtests]:\n"
@@ -174,14 +211,14 @@ class MoEOrchestrator:
         # We reuse the technical agent's connection for the final synthesis to save resources
         response = None
         try:
-            response = await self.tech_agent._call_llm_async(prompt)
+            response = await self.tech_agent._call_llm_async(prompt, priority=PRIORITY_CRITICAL)
         except Exception as e:
             logging.error(f"Synthesizer LLM Call Failed: {e}")
 
         fallback = {
             "action": "HOLD",
             "confidence": 0.0,
-            "reasoning": "Synthesis Failed or Fallback Triggered",
+            "reasoning": SYNTHESIS_FALLBACK_REASONING,
             "risk_parameters": {"leverage": 1, "stop_loss": "N/A"},
         }
 
@@ -202,6 +239,10 @@ class MoEOrchestrator:
             "RiskManager": self.risk_agent.update_model(model_name),
         }
 
+        # Decisions made by the previous models are no longer representative
+        self.consensus_cache.invalidate()
+        self._spread_models()
+
         # Update internal config to persist (in memory only for now)
         for key in self.models:
             self.models[key] = model_name
@@ -0,0 +1,149 @@
+"""
+Market Publisher - topic-negotiated ticker / signal framing on the PUB port.
+
+The engine's publish socket is an XPUB, so it sees every subscription its
+subscribers make and only encodes the formats someone actually asked for:
+
+  ticker {json}          one single-frame JSON message per symbol (legacy)
+  signal {json}          one single-frame JSON message per signal (legacy)
+  snap.json  [payload]   every symbol of a scan in one JSON array
+  snap.bin   [payload]   every symbol of a scan as packed binary records
+  mp.signal  [payload]   signal as msgpack (only if msgpack is installed)
+
+New topics deliberately do not start with "ticker" or "signal": ZMQ
+subscriptions are prefix matches, so legacy subscribers never receive them.
+
+``snap.bin`` payload, little-endian:
+
+    header  4s magic "FXTK" | u8 version | u8 pad | u16 count | i64 sent_ms
+    record  12s symbol (ASCII, NUL padded) | f64 price | i64 timestamp_ms
+
+Records are fixed-size (28 bytes), so a subscriber decodes the whole batch
+with one struct/typed-array read instead of one JSON parse per symbol.
+"""
+
+import asyncio
+import json
+import logging
+import struct
+import time
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+import zmq
+
+try:
+    import msgpack
+except ImportError:  # mp.* topics are simply not served
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+SNAP_MAGIC = b"FXTK"
+SNAP_VERSION = 1
+SNAP_HEADER = struct.Struct("<4sBxHq")
+SNAP_RECORD = np.dtype([("symbol", "S12"), ("price", "<f8"), ("timestamp", "<i8")])
+
+TOPIC_TICKER = b"ticker"
+TOPIC_SIGNAL = b"signal"
+TOPIC_SNAP_JSON = b"snap.json"
+TOPIC_SNAP_BIN = b"snap.bin"
+TOPIC_SIGNAL_MSGPACK = b"mp.signal"
+
+
+def encode_snapshot(tickers: List[Dict], sent_ms: int = None) -> bytes:
+    """Packs ``[{symbol, price, timestamp_ms}]`` into one snap.bin payload."""
+    records = np.zeros(len(tickers), dtype=SNAP_RECORD)
+    if tickers:
+        records["symbol"] = [t["symbol"].encode("ascii")[:12] for t in tickers]
+        records["price"] = [t["price"] for t in tickers]
+        records["timestamp"] = [t["timestamp_ms"] for t in tickers]
+    sent_ms = int(time.time() * 1000) if sent_ms is None else sent_ms
+    return SNAP_HEADER.pack(SNAP_MAGIC, SNAP_VERSION, len(tickers), sent_ms) + records.tobytes()
+
+
+def decode_snapshot(payload: bytes) -> Dict:
+    """Inverse of encode_snapshot, for Python subscribers and tests."""
+    magic, version, count, sent_ms = SNAP_HEADER.unpack_from(payload)
+    if magic != SNAP_MAGIC or version != SNAP_VERSION:
+        raise ValueError(f"Not a snap.bin v{SNAP_VERSION} payload")
+    records = np.frombuffer(payload, dtype=SNAP_RECORD, count=count, offset=SNAP_HEADER.size)
+    return {
+        "sent_ms": sent_ms,
+        "tickers": [
+            {"symbol": r["symbol"].decode("ascii"), "price": float(r["price"]), "timestamp_ms": int(r["timestamp"])}
+            for r in records
+        ],
+    }
+
+
+class MarketPublisher:
+    """Publishes tickers and signals in every format that has a subscriber."""
+
+    def __init__(self, socket):
+        self.socket = socket
+        self._subscriptions: Counter = Counter()
+
+    @classmethod
+    def bind(cls, context, endpoint: str) -> "MarketPublisher":
+        socket = context.socket(zmq.XPUB)
+        # Report every (un)subscription, not just the first/last per topic
+        socket.setsockopt(zmq.XPUB_VERBOSER, 1)
+        socket.bind(endpoint)
+        return cls(socket)
+
+    # ------------------------------------------------------------------
+    # Subscription tracking
+    # ------------------------------------------------------------------
+
+    def on_subscription(self, message: bytes):
+        if not message:
+            return
+        topic = bytes(message[1:])
+        if message[0] == 1:
+            self._subscriptions[topic] += 1
+        elif message[0] == 0 and self._subscriptions[topic] > 0:
+            self._subscriptions[topic] -= 1
+            if not self._subscriptions[topic]:
+                del self._subscriptions[topic]
+        logger.debug("Subscriptions: %s", dict(self._subscriptions))
+
+    async def track_subscriptions(self):
+        """Reads XPUB subscription messages forever."""
+        while True:
+            self.on_subscription(await self.socket.recv())
+
+    def wants(self, topic: bytes) -> bool:
+        """True if any live subscription prefix-matches *topic*."""
+        return any(topic.startswith(sub) for sub, n in self._subscriptions.items() if n)
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    async def send_string(self, message: str):
+        """Pass-through for the other single-frame JSON topics."""
+        await self.socket.send_string(message)
+
+    async def publish_tickers(self, tickers: List[Dict]):
+        """Publishes one scan's tickers: ``[{symbol, price, timestamp}]``
+        with ``timestamp`` an ISO string (legacy) and ``timestamp_ms``."""
+        if not tickers:
+            return
+        if self.wants(TOPIC_TICKER + b" "):
+            for t in tickers:
+                legacy = {"symbol": t["symbol"], "price": t["price"], "timestamp": t["timestamp"]}
+                await self.socket.send_string(f"ticker {json.dumps(legacy)}")
+        if self.wants(TOPIC_SNAP_JSON):
+            await self.socket.send_multipart([TOPIC_SNAP_JSON, json.dumps(tickers).encode()])
+        if self.wants(TOPIC_SNAP_BIN):
+            await self.socket.send_multipart([TOPIC_SNAP_BIN, encode_snapshot(tickers)])
+
+    async def publish_signal(self, signal: Dict):
+        if self.wants(TOPIC_SIGNAL + b" "):
+            await self.socket.send_string(f"signal {json.dumps(signal)}")
+        if msgpack is not None and self.wants(TOPIC_SIGNAL_MSGPACK):
+            await self.socket.send_multipart(
+                [TOPIC_SIGNAL_MSGPACK, msgpack.packb(signal, default=str)]
+            )
@@ -0,0 +1,256 @@
+"""
+Research Index - chunked BM25 retrieval over data/research.
+
+Documents are split into paragraph-aligned chunks and kept in an in-memory
+inverted index. The index is refreshed incrementally: a file is only
+re-read when its mtime or size changed, and only re-chunked when its
+content hash changed, so a growing corpus costs one directory scan per
+``refresh_interval`` rather than a full re-read per query. Chunks and file
+signatures are persisted next to the corpus (``.rag_index.json``), so a
+restart does not re-read unchanged files either.
+
+Queries return the top-k chunks by Okapi BM25; pair symbols such as EURUSD
+are also matched by their legs (EUR, USD).
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = ".rag_index.json"
+INDEX_VERSION = 1
+EXTENSIONS = (".txt", ".md")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def query_terms(symbol: Optional[str], query: Optional[str]) -> List[str]:
+    terms = tokenize(query or "")
+    if symbol:
+        s = re.sub(r"[^A-Za-z0-9]", "", symbol).lower()
+        terms.append(s)
+        if len(s) == 6 and s.isalpha():
+            terms += [s[:3], s[3:]]  # currency legs
+    return terms
+
+
+def chunk_text(text: str, chunk_chars: int = 800) -> List[str]:
+    """Splits on blank lines and packs paragraphs into ~chunk_chars chunks;
+    paragraphs longer than that are cut at word boundaries."""
+    chunks, current = [], ""
+    for para in re.split(r"\n\s*\n", text):
+        para = para.strip()
+        while len(para) > chunk_chars:
+            cut = para.rfind(" ", 0, chunk_chars)
+            cut = cut if cut > 0 else chunk_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(para[:cut].strip())
+            para = para[cut:].strip()
+        if not para:
+            continue
+        if current and len(current) + len(para) + 2 > chunk_chars:
+            chunks.append(current)
+            current = para
+        else:
+            current = f"{current}\n\n{para}" if current else para
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@dataclass
+class Chunk:
+    source: str
+    position: int
+    text: str
+    length: int = 0
+
+
+class ResearchIndex:
+    """Incrementally maintained BM25 index over a research directory."""
+
+    def __init__(self, data_dir: str, chunk_chars: int = 800, refresh_interval: float = 30.0,
+                 k1: float = 1.5, b: float = 0.75, persist: bool = True):
+        self.data_dir = data_dir
+        self.chunk_chars = chunk_chars
+        self.refresh_interval = refresh_interval
+        self.k1 = k1
+        self.b = b
+        self.index_path = os.path.join(data_dir, INDEX_FILE) if persist else None
+        self.files: Dict[str, dict] = {}  # relpath -> {mtime_ns, size, sha1, chunk ids}
+        self.chunks: Dict[int, Chunk] = {}
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)  # term -> chunk id -> tf
+        self._total_length = 0
+        self._next_id = 0
+        self._last_refresh = None
+        self.reads = 0  # files read from disk, for tests / stats
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _add_chunks(self, source: str, texts: List[str]) -> List[int]:
+        ids = []
+        for position, text in enumerate(texts):
+            tokens = tokenize(text)
+            cid = self._next_id
+            self._next_id += 1
+            self.chunks[cid] = Chunk(source, position, text, len(tokens))
+            self._total_length += len(tokens)
+            for term, tf in Counter(tokens).items():
+                self.postings[term][cid] = tf
+            ids.append(cid)
+        return ids
+
+    def _remove_file(self, source: str):
+        entry = self.files.pop(source, None)
+        if entry is None:
+            return
+        for cid in entry["chunks"]:
+            chunk = self.chunks.pop(cid)
+            self._total_length -= chunk.length
+            for term in set(tokenize(chunk.text)):
+                docs = self.postings.get(term)
+                if docs is not None:
+                    docs.pop(cid, None)
+                    if not docs:
+                        del self.postings[term]
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        found = {}
+        for root, dirs, names in os.walk(self.data_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in names:
+                if not name.endswith(EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found[os.path.relpath(path, self.data_dir)] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-indexes changed files; returns True if anything changed."""
+        now = time.monotonic()
+        if not force and self._last_refresh is not None and now - self._last_refresh < self.refresh_interval:
+            return False
+        self._last_refresh = now
+        if not os.path.isdir(self.data_dir):
+            return False
+
+        found = self._scan()
+        changed = False
+        for source in [s for s in self.files if s not in found]:
+            self._remove_file(source)
+            changed = True
+        for source, (mtime_ns, size) in found.items():
+            entry = self.files.get(source)
+            if entry is not None and entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+                continue
+            try:
+                with open(os.path.join(self.data_dir, source), "r", encoding="utf-8") as f:
+                    content = f.read()
+            except Exception as e:
+                logger.error("Error reading %s: %s", source, e)
+                continue
+            self.reads += 1
+            sha1 = hashlib.sha1(content.encode("utf-8")).hexdigest()
+            if entry is not None and entry["sha1"] == sha1:
+                entry.update(mtime_ns=mtime_ns, size=size)  # touched, not edited
+                changed = True
+                continue
+            self._remove_file(source)
+            texts = chunk_text(content, self.chunk_chars) if content.strip() else []
+            self.files[source] = {
+                "mtime_ns": mtime_ns, "size": size, "sha1": sha1,
+                "chunks": self._add_chunks(source, texts),
+            }
+            changed = True
+        if changed:
+            logger.info("Research index: %d files, %d chunks", len(self.files), len(self.chunks))
+            self._save()
+        return changed
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION or data.get("chunk_chars") != self.chunk_chars:
+                return
+            for source, entry in data["files"].items():
+                texts = entry.pop("texts")
+                entry["chunks"] = self._add_chunks(source, texts)
+                self.files[source] = entry
+        except Exception as e:
+            logger.warning("Ignoring unreadable research index %s: %s", self.index_path, e)
+            self.files, self.chunks, self._total_length = {}, {}, 0
+            self.postings = defaultdict(dict)
+
+    def _save(self):
+        if not self.index_path:
+            return
+        files = {}
+        for source, entry in self.files.items():
+            files[source] = {k: v for k, v in entry.items() if k != "chunks"}
+            files[source]["texts"] = [self.chunks[cid].text for cid in entry["chunks"]]
+        tmp = self.index_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "chunk_chars": self.chunk_chars, "files": files}, f)
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            logger.warning("Could not persist research index: %s", e)
+
+    # ------------------------------------------------------------------
+    # Retrieval
+    # ------------------------------------------------------------------
+
+    def search(self, terms: List[str], k: int = 4) -> List[Tuple[float, Chunk]]:
+        """Top-*k* chunks for *terms* by BM25 (score > 0 only)."""
+        n = len(self.chunks)
+        if not n or not terms:
+            return []
+        avgdl = self._total_length / n or 1.0
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(terms):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for cid, tf in docs.items():
+                norm = 1 - self.b + self.b * self.chunks[cid].length / avgdl
+                scores[cid] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(score, self.chunks[cid]) for cid, score in best]
+
+    def leading_chunks(self, k: int = 4) -> List[Chunk]:
+        """First chunk of each document (for queries with no matches)."""
+        firsts = [self.chunks[e["chunks"][0]] for _, e in sorted(self.files.items()) if e["chunks"]]
+        return firsts[:k]
@@ -1,14 +1,26 @@
 import os
 import glob
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+try:
+    from engine.rag.index import ResearchIndex, query_terms
+except ImportError:
+    from rag.index import ResearchIndex, query_terms
+
+# Chunks returned per get_summary_context call
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+# Seconds between checks of data/research for new or edited files
+RAG_REFRESH_INTERVAL = float(os.getenv("RAG_REFRESH_INTERVAL", "30"))
 
 class RAGLoader:
-    def __init__(self, data_dir: str = "data/research"):
+    def __init__(self, data_dir: str = "data/research", top_k: int = RAG_TOP_K):
         self.data_dir = data_dir
+        self.top_k = top_k
         # Ensure directory exists
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir, exist_ok=True)
+        self.index = ResearchIndex(self.data_dir, refresh_interval=RAG_REFRESH_INTERVAL)
             
     def load_documents(self) -> List[Dict[str, str]]:
         """
@@ -33,19 +45,22 @@ class RAGLoader:
         
         return documents
 
-    def get_summary_context(self) -> str:
+    def get_summary_context(self, symbol: Optional[str] = None, query: Optional[str] = None) -> str:
         """
-        Returns a concatenated string of all document contents, truncated or summarized.
-        For now, we'll just concatenate the first 2000 chars of each doc to avoid blowing context.
+        Returns the top-k research chunks relevant to *symbol* / *query*
+        from the incrementally maintained index (BM25). Without a match,
+        falls back to the opening chunk of each document.
         """
-        docs = self.load_documents()
-        if not docs:
+        self.index.refresh()
+        if not self.index.chunks:
             return "No research documents found."
-            
+
+        hits = [chunk for _, chunk in self.index.search(query_terms(symbol, query), self.top_k)]
+        if not hits:
+            hits = self.index.leading_chunks(self.top_k)
+
         context_parts = []
-        for doc in docs:
-            # Simple truncation for now - in full version we'd use LLM summarization here
-            snippet = doc['content'][:2000] 
-            context_parts.append(f"--- SOURCE: {doc['source']} ---\n{snippet}\n")
-            
+        for chunk in hits:
+            context_parts.append(f"--- SOURCE: {os.path.basename(chunk.source)} ---\n{chunk.text}\n")
+
         return "\n".join(context_parts)
@@ -0,0 +1,293 @@
+"""
+News Ingester - background RSS polling into a deduplicated headline store.
+
+All feeds are polled concurrently every ``RSS_POLL_INTERVAL`` seconds with
+conditional GETs (ETag / Last-Modified), so an unchanged feed costs one 304
+and no parsing. New entries are deduplicated (guid, else link, else
+normalised title) and kept in a rolling, time-bounded HeadlineStore; the
+MoE orchestrator reads from the store and never touches the network.
+
+HTTP goes through urllib on worker threads (no extra dependency); feeds
+are parsed with feedparser when it is installed, otherwise with a small
+RSS 2.0 / Atom reader.
+
+Usage (from bridge.py):
+    await self.moe.rss.ingester.run()
+"""
+
+import asyncio
+import calendar
+import email.utils
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import feedparser
+except ImportError:
+    feedparser = None
+
+logger = logging.getLogger(__name__)
+
+RSS_POLL_INTERVAL = float(os.getenv("RSS_POLL_INTERVAL", "300"))
+RSS_MAX_AGE_HOURS = float(os.getenv("RSS_MAX_AGE_HOURS", "24"))
+RSS_MAX_HEADLINES = int(os.getenv("RSS_MAX_HEADLINES", "500"))
+
+USER_AGENT = "Fx-analyzer news ingester"
+
+
+@dataclass
+class Headline:
+    key: str
+    title: str
+    summary: str
+    link: str
+    source: str
+    published: Optional[datetime] = None
+    first_seen: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def timestamp(self) -> datetime:
+        return self.published or self.first_seen
+
+
+def _normalise_title(title: str) -> str:
+    return re.sub(r"\W+", " ", title.lower()).strip()
+
+
+def headline_key(title: str, link: str = "", guid: str = "") -> str:
+    basis = guid or link or _normalise_title(title)
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+# ----------------------------------------------------------------------
+# Parsing
+# ----------------------------------------------------------------------
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = email.utils.parsedate_to_datetime(value)  # RSS (RFC 822)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))  # Atom (RFC 3339)
+        except ValueError:
+            return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _strip_tags(text: str) -> str:
+    return re.sub(r"<[^>]+>", "", text or "").strip()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_xml(body: bytes, source: str) -> List[Headline]:
+    root = ET.fromstring(body)
+    items = []
+    for node in root.iter():
+        if _local(node.tag) not in ("item", "entry"):
+            continue
+        fields, link = {}, ""
+        for child in node:
+            name = _local(child.tag)
+            if name == "link":
+                link = link or child.get("href") or (child.text or "").strip()
+            elif name not in fields:
+                fields[name] = (child.text or "").strip()
+        title = fields.get("title", "")
+        if not title:
+            continue
+        items.append(Headline(
+            key=headline_key(title, link, fields.get("guid") or fields.get("id", "")),
+            title=title,
+            summary=_strip_tags(fields.get("description") or fields.get("summary") or fields.get("content", "")),
+            link=link,
+            source=source,
+            published=_parse_date(fields.get("pubDate") or fields.get("published") or fields.get("updated")),
+        ))
+    return items
+
+
+def _parse_feedparser(body: bytes, source: str) -> List[Headline]:
+    items = []
+    for entry in feedparser.parse(body).entries:
+        title = entry.get("title", "")
+        if not title:
+            continue
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        items.append(Headline(
+            key=headline_key(title, entry.get("link", ""), entry.get("id", "")),
+            title=title,
+            summary=_strip_tags(entry.get("summary", "")),
+            link=entry.get("link", ""),
+            source=source,
+            published=datetime.fromtimestamp(calendar.timegm(parsed), timezone.utc) if parsed else None,
+        ))
+    return items
+
+
+def parse_feed(body: bytes, source: str) -> List[Headline]:
+    """Entries of an RSS / Atom document as Headlines."""
+    if feedparser is not None:
+        return _parse_feedparser(body, source)
+    return _parse_xml(body, source)
+
+
+# ----------------------------------------------------------------------
+# Store
+# ----------------------------------------------------------------------
+
+
+class HeadlineStore:
+    """Rolling, deduplicated headlines, newest last."""
+
+    def __init__(self, max_items: int = RSS_MAX_HEADLINES, max_age_hours: float = RSS_MAX_AGE_HOURS):
+        self.max_items = max_items
+        self.max_age = max_age_hours * 3600
+        self._items: "OrderedDict[str, Headline]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, headlines: List[Headline]) -> int:
+        """Adds unseen headlines; returns how many were new."""
+        added = 0
+        with self._lock:
+            for h in headlines:
+                if h.key in self._items:
+                    continue
+                self._items[h.key] = h
+                added += 1
+            self._expire()
+        return added
+
+    def _expire(self):
+        cutoff = time.time() - self.max_age
+        for key in [k for k, h in self._items.items() if h.timestamp.timestamp() < cutoff]:
+            del self._items[key]
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def latest(self, limit: int = 10, per_source: Optional[int] = None) -> List[Headline]:
+        """Newest first, optionally capped per feed."""
+        with self._lock:
+            self._expire()
+            items = sorted(self._items.values(), key=lambda h: h.timestamp, reverse=True)
+        if per_source is None:
+            return items[:limit]
+        counts: Dict[str, int] = {}
+        out = []
+        for h in items:
+            if counts.get(h.source, 0) < per_source:
+                counts[h.source] = counts.get(h.source, 0) + 1
+                out.append(h)
+        return out[:limit]
+
+
+# ----------------------------------------------------------------------
+# Ingester
+# ----------------------------------------------------------------------
+
+
+@dataclass
+class FeedState:
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    status: Optional[int] = None
+    fetches: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    last_fetch: Optional[float] = None
+
+
+class NewsIngester:
+    """Polls every feed concurrently and feeds a HeadlineStore."""
+
+    def __init__(self, feeds: List[str], store: Optional[HeadlineStore] = None,
+                 interval: float = RSS_POLL_INTERVAL, timeout: float = 10.0, max_concurrency: int = 8):
+        self.feeds = {url: FeedState(url) for url in feeds}
+        self.store = store if store is not None else HeadlineStore()
+        self.interval = interval
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.last_poll: Optional[float] = None
+
+    def _get(self, state: FeedState):
+        """Blocking conditional GET; returns (status, body)."""
+        request = urllib.request.Request(state.url, headers={"User-Agent": USER_AGENT})
+        if state.etag:
+            request.add_header("If-None-Match", state.etag)
+        if state.last_modified:
+            request.add_header("If-Modified-Since", state.last_modified)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                state.etag = response.headers.get("ETag") or state.etag
+                state.last_modified = response.headers.get("Last-Modified") or state.last_modified
+                return response.status, body
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return 304, b""
+            raise
+
+    async def _poll_feed(self, state: FeedState, semaphore: asyncio.Semaphore) -> int:
+        async with semaphore:
+            state.fetches += 1
+            state.last_fetch = time.time()
+            try:
+                status, body = await asyncio.to_thread(self._get, state)
+            except Exception as e:
+                state.errors += 1
+                logger.error("Failed to fetch %s: %s", state.url, e)
+                return 0
+        state.status = status
+        if status == 304:
+            state.not_modified += 1
+            return 0
+        try:
+            headlines = parse_feed(body, urlparse(state.url).netloc or state.url)
+        except Exception as e:
+            state.errors += 1
+            logger.error("Failed to parse %s: %s", state.url, e)
+            return 0
+        return self.store.add(headlines)
+
+    async def poll_once(self) -> int:
+        """Polls every feed once; returns the number of new headlines."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        added = await asyncio.gather(*(self._poll_feed(s, semaphore) for s in self.feeds.values()))
+        self.last_poll = time.time()
+        if sum(added):
+            logger.info("News ingester: %d new headlines (%d stored)", sum(added), len(self.store))
+        return sum(added)
+
+    async def run(self):
+        """Polls forever every ``interval`` seconds."""
+        logger.info("News ingester polling %d feeds every %.0fs", len(self.feeds), self.interval)
+        while True:
+            await self.poll_once()
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            url: {"status": s.status, "fetches": s.fetches, "not_modified": s.not_modified, "errors": s.errors}
+            for url, s in self.feeds.items()
+        }
@@ -1,7 +1,11 @@
-import feedparser
 import logging
 from datetime import datetime, timedelta
 
+try:
+    from engine.rag.news_ingester import NewsIngester
+except ImportError:
+    from rag.news_ingester import NewsIngester
+
 # Key Financial RSS Feeds
 FEEDS = [
     "http://feeds.marketwatch.com/marketwatch/topstories/",
@@ -10,35 +14,22 @@ FEEDS = [
 ]
 
 class RSSLoader:
-    def __init__(self):
-        self.feeds = FEEDS
+    def __init__(self, feeds=None):
+        self.feeds = feeds or FEEDS
+        # Polled in the background (bridge.py runs ingester.run());
+        # reads below only touch the in-memory headline store
+        self.ingester = NewsIngester(self.feeds)
 
     def fetch_news(self, limit_per_feed=3):
         """
-        Fetches and parses RSS feeds. returns a list of news items strings.
+        Latest ingested headlines, newest first, at most limit_per_feed per
+        feed. Returns a list of news item strings; no network calls.
         """
         news_items = []
-        logging.info("Fetching RSS News...")
-        
-        for url in self.feeds:
-            try:
-                feed = feedparser.parse(url)
-                count = 0
-                for entry in feed.entries:
-                    if count >= limit_per_feed: break
-                    
-                    # Filter for very recent news (last 24h)
-                    # Note: parsing dates is tricky across feeds, skipping strict check for now
-                    # assuming top of feed is recent.
-                    
-                    title = entry.title
-                    summary = getattr(entry, 'summary', '')
-                    item_text = f"Title: {title} | Summary: {summary[:200]}..."
-                    news_items.append(item_text)
-                    count += 1
-            except Exception as e:
-                logging.error(f"Failed to fetch {url}: {e}")
-                
+        for headline in self.ingester.store.latest(limit=limit_per_feed * len(self.feeds), per_source=limit_per_feed):
+            item_text = f"Title: {headline.title} | Summary: {headline.summary[:200]}..."
+            news_items.append(item_text)
+
         return news_items
 
     def get_context_string(self):
@@ -48,5 +39,5 @@ class RSSLoader:
         items = self.fetch_news()
         if not items:
             return "No recent news retrieved via RSS."
-        
+
         return "LATEST MARKET NEWS (RSS):\n" + "\n".join([f"- {item}" for item in items])
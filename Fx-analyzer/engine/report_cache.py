@@ -0,0 +1,145 @@
+"""
+Report Cache - reuse TradingAgents analyst reports across queries on a symbol.
+
+Every ENGINE_AGENT_ANALYZE run starts with seven analysts whose reports
+depend on the symbol rather than on the exact wording of the question, so
+several users asking about the same ticker within minutes pay for the same
+reports again. Reports are cached per (symbol, analyst) with a TTL that
+follows how fast the underlying data moves: minutes for the market, news
+and sentiment reports, a day for the company overview, fundamentals,
+shareholder and product reports (override with
+``REPORT_CACHE_TTLS="market_analyst=120,..."``). A cached run hands the
+fresh reports to the orchestrator, which skips those analysts and goes
+straight on with the rest and the debates.
+
+Reports from failed or timed-out analysts (empty, or carrying the
+analysts' error text) are never stored. The analysts write their reports
+from the whole question, so the bridge only keys the cache for queries
+that name exactly one ticker ("Should I buy AAPL now?"); a comparison
+like "Compare AAPL and MSFT" neither reads nor fills it.
+
+Usage (from agent_bridge.py):
+    cached = self.report_cache.get(symbol)
+    state = await orchestrator.run_analysis(query, cached_reports=cached)
+    self.report_cache.put(symbol, state, skip=cached)
+"""
+
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from engine.llm_cache import parse_ttls
+except ImportError:
+    from llm_cache import parse_ttls
+
+logger = logging.getLogger(__name__)
+
+# State fields each analyst produces (the overview also fills company_details,
+# which the other analysts read)
+ANALYST_FIELDS = {
+    "company_overview_analyst": ("company_overview_report", "company_details"),
+    "market_analyst": ("market_report",),
+    "sentiment_analyst": ("sentiment_report",),
+    "news_analyst": ("news_report",),
+    "fundamentals_analyst": ("fundamentals_report",),
+    "shareholder_analyst": ("shareholder_report",),
+    "product_analyst": ("product_report",),
+}
+
+DEFAULT_REPORT_TTLS = {
+    "market_analyst": 300.0,
+    "news_analyst": 600.0,
+    "sentiment_analyst": 900.0,
+    "company_overview_analyst": 86400.0,
+    "fundamentals_analyst": 86400.0,
+    "shareholder_analyst": 86400.0,
+    "product_analyst": 86400.0,
+}
+
+# Text the analysts write into their report when they fail
+ERROR_MARKERS = ("分析出现错误", "信息获取失败", "处理过程中出现错误")
+
+
+def _field(state, key: str) -> Any:
+    if isinstance(state, dict):
+        return state.get(key)
+    return getattr(state, key, None)
+
+
+class ReportCache:
+    """Per-symbol analyst reports with per-analyst TTLs."""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        overrides = ttls if ttls is not None else parse_ttls(os.getenv("REPORT_CACHE_TTLS", ""))
+        self.ttls = {**DEFAULT_REPORT_TTLS, **overrides}
+        self.clock = clock
+        self._entries: Dict[Tuple[str, str], Tuple[float, Dict[str, str]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stored = 0
+
+    def get(self, symbol: str) -> Dict[str, Dict[str, str]]:
+        """Fresh reports for *symbol* as {analyst: {field: text}}."""
+        symbol = (symbol or "").upper()
+        reports = {}
+        now = self.clock()
+        for analyst in ANALYST_FIELDS:
+            entry = self._entries.get((symbol, analyst))
+            if entry is None:
+                self.misses += 1
+                continue
+            expires, fields = entry
+            if now >= expires:
+                del self._entries[(symbol, analyst)]
+                self.expired += 1
+                self.misses += 1
+                continue
+            self.hits += 1
+            reports[analyst] = dict(fields)
+        if reports:
+            logger.info("Report cache: reusing %s for %s", sorted(reports), symbol)
+        return reports
+
+    def put(self, symbol: str, state, skip: Iterable[str] = ()) -> List[str]:
+        """Stores the usable reports in *state* (an AgentState or its dict),
+        except for analysts in *skip* (reports that came from the cache).
+        Returns the analysts stored."""
+        symbol = (symbol or "").upper()
+        if not symbol:
+            return []
+        skip = set(skip)
+        stored = []
+        for analyst, fields in ANALYST_FIELDS.items():
+            ttl = self.ttls.get(analyst, 0)
+            if analyst in skip or ttl <= 0:
+                continue
+            values = {key: _field(state, key) or "" for key in fields}
+            report = values[fields[0]]
+            if not report.strip() or any(marker in text for text in values.values() for marker in ERROR_MARKERS):
+                continue
+            self._entries[(symbol, analyst)] = (self.clock() + ttl, values)
+            stored.append(analyst)
+        self.stored += len(stored)
+        return stored
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drops cached reports for *symbol* (all symbols if None)."""
+        if symbol is None:
+            self._entries.clear()
+        else:
+            for key in [k for k in self._entries if k[0] == symbol.upper()]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "symbols": len({symbol for symbol, _ in self._entries}),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "stored": self.stored,
+        }
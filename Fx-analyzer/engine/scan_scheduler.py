@@ -0,0 +1,258 @@
+"""
+Scan Scheduler - concurrent per-symbol market scan for the engine bridge.
+
+Fetches the whole watchlist with one batched ``DataFeed.fetch_many`` call,
+then fans ``TechnicalAnalyzer.analyze`` out across a bounded thread pool, so
+nothing blocks the event loop and fetch latency does not grow with one round
+trip per symbol. ``scan_iter`` yields each symbol's result as soon as its
+analysis finishes, and ``batched`` groups the results that finish within a
+short window, so one slow symbol never holds back the others' tickers while
+the rest still go out together in one snapshot.
+The batched fetch runs on its own thread and is bounded by
+``fetch_timeout``; when the provider stalls, the cycle falls back to each
+symbol's last fetched frame, and no new fetch starts until the stalled one
+returns, so a hung provider never takes over the analysis workers. Technical signals
+that need an MoE consensus are handed to a separate escalation queue, so a
+slow LLM round never delays the ticker cadence of the other symbols.
+
+Usage (from bridge.py):
+    self.scheduler = ScanScheduler(self.data_feed, self.analyzer, max_workers=4,
+                                   fetch_timeout=5.0)
+    async for batch in batched(self.scheduler.scan_iter(SYMBOLS), window=0.05):
+        ...
+    await self.scheduler.run_escalations(self._handle_escalation, concurrency=2)
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScanResult:
+    """Outcome of one symbol's fetch + technical pass."""
+
+    symbol: str
+    df: Optional[pd.DataFrame] = None
+    signal: Optional[Dict[str, Any]] = None
+    price: Optional[float] = None
+    error: Optional[str] = None
+
+
+async def batched(results: AsyncIterator[ScanResult], window: float) -> AsyncIterator[List[ScanResult]]:
+    """Groups a result stream into lists. A batch closes *window* seconds
+    after its first result arrives, or when the stream ends."""
+    loop = asyncio.get_running_loop()
+    iterator = results.__aiter__()
+    batch: List[ScanResult] = []
+    deadline = None
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield batch
+                batch, deadline = [], None
+                continue
+            finished, pending = pending, None
+            try:
+                batch.append(finished.result())
+            except StopAsyncIteration:
+                break
+            if deadline is None:
+                deadline = loop.time() + window
+    finally:
+        if pending is not None:
+            pending.cancel()
+    if batch:
+        yield batch
+
+
+class ScanScheduler:
+    """Runs per-symbol scans in a worker pool and queues MoE escalations.
+
+    At most one escalation per symbol is pending at a time: while a symbol's
+    consensus is still running, further triggers for it are dropped instead
+    of piling up behind the LLMs.
+    """
+
+    def __init__(
+        self,
+        data_feed,
+        analyzer,
+        max_workers: int = 4,
+        escalation_queue_size: int = 32,
+        fetch_timeout: Optional[float] = None,
+    ):
+        self.data_feed = data_feed
+        self.analyzer = analyzer
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="scan"
+        )
+        self.escalations: asyncio.Queue = asyncio.Queue(maxsize=escalation_queue_size)
+        self._pending: Set[str] = set()
+        self.fetch_timeout = fetch_timeout or None
+        # One fetch at a time, off the analysis pool: a stalled provider call
+        # cannot be interrupted, only waited out
+        self._fetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scan-fetch")
+        self._fetch_future: Optional[asyncio.Future] = None
+        # Last good frame per symbol, reused when a batched fetch times out
+        self._last_frames: Dict[str, pd.DataFrame] = {}
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def _scan_symbol(self, symbol: str, df: Optional[pd.DataFrame] = None) -> ScanResult:
+        """Analyse one symbol (fetching it first if *df* is not given). Runs
+        inside a worker thread."""
+        if df is None:
+            df = self.data_feed.fetch_data(symbol)
+        if df is None or df.empty:
+            return ScanResult(symbol=symbol, error="No data")
+
+        analyzed_df = self.analyzer.analyze(df, symbol=symbol)
+        signal = self.analyzer.check_signals(analyzed_df, symbol)
+        return ScanResult(
+            symbol=symbol,
+            df=analyzed_df,
+            signal=signal,
+            price=float(analyzed_df.iloc[-1]["close"]),
+        )
+
+    async def scan(self, symbols: List[str]) -> List[ScanResult]:
+        """Scan all *symbols* concurrently and return results in input order.
+
+        A failure for one symbol is reported in its ``error`` field and never
+        aborts the rest of the batch.
+        """
+        results = {result.symbol: result async for result in self.scan_iter(symbols)}
+        return [results[symbol] for symbol in symbols]
+
+    async def scan_iter(self, symbols: List[str]) -> AsyncIterator[ScanResult]:
+        """Like ``scan`` but yields each result as soon as it is ready."""
+        frames = await self._fetch(list(symbols))
+        async for result in self._analyze_iter(list(symbols), frames):
+            yield result
+
+    async def analyze(self, frames: Dict[str, pd.DataFrame]) -> List[ScanResult]:
+        """Analyse already-fetched frames (e.g. from the tick ingestor)."""
+        return [result async for result in self.analyze_iter(frames)]
+
+    async def analyze_iter(self, frames: Dict[str, pd.DataFrame]) -> AsyncIterator[ScanResult]:
+        async for result in self._analyze_iter(list(frames), frames):
+            yield result
+
+    async def _fetch(self, symbols: List[str]) -> Dict[str, Optional[pd.DataFrame]]:
+        """One batched fetch, bounded by ``fetch_timeout``."""
+        if self._fetch_future is not None and not self._fetch_future.done():
+            logger.warning("Previous batched fetch still running, reusing last frames")
+            return self._stale_frames(symbols)
+
+        loop = asyncio.get_running_loop()
+        self._fetch_future = loop.run_in_executor(
+            self._fetch_executor, self.data_feed.fetch_many, symbols
+        )
+        try:
+            # Shielded: the timeout must not mark the still-running fetch done
+            frames = await asyncio.wait_for(asyncio.shield(self._fetch_future), self.fetch_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Batched fetch timed out after %.1fs, reusing last frames", self.fetch_timeout
+            )
+            self._fetch_future.add_done_callback(self._late_fetch_done)
+            return self._stale_frames(symbols)
+        except Exception as e:
+            logger.error("Batched fetch failed, fetching per symbol: %s", e)
+            return {}
+        self._remember(frames)
+        return frames
+
+    def _stale_frames(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        # Empty frames (not None) so the workers don't retry the stalled
+        # provider symbol by symbol
+        return {s: self._last_frames.get(s, pd.DataFrame()) for s in symbols}
+
+    def _remember(self, frames: Dict[str, Optional[pd.DataFrame]]):
+        for symbol, df in frames.items():
+            if df is not None and not df.empty:
+                self._last_frames[symbol] = df
+
+    def _late_fetch_done(self, future: asyncio.Future):
+        """A timed-out fetch that finally returned still refreshes the frames."""
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error("Timed-out batched fetch failed: %s", future.exception())
+            return
+        self._remember(future.result())
+
+    async def _scan_one(self, symbol: str, df: Optional[pd.DataFrame]) -> ScanResult:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._scan_symbol, symbol, df)
+        except Exception as e:
+            logger.error("Scan failed for %s: %s", symbol, e)
+            return ScanResult(symbol=symbol, error=str(e))
+
+    async def _analyze_iter(
+        self, symbols: List[str], frames: Dict[str, pd.DataFrame]
+    ) -> AsyncIterator[ScanResult]:
+        tasks = [asyncio.ensure_future(self._scan_one(s, frames.get(s))) for s in symbols]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # ------------------------------------------------------------------
+    # MoE escalation queue
+    # ------------------------------------------------------------------
+
+    def escalate(self, result: ScanResult) -> bool:
+        """Queue *result* for MoE consensus. Returns False if it was dropped."""
+        if result.symbol in self._pending:
+            logger.debug("Escalation for %s already pending, skipping", result.symbol)
+            return False
+        try:
+            self.escalations.put_nowait(result)
+        except asyncio.QueueFull:
+            logger.warning("Escalation queue full, dropping %s signal", result.symbol)
+            return False
+        self._pending.add(result.symbol)
+        return True
+
+    async def run_escalations(
+        self,
+        handler: Callable[[ScanResult], Awaitable[None]],
+        concurrency: int = 2,
+    ):
+        """Consume the escalation queue with *concurrency* workers forever."""
+
+        async def _worker():
+            while True:
+                result = await self.escalations.get()
+                try:
+                    await handler(result)
+                except Exception as e:
+                    logger.error("Escalation handler failed for %s: %s", result.symbol, e)
+                finally:
+                    self._pending.discard(result.symbol)
+                    self.escalations.task_done()
+
+        await asyncio.gather(*(_worker() for _ in range(max(1, concurrency))))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._fetch_executor.shutdown(wait=False, cancel_futures=True)
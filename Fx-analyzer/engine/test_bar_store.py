@@ -0,0 +1,87 @@
+"""Bar store checks: appends, forming-bar rewrites, torn-partition repair, compaction."""
+import os, sys, tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from engine.bar_store import BarStore
+
+
+def _bars(start, n, price=1.08):
+    close = price + np.arange(n) * 0.0001
+    return pd.DataFrame({
+        "time": pd.date_range(start, periods=n, freq="1min"),
+        "open": close,
+        "high": close + 0.0002,
+        "low": close - 0.0002,
+        "close": close,
+        "tick_volume": np.arange(n) + 100,
+    })
+
+
+def test_append_and_rewrite_forming_bar():
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root)
+        first = _bars("2026-01-05 00:00", 10)
+        assert store.append("EURUSD", "M1", first) == 10
+        assert store.last_time("EURUSD") == first["time"].iloc[-1]
+
+        # Re-sending stored bars writes nothing
+        assert store.append("EURUSD", "M1", first.iloc[:5]) == 0
+
+        # The last bar was still forming: its revision replaces it, new bars follow
+        update = _bars("2026-01-05 00:09", 3, price=1.09)
+        assert store.append("EURUSD", "M1", update) == 3
+        df = store.read("EURUSD", "M1")
+        assert len(df) == 12 and store.count("EURUSD") == 12
+        assert df["time"].is_monotonic_increasing and df["time"].is_unique
+        assert df["close"].iloc[9] == update["close"].iloc[0]
+        assert df["tick_volume"].iloc[9] == update["tick_volume"].iloc[0]
+        pd.testing.assert_frame_equal(df.iloc[:9], first.iloc[:9], check_dtype=False)
+
+        assert len(store.read("EURUSD", "M1", limit=4)) == 4
+        assert store.read("EURUSD", "M1", start=update["time"].iloc[1])["time"].tolist() == \
+            update["time"].iloc[1:].tolist()
+
+
+def test_torn_partition_is_repaired():
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root)
+        bars = _bars("2026-01-05 00:00", 10)
+        store.append("EURUSD", "M1", bars)
+
+        # A crash mid-append left close.bin short by two and a half rows
+        path = os.path.join(root, "EURUSD", "M1", "close.bin")
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 20)
+
+        assert store.count("EURUSD") == 7
+        for column in ("time", "open", "close", "tick_volume"):
+            assert os.path.getsize(os.path.join(root, "EURUSD", "M1", f"{column}.bin")) == 7 * 8
+        pd.testing.assert_frame_equal(store.read("EURUSD"), bars.iloc[:7], check_dtype=False)
+
+        # The next top-up continues from the repaired tail (rewriting its last bar)
+        assert store.append("EURUSD", "M1", bars) == 4
+        pd.testing.assert_frame_equal(store.read("EURUSD"), bars, check_dtype=False)
+
+
+def test_compaction_keeps_newest_bars():
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root, max_bars=50)
+        bars = _bars("2026-01-05 00:00", 130)
+        store.append("EURUSD", "M1", bars.iloc[:100])
+        assert store.count("EURUSD") == 100  # exactly 2x: not compacted yet
+
+        store.append("EURUSD", "M1", bars.iloc[100:])
+        df = store.read("EURUSD")
+        assert len(df) == 50
+        pd.testing.assert_frame_equal(df, bars.iloc[-50:].reset_index(drop=True), check_dtype=False)
+        assert not any(name.endswith(".tmp") for name in os.listdir(os.path.join(root, "EURUSD", "M1")))
+
+
+if __name__ == "__main__":
+    test_append_and_rewrite_forming_bar()
+    test_torn_partition_is_repaired()
+    test_compaction_keeps_newest_bars()
+    print("Bar store tests PASSED")
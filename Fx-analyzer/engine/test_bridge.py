@@ -0,0 +1,118 @@
+"""Engine bridge checks: a reused MoE decision is stored and published once,
+and a scan goes out as one ticker snapshot."""
+import os, sys, asyncio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import pandas as pd
+
+from engine.consensus_cache import ConsensusCache
+from engine.publisher import MarketPublisher, decode_snapshot
+from engine.scan_scheduler import ScanResult, ScanScheduler
+
+# MetaTrader5 is Windows-only; the bridge cannot be imported without it
+bridge = pytest.importorskip("engine.bridge")
+
+
+class _MoE:
+    """get_consensus_signal backed by a real ConsensusCache."""
+
+    def __init__(self, action="BUY"):
+        self.cache = ConsensusCache()
+        self.action = action
+        self.runs = 0
+
+    async def get_consensus_signal(self, symbol, df, direction=None):
+        async def compute():
+            self.runs += 1
+            return {"action": self.action, "reasoning": "ok", "confidence": 0.8}
+
+        key = self.cache.key(symbol, direction, {"rsi": 25.0, "trend": "Uptrend"})
+        return await self.cache.get_or_compute(key, 1.1, compute)
+
+
+class _Publisher:
+    def __init__(self):
+        self.signals = []
+
+    async def publish_signal(self, signal):
+        self.signals.append(signal)
+
+
+def _escalate(moe, times):
+    """Runs *times* escalations of the same setup; returns (stored, published)."""
+    engine = bridge.AsyncEngineBridge.__new__(bridge.AsyncEngineBridge)
+    engine.moe = moe
+    engine.publisher = _Publisher()
+    stored = []
+    store_signal = bridge.database.store_signal
+    bridge.database.store_signal = stored.append
+
+    async def run():
+        for _ in range(times):
+            signal = {"symbol": "EURUSD", "action": "BUY", "price": 1.1}
+            await engine._handle_escalation(ScanResult("EURUSD", signal=signal))
+
+    try:
+        asyncio.run(run())
+    finally:
+        bridge.database.store_signal = store_signal
+    return stored, engine.publisher.signals
+
+
+def test_cached_decision_is_published_once():
+    # The setup keeps firing on every scan while its decision is cached
+    moe = _MoE()
+    stored, published = _escalate(moe, 5)
+    assert moe.runs == 1
+    assert len(stored) == 1 and len(published) == 1
+    assert published[0]["source"] == "MOE_ENGINE"
+
+
+def test_vetoed_decision_is_not_published():
+    moe = _MoE(action="HOLD")
+    stored, published = _escalate(moe, 3)
+    assert moe.runs == 1 and stored == [] and published == []
+
+
+class _Socket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_multipart(self, frames):
+        self.frames.append(frames)
+
+
+class _Feed:
+    def fetch_many(self, symbols):
+        return {s: pd.DataFrame({"close": [1.0, 1.1]}) for s in symbols}
+
+
+class _Analyzer:
+    def analyze(self, df, symbol=None):
+        return df
+
+    def check_signals(self, df, symbol):
+        return None
+
+
+def test_scan_is_published_as_one_snapshot():
+    engine = bridge.AsyncEngineBridge.__new__(bridge.AsyncEngineBridge)
+    engine.publisher = MarketPublisher(_Socket())
+    engine.publisher.on_subscription(b"\x01snap.bin")
+    engine.scheduler = ScanScheduler(_Feed(), _Analyzer())
+    symbols = ["EURUSD", "GBPUSD", "XAUUSD"]
+
+    asyncio.run(engine._publish_stream(engine.scheduler.scan_iter(symbols)))
+    engine.scheduler.shutdown()
+    frames = engine.publisher.socket.frames
+    assert len(frames) == 1 and frames[0][0] == b"snap.bin"
+    assert sorted(t["symbol"] for t in decode_snapshot(frames[0][1])["tickers"]) == symbols
+
+
+if __name__ == "__main__":
+    test_cached_decision_is_published_once()
+    test_vetoed_decision_is_not_published()
+    test_scan_is_published_as_one_snapshot()
+    print("Bridge tests PASSED")
@@ -0,0 +1,139 @@
+"""Cancellation checks: event-driven cancel, per-agent deadlines, slots freed at once."""
+import os, sys, asyncio, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.llm_scheduler import LLMScheduler
+from engine.trading_agents.cancellation import CancelScope, current_scope
+from engine.trading_agents.state_fanout import apply_deltas, branch, collect_delta
+
+
+def test_cancel_reaches_in_flight_tasks_immediately():
+    async def run():
+        scope = CancelScope()
+        stopped = []
+
+        async def agent(name):
+            try:
+                await asyncio.sleep(10)
+            finally:
+                stopped.append(name)
+
+        tasks = [asyncio.create_task(scope.run(agent(n))) for n in ("market", "news")]
+        await asyncio.sleep(0.01)
+        start = time.monotonic()
+        scope.cancel("stop")
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert time.monotonic() - start < 0.05
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+        assert sorted(stopped) == ["market", "news"]
+        # Later work in the same scope refuses to start
+        try:
+            scope.check()
+            assert False, "expected CancelledError"
+        except asyncio.CancelledError as e:
+            assert str(e) == "stop"
+
+    asyncio.run(run())
+
+
+def test_deadline_keeps_other_agents_results():
+    async def run(state):
+        scope = CancelScope()
+
+        async def analyst(view, key, delay):
+            await asyncio.sleep(delay)
+            view[key] = f"{key} done"
+            return view
+
+        async def guarded(key, delay):
+            view = branch(state)
+            try:
+                return await scope.run(analyst(view, key, delay), timeout=0.05)
+            except asyncio.TimeoutError:
+                view["warnings"].append(f"{key} timed out")
+                return view
+
+        start = time.monotonic()
+        results = await asyncio.gather(guarded("market_report", 0), guarded("news_report", 5))
+        assert time.monotonic() - start < 0.5
+        deltas = [collect_delta(state, r, [k]) for r, k in zip(results, ("market_report", "news_report"))]
+        return apply_deltas(state, deltas)
+
+    state = asyncio.run(run({"market_report": "", "news_report": "", "warnings": []}))
+    assert state["market_report"] == "market_report done" and state["news_report"] == ""
+    assert state["warnings"] == ["news_report timed out"]
+
+
+def test_cancelled_call_frees_scheduler_slot():
+    scheduler = LLMScheduler(model_limits={"m": (1, 0)}, provider_limits={})
+
+    async def run():
+        scope = CancelScope()
+        scheduler.penalise("p", "m", 0.3)
+        waiting = asyncio.create_task(scope.run(scheduler.acquire("p", ["m"], max_wait=5)))
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["queued"] == {"p": 1}
+        scope.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert scheduler.stats()["queued"] == {}
+        # The budget it was queued for goes to the next caller
+        assert await scheduler.acquire("p", ["m"], max_wait=5) == "m"
+
+    asyncio.run(run())
+
+
+def test_legacy_checker_is_watched():
+    async def run():
+        scope = CancelScope()
+        flag = {"cancel": False}
+        watcher = scope.watch(lambda: flag["cancel"], interval=0.01)
+        task = asyncio.create_task(scope.run(asyncio.sleep(10)))
+        await asyncio.sleep(0.02)
+        flag["cancel"] = True
+        await asyncio.gather(task, return_exceptions=True)
+        assert task.cancelled() and scope.cancelled and watcher.done()
+
+    asyncio.run(run())
+
+
+def test_concurrent_runs_have_their_own_scope():
+    async def agent(name, log):
+        # Nodes and agents only see the scope through the context
+        scope = current_scope()
+        scope.check()
+        await scope.run(asyncio.sleep(0.05))
+        log.append((name, scope))
+
+    async def run_analysis(name, scope, log):
+        async def workflow():
+            await asyncio.gather(agent(f"{name}.market", log), agent(f"{name}.news", log))
+            await agent(f"{name}.trader", log)
+            return name
+
+        try:
+            return await scope.run(workflow())
+        except asyncio.CancelledError:
+            return f"{name} cancelled"
+
+    async def run():
+        scopes = {"a": CancelScope(), "b": CancelScope()}
+        log = []
+        runs = [asyncio.create_task(run_analysis(n, s, log)) for n, s in scopes.items()]
+        await asyncio.sleep(0.01)
+        scopes["a"].cancel()
+        results = await asyncio.gather(*runs)
+        assert results == ["a cancelled", "b"]
+        assert sorted(name for name, _ in log) == ["b.market", "b.news", "b.trader"]
+        assert all(scope is scopes["b"] for _, scope in log)
+        assert current_scope() is None  # nothing leaks into the caller
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_cancel_reaches_in_flight_tasks_immediately()
+    test_deadline_keeps_other_agents_results()
+    test_cancelled_call_frees_scheduler_slot()
+    test_legacy_checker_is_watched()
+    test_concurrent_runs_have_their_own_scope()
+    print("Cancellation tests PASSED")
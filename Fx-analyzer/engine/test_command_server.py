@@ -0,0 +1,233 @@
+"""Command server checks: concurrent dispatch, jobs, coalescing, REQ compatibility."""
+import os, sys, asyncio, json
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import zmq
+import zmq.asyncio
+
+from engine.command_server import CommandServer
+
+ENDPOINT = "inproc://command-server-test"
+
+
+def _server(ctx, published, **kwargs):
+    async def publish(message):
+        published.append(json.loads(message.split(" ", 1)[1]))
+
+    server = CommandServer(ctx, ENDPOINT, publish=publish, **kwargs)
+    release = asyncio.Event()
+
+    async def slow(msg, progress):
+        await progress(stage="started")
+        await release.wait()
+        return {"status": "ok", "query": msg["query"]}
+
+    async def fast(msg):
+        return {"status": "ok", "pong": True}
+
+    server.register("SLOW", slow, job=True)
+    server.register("PING", fast)
+    return server, release
+
+
+def test_slow_job_does_not_block_quick_commands():
+    async def run():
+        ctx = zmq.asyncio.Context()
+        published = []
+        server, release = _server(ctx, published)
+        serve = asyncio.create_task(server.serve())
+        client = ctx.socket(zmq.DEALER)
+        client.connect(ENDPOINT)
+        try:
+            await client.send_json({"cmd": "SLOW", "query": "AAPL", "id": 1})
+            accepted = await asyncio.wait_for(client.recv_json(), 1.0)
+            assert accepted["status"] == "accepted" and accepted["id"] == 1
+            job_id = accepted["job_id"]
+
+            # Pipelined quick commands answer while the job is still running
+            await client.send_json({"cmd": "PING", "id": 2})
+            await client.send_json({"cmd": "NOPE", "id": 3})
+            replies = {r["id"]: r for r in [await asyncio.wait_for(client.recv_json(), 1.0) for _ in range(2)]}
+            assert replies[2]["pong"] and replies[3]["status"] == "error"
+
+            await client.send_json({"cmd": "JOB_STATUS", "job_id": job_id, "id": 4})
+            status = await asyncio.wait_for(client.recv_json(), 1.0)
+            assert status["job"]["state"] == "running"
+
+            release.set()
+            await asyncio.sleep(0.01)
+            states = [e["state"] for e in published if e["job_id"] == job_id]
+            assert states == ["queued", "running", "progress", "done"]
+            assert published[-1]["result"] == {"status": "ok", "query": "AAPL"}
+            assert published[-1]["id"] == 1
+
+            await client.send_json({"cmd": "COMMAND_STATS", "id": 5})
+            stats = await asyncio.wait_for(client.recv_json(), 1.0)
+            assert stats["commands"]["PING"]["count"] == 1
+            assert stats["commands"]["SLOW"]["count"] == 1
+        finally:
+            serve.cancel()
+            client.close(0)
+            server.socket.close(0)
+            ctx.term()
+
+    asyncio.run(run())
+
+
+def test_req_client_and_job_limit():
+    async def run():
+        ctx = zmq.asyncio.Context()
+        published = []
+        server, release = _server(ctx, published, max_jobs=1)
+        serve = asyncio.create_task(server.serve())
+        req = ctx.socket(zmq.REQ)
+        req.connect(ENDPOINT)
+        try:
+            # Plain REQ clients get their reply through the ROUTER envelope
+            await req.send_json({"cmd": "PING"})
+            assert (await asyncio.wait_for(req.recv_json(), 1.0))["pong"]
+
+            # Malformed or non-object bodies are answered, never left hanging
+            for body in (b"{nope", b"[1]", b'"x"'):
+                await req.send(body)
+                reply = await asyncio.wait_for(req.recv_json(), 1.0)
+                assert reply == {"status": "error", "message": "Invalid JSON"}
+
+            for query in ("A", "B"):
+                await req.send_json({"cmd": "SLOW", "query": query})
+                await asyncio.wait_for(req.recv_json(), 1.0)
+            await asyncio.sleep(0.01)
+            assert sum(1 for e in published if e["state"] == "running") == 1
+
+            # wait=true returns the result inline once a slot frees up
+            await req.send_json({"cmd": "SLOW", "query": "C", "wait": True})
+            release.set()
+            reply = await asyncio.wait_for(req.recv_json(), 1.0)
+            assert reply == {"status": "ok", "query": "C"}
+        finally:
+            serve.cancel()
+            req.close(0)
+            server.socket.close(0)
+            ctx.term()
+
+    asyncio.run(run())
+
+
+def test_per_command_job_limit():
+    async def run():
+        ctx = zmq.asyncio.Context()
+        published = []
+        server, release = _server(ctx, published, max_jobs=2)
+        server.register("SOLO", server._handlers["SLOW"], job=True, max_concurrent=1)
+        serve = asyncio.create_task(server.serve())
+        client = ctx.socket(zmq.DEALER)
+        client.connect(ENDPOINT)
+        try:
+            job_ids = {}
+            for cmd, query in (("SOLO", "A"), ("SOLO", "B"), ("SLOW", "C")):
+                await client.send_json({"cmd": cmd, "query": query})
+                job_ids[query] = (await asyncio.wait_for(client.recv_json(), 1.0))["job_id"]
+            await asyncio.sleep(0.01)
+
+            # The second SOLO waits for the first; it does not hold the slot SLOW uses
+            states = {q: server.job_status(j)["state"] for q, j in job_ids.items()}
+            assert states == {"A": "running", "B": "queued", "C": "running"}
+
+            release.set()
+            await asyncio.sleep(0.01)
+            assert all(server.job_status(j)["state"] == "done" for j in job_ids.values())
+        finally:
+            serve.cancel()
+            client.close(0)
+            server.socket.close(0)
+            ctx.term()
+
+    asyncio.run(run())
+
+
+def test_identical_jobs_are_coalesced():
+    async def run():
+        ctx = zmq.asyncio.Context()
+        published = []
+        server, release = _server(ctx, published)
+        runs = []
+
+        async def solo(msg, progress):
+            runs.append(msg["query"])
+            return await server._handlers["SLOW"](msg, progress)
+
+        server.register("SOLO", solo, job=True, max_concurrent=1,
+                        coalesce=lambda msg: msg["query"].lower())
+        serve = asyncio.create_task(server.serve())
+        client = ctx.socket(zmq.DEALER)
+        client.connect(ENDPOINT)
+        try:
+            replies = []
+            for request_id, query in ((1, "A"), (2, "a"), (3, "B")):
+                await client.send_json({"cmd": "SOLO", "query": query, "id": request_id})
+                replies.append(await asyncio.wait_for(client.recv_json(), 1.0))
+            # The repeat joins the queued/running job instead of waiting for the slot
+            assert replies[0]["job_id"] == replies[1]["job_id"] != replies[2]["job_id"]
+            assert replies[1]["coalesced"] and "coalesced" not in replies[0]
+
+            release.set()
+            await asyncio.sleep(0.02)
+            assert runs == ["A", "B"] and server.coalesced == 1
+            done = [e for e in published if e["job_id"] == replies[0]["job_id"] and e["state"] == "done"]
+            assert done[0]["ids"] == [1, 2]
+
+            # A finished job is not joined
+            await client.send_json({"cmd": "SOLO", "query": "A"})
+            again = await asyncio.wait_for(client.recv_json(), 1.0)
+            assert again["job_id"] != replies[0]["job_id"] and "coalesced" not in again
+        finally:
+            serve.cancel()
+            client.close(0)
+            server.socket.close(0)
+            ctx.term()
+
+    asyncio.run(run())
+
+
+def test_cancel_running_and_queued_jobs():
+    async def run():
+        ctx = zmq.asyncio.Context()
+        published = []
+        server, release = _server(ctx, published, max_jobs=1)
+        serve = asyncio.create_task(server.serve())
+        client = ctx.socket(zmq.DEALER)
+        client.connect(ENDPOINT)
+        try:
+            job_ids = []
+            for query in ("A", "B"):
+                await client.send_json({"cmd": "SLOW", "query": query})
+                job_ids.append((await asyncio.wait_for(client.recv_json(), 1.0))["job_id"])
+            await asyncio.sleep(0.01)
+
+            # B is still queued behind A; both cancel without waiting for release
+            for job_id in reversed(job_ids):
+                await client.send_json({"cmd": "JOB_CANCEL", "job_id": job_id})
+                assert (await asyncio.wait_for(client.recv_json(), 1.0))["status"] == "ok"
+            await asyncio.sleep(0.01)
+            for job_id in job_ids:
+                assert server.job_status(job_id)["state"] == "cancelled"
+                assert [e["state"] for e in published if e["job_id"] == job_id][-1] == "cancelled"
+
+            await client.send_json({"cmd": "JOB_CANCEL", "job_id": job_ids[0]})
+            assert (await asyncio.wait_for(client.recv_json(), 1.0))["status"] == "error"
+        finally:
+            serve.cancel()
+            client.close(0)
+            server.socket.close(0)
+            ctx.term()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_slow_job_does_not_block_quick_commands()
+    test_req_client_and_job_limit()
+    test_per_command_job_limit()
+    test_identical_jobs_are_coalesced()
+    test_cancel_running_and_queued_jobs()
+    print("Command server tests PASSED")
@@ -0,0 +1,104 @@
+"""Consensus cache checks: fingerprint keys, TTL / price-move staleness, coalescing."""
+import os, sys, asyncio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from engine.consensus_cache import ConsensusCache, volatility_regime
+
+TECH = {"symbol": "EURUSD", "price": 1.1000, "rsi": 27.4, "trend": "Downtrend"}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _closes(vols):
+    rng = np.random.default_rng(0)
+    returns = np.concatenate([rng.standard_normal(n) * v for n, v in vols])
+    return pd.DataFrame({"close": 1.1 * np.exp(np.cumsum(returns))})
+
+
+def test_fingerprint_quantises_setup():
+    assert ConsensusCache.key("EURUSD", "buy", TECH) == ConsensusCache.key("EURUSD", "BUY", {**TECH, "rsi": 21.0})
+    assert ConsensusCache.key("EURUSD", "BUY", TECH) != ConsensusCache.key("EURUSD", "BUY", {**TECH, "rsi": 31.0})
+    assert ConsensusCache.key("EURUSD", "BUY", TECH) != ConsensusCache.key("EURUSD", "SELL", TECH)
+    assert volatility_regime(_closes([(100, 1e-4), (20, 5e-4)])) == "HIGH_VOL"
+    assert volatility_regime(_closes([(100, 5e-4), (20, 1e-4)])) == "LOW_VOL"
+    assert volatility_regime(_closes([(10, 1e-4)])) == "NORMAL"  # too short
+
+
+def test_reuse_until_stale():
+    clock = _Clock()
+    cache = ConsensusCache(ttl=60, max_move=0.002, clock=clock)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"action": "BUY", "confidence": 0.7, "agent_breakdown": {"risk": {}}}
+
+    key = cache.key("EURUSD", "BUY", TECH)
+
+    async def run():
+        first = await cache.get_or_compute(key, 1.1000, compute)
+        first["agent_breakdown"]["risk"]["mutated"] = True  # callers get copies
+        again = await cache.get_or_compute(key, 1.1010, compute)  # 0.09% move
+        assert again["agent_breakdown"]["risk"] == {} and len(calls) == 1
+        assert first["cached"] is False and again["cached"] is True
+
+        await cache.get_or_compute(key, 1.1050, compute)  # 0.45% move: stale
+        assert len(calls) == 2
+        clock.now = 61
+        await cache.get_or_compute(key, 1.1050, compute)  # expired
+        assert len(calls) == 3
+
+        cache.invalidate("EURUSD")
+        await cache.get_or_compute(key, 1.1050, compute)
+        assert len(calls) == 4
+
+    asyncio.run(run())
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 4, "coalesced": 0, "stale": 2}
+
+
+def test_concurrent_requests_share_one_run_and_failures_are_not_cached():
+    cache = ConsensusCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"action": "HOLD", "reasoning": "fallback"}
+
+    async def run():
+        key = cache.key("GBPUSD", "SELL", TECH)
+        results = await asyncio.gather(*(
+            cache.get_or_compute(key, 1.27, compute, cacheable=lambda d: d["reasoning"] != "fallback")
+            for _ in range(5)
+        ))
+        assert len(calls) == 1 and all(r["action"] == "HOLD" for r in results)
+        assert sorted(r["cached"] for r in results) == [False] + [True] * 4
+        assert cache.stats()["coalesced"] == 4 and cache.stats()["entries"] == 0
+
+        async def boom():
+            raise RuntimeError("LLM down")
+
+        for _ in range(2):
+            try:
+                await cache.get_or_compute(key, 1.27, boom)
+            except RuntimeError:
+                pass
+        assert cache.stats()["entries"] == 0
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_fingerprint_quantises_setup()
+    test_reuse_until_stale()
+    test_concurrent_requests_share_one_run_and_failures_are_not_cached()
+    print("Consensus cache tests PASSED")
@@ -0,0 +1,120 @@
+"""Context builder checks: role budgets, cached summaries reused across rounds."""
+import os, sys, asyncio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.trading_agents.context_builder import (
+    ContextBuilder, SummaryCache, budget_for, estimate_tokens, parse_budgets, split_turns,
+)
+
+HEAD = ["当前日期时间: 2024年01月02日 10:00:00 (Tuesday)", "用户问题: 分析AAPL"]
+
+
+class _Summariser:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, text, max_tokens):
+        self.calls.append(text)
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return f"摘要{len(self.calls)}"
+
+
+def _history(turns):
+    sides = ["看涨研究员", "看跌研究员"]
+    return "".join(f"\n\n【{sides[i % 2]} 第{i + 1}轮】:\n" + f"论据{i}" * 200 for i in range(turns))
+
+
+def test_under_budget_matches_original_layout():
+    builder = ContextBuilder(100_000, _Summariser(), SummaryCache())
+    reports = {"market_report": "上涨", "news_report": "  "}
+    prompt = asyncio.run(builder.build(HEAD, reports, [("投资辩论历史", "\n\n【看涨研究员 第1轮】:\n看涨", 2),
+                                                      ("风险管理辩论历史", "", 3)], ["研究经理决策: 买入", ""]))
+    assert prompt == "\n\n".join([
+        *HEAD, "market_report: 上涨", "辩论历史:\n投资辩论历史:\n\n\n【看涨研究员 第1轮】:\n看涨", "研究经理决策: 买入",
+    ])
+
+
+def test_earlier_turns_summarised_once_across_rounds():
+    summariser = _Summariser()
+    builder = ContextBuilder(1500, summariser, SummaryCache())
+    reports = {"market_report": "短报告"}
+
+    async def round_prompt(turns):
+        return await builder.build(HEAD, reports, [("投资辩论历史", _history(turns), 2)], [])
+
+    first = asyncio.run(round_prompt(4))
+    assert len(summariser.calls) == 2
+    assert "【看涨研究员 第1轮】:\n(摘要) 摘要" in first and "(摘要)" not in first.split("【看涨研究员 第3轮】")[1]
+    assert estimate_tokens(first) <= 1500
+
+    # Next round: turns 1-2 come from the cache, only turns 3-4 are new
+    asyncio.run(round_prompt(6))
+    assert len(summariser.calls) == 4
+    assert builder.cache.stats()["hits"] == 2
+
+
+def test_long_reports_summarised_and_concurrent_builds_coalesce():
+    summariser = _Summariser()
+    cache = SummaryCache()
+    reports = {"market_report": "市场" * 2000, "news_report": "新闻" * 2000}
+    bull, bear = ContextBuilder(3000, summariser, cache), ContextBuilder(3000, summariser, cache)
+
+    async def run():
+        return await asyncio.gather(bull.build(HEAD, reports, [], []), bear.build(HEAD, reports, [], []))
+
+    first, second = asyncio.run(run())
+    assert first == second and "market_report: 摘要" in first
+    assert len(summariser.calls) == 2 and cache.stats()["coalesced"] == 2
+
+
+def test_failed_summary_truncates_within_budget_and_is_not_cached():
+    summariser = _Summariser(fail=True)
+    builder = ContextBuilder(1800, summariser, SummaryCache())
+    reports = {"market_report": "市场" * 2000, "news_report": "新闻" * 2000}
+    prompt = asyncio.run(builder.build(HEAD, reports, [("投资辩论历史", _history(2), 2)], []))
+    # The latest round stays verbatim, the reports give way
+    assert "【看跌研究员 第2轮】:\n论据1" in prompt
+    assert "已截断" in prompt and estimate_tokens(prompt) <= 1800
+    asyncio.run(builder.build(HEAD, reports, [], []))
+    assert len(summariser.calls) == 4 and builder.cache.stats()["entries"] == 0
+
+
+def test_risk_debater_context_is_capped():
+    budget = budget_for("aggressive_risk_analyst")
+    assert budget > 0
+    assert budget_for("safe_risk_analyst") == budget_for("neutral_risk_analyst") == budget
+
+    sides = ["激进风险分析师", "保守风险分析师", "中性风险分析师"]
+    risk = "".join(f"\n\n【{sides[i % 3]} 第{i + 1}轮】:\n" + f"风险{i}" * 300 for i in range(9))
+    reports = {name: name[:2] * 3000 for name in ("market_report", "news_report", "fundamentals_report")}
+    builder = ContextBuilder(budget, _Summariser(), SummaryCache())
+    prompt = asyncio.run(builder.build(
+        HEAD, reports, [("投资辩论历史", _history(6), 2), ("风险管理辩论历史", risk, 3)], ["交易员计划: 买入"],
+    ))
+    assert estimate_tokens(prompt) <= budget
+    assert "交易员计划: 买入" in prompt and "【中性风险分析师 第9轮】:\n风险8" in prompt
+
+
+def test_budgets_and_helpers(monkeypatch=None):
+    assert parse_budgets("researcher=100, trader=0,bad,x=y") == {"researcher": 100, "trader": 0}
+    os.environ["CONTEXT_BUDGETS"] = "researcher=100"
+    try:
+        assert budget_for("bull_researcher") == 100 and budget_for("trader") > 0
+        assert budget_for("market_analyst") == 0
+    finally:
+        del os.environ["CONTEXT_BUDGETS"]
+    assert len(split_turns(_history(3))) == 3
+    assert estimate_tokens("中文abcd") == 3
+
+
+if __name__ == "__main__":
+    test_under_budget_matches_original_layout()
+    test_earlier_turns_summarised_once_across_rounds()
+    test_long_reports_summarised_and_concurrent_builds_coalesce()
+    test_failed_summary_truncates_within_budget_and_is_not_cached()
+    test_risk_debater_context_is_capped()
+    test_budgets_and_helpers()
+    print("Context builder tests PASSED")
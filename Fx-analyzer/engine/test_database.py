@@ -0,0 +1,164 @@
+"""Persistence checks: WAL + indexes, batched background writes, read paths."""
+import os, sys, asyncio, sqlite3, tempfile, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import database
+from engine.memory import MemoryService, PerformanceCache
+
+
+def _fresh_db():
+    path = os.path.join(tempfile.mkdtemp(), "fx_test.db")
+    database.configure(path)
+    database.init_db()
+    return path
+
+
+def test_schema_uses_wal_and_indexes():
+    path = _fresh_db()
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {"idx_trades_symbol_status_ts", "idx_signals_symbol_ts"} <= indexes
+    plan = " ".join(str(r) for r in conn.execute(
+        "EXPLAIN QUERY PLAN " + database.SELECT_CLOSED_TRADES, ("EURUSD", 5)
+    ))
+    assert "idx_trades_symbol_status_ts" in plan
+    conn.close()
+    database.close()
+
+
+def test_signal_burst_is_queued_and_batched():
+    path = _fresh_db()
+    start = time.perf_counter()
+    for i in range(500):
+        database.store_signal({"symbol": f"SYM{i % 20}", "action": "BUY", "price": 1.0 + i, "confidence": 80})
+    enqueue = time.perf_counter() - start
+    database.flush()
+
+    db = database.get_db()
+    assert db.batches < 500  # grouped into transactions, not one commit per row
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 500
+    conn.close()
+    assert enqueue < 0.5
+    database.close()
+
+
+def test_memory_reads_closed_trades():
+    _fresh_db()
+    for i, pl in enumerate([10.0, -5.0, 7.5]):
+        database.store_trade({
+            "symbol": "EURUSD", "action": "BUY", "price": 1.1,
+            "pl": pl, "status": "closed", "timestamp": f"2026-01-0{i + 1}T10:00:00",
+        })
+    database.store_trade({"symbol": "EURUSD", "action": "SELL", "price": 1.1})  # still open
+    database.flush()
+
+    rows = database.get_closed_trades("EURUSD", 5)
+    assert [r["pl"] for r in rows] == [7.5, -5.0, 10.0]
+    memory = MemoryService(PerformanceCache())
+    summary = asyncio.run(database.run_read(memory.get_recent_performance, "EURUSD"))
+    assert summary.startswith("Past Performance (3 trades, 67% WR)")
+    assert memory.get_recent_performance("GBPUSD") == "No past trade history for this symbol."
+    database.close()
+
+
+def test_unflushed_writes_are_replayed_after_crash():
+    path = _fresh_db()
+    database.close()
+    # A writer that never reaches its time trigger stands in for a crash
+    crashed = database.Persistence(path, batch_size=1000, flush_interval=60)
+    for i in range(5):
+        crashed.write("trade", ("2026-01-05T10:00:00", "EURUSD", "BUY", 1.1, None, float(i), "closed", None))
+    with open(crashed.journal_path, "a") as f:
+        f.write('[6, "trade", ["2026-01-05')  # torn append
+
+    restarted = database.Persistence(path)
+    restarted.start()
+    assert restarted.replayed == 5
+    assert os.path.getsize(restarted.journal_path) == 0
+    assert len(restarted.query("SELECT * FROM trades")) == 5
+
+    # Committed entries are checkpointed and never replayed twice
+    restarted.write("trade", ("2026-01-05T11:00:00", "EURUSD", "SELL", 1.1, None, 1.0, "closed", None))
+    restarted.flush()
+    restarted.close()
+    again = database.Persistence(path)
+    again.start()
+    assert again.replayed == 0 and len(again.query("SELECT * FROM trades")) == 6
+    again.close()
+
+
+def _journal_lines(db):
+    lines = 0
+    for path in db._segments() + [db.journal_path]:
+        with open(path) as f:
+            lines += sum(1 for _ in f)
+    return lines
+
+
+def test_journal_is_compacted_under_sustained_writes():
+    path = _fresh_db()
+    database.close()
+    trade = ("2026-01-05T10:00:00", "EURUSD", "BUY", 1.1, None, 1.0, "closed", None)
+    db = database.Persistence(path, batch_size=1, flush_interval=60)
+    journaled = []
+    apply = db._apply
+
+    def apply_while_writing(conn, entries):
+        # The next write always lands before this commit's checkpoint, so the
+        # writer never catches up
+        journaled.append(_journal_lines(db))
+        apply(conn, entries)
+        if entries[-1][0] < 50:
+            db.write("trade", trade)
+
+    db._apply = apply_while_writing
+    db.start()
+    db.write("trade", trade)
+    deadline = time.monotonic() + 5
+    while db.batches < 50 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    db.close()
+    assert len(journaled) == 50 and max(journaled) <= 2
+
+    # Sealed segments are replayed after a crash like the live file
+    crashed = database.Persistence(path, batch_size=1000, flush_interval=60)
+    for _ in range(3):
+        crashed.write("trade", trade)
+    crashed._checkpoint_journal(50)  # seals the three entries
+    for _ in range(2):
+        crashed.write("trade", trade)
+    assert len(crashed._segments()) == 1
+    restarted = database.Persistence(path)
+    restarted.start()
+    assert restarted.replayed == 5 and restarted._segments() == []
+    assert len(restarted.query("SELECT * FROM trades")) == 55
+    restarted.close()
+
+
+def test_export_signals_columnar():
+    _fresh_db()
+    for i in range(3):
+        database.store_signal({
+            "symbol": "EURUSD", "action": "BUY", "price": 1.1 + i, "confidence": 70 + i,
+            "agent_breakdown": {"technical": {"signal": "bullish"}},
+            "timestamp": f"2026-01-0{i + 1}T10:00:00",
+        })
+    out = os.path.join(tempfile.mkdtemp(), "signals.npz")
+    assert database.export_signals(out, since="2026-01-02") == 2
+    import numpy as np
+    cols = np.load(out)  # no pickle needed
+    assert list(cols["price"]) == [2.1, 3.1]
+    assert list(cols["agent_breakdown.technical.signal"]) == ["bullish", "bullish"]
+    database.close()
+
+
+if __name__ == "__main__":
+    test_schema_uses_wal_and_indexes()
+    test_signal_burst_is_queued_and_batched()
+    test_memory_reads_closed_trades()
+    test_unflushed_writes_are_replayed_after_crash()
+    test_journal_is_compacted_under_sustained_writes()
+    test_export_signals_columnar()
+    print("Database tests PASSED")
@@ -0,0 +1,126 @@
+"""Parallel debate checks: concurrent turns merge deterministically in participant order."""
+import os, sys, asyncio, random
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.trading_agents.debate import (
+    INVESTMENT_DEBATE, RISK_DEBATE, merge_round, round_snapshot, rounds_completed, state_view,
+)
+
+
+def _researcher(side, other):
+    """Mimics Bull/BearResearcher.process: rewrites the whole debate dict."""
+    async def process(state):
+        await asyncio.sleep(random.random() * 0.02)
+        debate = state["investment_debate_state"]
+        count = debate["count"]
+        seen = debate.get("current_response", "").strip().split("\n")[0]
+        reply = f"{side} says (saw: {seen or 'nothing'})"
+        new = {
+            "history": debate.get("history", "") + f"\n\n[{side} {count + 1}]:\n{reply}",
+            f"{side}_history": debate.get(f"{side}_history", "") + f"\n\n{count + 1}: {reply}",
+            f"{other}_history": debate.get(f"{other}_history", ""),
+            "current_response": reply,
+            "count": count + 1,
+        }
+        return {**state, "investment_debate_state": new}
+    return process
+
+
+def _risk(side, others):
+    async def process(state):
+        await asyncio.sleep(random.random() * 0.02)
+        debate = state["risk_debate_state"]
+        count = debate["count"]
+        reply = f"{side}#{count + 1} vs " + ",".join(debate.get(f"current_{o}_response", "") or "-" for o in others)
+        new = dict(debate)
+        new.update({
+            "history": debate.get("history", "") + f"\n\n[{side} {count + 1}]:\n{reply}",
+            f"{side}_history": debate.get(f"{side}_history", "") + f"\n\n{count + 1}: {reply}",
+            f"current_{side}_response": reply,
+            "count": count + 1,
+        })
+        return {**state, "risk_debate_state": new}
+    return process
+
+
+async def _round(state, key, agents):
+    debate = dict(state[key])
+
+    async def speak(position, process):
+        snapshot = round_snapshot(debate, position)
+        result = await process(state_view(state, **{key: snapshot}))
+        return snapshot, result[key]
+
+    turns = await asyncio.gather(*(speak(i, p) for i, p in enumerate(agents)))
+    state[key] = merge_round(debate, list(turns), len(agents))
+    return state
+
+
+def test_investment_rounds_merge_in_order():
+    key, participants = INVESTMENT_DEBATE
+    agents = [_researcher("bull", "bear"), _researcher("bear", "bull")]
+    state = {"user_query": "AAPL", key: {"count": 0, "history": "", "current_response": ""}}
+
+    async def run():
+        for _ in range(2):
+            await _round(state, key, agents)
+
+    for seed in range(3):
+        random.seed(seed)
+        state[key] = {"count": 0, "history": "", "current_response": ""}
+        asyncio.run(run())
+        debate = state[key]
+        # Same numbering and order as the sequential bull -> bear -> bull -> bear
+        labels = [line for line in debate["history"].split("\n") if line.startswith("[")]
+        assert labels == ["[bull 1]:", "[bear 2]:", "[bull 3]:", "[bear 4]:"]
+        assert debate["count"] == 4 and rounds_completed(debate, len(participants)) == 2
+        assert debate["bull_history"].count("bull says") == 2 and debate["bear_history"].count("bear says") == 2
+        # Round 2 speakers saw the whole of round 1, not only the other side
+        assert "bull says (saw: [bull 1]" in debate["history"] and "bear says (saw: [bull 1]" in debate["history"]
+        # The shared field carries the latest round's transcript for the next one
+        assert debate["current_response"].startswith("[bull 3]") and "[bear 4]" in debate["current_response"]
+    # Fields outside the debate pass through untouched
+    assert state["user_query"] == "AAPL"
+
+
+def test_risk_round_owned_fields_and_skipped_participant():
+    key, participants = RISK_DEBATE
+    state = {key: {"count": 0, "history": "", "current_aggressive_response": "",
+                   "current_safe_response": "", "current_neutral_response": ""}}
+    aggressive = _risk("aggressive", ["safe", "neutral"])
+    neutral = _risk("neutral", ["aggressive", "safe"])
+
+    async def run():
+        debate = dict(state[key])
+        turns = await asyncio.gather(
+            *(_speak(debate, pos, proc) for pos, proc in ((0, aggressive), (2, neutral)))  # safe disabled
+        )
+        state[key] = merge_round(debate, list(turns), len(participants))
+
+    async def _speak(debate, position, process):
+        snapshot = round_snapshot(debate, position)
+        result = await process(state_view(state, **{key: snapshot}))
+        return snapshot, result[key]
+
+    asyncio.run(run())
+    debate = state[key]
+    assert debate["count"] == 3 and rounds_completed(debate, 3) == 1
+    assert debate["current_aggressive_response"] == "aggressive#1 vs -,-"
+    assert debate["current_neutral_response"] == "neutral#3 vs -,-"
+    assert debate["current_safe_response"] == ""
+    assert debate["history"].index("[aggressive 1]") < debate["history"].index("[neutral 3]")
+
+
+def test_state_view_is_shallow_and_isolated():
+    reports = {"market_report": "long report"}
+    state = {"errors": [], "investment_debate_state": {"count": 0}, **reports}
+    view = state_view(state, investment_debate_state={"count": 5})
+    assert view["market_report"] is state["market_report"]
+    assert state["investment_debate_state"] == {"count": 0}
+
+
+if __name__ == "__main__":
+    test_investment_rounds_merge_in_order()
+    test_risk_round_owned_fields_and_skipped_participant()
+    test_state_view_is_shallow_and_isolated()
+    print("Debate tests PASSED")
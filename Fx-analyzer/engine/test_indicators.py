@@ -0,0 +1,130 @@
+"""Parity checks: streaming and batch indicator kernels vs. the full-frame 'ta' pipeline."""
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from engine.analyzer import TechnicalAnalyzer
+from engine.batch_indicators import compute_indicators, stack_frames
+from engine.indicator_engine import INDICATOR_COLUMNS, StreamingIndicatorEngine
+
+
+def _make_bars(n=600, seed=7, start_price=1.08, pip=0.0001):
+    rng = np.random.default_rng(seed)
+    close = start_price + np.cumsum(rng.normal(0, pip * 5, n))
+    return pd.DataFrame({
+        "time": pd.date_range("2026-01-05 00:00", periods=n, freq="1min"),
+        "open": close,
+        "high": close + pip,
+        "low": close - pip,
+        "close": close,
+        "tick_volume": rng.integers(100, 1000, n),
+    })
+
+
+def _reference(df):
+    return TechnicalAnalyzer().analyze(df.copy())
+
+
+def _assert_parity(actual, expected, rows=None):
+    rows = slice(None) if rows is None else rows
+    for col in INDICATOR_COLUMNS:
+        a = actual[col].to_numpy()[rows]
+        e = expected[col].to_numpy()[rows]
+        assert np.array_equal(np.isnan(a), np.isnan(e)), f"{col}: NaN layout differs"
+        mask = ~np.isnan(e)
+        np.testing.assert_allclose(a[mask], e[mask], rtol=1e-9, atol=1e-10, err_msg=col)
+
+
+def test_full_frame_parity():
+    df = _make_bars()
+    streamed = StreamingIndicatorEngine().update("EURUSD", df.copy())
+    _assert_parity(streamed, _reference(df))
+
+
+def test_incremental_parity_with_forming_bar():
+    """Feed a 500-bar sliding window one bar at a time, revising the last bar."""
+    full = _make_bars(n=800)
+    engine = StreamingIndicatorEngine()
+    window = 500
+
+    for end in range(window, len(full) + 1):
+        frame = full.iloc[end - window:end].reset_index(drop=True)
+
+        # Provisional close for the forming bar, then the final one
+        forming = frame.copy()
+        forming.loc[len(forming) - 1, "close"] += 0.0003
+        engine.update("EURUSD", forming)
+        streamed = engine.update("EURUSD", frame.copy())
+
+        # Compare against ta run over the whole history so EMA seeding matches
+        expected = _reference(full.iloc[:end].copy()).iloc[-window:].reset_index(drop=True)
+        _assert_parity(streamed, expected, rows=slice(-50, None))
+
+
+def test_rebuild_on_reseeded_feed():
+    engine = StreamingIndicatorEngine()
+    engine.update("EURUSD", _make_bars(seed=1))
+    other = _make_bars(seed=2)
+    streamed = engine.update("EURUSD", other.copy())
+    _assert_parity(streamed, _reference(other))
+
+
+def test_signals_and_summary_read_streamed_columns():
+    df = _make_bars()
+    analyzer = TechnicalAnalyzer()
+    streamed = analyzer.analyze(df.copy(), symbol="EURUSD")
+    reference = analyzer.analyze(df.copy())
+
+    assert analyzer.check_signals(streamed, "EURUSD") == analyzer.check_signals(reference, "EURUSD")
+    summary = analyzer.get_technical_summary(streamed, "EURUSD")
+    expected = analyzer.get_technical_summary(reference, "EURUSD")
+    assert summary["trend"] == expected["trend"]
+    assert summary["bb_status"] == expected["bb_status"]
+    assert abs(summary["rsi"] - expected["rsi"]) < 1e-6
+
+
+def _watchlist():
+    frames = {f"SYM{i}": _make_bars(n=300 + 40 * i, seed=i) for i in range(6)}
+    # Steady trends so both RSI extremes fire
+    for name, step in (("DUMP", -0.0004), ("PUMP", 0.0004)):
+        df = _make_bars(n=500, seed=99)
+        df["close"] = 1.08 + step * np.arange(500) + df["close"] - 1.08
+        frames[name] = df
+    return frames
+
+
+def test_batch_parity_with_ragged_histories():
+    frames = _watchlist()
+    symbols, closes, _ = stack_frames(frames, bars=500)
+    batch = compute_indicators(closes)
+    for i, symbol in enumerate(symbols):
+        expected = _reference(frames[symbol])
+        n = len(expected)
+        actual = pd.DataFrame({col: batch[col][i, 500 - n:] for col in INDICATOR_COLUMNS})
+        _assert_parity(actual, expected)
+
+
+def test_check_signals_batch_matches_per_symbol():
+    frames = _watchlist()
+    analyzer = TechnicalAnalyzer()
+    signals = analyzer.check_signals_batch(analyzer.analyze_batch(frames))
+
+    expected = {}
+    for symbol, df in frames.items():
+        sig = analyzer.check_signals(analyzer.analyze(df.copy()), symbol)
+        if sig:
+            expected[symbol] = sig
+    assert {"DUMP", "PUMP"} <= set(expected)
+    assert signals == expected
+
+
+if __name__ == "__main__":
+    test_full_frame_parity()
+    test_incremental_parity_with_forming_bar()
+    test_rebuild_on_reseeded_feed()
+    test_signals_and_summary_read_streamed_columns()
+    test_batch_parity_with_ragged_histories()
+    test_check_signals_batch_matches_per_symbol()
+    print("Indicator parity tests PASSED")
@@ -0,0 +1,107 @@
+"""LLM response cache checks: exact / normalised keys, per-agent TTL, LRU bound, persistence."""
+import os, sys, tempfile, threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.llm_cache import LLMResponseCache, normalise_prompt, parse_ttls
+
+PROMPT = """
+    Analyze EURUSD.
+    RSI: 27.41382
+    Price: 1.085123
+"""
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_exact_and_normalised_hits():
+    cache = LLMResponseCache(path=None, ttls={})
+    cache.put("TechnicalExpert", "openrouter", "m", PROMPT, '{"signal": "BUY"}')
+
+    assert cache.get("TechnicalExpert", "openrouter", "m", PROMPT) == '{"signal": "BUY"}'
+    # Same indicators after rounding, different layout -> normalised hit
+    near = "analyze eurusd. rsi: 27.41 price: 1.085119"
+    assert normalise_prompt(near) == normalise_prompt(PROMPT)
+    assert cache.get("TechnicalExpert", "openrouter", "m", near) == '{"signal": "BUY"}'
+    # Different model, system prompt or values -> miss
+    assert cache.get("TechnicalExpert", "openrouter", "other", PROMPT) is None
+    assert cache.get("TechnicalExpert", "openrouter", "m", PROMPT, system_prompt="Be brief.") is None
+    assert cache.get("TechnicalExpert", "openrouter", "m", PROMPT.replace("27.41382", "31.2")) is None
+
+    m = cache.stats()["agents"]["TechnicalExpert"]
+    assert (m["hits"], m["normalised_hits"], m["misses"], m["stores"]) == (1, 1, 3, 1)
+
+    # Failed calls are never cached
+    cache.put("RiskManager", "gemini", "m", "p", None)
+    cache.put("RiskManager", "gemini", "m", "p", "  ")
+    assert cache.get("RiskManager", "gemini", "m", "p") is None
+
+
+def test_per_agent_ttl_and_lru_bound():
+    clock = _Clock()
+    cache = LLMResponseCache(path=None, max_entries=4, default_ttl=100,
+                             ttls=parse_ttls("TechnicalExpert=10, FundamentalExpert=1000"), clock=clock)
+    cache.put("TechnicalExpert", "gemini", "m", "tech", "t")
+    cache.put("FundamentalExpert", "gemini", "m", "macro", "f")
+    clock.now += 50
+    assert cache.get("TechnicalExpert", "gemini", "m", "tech") is None
+    assert cache.get("FundamentalExpert", "gemini", "m", "macro") == "f"
+
+    # Each response holds two keys; a bound of 4 keeps the two most recent
+    cache.put("SentimentExpert", "gemini", "m", "a", "1")
+    cache.put("SentimentExpert", "gemini", "m", "b", "2")
+    cache.put("SentimentExpert", "gemini", "m", "c", "3")
+    assert cache.stats()["entries"] <= 4 and cache.stats()["evictions"] > 0
+    assert cache.get("SentimentExpert", "gemini", "m", "c") == "3"
+    assert cache.get("SentimentExpert", "gemini", "m", "a") is None
+
+
+def test_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm_cache.db")
+        clock = _Clock()
+        first = LLMResponseCache(path=path, ttls={"RiskManager": 600, "TechnicalExpert": 60}, clock=clock)
+        first.put("RiskManager", "openrouter", "m", "risk?", "low")
+        first.put("TechnicalExpert", "openrouter", "m", "old", "x")
+        first.close()  # commits the queued writes
+
+        clock.now += 120  # TechnicalExpert entry expired on disk
+        second = LLMResponseCache(path=path, clock=clock)
+        assert second.get("RiskManager", "openrouter", "m", "risk?") == "low"
+        assert second.get("TechnicalExpert", "openrouter", "m", "old") is None
+        second.clear()
+        second.close()
+        assert LLMResponseCache(path=path, clock=clock).stats()["entries"] == 0
+
+
+def test_writes_happen_on_writer_thread():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(path=os.path.join(tmp, "llm_cache.db"))
+        writers = []
+        write = cache._write
+
+        def recording_write(items):
+            writers.append(threading.current_thread().name)
+            write(items)
+
+        cache._write = recording_write
+        for i in range(20):
+            cache.put("TechnicalExpert", "openrouter", "m", f"p{i}", "r")
+        cache.flush()
+        assert writers and set(writers) == {"llm-cache-writer"}
+        rows = cache._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        assert rows == 40  # exact + normalised key per response
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_exact_and_normalised_hits()
+    test_per_agent_ttl_and_lru_bound()
+    test_survives_restart()
+    test_writes_happen_on_writer_thread()
+    print("LLM cache tests PASSED")
@@ -0,0 +1,183 @@
+"""LLM HTTP pool checks against a local mock OpenAI-compatible server."""
+import os, sys, asyncio, json, threading, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from engine.llm_client import JSONObjectScanner, LLMHTTPError, LLMHTTPPool, ProviderConfig
+
+VERDICT = '{"signal": "BUY", "confidence": 0.8, "reasoning": "RSI {oversold}"}'
+
+
+class MockOpenAI:
+    """/v1/chat/completions with keep-alive, SSE streaming and a slow / 429 model."""
+
+    def __init__(self):
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self.requests = []
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.requests.append((self.headers.get("Authorization"), body))
+                with server.lock:
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    self._reply(body)
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+            def _reply(self, body):
+                if body["model"] == "limited":
+                    payload = b'{"error": {"message": "Rate limit exceeded"}}'
+                    self.send_response(429)
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                if body["model"] == "slow":
+                    time.sleep(0.2)
+                if not body.get("stream"):
+                    payload = json.dumps({"choices": [{"message": {"role": "assistant", "content": VERDICT}}]}).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                pieces = ["```json\n", VERDICT[:20], VERDICT[20:], "\n```\nExtra commentary"]
+                try:
+                    self._chunk(b": OPENROUTER PROCESSING\n\n")
+                    for i, piece in enumerate(pieces):
+                        if i == len(pieces) - 1:
+                            time.sleep(0.5)  # trailing text the client should not wait for
+                        event = {"choices": [{"delta": {"content": piece}}]}
+                        self._chunk(f"data: {json.dumps(event)}\n\n".encode())
+                    self._chunk(b"data: [DONE]\n\n")
+                    self._chunk(b"")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def pool(self, max_concurrency=4, timeout=5.0):
+        base = f"http://127.0.0.1:{self.httpd.server_port}/v1"
+        return LLMHTTPPool({"mock": ProviderConfig(base, "MOCK_KEY", max_concurrency)}, timeout=timeout)
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+MESSAGES = [{"role": "user", "content": "EURUSD?"}]
+
+
+def test_json_scanner_ignores_braces_in_strings():
+    scanner = JSONObjectScanner()
+    assert not scanner.feed('```json\n{"a": "}{", "b": {"c": 1}')
+    assert scanner.feed(', "d": "\\"}"}\n```')
+
+
+def test_requests_reuse_connections_and_raise_on_errors():
+    server = MockOpenAI()
+    pool = server.pool()
+
+    async def run():
+        for _ in range(3):
+            assert await pool.chat("mock", "m", MESSAGES, api_key="k1") == VERDICT
+        try:
+            await pool.chat("mock", "limited", MESSAGES)
+            raise AssertionError("expected LLMHTTPError")
+        except LLMHTTPError as e:
+            assert e.status == 429 and "429" in str(e)
+        await pool.close()
+
+    try:
+        os.environ["MOCK_KEY"] = "env-key"
+        asyncio.run(run())
+        assert server.connections == 1  # keep-alive across all four requests
+        assert server.requests[0][0] == "Bearer k1" and server.requests[-1][0] == "Bearer env-key"
+        assert server.requests[0][1]["model"] == "m" and server.requests[0][1]["max_tokens"] == 1024
+        stats = pool.stats()["mock"]
+        assert stats["requests"] == 4 and stats["errors"] == 1 and stats["in_flight"] == 0
+    finally:
+        os.environ.pop("MOCK_KEY", None)
+        server.close()
+
+
+def test_concurrency_limit_and_timeout():
+    server = MockOpenAI()
+
+    async def run():
+        pool = server.pool(max_concurrency=2)
+        replies = await asyncio.gather(*(pool.chat("mock", "slow", MESSAGES) for _ in range(5)))
+        assert replies == [VERDICT] * 5
+        await pool.close()
+
+        short = server.pool(timeout=0.05)
+        try:
+            await short.chat("mock", "slow", MESSAGES)
+            raise AssertionError("expected timeout")
+        except asyncio.TimeoutError:
+            pass
+        assert short.stats()["mock"]["errors"] == 1
+        await short.close()
+
+    try:
+        asyncio.run(run())
+        assert server.max_active == 2
+    finally:
+        server.close()
+
+
+def test_streaming_stops_at_complete_json():
+    server = MockOpenAI()
+    pool = server.pool()
+
+    async def run():
+        start = time.monotonic()
+        early = await pool.chat("mock", "m", MESSAGES, stream=True, stop_when_complete=True)
+        assert time.monotonic() - start < 0.4
+        assert json.loads(early.replace("```json", "").strip())["signal"] == "BUY"
+        full = await pool.chat("mock", "m", MESSAGES, stream=True)
+        assert full.endswith("Extra commentary")
+        assert server.requests[-1][1]["stream"] is True
+        await pool.close()
+
+    try:
+        asyncio.run(run())
+        assert pool.stats()["mock"]["early_stops"] == 1
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    test_json_scanner_ignores_braces_in_strings()
+    test_requests_reuse_connections_and_raise_on_errors()
+    test_concurrency_limit_and_timeout()
+    test_streaming_stops_at_complete_json()
+    print("LLM client tests PASSED")
@@ -0,0 +1,104 @@
+"""LLM scheduler checks: token buckets, priority grants, model spreading, predictable refusal."""
+import os, sys, asyncio, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.llm_scheduler import (
+    PRIORITY_BACKGROUND, PRIORITY_CRITICAL, PRIORITY_NORMAL,
+    LLMScheduler, TokenBucket, parse_limits,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_and_limit_parsing():
+    clock = _Clock()
+    bucket = TokenBucket(60, clock)  # one per second, burst of 60
+    bucket.take(60)
+    assert bucket.time_until(1) == 1.0
+    clock.now += 0.5
+    assert bucket.time_until(1) == 0.5
+    clock.now += 10
+    assert bucket.time_until(5) == 0.0
+    assert bucket.time_until(500) > 0  # capped at capacity, never infinite
+
+    assert parse_limits("gemini=15/1000000, google/gemma-4-31b-it:free=10/0,bad") == {
+        "gemini": (15, 1000000),
+        "google/gemma-4-31b-it:free": (10, 0),
+    }
+
+
+def test_critical_requests_are_granted_first_and_others_refused_up_front():
+    scheduler = LLMScheduler(model_limits={"m": (1, 0)}, provider_limits={})
+    order = []
+
+    async def call(name, priority):
+        model = await scheduler.acquire("p", ["m"], priority=priority, max_wait=1.0)
+        order.append((name, model))
+
+    async def run():
+        scheduler.penalise("p", "m", 0.2)  # e.g. a sibling just saw a 429
+        start = time.monotonic()
+        await asyncio.gather(
+            call("background", PRIORITY_BACKGROUND),
+            call("expert", PRIORITY_NORMAL),
+            call("synthesis", PRIORITY_CRITICAL),
+        )
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    # One request per minute: synthesis gets it once the block lifts, the
+    # rest would wait ~60s and are refused instead of stalling for max_wait
+    assert dict(order) == {"synthesis": "m", "expert": None, "background": None}
+    assert 0.15 < elapsed < 0.9
+    stats = scheduler.stats()
+    assert stats["granted"] == 1 and stats["refused"] == 2 and stats["penalised"] == 1
+    assert stats["queued"] == {}
+
+
+def test_spreads_across_models_and_respects_waiting_claims():
+    scheduler = LLMScheduler(model_limits={"a": (1, 0), "b": (1, 0), "c": (0, 0)}, provider_limits={})
+
+    async def run():
+        assert await scheduler.acquire("p", ["a", "b"]) == "a"
+        assert await scheduler.acquire("p", ["a", "b"]) == "b"
+        start = time.monotonic()
+        assert await scheduler.acquire("p", ["a", "b"], max_wait=5) is None
+        assert time.monotonic() - start < 0.1
+
+        # A waiting critical request on "c" keeps background work off "c"
+        # but not off models it did not ask for
+        scheduler.penalise("p", "c", 0.2)
+        critical = asyncio.create_task(scheduler.acquire("p", ["c"], priority=PRIORITY_CRITICAL))
+        await asyncio.sleep(0.01)
+        background = asyncio.create_task(scheduler.acquire("p", ["c"], priority=PRIORITY_BACKGROUND))
+        await asyncio.sleep(0.01)
+        assert not background.done()
+        assert await critical == "c" and await background == "c"
+
+    asyncio.run(run())
+    assert scheduler.stats()["spread"] == 1
+
+
+def test_provider_budget_is_shared_by_all_models():
+    scheduler = LLMScheduler(model_limits={}, provider_limits={"gemini": (0, 3000)})
+
+    async def run():
+        assert await scheduler.acquire("gemini", ["flash"], tokens=2000) == "flash"
+        assert await scheduler.acquire("gemini", ["pro"], tokens=2000, max_wait=1) is None
+        assert await scheduler.acquire("openrouter", ["x"], tokens=2000) == "x"
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_token_bucket_and_limit_parsing()
+    test_critical_requests_are_granted_first_and_others_refused_up_front()
+    test_spreads_across_models_and_respects_waiting_claims()
+    test_provider_budget_is_shared_by_all_models()
+    print("LLM scheduler tests PASSED")
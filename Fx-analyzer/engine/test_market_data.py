@@ -0,0 +1,247 @@
+"""Provider chain checks: replay determinism, mock generator, DataFeed fallback / persistence."""
+import os, sys, tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from engine.bar_aggregator import BarAggregator
+from engine.bar_store import BarStore
+from engine.data_feed import DataFeed
+from engine.market_data import MarketDataProvider, ReplayProvider, normalize_bars
+from engine.market_data.yahoo import _ticker_slice, normalize_history
+from engine.mock_bars import MockBarGenerator
+
+
+def _make_bars(n=600, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 1.08 + np.cumsum(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        "time": pd.date_range("2026-01-05 00:00", periods=n, freq="1min"),
+        "open": close,
+        "high": close + 0.0001,
+        "low": close - 0.0001,
+        "close": close,
+        "tick_volume": rng.integers(100, 1000, n),
+    })
+
+
+class _StaticProvider(MarketDataProvider):
+    """Serves fixed frames and records what it was asked for."""
+
+    name = "static"
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def fetch_bars(self, symbols, timeframe="M1", limit=500, since=None):
+        self.calls.append((list(symbols), dict(since or {})))
+        return {
+            s: normalize_bars(self.frames[s], limit=limit, since=(since or {}).get(s))
+            for s in symbols if s in self.frames
+        }
+
+
+def test_replay_step_mode_is_deterministic():
+    frames = {"EURUSD": _make_bars(seed=1), "GBPUSD": _make_bars(seed=2)}
+    with tempfile.TemporaryDirectory() as root:
+        ReplayProvider.record(frames, root)
+        runs = []
+        for _ in range(2):
+            replay = ReplayProvider(root, speed=0, warmup=100)
+            assert replay.symbols() == ["EURUSD", "GBPUSD"]
+            runs.append([replay.fetch_bars(["EURUSD", "GBPUSD"], limit=50) for _ in range(10)])
+
+        for a, b in zip(*runs):
+            for symbol in frames:
+                pd.testing.assert_frame_equal(a[symbol], b[symbol])
+        # First fetch shows the warmup window, each later one releases a bar
+        last = runs[0][-1]["EURUSD"]
+        assert len(last) == 50
+        assert last["time"].iloc[-1] == frames["EURUSD"]["time"].iloc[108]
+
+
+def test_replay_wall_clock_speed():
+    now = [0.0]
+    with tempfile.TemporaryDirectory() as root:
+        ReplayProvider.record({"EURUSD": _make_bars()}, root)
+        replay = ReplayProvider(root, speed=60, warmup=100, clock=lambda: now[0])
+        assert len(replay.fetch("EURUSD", limit=None)) == 100
+        now[0] = 5.0  # 5s at 60x = five M1 bars
+        assert len(replay.fetch("EURUSD", limit=None)) == 105
+        now[0] = 1e6
+        assert len(replay.fetch("EURUSD", limit=None)) == 600
+        assert replay.exhausted("EURUSD")
+
+
+def test_datafeed_tops_up_store_and_falls_through():
+    full = _make_bars()
+    with tempfile.TemporaryDirectory() as root:
+        primary = _StaticProvider({"EURUSD": full.iloc[:400]})
+        secondary = _StaticProvider({"GBPUSD": _make_bars(seed=3)})
+        feed = DataFeed(store=BarStore(root), providers=[primary, secondary])
+
+        frames = feed.fetch_many(["EURUSD", "GBPUSD"], limit=300)
+        assert len(frames["EURUSD"]) == 300 and len(frames["GBPUSD"]) == 300
+        assert secondary.calls[0][0] == ["GBPUSD"]
+
+        # Second call asks only for bars since the last stored one
+        primary.frames["EURUSD"] = full
+        df = feed.fetch_data("EURUSD", limit=500)
+        assert primary.calls[-1][1]["EURUSD"] == full["time"].iloc[399]
+        assert df["time"].iloc[-1] == full["time"].iloc[-1] and len(df) == 500
+
+        # Nothing anywhere: mock data
+        assert len(feed.fetch_data("USDJPY")) == 500
+
+
+def test_mock_generator_is_seeded_and_streams():
+    symbols = [f"SYM{i}" for i in range(50)] + ["USDJPY"]
+    t0 = pd.Timestamp("2026-01-05 12:00")
+    a = MockBarGenerator(seed=3, gap_probability=0.05).frames(symbols, now=t0)
+    gen = MockBarGenerator(seed=3, gap_probability=0.05)
+    b = gen.frames(symbols, now=t0)
+    for symbol in symbols:
+        pd.testing.assert_frame_equal(a[symbol], b[symbol])
+        df = b[symbol]
+        assert len(df) == 500 and df["time"].iloc[-1] == t0
+        assert (df["high"] >= df[["open", "close"]].max(axis=1)).all()
+        assert (df["low"] <= df[["open", "close"]].min(axis=1)).all()
+
+    # Five minutes later only five bars are new; the rest is the same window
+    later = gen.frames(symbols, now=t0 + pd.Timedelta(minutes=5))
+    for symbol in symbols:
+        pd.testing.assert_frame_equal(
+            later[symbol].iloc[:495], b[symbol].iloc[5:].reset_index(drop=True)
+        )
+    new = gen.next_bars(["SYM0"], count=10)["SYM0"]
+    assert len(new) == 10 and new["time"].iloc[0] == t0 + pd.Timedelta(minutes=6)
+
+
+def test_mock_range_regime_reverts():
+    gen = MockBarGenerator(seed=5, regime="range", reversion=0.1)
+    df = gen.frames(["EURUSD"], bars=5000)["EURUSD"]
+    # An AR(1) with k=0.1 stays within a few dozen pips of its anchor
+    assert (df["close"] - df["close"].mean()).abs().max() < 0.005
+
+
+def test_datafeed_mock_fallback_streams():
+    with tempfile.TemporaryDirectory() as root:
+        mock = MockBarGenerator(seed=1)
+        feed = DataFeed(store=BarStore(root), providers=[], mock=mock)
+        first = feed.fetch_many(["EURUSD", "GBPUSD"])
+        assert {len(df) for df in first.values()} == {500}
+        assert mock.has("EURUSD") and mock.has("GBPUSD")
+        again = feed.fetch_data("EURUSD")
+        assert again["time"].iloc[0] >= first["EURUSD"]["time"].iloc[0]
+        # Unbounded requests (DataFeed.history) get the generator's window
+        unbounded = feed.fetch_many(["EURUSD", "USDJPY"], limit=None)
+        assert {len(df) for df in unbounded.values()} == {mock.window}
+
+
+def test_batched_download_splits_per_symbol():
+    """A grouped multi-ticker download frame maps onto per-symbol bars."""
+    index = pd.date_range("2026-01-05 09:00", periods=30, freq="1min", tz="UTC", name="Datetime")
+    fields = ["Open", "High", "Low", "Close", "Volume"]
+    columns = pd.MultiIndex.from_product([["EURUSD=X", "^DJI", "BAD"], fields], names=["Ticker", "Price"])
+    data = pd.DataFrame(np.nan, index=index, columns=columns)
+    for ticker, price in (("EURUSD=X", 1.08), ("^DJI", 42000.0)):
+        for field in fields[:4]:
+            data[(ticker, field)] = price + np.arange(30) * 0.0001
+        data[(ticker, "Volume")] = 0 if ticker == "EURUSD=X" else 1000
+    data.iloc[-5:, data.columns.get_loc(("^DJI", "Close"))] = np.nan  # closed session
+
+    eur = normalize_history(_ticker_slice(data, "EURUSD=X", single=False), limit=20)
+    assert list(eur.columns) == ["time", "open", "high", "low", "close", "tick_volume"]
+    assert len(eur) == 20 and eur["time"].dt.tz is None
+    assert (eur["tick_volume"] > 0).all()
+    assert len(_ticker_slice(data, "^DJI", single=False)) == 30
+    assert _ticker_slice(data, "BAD", single=False).empty
+    assert _ticker_slice(data, "MISSING", single=False) is None
+
+
+def _resample(m1, rule):
+    df = m1.set_index("time").resample(rule, label="left", closed="left").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "tick_volume": "sum"}
+    )
+    return df.dropna().reset_index()
+
+
+def test_aggregator_matches_resample_incrementally():
+    full = _make_bars(n=3000)
+    full["time"] = full["time"] + pd.Timedelta(minutes=7)  # start mid-bucket
+    agg = BarAggregator()
+    for end in range(500, len(full) + 1, 37):
+        window = full.iloc[max(0, end - 500):end].copy()
+        forming = window.copy()
+        forming.loc[forming.index[-1], "close"] += 0.001
+        agg.update("EURUSD", forming)
+        agg.update("EURUSD", window)
+    agg.update("EURUSD", full.iloc[-500:])
+
+    for tf, rule in (("M5", "5min"), ("M15", "15min"), ("H1", "1h")):
+        expected = _resample(full, rule).iloc[1:].reset_index(drop=True)  # partial head dropped
+        actual = agg.bars("EURUSD", tf)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_aggregator_prefixes_provider_history():
+    m1 = _make_bars(n=3 * 1440)
+    m1["time"] = m1["time"] + pd.Timedelta(hours=6)
+    agg = BarAggregator()
+    history = _make_bars(n=100, seed=9)
+    history["time"] = pd.date_range(end="2026-01-08", periods=100, freq="D")
+    agg.set_history("EURUSD", "D1", history)
+    assert agg.needs_history("AAPL", "D1") and not agg.needs_history("EURUSD", "D1")
+
+    agg.update("EURUSD", m1)
+    daily = agg.bars("EURUSD", "D1")
+    # History up to the first full aggregated day (Jan 6), then the M1 days
+    assert daily["time"].is_monotonic_increasing and daily["time"].is_unique
+    assert daily["time"].iloc[-1] == pd.Timestamp("2026-01-08")
+    assert (daily["time"] < pd.Timestamp("2026-01-06")).sum() == 97
+    assert len(daily) == 100
+    assert len(agg.bars("EURUSD", "D1", limit=50)) == 50
+
+
+def test_datafeed_serves_aggregated_timeframes():
+    with tempfile.TemporaryDirectory() as root:
+        m1 = _make_bars(n=2000)
+        daily = _make_bars(n=300, seed=4)
+        daily["time"] = pd.date_range(end="2026-01-04", periods=300, freq="D")
+        provider = _StaticProvider({"EURUSD": m1})
+        provider.fetch_bars = _by_timeframe(provider.fetch_bars, {"D1": {"EURUSD": daily}})
+        feed = DataFeed(store=BarStore(root), providers=[provider])
+
+        feed.fetch_data("EURUSD", limit=2000)
+        h1 = feed.fetch_data("EURUSD", "H1", limit=10)
+        assert len(h1) == 10 and h1["time"].iloc[-1] == m1["time"].iloc[-1].floor("h")
+        d1 = feed.fetch_data("EURUSD", "D1", limit=200)
+        assert len(d1) == 200
+        calls = len(provider.calls)
+        feed.fetch_data("EURUSD", "D1", limit=200)
+        assert len(provider.calls) == calls  # history fetched once
+
+
+def _by_timeframe(fetch_bars, frames_by_tf):
+    def wrapper(symbols, timeframe="M1", limit=500, since=None):
+        if timeframe in frames_by_tf:
+            frames = frames_by_tf[timeframe]
+            return {s: normalize_bars(frames[s], limit=limit) for s in symbols if s in frames}
+        return fetch_bars(symbols, timeframe, limit, since)
+    return wrapper
+
+
+if __name__ == "__main__":
+    test_replay_step_mode_is_deterministic()
+    test_replay_wall_clock_speed()
+    test_datafeed_tops_up_store_and_falls_through()
+    test_mock_generator_is_seeded_and_streams()
+    test_mock_range_regime_reverts()
+    test_datafeed_mock_fallback_streams()
+    test_batched_download_splits_per_symbol()
+    test_aggregator_matches_resample_incrementally()
+    test_aggregator_prefixes_provider_history()
+    test_datafeed_serves_aggregated_timeframes()
+    print("Market data provider tests PASSED")
@@ -0,0 +1,100 @@
+"""Performance memory checks: warm load, incremental updates, aggregates."""
+import os, sys, tempfile, threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import database
+from engine.memory import MemoryService, PerformanceCache, performance_cache
+
+
+def _closed(pl, day, regime=None, symbol="EURUSD"):
+    return {
+        "symbol": symbol, "action": "BUY", "price": 1.1, "pl": pl, "status": "closed",
+        "timestamp": f"2026-01-{day:02d}T10:00:00", "regime": regime,
+    }
+
+
+def test_cache_warms_from_db_then_tracks_store_trade():
+    database.configure(os.path.join(tempfile.mkdtemp(), "fx_memory.db"))
+    database.init_db()
+    performance_cache.clear()
+    for day, pl in enumerate([10.0, -4.0, -6.0], start=1):
+        database.store_trade(_closed(pl, day, regime="HIGH_VOL"))
+
+    memory = MemoryService()
+    stats = memory.get_performance_stats("EURUSD")
+    assert stats["trades"] == 3 and stats["wins"] == 1 and stats["streak"] == -2
+    assert stats["by_regime"]["HIGH_VOL"]["total_pl"] == 0.0
+
+    # Closed trades update the cache in place; open ones are ignored
+    database.store_trade({"symbol": "EURUSD", "action": "SELL", "price": 1.1})
+    database.store_trade(_closed(8.0, 4, regime="LOW_VOL"))
+    database.store_trade(_closed(2.0, 5))
+    stats = memory.get_performance_stats("EURUSD")
+    assert stats["trades"] == 5 and stats["streak"] == 2
+    assert stats["best_streak"] == 2 and stats["worst_streak"] == -2
+    assert stats["expectancy"] == 2.0
+    assert stats["profit_factor"] == 20.0 / 10.0
+    assert set(stats["by_regime"]) == {"HIGH_VOL", "LOW_VOL", "UNKNOWN"}
+
+    summary = memory.get_recent_performance("EURUSD", limit=2)
+    assert summary.splitlines()[0] == "Past Performance (2 trades, 100% WR):"
+    assert "2026-01-05" in summary.splitlines()[1]
+
+    # A fresh cache rebuilt from SQLite agrees with the incremental one
+    rebuilt = PerformanceCache().get("EURUSD").stats()
+    assert rebuilt == stats
+    performance_cache.clear()
+    database.close()
+
+
+def test_load_during_store_counts_trade_once():
+    database.configure(os.path.join(tempfile.mkdtemp(), "fx_memory_race.db"))
+    database.init_db()
+    performance_cache.clear()
+    db = database.get_db()
+    loaders = []
+
+    def write(kind, params):
+        type(db).write(db, kind, params)
+        # Another thread builds the symbol's cache right after the trade is queued
+        loader = threading.Thread(target=performance_cache.get, args=("EURUSD",))
+        loader.start()
+        loader.join(0.2)
+        loaders.append(loader)
+
+    db.write = write
+    try:
+        database.store_trade(_closed(5.0, 1))
+    finally:
+        del db.write
+    for loader in loaders:
+        loader.join()
+    assert performance_cache.get("EURUSD").stats()["trades"] == 1
+    performance_cache.clear()
+    database.close()
+
+
+def test_recent_trades_ordered_by_timestamp():
+    database.configure(os.path.join(tempfile.mkdtemp(), "fx_memory_order.db"))
+    database.init_db()
+    performance_cache.clear()
+    memory = MemoryService()
+    database.store_trade(_closed(5.0, 10))
+    memory.get_performance_stats("EURUSD")
+
+    # A late, backfilled close lands in timestamp order, not arrival order
+    database.store_trade(_closed(-3.0, 12))
+    database.store_trade(_closed(7.0, 11))
+    lines = memory.get_recent_performance("EURUSD", limit=3).splitlines()[1:]
+    assert [line[2:12] for line in lines] == ["2026-01-12", "2026-01-11", "2026-01-10"]
+    assert memory.get_recent_performance("EURUSD", limit=3) == \
+        PerformanceCache().get("EURUSD").summary(3)
+    performance_cache.clear()
+    database.close()
+
+
+if __name__ == "__main__":
+    test_cache_warms_from_db_then_tracks_store_trade()
+    test_load_during_store_counts_trade_once()
+    test_recent_trades_ordered_by_timestamp()
+    print("Memory tests PASSED")
@@ -0,0 +1,114 @@
+"""News ingestion checks against a local HTTP fixture server."""
+import os, sys, asyncio, threading, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from engine.rag.news_ingester import HeadlineStore, NewsIngester, parse_feed
+from engine.rag.rss_loader import RSSLoader
+
+
+def _rss(*titles, day=17):
+    items = "".join(
+        f"<item><title>{t}</title><link>http://x/{t.replace(' ', '-')}</link>"
+        f"<description>&lt;p&gt;{t} details&lt;/p&gt;</description>"
+        f"<pubDate>Sat, {day} Oct 2026 0{i}:00:00 GMT</pubDate></item>"
+        for i, t in enumerate(titles)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{items}</channel></rss>'.encode()
+
+
+ATOM = b"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">
+<entry><id>tag:a,1</id><title>Gold rallies</title><link href="http://a/gold"/>
+<updated>2026-10-17T08:00:00Z</updated><summary>Safe haven bid</summary></entry></feed>"""
+
+
+class FeedServer:
+    """Serves in-memory feeds with ETag / Last-Modified and a response delay."""
+
+    def __init__(self, delay=0.0):
+        self.feeds = {}  # path -> (body, etag)
+        self.requests = []
+        self.delay = delay
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, self.headers.get("If-None-Match")))
+                time.sleep(server.delay)
+                body, etag = server.feeds[self.path]
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", "Sat, 17 Oct 2026 08:00:00 GMT")
+                self.send_header("Content-Type", "application/rss+xml")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def test_parse_rss_and_atom():
+    rss = parse_feed(_rss("Fed holds rates"), "fx")
+    assert rss[0].title == "Fed holds rates" and rss[0].summary == "Fed holds rates details"
+    assert rss[0].published.isoformat() == "2026-10-17T00:00:00+00:00"
+    atom = parse_feed(ATOM, "a")
+    assert atom[0].link == "http://a/gold" and atom[0].published.hour == 8
+
+
+def test_concurrent_conditional_polling_and_dedupe():
+    server = FeedServer(delay=0.2)
+    server.feeds = {
+        "/a": (_rss("Fed holds rates", "USD slips"), '"a1"'),
+        "/b": (_rss("ECB warns"), '"b1"'),
+        "/c": (ATOM, '"c1"'),
+    }
+    store = HeadlineStore(max_age_hours=24 * 365 * 10)
+    ingester = NewsIngester([server.url(p) for p in ("/a", "/b", "/c")], store=store)
+    try:
+        start = time.perf_counter()
+        assert asyncio.run(ingester.poll_once()) == 4
+        assert time.perf_counter() - start < 0.5  # three 0.2s feeds in parallel
+
+        # Unchanged feeds answer 304 and are not re-parsed
+        assert asyncio.run(ingester.poll_once()) == 0
+        assert [etag for _, etag in server.requests[3:]] and all(
+            etag is not None for _, etag in server.requests[3:]
+        )
+        assert all(s["not_modified"] == 1 for s in ingester.stats().values())
+
+        # A changed feed repeating an old item only adds the new one
+        server.feeds["/a"] = (_rss("Fed holds rates", "Dollar index jumps"), '"a2"')
+        assert asyncio.run(ingester.poll_once()) == 1
+        assert len(store) == 5
+    finally:
+        server.close()
+
+
+def test_loader_reads_store_without_network():
+    loader = RSSLoader(feeds=["http://127.0.0.1:9/unreachable"])
+    loader.ingester.store.max_age = 10 * 365 * 86400
+    assert loader.fetch_news() == []
+    loader.ingester.store.add(parse_feed(_rss("One", "Two", "Three", "Four"), "fx"))
+    news = loader.fetch_news(limit_per_feed=3)
+    assert len(news) == 3 and news[0].startswith("Title: Four | Summary: Four details")
+
+
+if __name__ == "__main__":
+    test_parse_rss_and_atom()
+    test_concurrent_conditional_polling_and_dedupe()
+    test_loader_reads_store_without_network()
+    print("News tests PASSED")
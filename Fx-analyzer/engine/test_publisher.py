@@ -0,0 +1,78 @@
+"""Publication protocol checks: snap.bin framing and topic negotiation."""
+import os, sys, asyncio, json
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import zmq
+import zmq.asyncio
+
+from engine.publisher import MarketPublisher, decode_snapshot, encode_snapshot
+
+TICKERS = [
+    {"symbol": "EURUSD", "price": 1.08512, "timestamp": "2026-01-05T12:00:00", "timestamp_ms": 1767614400000},
+    {"symbol": "XAUUSD", "price": 2650.25, "timestamp": "2026-01-05T12:00:00", "timestamp_ms": 1767614400000},
+]
+
+
+def test_snapshot_round_trip():
+    payload = encode_snapshot(TICKERS, sent_ms=42)
+    assert len(payload) == 16 + 28 * len(TICKERS)
+    decoded = decode_snapshot(payload)
+    assert decoded["sent_ms"] == 42
+    assert decoded["tickers"] == [
+        {k: t[k] for k in ("symbol", "price", "timestamp_ms")} for t in TICKERS
+    ]
+    assert decode_snapshot(encode_snapshot([]))["tickers"] == []
+
+
+def test_subscription_prefix_matching():
+    pub = MarketPublisher(socket=None)
+    pub.on_subscription(b"\x01ticker")
+    pub.on_subscription(b"\x01snap")
+    assert pub.wants(b"ticker ") and pub.wants(b"snap.bin") and pub.wants(b"snap.json")
+    assert not pub.wants(b"signal ")
+    pub.on_subscription(b"\x00snap")
+    assert not pub.wants(b"snap.bin")
+    # An unsubscribe without a subscribe is ignored
+    pub.on_subscription(b"\x00signal")
+    assert pub.wants(b"ticker ")
+
+
+def test_only_subscribed_formats_are_sent():
+    async def run():
+        ctx = zmq.asyncio.Context()
+        pub = MarketPublisher.bind(ctx, "inproc://publisher-test")
+        sub = ctx.socket(zmq.SUB)
+        sub.connect("inproc://publisher-test")
+        sub.setsockopt(zmq.SUBSCRIBE, b"snap.bin")
+        try:
+            pub.on_subscription(await asyncio.wait_for(pub.socket.recv(), 1.0))
+            await pub.publish_tickers(TICKERS)
+            await pub.publish_signal({"symbol": "EURUSD", "direction": "BUY"})
+
+            topic, payload = await asyncio.wait_for(sub.recv_multipart(), 1.0)
+            assert topic == b"snap.bin"
+            assert [t["symbol"] for t in decode_snapshot(payload)["tickers"]] == ["EURUSD", "XAUUSD"]
+            # Nothing else (no legacy JSON, no signal) was published
+            assert not await sub.poll(50)
+
+            sub.setsockopt(zmq.SUBSCRIBE, b"ticker")
+            pub.on_subscription(await asyncio.wait_for(pub.socket.recv(), 1.0))
+            await pub.publish_tickers(TICKERS[:1])
+            messages = [await asyncio.wait_for(sub.recv_multipart(), 1.0) for _ in range(2)]
+            legacy = [m for m in messages if len(m) == 1]
+            assert len(legacy) == 1
+            topic, body = legacy[0][0].decode().split(" ", 1)
+            assert topic == "ticker" and json.loads(body)["symbol"] == "EURUSD"
+        finally:
+            sub.close(0)
+            pub.socket.close(0)
+            ctx.term()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_snapshot_round_trip()
+    test_subscription_prefix_matching()
+    test_only_subscribed_formats_are_sent()
+    print("Publisher tests PASSED")
@@ -0,0 +1,67 @@
+"""Research index checks: chunking, BM25 relevance, incremental refresh."""
+import os, sys, tempfile, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.rag.index import ResearchIndex, chunk_text, query_terms
+from engine.rag.loader import RAGLoader
+
+DOCS = {
+    "fed_minutes.txt": "The Federal Reserve is likely to pause rate hikes as inflation cools. USD weakens.",
+    "ecb.txt": "ECB policy outlook: EUR strength expected as the ECB keeps rates high.\n\n" + "filler text " * 120,
+    "crypto/btc.txt": "BTC moving-average backtest: 20/50 crossover reduces drawdown.",
+}
+
+
+def _corpus():
+    root = tempfile.mkdtemp()
+    for name, text in DOCS.items():
+        os.makedirs(os.path.dirname(os.path.join(root, name)), exist_ok=True)
+        with open(os.path.join(root, name), "w") as f:
+            f.write(text)
+    return root
+
+
+def test_chunking_and_query_terms():
+    chunks = chunk_text("a " * 1000 + "\n\nshort paragraph", chunk_chars=300)
+    assert all(len(c) <= 300 for c in chunks) and chunks[-1].endswith("short paragraph")
+    assert query_terms("EUR/USD", "Rates outlook") == ["rates", "outlook", "eurusd", "eur", "usd"]
+
+
+def test_top_k_is_relevant_and_bounded():
+    loader = RAGLoader(_corpus(), top_k=2)
+    context = loader.get_summary_context("EURUSD", query="ECB rates")
+    assert context.count("--- SOURCE:") <= 2
+    assert context.startswith("--- SOURCE: ecb.txt ---")
+    assert "btc" not in context.lower()
+    # No match falls back to each document's opening chunk
+    fallback = loader.get_summary_context(query="zzz")
+    assert fallback.count("--- SOURCE:") == 2
+
+
+def test_refresh_is_incremental_and_persisted():
+    root = _corpus()
+    index = ResearchIndex(root, refresh_interval=0)
+    index.refresh()
+    assert index.reads == 3
+    assert not index.refresh() and index.reads == 3  # nothing re-read
+
+    path = os.path.join(root, "fed_minutes.txt")
+    with open(path, "a") as f:
+        f.write(" Gold rallies on the dovish pivot.")
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    os.remove(os.path.join(root, "crypto/btc.txt"))
+    assert index.refresh() and index.reads == 4
+    assert index.search(["gold"])[0][1].source == "fed_minutes.txt"
+    assert not index.search(["btc"])
+
+    # A new process reuses the persisted chunks without reading any file
+    reloaded = ResearchIndex(root, refresh_interval=0)
+    assert not reloaded.refresh() and reloaded.reads == 0
+    assert [c.text for _, c in reloaded.search(["gold"])] == [c.text for _, c in index.search(["gold"])]
+
+
+if __name__ == "__main__":
+    test_chunking_and_query_terms()
+    test_top_k_is_relevant_and_bounded()
+    test_refresh_is_incremental_and_persisted()
+    print("RAG tests PASSED")
@@ -0,0 +1,194 @@
+"""Report cache checks: per-analyst TTLs, error reports skipped, coalesced analyze jobs, per-symbol reuse."""
+import os, sys, asyncio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import zmq
+import zmq.asyncio
+
+from engine.agent_bridge import AgentAnalysisBridge
+from engine.command_server import CommandServer
+from engine.report_cache import ANALYST_FIELDS, ReportCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _state(**overrides):
+    state = {field: f"{field} text" for fields in ANALYST_FIELDS.values() for field in fields}
+    state.update(overrides)
+    return state
+
+
+class _Orchestrator:
+    """Stands in for WorkflowOrchestrator.run_analysis."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def run_analysis(self, query, active_agents=None, cached_reports=None):
+        self.calls.append(sorted(cached_reports or {}))
+        await asyncio.sleep(0.05)
+        state = _state(user_query=query, final_trade_decision="BUY")
+        for fields in (cached_reports or {}).values():
+            state.update(fields)
+        return state
+
+
+class _QueryOrchestrator(_Orchestrator):
+    """Writes reports that name the question they were written for."""
+
+    async def run_analysis(self, query, active_agents=None, cached_reports=None):
+        self.calls.append((query, sorted(cached_reports or {})))
+        await asyncio.sleep(0.05)
+        state = {field: f"{field} for {query}" for fields in ANALYST_FIELDS.values() for field in fields}
+        for fields in (cached_reports or {}).values():
+            state.update(fields)
+        return state
+
+
+def test_ttls_follow_how_fast_reports_go_stale():
+    clock = _Clock()
+    cache = ReportCache(ttls={}, clock=clock)
+    assert cache.put("aapl", _state()) == list(ANALYST_FIELDS)
+
+    clock.now = 400  # past market (300s), within news (600s)
+    fresh = cache.get("AAPL")
+    assert "market_analyst" not in fresh and "news_analyst" in fresh
+    assert fresh["company_overview_analyst"] == {
+        "company_overview_report": "company_overview_report text",
+        "company_details": "company_details text",
+    }
+    clock.now = 3600
+    assert sorted(cache.get("AAPL")) == [
+        "company_overview_analyst", "fundamentals_analyst", "product_analyst", "shareholder_analyst",
+    ]
+    assert cache.get("MSFT") == {} and cache.stats()["expired"] == 3
+
+
+def test_failed_and_reused_reports_are_not_stored():
+    cache = ReportCache(ttls={"sentiment_analyst": 0})
+    stored = cache.put("AAPL", _state(
+        market_report="市场分析出现错误: 市场分析失败: timeout",
+        news_report="",
+        company_details="公司信息获取失败: boom",
+    ), skip=["fundamentals_analyst"])
+    assert stored == ["shareholder_analyst", "product_analyst"]
+
+
+def test_identical_submissions_share_one_job():
+    bridge = AgentAnalysisBridge()
+    bridge.orchestrator = _Orchestrator()
+
+    async def run():
+        ctx = zmq.asyncio.Context()
+        server = CommandServer(ctx, "inproc://report-cache-test")
+
+        async def agent_analyze(msg, progress):
+            return await bridge.analyze(msg["query"], refresh=bool(msg.get("refresh", False)),
+                                        progress=progress)
+
+        # As bridge.py registers it
+        server.register("ENGINE_AGENT_ANALYZE", agent_analyze, job=True, max_concurrent=1,
+                        coalesce=AgentAnalysisBridge.request_key)
+        serve = asyncio.create_task(server.serve())
+        client = ctx.socket(zmq.DEALER)
+        client.connect("inproc://report-cache-test")
+        try:
+            async def submit(query, **fields):
+                await client.send_json({"cmd": "ENGINE_AGENT_ANALYZE", "query": query, **fields})
+                return await asyncio.wait_for(client.recv_json(), 1.0)
+
+            first = await submit("Analyze AAPL")
+            second = await submit("analyze  aapl")
+            fresh = await submit("Analyze AAPL", refresh=True)
+            await asyncio.sleep(0.3)
+            jobs = [server.job_status(r["job_id"]) for r in (first, second, fresh)]
+            return first, second, fresh, jobs
+        finally:
+            serve.cancel()
+            client.close(0)
+            server.socket.close(0)
+            ctx.term()
+
+    first, second, fresh, jobs = asyncio.run(run())
+    # The repeat joined the first job before the one-at-a-time slot was taken;
+    # a refresh is a different request and runs on its own
+    assert second["job_id"] == first["job_id"] and second["coalesced"]
+    assert fresh["job_id"] != first["job_id"]
+    assert all(job["state"] == "done" for job in jobs)
+    assert jobs[0]["result"]["final_trade_decision"] == "BUY"
+    assert bridge.orchestrator.calls == [[], []]
+
+
+def test_bridge_reuses_reports_across_queries():
+    bridge = AgentAnalysisBridge()
+    bridge.orchestrator = _Orchestrator()
+
+    async def run():
+        await bridge.analyze("Analyze AAPL")
+        later = await bridge.analyze("Should I buy AAPL now?")
+        refreshed = await bridge.analyze("Should I buy AAPL now?", refresh=True)
+        # Lower-case guesses never key the cache ("what" is not a ticker)
+        await bridge.analyze("what about tsla")
+        return later, refreshed
+
+    later, refreshed = asyncio.run(run())
+    calls = bridge.orchestrator.calls
+    # A different question on the same symbol starts from every cached report
+    assert len(calls) == 4 and calls[0] == [] and calls[1] == sorted(ANALYST_FIELDS)
+    assert later["cached_analysts"] == sorted(ANALYST_FIELDS)
+    assert later["market_report"] == "market_report text"
+    assert refreshed["cached_analysts"] == [] and calls[2] == []
+    assert calls[3] == [] and bridge.report_cache.stats()["symbols"] == 1
+
+
+def test_only_single_ticker_queries_key_the_cache():
+    extract = AgentAnalysisBridge._extract_symbol
+    assert extract("Should I buy AAPL now?", strict=True) == "AAPL"
+    assert extract("AAPL: buy or sell AAPL?", strict=True) == "AAPL"
+    assert extract("Is NOW a good time for TSLA", strict=True) == ""
+    assert extract("Compare AAPL and MSFT", strict=True) == ""
+    assert extract("what about tsla", strict=True) == ""
+    # The loose guess (deep agents) still picks one
+    assert extract("Compare AAPL and MSFT") == "AAPL"
+
+
+def test_concurrent_runs_reuse_only_their_own_reports():
+    bridge = AgentAnalysisBridge()
+    bridge.orchestrator = _QueryOrchestrator()
+
+    async def run():
+        await bridge.analyze("Analyze AAPL")
+        aapl, msft = await asyncio.gather(
+            bridge.analyze("Should I buy AAPL now?"), bridge.analyze("Analyze MSFT"),
+        )
+        compared = await bridge.analyze("Compare AAPL and MSFT")
+        return aapl, msft, compared
+
+    aapl, msft, compared = asyncio.run(run())
+    calls = dict(bridge.orchestrator.calls)
+    assert calls["Should I buy AAPL now?"] == sorted(ANALYST_FIELDS)
+    assert calls["Analyze MSFT"] == [] and msft["cached_analysts"] == []
+    assert aapl["market_report"] == "market_report for Analyze AAPL"
+    assert msft["market_report"] == "market_report for Analyze MSFT"
+    # Each run stored its reports under its own symbol
+    assert bridge.report_cache.get("MSFT")["market_analyst"] == {"market_report": "market_report for Analyze MSFT"}
+    assert bridge.report_cache.get("AAPL")["market_analyst"] == {"market_report": "market_report for Analyze AAPL"}
+    # A comparison neither reuses single-ticker reports nor is stored
+    assert calls["Compare AAPL and MSFT"] == [] and compared["cached_analysts"] == []
+    assert bridge.report_cache.stats()["symbols"] == 2
+
+
+if __name__ == "__main__":
+    test_ttls_follow_how_fast_reports_go_stale()
+    test_failed_and_reused_reports_are_not_stored()
+    test_identical_submissions_share_one_job()
+    test_bridge_reuses_reports_across_queries()
+    test_only_single_ticker_queries_key_the_cache()
+    test_concurrent_runs_reuse_only_their_own_reports()
+    print("Report cache tests PASSED")
@@ -0,0 +1,182 @@
+"""Scan scheduler checks: per-symbol isolation, streaming, batching, fetch timeout, escalation queue."""
+import os, sys, asyncio, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from engine.scan_scheduler import ScanResult, ScanScheduler, batched
+
+
+def _frame(price):
+    return pd.DataFrame({"close": [price - 0.001, price]})
+
+
+class _Feed:
+    def __init__(self, prices, delay=0.0):
+        self.prices = prices
+        self.delay = delay
+        self.fetches = 0
+
+    def fetch_many(self, symbols):
+        self.fetches += 1
+        time.sleep(self.delay)
+        return {s: _frame(self.prices[s]) for s in symbols}
+
+    def fetch_data(self, symbol):
+        return _frame(self.prices[symbol])
+
+
+class _Analyzer:
+    def __init__(self, fail=(), slow=(), signals=()):
+        self.fail, self.slow, self.signals = set(fail), set(slow), set(signals)
+
+    def analyze(self, df, symbol=None):
+        if symbol in self.slow:
+            time.sleep(0.3)
+        if symbol in self.fail:
+            raise ValueError(f"bad data for {symbol}")
+        return df
+
+    def check_signals(self, df, symbol):
+        return {"action": "BUY"} if symbol in self.signals else None
+
+
+PRICES = {"EURUSD": 1.1, "GBPUSD": 1.3, "USDJPY": 150.0}
+
+
+def test_one_failure_does_not_abort_scan():
+    scheduler = ScanScheduler(_Feed(PRICES), _Analyzer(fail={"GBPUSD"}, signals={"EURUSD"}))
+    results = asyncio.run(scheduler.scan(list(PRICES)))
+    scheduler.shutdown()
+
+    assert [r.symbol for r in results] == list(PRICES)
+    assert "bad data" in results[1].error and results[1].price is None
+    assert results[0].signal == {"action": "BUY"} and results[0].price == 1.1
+    assert results[2].error is None and results[2].price == 150.0
+
+
+def test_results_stream_as_they_complete():
+    scheduler = ScanScheduler(_Feed(PRICES), _Analyzer(slow={"EURUSD"}), max_workers=3)
+
+    async def run():
+        start = time.monotonic()
+        arrivals = []
+        async for result in scheduler.scan_iter(list(PRICES)):
+            arrivals.append((result.symbol, time.monotonic() - start))
+        return arrivals
+
+    arrivals = asyncio.run(run())
+    scheduler.shutdown()
+    # The slow symbol comes last, and the others did not wait for it
+    assert arrivals[-1][0] == "EURUSD"
+    assert all(elapsed < 0.2 for _, elapsed in arrivals[:-1])
+
+
+def test_results_finishing_together_are_batched():
+    scheduler = ScanScheduler(_Feed(PRICES), _Analyzer(slow={"EURUSD"}), max_workers=3)
+
+    async def run():
+        return [
+            sorted(r.symbol for r in batch)
+            async for batch in batched(scheduler.scan_iter(list(PRICES)), window=0.1)
+        ]
+
+    batches = asyncio.run(run())
+    scheduler.shutdown()
+    # The fast symbols share one batch; the slow one does not hold it back
+    assert batches == [["GBPUSD", "USDJPY"], ["EURUSD"]]
+
+
+def test_fetch_timeout_reuses_last_frames():
+    feed = _Feed(PRICES)
+    scheduler = ScanScheduler(feed, _Analyzer(), fetch_timeout=0.1)
+
+    async def run():
+        first = await scheduler.scan(["EURUSD", "GBPUSD"])
+        feed.delay, feed.prices = 0.5, {**PRICES, "EURUSD": 1.2}
+        start = time.monotonic()
+        stalled = await scheduler.scan(["EURUSD", "GBPUSD", "USDJPY"])
+        return first, stalled, time.monotonic() - start
+
+    first, stalled, elapsed = asyncio.run(run())
+    scheduler.shutdown()
+    assert [r.price for r in first] == [1.1, 1.3]
+    assert elapsed < 0.4
+    assert [r.price for r in stalled[:2]] == [1.1, 1.3]  # last good frames
+    assert stalled[2].error == "No data"  # never fetched, not retried per symbol
+
+
+def test_stalled_fetch_is_not_stacked():
+    feed = _Feed(PRICES)
+    scheduler = ScanScheduler(feed, _Analyzer(), max_workers=1, fetch_timeout=0.1)
+
+    async def run():
+        await scheduler.scan(list(PRICES))
+        feed.delay, feed.prices = 0.4, {**PRICES, "EURUSD": 1.2}
+        stalled = [await scheduler.scan(list(PRICES)) for _ in range(3)]
+        await asyncio.sleep(0.4)
+        recovered = await scheduler.scan(list(PRICES))
+        return stalled, recovered
+
+    stalled, recovered = asyncio.run(run())
+    scheduler.shutdown()
+    # One stuck fetch at a time; the single analysis worker kept analysing
+    assert feed.fetches == 3
+    assert [r.price for r in stalled[-1]] == list(PRICES.values())
+    # The late result refreshed the last frames; the next fetch is live again
+    assert recovered[0].price == 1.2
+
+
+def test_escalations_dedupe_pending_symbols():
+    scheduler = ScanScheduler(_Feed(PRICES), _Analyzer())
+    handled = []
+
+    async def run():
+        assert scheduler.escalate(ScanResult("EURUSD", signal={"action": "BUY"}))
+        assert not scheduler.escalate(ScanResult("EURUSD", signal={"action": "SELL"}))
+        assert scheduler.escalate(ScanResult("GBPUSD", signal={"action": "BUY"}))
+
+        async def handler(result):
+            handled.append(result.symbol)
+            if result.symbol == "GBPUSD":
+                raise RuntimeError("LLM down")  # must not kill the worker
+
+        workers = asyncio.create_task(scheduler.run_escalations(handler, concurrency=1))
+        await asyncio.wait_for(scheduler.escalations.join(), 1)
+        # Handled (even when failing) symbols can be escalated again
+        assert scheduler._pending == set()
+        assert scheduler.escalate(ScanResult("EURUSD", signal={"action": "BUY"}))
+        await asyncio.wait_for(scheduler.escalations.join(), 1)
+        workers.cancel()
+
+    asyncio.run(run())
+    scheduler.shutdown()
+    assert handled == ["EURUSD", "GBPUSD", "EURUSD"]
+
+
+def test_full_escalation_queue_drops_signal():
+    scheduler = ScanScheduler(_Feed(PRICES), _Analyzer(), escalation_queue_size=1)
+
+    async def run():
+        assert scheduler.escalate(ScanResult("EURUSD"))
+        assert not scheduler.escalate(ScanResult("GBPUSD"))
+        # A dropped symbol is not left marked as pending
+        assert scheduler._pending == {"EURUSD"}
+        scheduler.escalations.get_nowait()
+        scheduler.escalations.task_done()
+        scheduler._pending.discard("EURUSD")
+        assert scheduler.escalate(ScanResult("GBPUSD"))
+
+    asyncio.run(run())
+    scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    test_one_failure_does_not_abort_scan()
+    test_results_stream_as_they_complete()
+    test_results_finishing_together_are_batched()
+    test_fetch_timeout_reuses_last_frames()
+    test_stalled_fetch_is_not_stacked()
+    test_escalations_dedupe_pending_symbols()
+    test_full_escalation_queue_drops_signal()
+    print("All scan scheduler tests PASSED")
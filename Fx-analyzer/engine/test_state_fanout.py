@@ -0,0 +1,95 @@
+"""State fan-out checks: shared views, per-agent deltas, deterministic merge."""
+import os, sys, asyncio, random
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.trading_agents.state_fanout import apply_deltas, branch, collect_delta
+
+
+def _analyst(name):
+    """Mimics an analyst: writes its report and appends an execution record."""
+    report_key = name.replace("_analyst", "_report")
+
+    async def process(state):
+        await asyncio.sleep(random.random() * 0.02)
+        state[report_key] = f"{name} report on {state['user_query']}"
+        state["agent_executions"].append({"agent": name})
+        if name == "news_analyst":
+            state["errors"].append("news: feed timeout")
+        return state
+    return process
+
+
+def _base_state():
+    return {
+        "user_query": "AAPL",
+        "company_details": "x" * 100_000,
+        "market_report": "",
+        "news_report": "",
+        "sentiment_report": "",
+        "agent_executions": [{"agent": "company_overview_analyst"}],
+        "errors": [],
+    }
+
+
+def test_branch_shares_read_only_fields():
+    state = _base_state()
+    view = branch(state)
+    assert view["company_details"] is state["company_details"]
+    assert view["agent_executions"] == [] and view["agent_executions"] is not state["agent_executions"]
+    view["market_report"] = "new"
+    view["agent_executions"].append({"agent": "market_analyst"})
+    assert state["market_report"] == "" and len(state["agent_executions"]) == 1
+
+
+def test_parallel_analysts_merge_in_declared_order():
+    names = ["market_analyst", "sentiment_analyst", "news_analyst"]
+
+    async def run(state):
+        tasks = [asyncio.create_task(_analyst(n)(branch(state))) for n in names]
+        results = await asyncio.gather(*tasks)
+        deltas = [collect_delta(state, r, [n.replace("_analyst", "_report")]) for n, r in zip(names, results)]
+        return apply_deltas(state, deltas)
+
+    for seed in range(3):
+        random.seed(seed)
+        state = asyncio.run(run(_base_state()))
+        # Original history kept once, new records appended in analyst order
+        assert [e["agent"] for e in state["agent_executions"]] == ["company_overview_analyst", *names]
+        assert state["errors"] == ["news: feed timeout"]
+        assert state["market_report"] == "market_analyst report on AAPL"
+        assert state["news_report"] == "news_analyst report on AAPL"
+
+
+def test_delta_only_holds_owned_changes():
+    state = _base_state()
+    view = branch(state)
+    view["market_report"] = "mine"
+    view["news_report"] = "not mine"
+    assert collect_delta(state, view, ["market_report"]) == {"market_report": "mine"}
+    # Untouched owned field and empty reports produce nothing to merge
+    assert collect_delta(state, branch(state), ["market_report"]) == {}
+    apply_deltas(state, [{"market_report": "  "}])
+    assert state["market_report"] == ""
+
+
+def test_object_state():
+    class State:
+        def __init__(self):
+            self.market_report = ""
+            self.errors = ["earlier"]
+
+    state = State()
+    view = branch(state)
+    view.market_report = "report"
+    view.errors.append("market: stale quote")
+    apply_deltas(state, [collect_delta(state, view, ["market_report"])])
+    assert state.market_report == "report"
+    assert state.errors == ["earlier", "market: stale quote"]
+
+
+if __name__ == "__main__":
+    test_branch_shares_read_only_fields()
+    test_parallel_analysts_merge_in_declared_order()
+    test_delta_only_holds_owned_changes()
+    test_object_state()
+    print("State fan-out tests PASSED")
@@ -0,0 +1,92 @@
+"""Tick ingestion checks: conflation, forming-bar updates, event-driven frames."""
+import os, sys, asyncio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from engine.mock_bars import MockBarGenerator
+from engine.tick_feed import (
+    Quote,
+    SimulatedTickSource,
+    TickConflator,
+    TickIngestor,
+    apply_quote,
+)
+
+T0 = pd.Timestamp("2026-01-05 12:00")
+
+
+class _Feed:
+    def __init__(self):
+        self.mock = MockBarGenerator(seed=1)
+        self.calls = 0
+
+    def fetch_many(self, symbols, timeframe="M1", limit=500):
+        self.calls += 1
+        return self.mock.frames(symbols, limit, now=T0)
+
+
+def _quote(symbol, bid, seconds=0):
+    return Quote(symbol, (T0 + pd.Timedelta(seconds=seconds)).value, bid, bid + 0.00015)
+
+
+def test_conflator_keeps_latest_moved_quote():
+    c = TickConflator()
+    assert c.ingest([_quote("EURUSD", 1.1), _quote("EURUSD", 1.1001), _quote("GBPUSD", 1.3)])
+    # Repeats of the current quote are not moves
+    assert not c.ingest([_quote("EURUSD", 1.1001), _quote("GBPUSD", 1.3)])
+    dirty = c.drain()
+    assert set(dirty) == {"EURUSD", "GBPUSD"}
+    assert dirty["EURUSD"].bid == 1.1001 and dirty["EURUSD"].ticks == 3
+    assert c.drain() == {} and c.ticks_in == 5 and c.moves == 3
+
+
+def test_apply_quote_updates_forming_bar_then_rolls():
+    df = _Feed().fetch_many(["EURUSD"])["EURUSD"]
+    last_close = df["close"].iloc[-1]
+    high = df["high"].iloc[-1]
+    df = apply_quote(df, _quote("EURUSD", high + 0.001, seconds=20))
+    assert len(df) == 500 and df["close"].iloc[-1] == df["high"].iloc[-1] == high + 0.001
+
+    rolled = apply_quote(df.copy(), _quote("EURUSD", last_close, seconds=75))
+    assert len(rolled) == 500
+    assert rolled["time"].iloc[-1] == T0 + pd.Timedelta(minutes=1)
+    assert rolled["open"].iloc[-1] == rolled["close"].iloc[-1] == last_close
+    assert rolled["time"].iloc[-2] == T0
+
+
+def test_ingestor_only_hands_over_moved_symbols():
+    symbols = [f"SYM{i}" for i in range(20)]
+
+    async def run():
+        # move_probability=0: ticks arrive but nothing moves
+        source = SimulatedTickSource(seed=2, move_probability=0.0, clock=lambda: T0.value)
+        feed = _Feed()
+        ingestor = TickIngestor(source, feed, symbols, poll_interval=0.001)
+        ingestor.start(asyncio.get_running_loop())
+        try:
+            # First ticks set the quotes, then nothing moves for a while
+            first = await asyncio.wait_for(ingestor.next_frames(), 1.0)
+            assert set(first) <= set(symbols)
+            await asyncio.sleep(0.05)
+            assert not ingestor._event.is_set()
+            assert ingestor.conflator.ticks_in > ingestor.conflator.moves
+
+            source.move_probability = 1.0
+            moved = await asyncio.wait_for(ingestor.next_frames(), 1.0)
+            assert moved and feed.calls == 1
+            for symbol in moved:
+                ingestor.mark_published(symbol)
+                assert moved[symbol]["close"].iloc[-1] == ingestor._pending[symbol].bid
+            assert ingestor.stats()["p50_ms"] is not None
+        finally:
+            ingestor.stop()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_conflator_keeps_latest_moved_quote()
+    test_apply_quote_updates_forming_bar_then_rolls()
+    test_ingestor_only_hands_over_moved_symbols()
+    print("Tick feed tests PASSED")
@@ -0,0 +1,298 @@
+"""
+Tick Feed - event-driven quote ingestion with per-symbol conflation.
+
+Instead of re-fetching every symbol's bars on a fixed cadence, a reader
+thread pulls ticks from a TickSource and conflates them into a latest-quote
+map. The event loop is only woken when a quote actually moved, and only the
+symbols that moved are re-analysed and published; however many ticks
+arrived in between, each symbol costs one update.
+
+Each moved quote is folded into that symbol's cached M1 frame as the
+forming bar (bid prices, like MT5 bars), so the streaming indicator engine
+only has to re-peek the last bar. Frames are re-synced from the DataFeed
+periodically.
+
+Sources:
+  - MT5TickSource: ``symbol_info_tick`` from a running MT5 terminal
+  - SimulatedTickSource: seeded random quotes for tests and soak runs
+
+Usage (from bridge.py):
+    ingestor = TickIngestor(source, self.data_feed, SYMBOLS)
+    ingestor.start(asyncio.get_running_loop())
+    while True:
+        frames = await ingestor.next_frames()
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from engine.market_data import MT5Provider
+    from engine.market_data.metatrader import mt5
+    from engine.mock_bars import base_price, pip_size
+except ImportError:
+    from market_data import MT5Provider
+    from market_data.metatrader import mt5
+    from mock_bars import base_price, pip_size
+
+logger = logging.getLogger(__name__)
+
+_MINUTE_NS = 60 * 1_000_000_000
+
+
+@dataclass
+class Quote:
+    """Latest conflated quote for one symbol."""
+
+    symbol: str
+    time: int            # tick time, epoch ns (UTC)
+    bid: float
+    ask: float
+    ticks: int = 1       # raw ticks conflated into this quote
+    received: float = 0.0  # time.monotonic() when the move was ingested
+
+
+# ----------------------------------------------------------------------
+# Tick sources
+# ----------------------------------------------------------------------
+
+
+class TickSource:
+    """Returns the ticks seen since the previous poll."""
+
+    name = "base"
+
+    def available(self) -> bool:
+        return True
+
+    def poll(self, symbols: List[str]) -> List[Quote]:
+        raise NotImplementedError
+
+
+class MT5TickSource(TickSource):
+    """Latest tick per symbol from the MT5 terminal.
+
+    ``symbol_info_tick`` is already conflated by the terminal; repeated calls
+    return the same tick until a new one arrives, which the conflator drops.
+    """
+
+    name = "mt5"
+
+    def __init__(self, provider: Optional[MT5Provider] = None):
+        self.provider = provider or MT5Provider()
+
+    def available(self) -> bool:
+        return self.provider.available()
+
+    def poll(self, symbols):
+        quotes = []
+        for symbol in symbols:
+            tick = mt5.symbol_info_tick(symbol)
+            if tick is None:
+                continue
+            quotes.append(Quote(symbol, int(tick.time_msc) * 1_000_000, float(tick.bid), float(tick.ask)))
+        return quotes
+
+
+class SimulatedTickSource(TickSource):
+    """Seeded random-walk quotes, for tests and soak runs without a terminal.
+
+    Every poll emits ``ticks_per_poll`` ticks per symbol on average; each tick
+    moves the bid with probability ``move_probability`` and otherwise repeats
+    the last quote, so conflation has something to drop.
+    """
+
+    name = "simulated"
+
+    def __init__(self, seed: Optional[int] = None, ticks_per_poll: float = 5.0,
+                 move_probability: float = 0.3, volatility: float = 1.0,
+                 clock=time.time_ns):
+        self.rng = np.random.default_rng(seed)
+        self.ticks_per_poll = ticks_per_poll
+        self.move_probability = move_probability
+        self.volatility = volatility
+        self.clock = clock
+        self._bids: Dict[str, float] = {}
+
+    def poll(self, symbols):
+        symbols = list(symbols)
+        for symbol in symbols:
+            if symbol not in self._bids:
+                self._bids[symbol] = base_price(symbol)
+        counts = self.rng.poisson(self.ticks_per_poll, len(symbols))
+        pips = np.array([pip_size(s) for s in symbols])
+        now = self.clock()
+
+        quotes = []
+        for i, symbol in enumerate(symbols):
+            n = int(counts[i])
+            if n == 0:
+                continue
+            moves = self.rng.random(n) < self.move_probability
+            steps = np.where(moves, self.rng.standard_normal(n) * self.volatility * pips[i], 0.0)
+            bids = self._bids[symbol] + np.cumsum(steps)
+            self._bids[symbol] = float(bids[-1])
+            spread = 1.5 * pips[i]
+            quotes.extend(Quote(symbol, now, float(b), float(b + spread)) for b in bids)
+        return quotes
+
+
+# ----------------------------------------------------------------------
+# Conflation
+# ----------------------------------------------------------------------
+
+
+class TickConflator:
+    """Latest-quote map plus the set of symbols that moved since the last drain."""
+
+    def __init__(self):
+        self.quotes: Dict[str, Quote] = {}
+        self._dirty: Dict[str, Quote] = {}
+        self._lock = threading.Lock()
+        self.ticks_in = 0
+        self.moves = 0
+
+    def ingest(self, ticks: List[Quote]) -> bool:
+        """Returns True if any quote moved."""
+        now = time.monotonic()
+        moved = False
+        with self._lock:
+            self.ticks_in += len(ticks)
+            for tick in ticks:
+                last = self.quotes.get(tick.symbol)
+                if last is not None and tick.bid == last.bid and tick.ask == last.ask:
+                    last.ticks += 1
+                    continue
+                pending = self._dirty.get(tick.symbol)
+                tick.ticks += pending.ticks if pending is not None else 0
+                tick.received = pending.received if pending is not None else now
+                self.quotes[tick.symbol] = tick
+                self._dirty[tick.symbol] = tick
+                self.moves += 1
+                moved = True
+        return moved
+
+    def drain(self) -> Dict[str, Quote]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        return dirty
+
+
+# ----------------------------------------------------------------------
+# Ingestor
+# ----------------------------------------------------------------------
+
+
+def apply_quote(df: pd.DataFrame, quote: Quote) -> pd.DataFrame:
+    """Folds *quote* into *df* as the forming M1 bar (bid prices)."""
+    price = quote.bid
+    minute = pd.Timestamp(quote.time - quote.time % _MINUTE_NS)
+    last_time = df["time"].iloc[-1] if not df.empty else None
+    if last_time is not None and minute < last_time:
+        return df  # stale tick
+    if last_time is not None and minute == last_time:
+        i = df.index[-1]
+        df.loc[i, "close"] = price
+        df.loc[i, "high"] = max(df.loc[i, "high"], price)
+        df.loc[i, "low"] = min(df.loc[i, "low"], price)
+        df.loc[i, "tick_volume"] += quote.ticks
+        return df
+    row = pd.DataFrame({
+        "time": [minute], "open": [price], "high": [price], "low": [price],
+        "close": [price], "tick_volume": [quote.ticks],
+    })
+    return pd.concat([df, row], ignore_index=True).tail(max(len(df), 1)).reset_index(drop=True)
+
+
+class TickIngestor:
+    """Reads ticks on a background thread and hands moved symbols' frames to
+    the event loop."""
+
+    def __init__(self, source: TickSource, data_feed, symbols: List[str],
+                 poll_interval: float = 0.05, resync_interval: float = 60.0):
+        self.source = source
+        self.data_feed = data_feed
+        self.symbols = list(symbols)
+        self.poll_interval = poll_interval
+        self.resync_interval = resync_interval
+        self.conflator = TickConflator()
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self._pending: Dict[str, Quote] = {}
+        self.latencies = deque(maxlen=1000)  # ingest -> publish, seconds
+        self._event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._last_sync = 0.0
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._event = asyncio.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._reader, name="tick-reader", daemon=True)
+        self._thread.start()
+        logger.info("TickIngestor: reading %s ticks for %d symbols", self.source.name, len(self.symbols))
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def _reader(self):
+        while self._running:
+            try:
+                ticks = self.source.poll(self.symbols)
+            except Exception as e:
+                logger.error("TickIngestor: %s poll failed: %s", self.source.name, e)
+                ticks = []
+            if ticks and self.conflator.ingest(ticks):
+                self._loop.call_soon_threadsafe(self._event.set)
+            time.sleep(self.poll_interval)
+
+    def resync(self):
+        """Reloads every symbol's M1 frame from the DataFeed (blocking)."""
+        self.frames.update(self.data_feed.fetch_many(self.symbols))
+        self._last_sync = time.monotonic()
+
+    async def next_frames(self) -> Dict[str, pd.DataFrame]:
+        """Waits until at least one quote moved; returns the moved symbols'
+        frames with the quote applied as the forming bar."""
+        loop = asyncio.get_running_loop()
+        if not self.frames or time.monotonic() - self._last_sync > self.resync_interval:
+            await loop.run_in_executor(None, self.resync)
+
+        await self._event.wait()
+        self._event.clear()
+        self._pending = self.conflator.drain()
+
+        frames = {}
+        for symbol, quote in self._pending.items():
+            df = self.frames.get(symbol)
+            if df is None:
+                continue
+            df = apply_quote(df, quote)
+            self.frames[symbol] = df
+            frames[symbol] = df.copy()
+        return frames
+
+    def mark_published(self, symbol: str):
+        quote = self._pending.get(symbol)
+        if quote is not None:
+            self.latencies.append(time.monotonic() - quote.received)
+
+    def stats(self) -> dict:
+        lat = sorted(self.latencies)
+        return {
+            "ticks_in": self.conflator.ticks_in,
+            "moves": self.conflator.moves,
+            "p50_ms": round(lat[len(lat) // 2] * 1000, 2) if lat else None,
+            "p99_ms": round(lat[int(len(lat) * 0.99)] * 1000, 2) if lat else None,
+        }
@@ -39,6 +39,7 @@ class AgentState(MessagesState):
     fundamentals_report: str = ""  # 基本面分析师报告
     shareholder_report: str = ""  # 股东结构分析师报告
     product_report: str = ""  # 产品分析师报告
+    cached_analysts: List[str] = []  # 本轮直接复用缓存报告的分析师（每轮独立，随状态传递）
     
     # 研究员辩论状态
     investment_debate_state: Dict[str, Any] = {}
@@ -7,6 +7,8 @@ from langchain.schema import HumanMessage, AIMessage
 
 from .agent_states import AgentState
 from .mcp_manager import MCPManager
+from .context_builder import AGENT_ROLES, LLM_SUMMARIES, ContextBuilder, budget_for
+from .debate import INVESTMENT_DEBATE, RISK_DEBATE
 
 
 class BaseAgent(ABC):
@@ -29,6 +31,9 @@ class BaseAgent(ABC):
         # 延迟创建智能体实例，等到MCP工具初始化完成后再创建
         self.agent = None
         
+        # 按角色预算组装上下文，长报告和早期辩论发言用缓存的摘要代替
+        self.context_builder = ContextBuilder(budget_for(agent_name), self._summarise if LLM_SUMMARIES else None)
+        
         print(f"智能体 {agent_name} 初始化完成，MCP工具: {'启用' if self.mcp_enabled else '禁用'}")
     
     def ensure_agent_created(self):
@@ -47,13 +52,11 @@ class BaseAgent(ABC):
         """处理智能体逻辑 - 子类必须实现"""
         pass
     
-    def build_context_prompt(self, state: AgentState) -> str:
-        """构建上下文提示词"""
-        context_parts = []
-        
+    async def build_context_prompt(self, state: AgentState) -> str:
+        """构建上下文提示词（超出角色token预算时压缩长报告和早期辩论发言）"""
         # 添加当前日期时间信息
         current_datetime = datetime.now()
-        context_parts.append(f"当前日期时间: {current_datetime.strftime('%Y年%m月%d日 %H:%M:%S')} ({current_datetime.strftime('%A')})")
+        date_line = f"当前日期时间: {current_datetime.strftime('%Y年%m月%d日 %H:%M:%S')} ({current_datetime.strftime('%A')})"
         
         # 处理状态可能是字典或AgentState对象的情况
         if isinstance(state, dict):
@@ -62,65 +65,56 @@ class BaseAgent(ABC):
             trader_investment_plan = state.get('trader_investment_plan', '')
             
             # 获取报告
-            company_overview_report = state.get('company_overview_report', '')
-            market_report = state.get('market_report', '')
-            sentiment_report = state.get('sentiment_report', '')
-            news_report = state.get('news_report', '')
-            fundamentals_report = state.get('fundamentals_report', '')
-            shareholder_report = state.get('shareholder_report', '')
-            product_report = state.get('product_report', '')
-            
             reports = {
-                "company_overview_report": company_overview_report,
-                "market_report": market_report,
-                "sentiment_report": sentiment_report,
-                "news_report": news_report,
-                "fundamentals_report": fundamentals_report,
-                "shareholder_report": shareholder_report,
-                "product_report": product_report
+                "company_overview_report": state.get('company_overview_report', ''),
+                "market_report": state.get('market_report', ''),
+                "sentiment_report": state.get('sentiment_report', ''),
+                "news_report": state.get('news_report', ''),
+                "fundamentals_report": state.get('fundamentals_report', ''),
+                "shareholder_report": state.get('shareholder_report', ''),
+                "product_report": state.get('product_report', '')
             }
             
             # 获取辩论历史
-            investment_debate_state = state.get('investment_debate_state', {})
-            risk_debate_state = state.get('risk_debate_state', {})
-            investment_history = investment_debate_state.get("history", "")
-            risk_history = risk_debate_state.get("history", "")
-            
-            debate_summary = ""
-            if investment_history:
-                debate_summary += f"投资辩论历史:\n{investment_history}\n\n"
-            if risk_history:
-                debate_summary += f"风险管理辩论历史:\n{risk_history}\n\n"
-            debate_summary = debate_summary.strip()
+            investment_history = state.get('investment_debate_state', {}).get("history", "")
+            risk_history = state.get('risk_debate_state', {}).get("history", "")
         else:
             user_query = state.user_query
             investment_plan = state.investment_plan
             trader_investment_plan = state.trader_investment_plan
             reports = state.get_all_reports()
-            debate_summary = state.get_debate_summary()
+            investment_history = state.investment_debate_state.get("history", "")
+            risk_history = state.risk_debate_state.get("history", "")
         
-        # 基础信息
-        context_parts.append(f"用户问题: {user_query}")
-        # 交易日期和市场类型信息现在通过当前日期时间提供
-        
-        # 分析师报告
-        for report_name, report_content in reports.items():
-            if report_content.strip():
-                context_parts.append(f"{report_name}: {report_content}")
-        
-        # 辩论历史
-        if debate_summary:
-            context_parts.append(f"辩论历史:\n{debate_summary}")
+        # 基础信息（交易日期和市场类型信息现在通过当前日期时间提供）
+        head = [date_line, f"用户问题: {user_query}"]
         
-        # 投资计划
-        if investment_plan:
-            context_parts.append(f"研究经理决策: {investment_plan}")
+        # 辩论历史：压缩时保留最近一轮的发言原文
+        debates = [
+            ("投资辩论历史", investment_history, len(INVESTMENT_DEBATE[1])),
+            ("风险管理辩论历史", risk_history, len(RISK_DEBATE[1])),
+        ]
         
-        # 交易员计划
-        if trader_investment_plan:
-            context_parts.append(f"交易员计划: {trader_investment_plan}")
+        # 投资计划和交易员计划
+        tail = [
+            f"研究经理决策: {investment_plan}" if investment_plan else "",
+            f"交易员计划: {trader_investment_plan}" if trader_investment_plan else "",
+        ]
         
-        return "\n\n".join(context_parts)
+        return await self.context_builder.build(head, reports, debates, tail)
+    
+    async def _summarise(self, text: str, max_tokens: int) -> str:
+        """用LLM压缩长报告或早期发言（结果由ContextBuilder缓存复用）"""
+        prompt = (
+            f"请将以下内容压缩为不超过{max_tokens}个token的摘要，保留关键数据、结论和论据，"
+            f"不要添加新的观点，直接输出摘要：\n\n{text}"
+        )
+        response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+        return response.content
+    
+    def uses_analyst_context(self) -> bool:
+        """分析师只用基础信息作上下文；风险辩论者（同样以 _analyst 结尾）按角色预算组装完整上下文"""
+        return self.agent_name.endswith('_analyst') and self.agent_name not in AGENT_ROLES
     
     def build_analyst_context_prompt(self, state: AgentState) -> str:
         """为分析师构建上下文提示词（包含company_details占位符）"""
@@ -174,11 +168,10 @@ class BaseAgent(ABC):
                             system_prompt
                             + "\n\n输出格式要求：请将本次输出写成一篇完整的说明文，使用连续段落表述，不要使用标题符号（如##）、项目符号或编号，保持逻辑清晰、语言连贯。若需输出代码/伪代码，可使用代码块，不受上述限制。"
                         )
-                        is_analyst = self.agent_name.endswith('_analyst')
-                        if is_analyst:
+                        if self.uses_analyst_context():
                             context_prompt = self.build_analyst_context_prompt(state)
                         else:
-                            context_prompt = self.build_context_prompt(state)
+                            context_prompt = await self.build_context_prompt(state)
                         
                         # 新的ProgressManager接口
                         progress_tracker.start_agent(
@@ -209,11 +202,10 @@ class BaseAgent(ABC):
                 )
             if 'context_prompt' not in locals():
                 # 检查是否是分析师，如果是则使用专门的分析师上下文
-                is_analyst = self.agent_name.endswith('_analyst')
-                if is_analyst:
+                if self.uses_analyst_context():
                     context_prompt = self.build_analyst_context_prompt(state)
                 else:
-                    context_prompt = self.build_context_prompt(state)
+                    context_prompt = await self.build_context_prompt(state)
             
             # 将系统和上下文组合成一个系统消息
             system_level_prompt = f"""{system_prompt}
@@ -0,0 +1,86 @@
+"""取消与时限 - 用 asyncio.Event 和任务取消代替定时轮询
+
+一次分析对应一个 CancelScope。智能体在范围内以任务形式运行（run），
+cancel() 会设置事件并立即取消所有登记的任务，CancelledError 直接打断
+正在等待的 LLM 请求、调度器排队和 MCP 工具调用，它们在 finally / async with
+中释放的并发槽位和预算随之立即归还，而不是等到下一次轮询。
+run() 还可以带单个智能体的时限，超时时只取消该智能体并抛出 asyncio.TimeoutError，
+由调用方保留其余智能体的结果。
+
+旧的 cancel_checker 回调仍可通过 watch() 接入：由一个后台任务检查回调，
+一旦为真就取消整个范围。
+
+范围经 contextvar 传递：run() 创建的任务及其子任务中 current_scope() 返回该范围，
+所以同一个编排器上并发的多次分析各用各的范围，取消其中一次不影响其他。
+"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional, Set
+
+CANCEL_REASON = "分析已被用户取消"
+
+_current: ContextVar[Optional["CancelScope"]] = ContextVar("cancel_scope", default=None)
+
+
+def current_scope() -> Optional["CancelScope"]:
+    """当前任务所在的取消范围（不在任何范围内时为 None）"""
+    return _current.get()
+
+
+class CancelScope:
+    """一次分析的取消范围"""
+
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.reason = ""
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+    def cancel(self, reason: str = CANCEL_REASON):
+        """设置取消事件并立即取消范围内所有任务"""
+        if self.event.is_set():
+            return
+        self.reason = reason
+        self.event.set()
+        for task in list(self._tasks):
+            task.cancel(reason)
+
+    def check(self):
+        """已取消时抛出 CancelledError（节点边界处的同步检查）"""
+        if self.event.is_set():
+            raise asyncio.CancelledError(self.reason)
+
+    def track(self, task: asyncio.Task) -> asyncio.Task:
+        """登记任务，范围取消时一并取消"""
+        if self.event.is_set():
+            task.cancel(self.reason)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def run(self, coro: Awaitable, timeout: Optional[float] = None):
+        """在范围内运行 coro；超过 timeout 秒时取消它并抛出 asyncio.TimeoutError"""
+        self.check()
+        # 任务创建时复制当前上下文：任务内（含其子任务）current_scope() 为本范围
+        token = _current.set(self)
+        try:
+            task = self.track(asyncio.ensure_future(coro))
+        finally:
+            _current.reset(token)
+        if timeout:
+            return await asyncio.wait_for(task, timeout)
+        return await task
+
+    def watch(self, checker: Callable[[], bool], interval: float = 0.3) -> asyncio.Task:
+        """兼容旧的取消回调：后台检查 checker()，为真时取消整个范围"""
+        async def poll():
+            while not self.event.is_set():
+                if checker():
+                    self.cancel()
+                    return
+                await asyncio.sleep(interval)
+        return asyncio.create_task(poll())
@@ -0,0 +1,252 @@
+"""上下文构建 - 按角色 token 预算组装下游智能体的上下文
+
+研究员、风险辩论者、经理和交易员的上下文包含全部分析师报告和完整辩论记录，
+每多一轮辩论，后续每次调用的提示词都更长。ContextBuilder 先按原样组装，
+在角色预算内则原样返回；超出时按以下顺序压缩，直到放得下：
+
+1. 辩论中较早的发言换成摘要，最近一轮发言保留原文；
+2. 超过 REPORT_SUMMARY_TOKENS 的分析师报告换成摘要；
+3. 仍然超出时按比例截断报告（最近一轮发言和计划不截断）。
+
+摘要按（原文, 目标长度）缓存在进程级 SummaryCache 中，由所有智能体共享：
+早期发言的原文在之后各轮不再变化，所以每段发言、每份报告只摘要一次，
+并发请求同一段摘要时只调用一次摘要函数。
+
+预算可通过 CONTEXT_BUDGETS="researcher=8000,risk_manager=12000" 覆盖，0 表示不限。
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# 各角色的上下文预算（token）
+DEFAULT_BUDGETS = {
+    "researcher": 8000,
+    "risk_debater": 8000,
+    "research_manager": 12000,
+    "trader": 10000,
+    "risk_manager": 12000,
+}
+
+AGENT_ROLES = {
+    "bull_researcher": "researcher",
+    "bear_researcher": "researcher",
+    # 名字以 _analyst 结尾，但读的是报告和辩论记录而不是分析师上下文
+    "aggressive_risk_analyst": "risk_debater",
+    "safe_risk_analyst": "risk_debater",
+    "neutral_risk_analyst": "risk_debater",
+    "research_manager": "research_manager",
+    "trader": "trader",
+    "risk_manager": "risk_manager",
+}
+
+# 用LLM生成摘要（false 时直接截断，不额外调用LLM）
+LLM_SUMMARIES = os.getenv("CONTEXT_LLM_SUMMARY", "true").lower() == "true"
+
+# 单段早期发言和单份报告的摘要长度（token）
+TURN_SUMMARY_TOKENS = int(os.getenv("CONTEXT_TURN_SUMMARY_TOKENS", "200"))
+REPORT_SUMMARY_TOKENS = int(os.getenv("CONTEXT_REPORT_SUMMARY_TOKENS", "800"))
+
+Summariser = Callable[[str, int], Awaitable[str]]
+
+TRUNCATED = "…(已截断)"
+
+_CJK = re.compile(r"[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符约 1 token/字，其余约 4 字符/token"""
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk) // 4
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """截断到不超过 max_tokens 个 token（含截断标记）"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max_tokens - estimate_tokens(TRUNCATED)
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= limit:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low].rstrip() + TRUNCATED
+
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """'researcher=8000,trader=0' -> {role: tokens}"""
+    budgets = {}
+    for part in (spec or "").split(","):
+        role, _, value = part.strip().partition("=")
+        if role and value.strip().isdigit():
+            budgets[role.strip()] = int(value)
+    return budgets
+
+
+def budget_for(agent_name: str) -> int:
+    """智能体所属角色的上下文预算（0 表示不限）"""
+    role = AGENT_ROLES.get(agent_name, agent_name)
+    budgets = {**DEFAULT_BUDGETS, **parse_budgets(os.getenv("CONTEXT_BUDGETS", ""))}
+    return budgets.get(role, 0)
+
+
+def split_turns(history: str) -> List[str]:
+    """按 '【发言者 第N轮】' 标记拆分辩论记录"""
+    return [turn for turn in re.split(r"\n\n(?=【)", history or "") if turn.strip()]
+
+
+class SummaryCache:
+    """摘要缓存（LRU），并发请求同一摘要时共享同一次计算"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.metrics = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    @staticmethod
+    def key(text: str, max_tokens: int) -> str:
+        return hashlib.sha256(f"{max_tokens}\0{text}".encode("utf-8")).hexdigest()
+
+    async def get_or_create(self, text: str, max_tokens: int, create: Callable[[], Awaitable[str]]) -> str:
+        key = self.key(text, max_tokens)
+        while True:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.metrics["hits"] += 1
+                return self._entries[key]
+            pending = self._pending.get(key)
+            if pending is None:
+                break
+            self.metrics["coalesced"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # 正在计算的调用方被取消（如超时），由本调用方重新计算
+
+        self.metrics["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            summary = await create()
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._pending.pop(key, None)
+        future.set_result(summary)
+        self._entries[key] = summary
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return summary
+
+    def stats(self) -> dict:
+        return {**self.metrics, "entries": len(self._entries)}
+
+
+class ContextBuilder:
+    """在预算内组装上下文：原文 -> 早期发言摘要 -> 报告摘要 -> 截断"""
+
+    def __init__(self, budget: int, summariser: Optional[Summariser] = None,
+                 cache: Optional[SummaryCache] = None):
+        self.budget = budget
+        self.summariser = summariser
+        self.cache = cache if cache is not None else get_summary_cache()
+
+    async def summarise(self, text: str, max_tokens: int) -> str:
+        """缓存的摘要；没有摘要函数或摘要失败时退化为截断"""
+        if estimate_tokens(text) <= max_tokens:
+            return text
+
+        if self.summariser is None:
+            return truncate_tokens(text, max_tokens)
+
+        async def create():
+            summary = (await self.summariser(text, max_tokens) or "").strip()
+            if not summary:
+                raise ValueError("摘要为空")
+            return truncate_tokens(summary, max_tokens)
+
+        try:
+            return await self.cache.get_or_create(text, max_tokens, create)
+        except Exception as e:
+            # 不缓存失败结果，下次调用会重新尝试摘要
+            print(f"⚠️ 摘要失败，改为截断: {e}")
+            return truncate_tokens(text, max_tokens)
+
+    @staticmethod
+    def render(head: List[str], reports: Dict[str, str], debates: List[Tuple[str, str, int]],
+               tail: List[str]) -> str:
+        """与原 build_context_prompt 相同的排版"""
+        parts = list(head)
+        parts += [f"{name}: {content}" for name, content in reports.items() if content.strip()]
+        debate_summary = "\n\n".join(f"{title}:\n{history}" for title, history, _ in debates if history).strip()
+        if debate_summary:
+            parts.append(f"辩论历史:\n{debate_summary}")
+        parts += [line for line in tail if line]
+        return "\n\n".join(parts)
+
+    async def _condense_debate(self, history: str, keep: int) -> str:
+        """保留最近 keep 段发言原文，更早的发言换成摘要"""
+        turns = split_turns(history)
+        if len(turns) <= keep:
+            return history
+        earlier, recent = turns[:len(turns) - keep], turns[len(turns) - keep:]
+
+        async def condense(turn: str) -> str:
+            header, _, body = turn.partition("\n") if turn.startswith("【") else ("", "", turn)
+            summary = await self.summarise(body, TURN_SUMMARY_TOKENS)
+            if summary == body:
+                return turn
+            return f"{header}\n(摘要) {summary}" if header else f"(摘要) {summary}"
+
+        condensed = await asyncio.gather(*(condense(turn) for turn in earlier))
+        return "\n\n" + "\n\n".join(list(condensed) + recent)
+
+    async def build(self, head: List[str], reports: Dict[str, str],
+                    debates: List[Tuple[str, str, int]], tail: List[str]) -> str:
+        """debates 为 [(标题, 辩论记录, 保留原文的最近发言数), ...]"""
+        prompt = self.render(head, reports, debates, tail)
+        if not self.budget or estimate_tokens(prompt) <= self.budget:
+            return prompt
+
+        histories = await asyncio.gather(*(self._condense_debate(h, keep) for _, h, keep in debates))
+        debates = [(title, history, keep) for (title, _, keep), history in zip(debates, histories)]
+        prompt = self.render(head, reports, debates, tail)
+        if estimate_tokens(prompt) <= self.budget:
+            return prompt
+
+        names = [name for name, content in reports.items() if content.strip()]
+        summaries = await asyncio.gather(*(self.summarise(reports[n], REPORT_SUMMARY_TOKENS) for n in names))
+        reports = dict(zip(names, summaries))
+        prompt = self.render(head, reports, debates, tail)
+        overflow = estimate_tokens(prompt) - self.budget
+        if overflow <= 0 or not reports:
+            return prompt
+
+        # 最后手段：按比例截断各报告（每份多留 1 token 抵消分段估算的取整误差）
+        overflow += len(reports)
+        total = sum(estimate_tokens(r) for r in reports.values())
+        scale = max(0.0, 1 - overflow / max(total, 1))
+        reports = {n: truncate_tokens(r, int(estimate_tokens(r) * scale)) for n, r in reports.items()}
+        return self.render(head, reports, debates, tail)
+
+
+_summary_cache: Optional[SummaryCache] = None
+
+
+def get_summary_cache() -> SummaryCache:
+    """进程级摘要缓存，由所有智能体共享"""
+    global _summary_cache
+    if _summary_cache is None:
+        _summary_cache = SummaryCache(int(os.getenv("CONTEXT_SUMMARY_CACHE", "512")))
+    return _summary_cache
@@ -0,0 +1,59 @@
+"""并行辩论 - 同一轮的参与者并发发言，再按固定顺序合并
+
+顺序模式下每次发言都要等上一位说完（多空各一次、风险三方各一次为一轮）。
+并行模式下，一轮内的所有参与者基于上一轮结束时的辩论记录同时发言，
+合并时按参与者的固定顺序追加到 history，因此结果与完成先后无关。
+每位参与者拿到的快照中 count 取其在顺序模式下的发言序号，
+所以首轮判断和“第N轮”标注与顺序模式保持一致。
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from .state_fanout import get_field, state_view  # noqa: F401  (供编排器复用)
+
+# (状态字段, 参与者发言顺序)
+INVESTMENT_DEBATE = ("investment_debate_state", ["bull_researcher", "bear_researcher"])
+RISK_DEBATE = ("risk_debate_state", ["aggressive_risk_analyst", "safe_risk_analyst", "neutral_risk_analyst"])
+
+
+def rounds_completed(debate: Dict[str, Any], participants: int) -> int:
+    """已完成的完整轮数"""
+    return int((debate or {}).get("count", 0)) // max(participants, 1)
+
+
+def round_snapshot(debate: Dict[str, Any], position: int) -> Dict[str, Any]:
+    """第 position 位参与者看到的辩论状态（上一轮结束时的记录）"""
+    snapshot = dict(debate or {})
+    snapshot["count"] = int(snapshot.get("count", 0)) + position
+    return snapshot
+
+
+def merge_round(debate: Dict[str, Any], turns: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                participants: int) -> Dict[str, Any]:
+    """按参与者顺序合并一轮发言
+
+    turns 为 [(快照, 发言后的辩论状态), ...]，顺序即参与者顺序（跳过的参与者不在其中）。
+    各参与者独占的字段（如 bull_history、current_safe_response）直接采用；
+    多人同时写入的字段（如投资辩论共用的 current_response）改为本轮完整发言记录，
+    让下一轮每位参与者都能看到其他人的观点。count 按完整一轮推进。
+    """
+    merged = dict(debate or {})
+    history = merged.get("history", "")
+    segments: List[str] = []
+    written: Dict[str, List[Any]] = {}
+
+    for snapshot, result in turns:
+        result = result or {}
+        new_history = result.get("history", history)
+        segments.append(new_history[len(history):] if new_history.startswith(history) else new_history)
+        for key, value in result.items():
+            if key in ("history", "count") or value == snapshot.get(key):
+                continue
+            written.setdefault(key, []).append(value)
+
+    transcript = "".join(segments)
+    merged["history"] = history + transcript
+    for key, values in written.items():
+        merged[key] = values[0] if len(values) == 1 else transcript.strip()
+    merged["count"] = int(merged.get("count", 0)) + participants
+    return merged
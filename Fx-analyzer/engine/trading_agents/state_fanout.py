@@ -0,0 +1,76 @@
+"""状态分发 - 并发智能体共享只读状态，各自返回增量，再由归并函数按顺序应用
+
+并发执行的智能体不再各自深拷贝整个 AgentState（报告、消息、执行历史全部复制），
+而是拿到一个浅拷贝视图：报告等大字段与主状态共享引用，只追加的历史列表换成空列表。
+智能体写入的报告字段和追加的历史记录都落在自己的视图中，
+collect_delta 只取出这部分增量，apply_deltas 按固定顺序写回主状态。
+视图的创建成本只与字段数量有关，与报告长度和历史条数无关。
+"""
+
+import copy
+from typing import Any, Dict, Iterable, List
+
+# 智能体只会追加的列表字段（dict 状态下执行记录写在 agent_executions）
+APPEND_ONLY_FIELDS = ("agent_execution_history", "agent_executions", "mcp_tool_calls", "warnings", "errors")
+
+
+def get_field(state, key: str, default=None):
+    """兼容字典或对象形式的状态读取"""
+    if isinstance(state, dict):
+        return state.get(key, default)
+    return getattr(state, key, default)
+
+
+def set_field(state, key: str, value: Any):
+    """兼容字典或对象形式的状态写入"""
+    if isinstance(state, dict):
+        state[key] = value
+    else:
+        setattr(state, key, value)
+
+
+def state_view(state, **overrides):
+    """浅拷贝状态并替换指定字段（不复制报告和历史列表）"""
+    if isinstance(state, dict):
+        view = dict(state)
+        view.update(overrides)
+        return view
+    view = copy.copy(state)
+    for key, value in overrides.items():
+        setattr(view, key, value)
+    return view
+
+
+def branch(state):
+    """为一个并发智能体创建视图：共享只读字段，只追加字段换成独立的空列表"""
+    fresh = {key: [] for key in APPEND_ONLY_FIELDS if isinstance(state, dict) or hasattr(state, key)}
+    return state_view(state, **fresh)
+
+
+def collect_delta(state, view, owned: Iterable[str]) -> Dict[str, Any]:
+    """取出视图相对主状态的增量：owned 中被改写的字段 + 新追加的历史记录"""
+    delta: Dict[str, Any] = {}
+    for key in owned:
+        value = get_field(view, key)
+        if value is not None and value is not get_field(state, key):
+            delta[key] = value
+    for key in APPEND_ONLY_FIELDS:
+        added = get_field(view, key)
+        if isinstance(added, list) and added:
+            delta[key] = added
+    return delta
+
+
+def apply_deltas(state, deltas: List[Dict[str, Any]]):
+    """按给定顺序把增量写回主状态：列表字段追加，其余字段覆盖（空字符串不覆盖）"""
+    for delta in deltas:
+        for key, value in delta.items():
+            if key in APPEND_ONLY_FIELDS:
+                current = get_field(state, key)
+                if not isinstance(current, list):
+                    current = []
+                    set_field(state, key, current)
+                current.extend(value)
+            elif not (isinstance(value, str) and not value.strip()):
+                set_field(state, key, value)
+    return state
@@ -8,6 +8,9 @@ from dotenv import load_dotenv
 from .agent_states import AgentState
 from .mcp_manager import MCPManager
 from .progress_tracker import ProgressTracker
+from .cancellation import CANCEL_REASON, CancelScope, current_scope
+from .debate import INVESTMENT_DEBATE, RISK_DEBATE, merge_round, round_snapshot, rounds_completed
+from .state_fanout import apply_deltas, branch, collect_delta, get_field, set_field, state_view
 from .agents.analysts import (
     CompanyOverviewAnalyst, MarketAnalyst, SentimentAnalyst, NewsAnalyst, FundamentalsAnalyst, ShareholderAnalyst, ProductAnalyst
 )
@@ -18,6 +21,17 @@ from .agents.risk_management import (
 )
 
 
+# 并行分析师及其各自写入的报告字段（顺序即归并顺序）
+PARALLEL_ANALYSTS = {
+    "market_analyst": "market_report",
+    "sentiment_analyst": "sentiment_report",
+    "news_analyst": "news_report",
+    "fundamentals_analyst": "fundamentals_report",
+    "shareholder_analyst": "shareholder_report",
+    "product_analyst": "product_report",
+}
+
+
 class WorkflowOrchestrator:
     """工作流编排器 - 管理整个智能体交互流程"""
     
@@ -39,6 +53,12 @@ class WorkflowOrchestrator:
         self.max_risk_debate_rounds = int(os.getenv("MAX_RISK_DEBATE_ROUNDS", "2"))
         self.debug_mode = os.getenv("DEBUG_MODE", "true").lower() == "true"
         self.verbose_logging = os.getenv("VERBOSE_LOGGING", "true").lower() == "true"
+        # 并行辩论：每轮参与者同时发言（默认关闭，保持顺序辩论）
+        self.parallel_debate = os.getenv("PARALLEL_DEBATE", "false").lower() == "true"
+        # 单个智能体的时限（秒，0 表示不限），超时只丢弃该智能体的输出
+        self.agent_timeout = float(os.getenv("AGENT_TIMEOUT", "300"))
+        # 进行中各次分析的取消范围（每次分析一个，经 contextvar 传给节点和智能体）
+        self.active_scopes: Set[CancelScope] = set()
         
         # 创建状态图
         self.workflow = self._create_workflow()
@@ -93,15 +113,21 @@ class WorkflowOrchestrator:
         # 新增：分析师并行聚合节点
         workflow.add_node("analysts_parallel", self._analysts_parallel_node)
         
-        workflow.add_node("bull_researcher", self._bull_researcher_node)
-        workflow.add_node("bear_researcher", self._bear_researcher_node)
+        if self.parallel_debate:
+            workflow.add_node("investment_debate_round", self._investment_debate_round_node)
+        else:
+            workflow.add_node("bull_researcher", self._bull_researcher_node)
+            workflow.add_node("bear_researcher", self._bear_researcher_node)
         workflow.add_node("research_manager", self._research_manager_node)
         
         workflow.add_node("trader", self._trader_node)
         
-        workflow.add_node("aggressive_risk_analyst", self._aggressive_risk_analyst_node)
-        workflow.add_node("safe_risk_analyst", self._safe_risk_analyst_node)
-        workflow.add_node("neutral_risk_analyst", self._neutral_risk_analyst_node)
+        if self.parallel_debate:
+            workflow.add_node("risk_debate_round", self._risk_debate_round_node)
+        else:
+            workflow.add_node("aggressive_risk_analyst", self._aggressive_risk_analyst_node)
+            workflow.add_node("safe_risk_analyst", self._safe_risk_analyst_node)
+            workflow.add_node("neutral_risk_analyst", self._neutral_risk_analyst_node)
         workflow.add_node("risk_manager", self._risk_manager_node)
         
         # 设置入口点
@@ -112,6 +138,10 @@ class WorkflowOrchestrator:
         # 概述后进入分析师并行节点（内部并发执行6个分析师）
         workflow.add_edge("company_overview_analyst", "analysts_parallel")
         
+        if self.parallel_debate:
+            self._add_parallel_debate_edges(workflow)
+            return workflow.compile()
+
         # 第一阶段：分析师并行（在单独节点中完成），完成后进入研究员辩论
         workflow.add_edge("analysts_parallel", "bull_researcher")
         
@@ -167,6 +197,29 @@ class WorkflowOrchestrator:
         workflow.add_edge("risk_manager", END)
         
         return workflow.compile()
+
+    def _add_parallel_debate_edges(self, workflow: StateGraph):
+        """并行辩论模式的边：每个辩论节点执行一整轮，未达轮数则回到自身"""
+        workflow.add_edge("analysts_parallel", "investment_debate_round")
+        workflow.add_conditional_edges(
+            "investment_debate_round",
+            self._should_continue_parallel_investment_debate,
+            {
+                "investment_debate_round": "investment_debate_round",
+                "research_manager": "research_manager"
+            }
+        )
+        workflow.add_edge("research_manager", "trader")
+        workflow.add_edge("trader", "risk_debate_round")
+        workflow.add_conditional_edges(
+            "risk_debate_round",
+            self._should_continue_parallel_risk_debate,
+            {
+                "risk_debate_round": "risk_debate_round",
+                "risk_manager": "risk_manager"
+            }
+        )
+        workflow.add_edge("risk_manager", END)
     
     # 节点处理函数
     async def _company_overview_analyst_node(self, state: AgentState) -> AgentState:
@@ -177,8 +230,11 @@ class WorkflowOrchestrator:
             self._skip_agent("company_overview_analyst")
             self._check_cancel()
             return state
+        if "company_overview_analyst" in (get_field(state, 'cached_analysts') or []):
+            print("♻️ 复用缓存的公司概述")
+            return state
         # 不再在这里调用start_agent，让BaseAgent自己处理
-        result = await self.agents["company_overview_analyst"].process(state, self.progress_manager)
+        result = await self._run_agent("company_overview_analyst", state)
         self._check_cancel()
         return result
 
@@ -191,7 +247,7 @@ class WorkflowOrchestrator:
             self._check_cancel()
             return state
         # 不再在这里调用start_agent，让BaseAgent自己处理
-        result = await self.agents["market_analyst"].process(state, self.progress_manager)
+        result = await self._run_agent("market_analyst", state)
         self._check_cancel()
         return result
     
@@ -204,7 +260,7 @@ class WorkflowOrchestrator:
             self._check_cancel()
             return state
         # 不再在这里调用start_agent，让BaseAgent自己处理
-        result = await self.agents["sentiment_analyst"].process(state, self.progress_manager)
+        result = await self._run_agent("sentiment_analyst", state)
         self._check_cancel()
         return result
 
@@ -217,7 +273,7 @@ class WorkflowOrchestrator:
             self._check_cancel()
             return state
         # 不再在这里调用start_agent，让BaseAgent自己处理
-        result = await self.agents["news_analyst"].process(state, self.progress_manager)
+        result = await self._run_agent("news_analyst", state)
         self._check_cancel()
         return result
 
@@ -230,7 +286,7 @@ class WorkflowOrchestrator:
             self._check_cancel()
             return state
         # 不再在这里调用start_agent，让BaseAgent自己处理
-        result = await self.agents["fundamentals_analyst"].process(state, self.progress_manager)
+        result = await self._run_agent("fundamentals_analyst", state)
         self._check_cancel()
         return result
 
@@ -243,7 +299,7 @@ class WorkflowOrchestrator:
             self._check_cancel()
             return state
         # 不再在这里调用start_agent，让BaseAgent自己处理
-        result = await self.agents["shareholder_analyst"].process(state, self.progress_manager)
+        result = await self._run_agent("shareholder_analyst", state)
         self._check_cancel()
         return result
 
@@ -256,88 +312,36 @@ class WorkflowOrchestrator:
             self._check_cancel()
             return state
         # 不再在这里调用start_agent，让BaseAgent自己处理
-        result = await self.agents["product_analyst"].process(state, self.progress_manager)
+        result = await self._run_agent("product_analyst", state)
         self._check_cancel()
         return result
 
     async def _analysts_parallel_node(self, state: AgentState) -> AgentState:
-        """分析师并行节点：并发执行6个分析师并合并结果"""
-        import copy
-        from asyncio import gather, create_task, wait, FIRST_COMPLETED
-
+        """分析师并行节点：并发执行6个分析师，按顺序归并各自的增量"""
+        # 复用的分析师来自本轮的state而不是共享的orchestrator，并发的分析互不影响
+        cached = set(get_field(state, 'cached_analysts') or []) & set(PARALLEL_ANALYSTS)
         analyst_names = [
-            name for name in [
-                "market_analyst",
-                "sentiment_analyst",
-                "news_analyst",
-                "fundamentals_analyst",
-                "shareholder_analyst",
-                "product_analyst",
-            ] if self._is_active(name)
+            name for name in PARALLEL_ANALYSTS
+            if self._is_active(name) and name not in cached
         ]
-
-        # 为避免并发写 state 产生竞态，对每个任务使用深拷贝
         self._check_cancel()
-        tasks = []
-        for name in analyst_names:
-            state_copy = copy.deepcopy(state)
-            tasks.append(create_task(self.agents[name].process(state_copy, self.progress_manager)))
-
-        if not tasks:
-            # 全部禁用，直接返回
+        if cached:
+            print(f"♻️ 复用缓存的报告: {', '.join(sorted(cached))}")
+        if not analyst_names:
+            # 全部禁用或均已有缓存，直接返回
             return state
 
-        # 协作式取消：轮询检查取消标记，必要时取消剩余任务
-        pending = set(tasks)
-        done_results = []
-        while pending:
-            self._check_cancel()
-            done, pending = await wait(pending, timeout=0.3, return_when=FIRST_COMPLETED)
-            for d in done:
-                done_results.append(await d)
-        results = done_results
+        # 每个分析师拿到共享只读字段的浅拷贝视图，写入只落在自己的视图中；
+        # 取消时所有分析师任务立即被取消，单个分析师超时只丢弃它自己的报告
+        results = await asyncio.gather(*(self._run_agent(name, branch(state)) for name in analyst_names))
+        self._check_cancel()
 
-        # 将各自字段安全合并回主state（兼容字典或对象）
-        def setter(k: str, v: Any):
-            if isinstance(state, dict):
-                state[k] = v
-            else:
-                setattr(state, k, v)
-
-        def getter_from(res, k: str) -> str:
-            if isinstance(res, dict):
-                return res.get(k, "")
-            return getattr(res, k, "")
-
-        # 需要合并的字段列表
-        report_keys = [
-            "market_report",
-            "sentiment_report",
-            "news_report",
-            "fundamentals_report",
-            "shareholder_report",
-            "product_report",
+        # 只取各分析师的报告字段和新增历史，按固定顺序写回主state
+        deltas = [
+            collect_delta(state, result, [PARALLEL_ANALYSTS[name]])
+            for name, result in zip(analyst_names, results)
         ]
-
-        # 合并报告字段（后到者覆盖为空的不覆盖）
-        for key in report_keys:
-            for res in results:
-                val = getter_from(res, key)
-                if isinstance(val, str) and val.strip():
-                    setter(key, val)
-
-        # 合并执行/工具调用历史（如果存在）
-        hist_keys = ["agent_execution_history", "mcp_tool_calls", "warnings", "errors"]
-        for hkey in hist_keys:
-            merged: List[Any] = []
-            for res in results:
-                part = getter_from(res, hkey)
-                if isinstance(part, list):
-                    merged.extend(part)
-            if merged:
-                setter(hkey, merged)
-
-        return state
+        return apply_deltas(state, deltas)
 
     async def _bull_researcher_node(self, state: AgentState) -> AgentState:
         """多头研究员节点"""
@@ -349,7 +353,7 @@ class WorkflowOrchestrator:
             self._skip_agent("bull_researcher")
             self._check_cancel()
             return state
-        result = await self.agents["bull_researcher"].process(state, self.progress_manager)
+        result = await self._run_agent("bull_researcher", state, on_timeout=self._increment_investment_round)
         self._check_cancel()
         return result
 
@@ -363,10 +367,53 @@ class WorkflowOrchestrator:
             self._skip_agent("bear_researcher")
             self._check_cancel()
             return state
-        result = await self.agents["bear_researcher"].process(state, self.progress_manager)
+        result = await self._run_agent("bear_researcher", state, on_timeout=self._increment_investment_round)
         self._check_cancel()
         return result
 
+    async def _investment_debate_round_node(self, state: AgentState) -> AgentState:
+        """投资辩论一轮（并行）：多空研究员同时发言"""
+        print("🗣️ 投资辩论（并行）")
+        return await self._debate_round(state, *INVESTMENT_DEBATE, debate_type="investment")
+
+    async def _risk_debate_round_node(self, state: AgentState) -> AgentState:
+        """风险辩论一轮（并行）：激进/保守/中性分析师同时发言"""
+        print("🗣️ 风险辩论（并行）")
+        return await self._debate_round(state, *RISK_DEBATE, debate_type="risk")
+
+    async def _debate_round(self, state: AgentState, state_key: str, participants: List[str],
+                            debate_type: str) -> AgentState:
+        """并发执行一轮发言，并按参与者顺序合并到辩论状态"""
+        self._check_cancel()
+        debate = dict(get_field(state, state_key) or {})
+        print(f"🗣️ 第{rounds_completed(debate, len(participants)) + 1}轮，参与者: {', '.join(participants)}")
+
+        async def speak(position: int, name: str):
+            snapshot = round_snapshot(debate, position)
+            result = await self._run_agent(name, state_view(state, **{state_key: snapshot}))
+            return snapshot, get_field(result, state_key) or snapshot
+
+        speakers = []
+        for position, name in enumerate(participants):
+            if self._is_active(name):
+                speakers.append(speak(position, name))
+            else:
+                self._skip_agent(name)
+        turns = await asyncio.gather(*speakers)
+        self._check_cancel()
+
+        merged = merge_round(debate, list(turns), len(participants))
+        if isinstance(state, dict):
+            state[state_key] = merged
+        else:
+            setattr(state, state_key, merged)
+        try:
+            if self.progress_manager:
+                self.progress_manager.update_debate_state(debate_type, {"count": merged["count"]})
+        except Exception:
+            pass
+        return state
+
     async def _research_manager_node(self, state: AgentState) -> AgentState:
         """研究经理节点"""
         print("🧑‍💼 研究经理")
@@ -375,7 +422,7 @@ class WorkflowOrchestrator:
             self._skip_agent("research_manager")
             self._check_cancel()
             return state
-        result = await self.agents["research_manager"].process(state, self.progress_manager)
+        result = await self._run_agent("research_manager", state)
         self._check_cancel()
         return result
 
@@ -387,7 +434,7 @@ class WorkflowOrchestrator:
             self._skip_agent("trader")
             self._check_cancel()
             return state
-        result = await self.agents["trader"].process(state, self.progress_manager)
+        result = await self._run_agent("trader", state)
         self._check_cancel()
         return result
 
@@ -400,7 +447,7 @@ class WorkflowOrchestrator:
             self._skip_agent("aggressive_risk_analyst")
             self._check_cancel()
             return state
-        result = await self.agents["aggressive_risk_analyst"].process(state, self.progress_manager)
+        result = await self._run_agent("aggressive_risk_analyst", state, on_timeout=self._increment_risk_round)
         self._check_cancel()
         return result
 
@@ -413,7 +460,7 @@ class WorkflowOrchestrator:
             self._skip_agent("safe_risk_analyst")
             self._check_cancel()
             return state
-        result = await self.agents["safe_risk_analyst"].process(state, self.progress_manager)
+        result = await self._run_agent("safe_risk_analyst", state, on_timeout=self._increment_risk_round)
         self._check_cancel()
         return result
 
@@ -426,7 +473,7 @@ class WorkflowOrchestrator:
             self._skip_agent("neutral_risk_analyst")
             self._check_cancel()
             return state
-        result = await self.agents["neutral_risk_analyst"].process(state, self.progress_manager)
+        result = await self._run_agent("neutral_risk_analyst", state, on_timeout=self._increment_risk_round)
         self._check_cancel()
         return result
 
@@ -438,7 +485,7 @@ class WorkflowOrchestrator:
             self._skip_agent("risk_manager")
             self._check_cancel()
             return state
-        result = await self.agents["risk_manager"].process(state, self.progress_manager)
+        result = await self._run_agent("risk_manager", state)
         self._check_cancel()
         return result
 
@@ -497,11 +544,61 @@ class WorkflowOrchestrator:
             print(f"🏁 风险辩论结束({self.max_risk_debate_rounds}轮完成)，进入风险经理")
             return "risk_manager"
     
+    def _should_continue_parallel_investment_debate(self, state) -> str:
+        """并行模式：判断是否再进行一轮投资辩论"""
+        done = rounds_completed(get_field(state, 'investment_debate_state', {}), len(INVESTMENT_DEBATE[1]))
+        if done < self.max_debate_rounds:
+            print(f"🔁 继续投资辩论（并行） 第{done + 1}轮")
+            return "investment_debate_round"
+        print(f"🏁 投资辩论结束({done}轮完成)，进入研究经理")
+        return "research_manager"
+
+    def _should_continue_parallel_risk_debate(self, state) -> str:
+        """并行模式：判断是否再进行一轮风险辩论"""
+        done = rounds_completed(get_field(state, 'risk_debate_state', {}), len(RISK_DEBATE[1]))
+        if done < self.max_risk_debate_rounds:
+            print(f"🔁 继续风险辩论（并行） 第{done + 1}轮")
+            return "risk_debate_round"
+        print(f"🏁 风险辩论结束({done}轮完成)，进入风险经理")
+        return "risk_manager"
+
     def _check_cancel(self):
-        """检查是否需要取消分析"""
-        if self.cancel_checker and callable(self.cancel_checker):
-            if self.cancel_checker():
-                raise asyncio.CancelledError("分析已被用户取消")
+        """检查本次分析是否已取消"""
+        scope = current_scope()
+        if scope is not None:
+            scope.check()
+
+    def cancel(self, reason: str = CANCEL_REASON):
+        """取消所有进行中的分析：正在运行的智能体及其LLM/MCP调用立即被取消
+
+        只取消某一次分析时，向 run_analysis 传入 cancel_scope 并调用它的 cancel()。
+        """
+        for scope in list(self.active_scopes):
+            scope.cancel(reason)
+
+    async def _run_agent(self, name: str, state: AgentState, on_timeout=None) -> AgentState:
+        """在本次分析的取消范围内执行智能体，超过时限时记录警告并返回未改动的state"""
+        scope = current_scope() or CancelScope()
+        try:
+            return await scope.run(
+                self.agents[name].process(state, self.progress_manager), self.agent_timeout
+            )
+        except asyncio.TimeoutError:
+            message = f"{name} 超过{self.agent_timeout:.0f}秒时限，已跳过"
+            print(f"⏱️ {message}")
+            if isinstance(state, dict):
+                state.setdefault('warnings', []).append(message)
+            else:
+                state.add_warning(message)
+            try:
+                if self.progress_manager:
+                    self.progress_manager.add_warning(message, agent_name=name)
+            except Exception:
+                pass
+            if on_timeout:
+                # 辩论节点需推进发言次数，避免条件边再次路由回同一发言者
+                on_timeout(state)
+            return state
 
     async def initialize(self) -> bool:
         """初始化MCP连接"""
@@ -516,13 +613,22 @@ class WorkflowOrchestrator:
             print(f"❌ 工作流编排器初始化失败: {e}")
             return False
 
-    async def run_analysis(self, user_query: str, cancel_checker=None, active_agents: Optional[List[str]] = None) -> AgentState:
-        """运行完整的交易分析流程"""
+    async def run_analysis(self, user_query: str, cancel_checker=None, active_agents: Optional[List[str]] = None,
+                           cached_reports: Optional[Dict[str, Dict[str, str]]] = None,
+                           cancel_scope: Optional[CancelScope] = None) -> AgentState:
+        """运行完整的交易分析流程
+
+        取消 cancel_scope（或调用 cancel() 取消全部分析）会立即停止本次分析，
+        返回取消前最后一个完成节点的state（部分结果）。
+        cached_reports 为 {分析师: {状态字段: 内容}}，这些分析师本轮不再执行，直接使用缓存的报告。
+        """
         print("🚀 智能交易分析系统启动")
         print(f"📝 用户查询: {user_query}")
         
-        # 存储取消检查器
-        self.cancel_checker = cancel_checker
+        # 本次分析的取消范围；旧式取消回调由后台任务检查
+        scope = cancel_scope or CancelScope()
+        self.active_scopes.add(scope)
+        watcher = scope.watch(cancel_checker) if callable(cancel_checker) else None
         # 配置本轮启用的智能体集合
         if active_agents is None or len(active_agents) == 0:
             self.active_agents = set(self.agents.keys())
@@ -549,36 +655,27 @@ class WorkflowOrchestrator:
             messages=[]
         )
         
+        # 写入缓存的分析师报告（只对本轮启用的分析师生效）
+        cached_analysts = []
+        for name, fields in (cached_reports or {}).items():
+            if name in self.agents and self._is_active(name):
+                for key, value in fields.items():
+                    set_field(initial_state, key, value)
+                cached_analysts.append(name)
+        set_field(initial_state, 'cached_analysts', sorted(cached_analysts))
+        
+        # 最近一个完成节点后的state，取消时作为部分结果返回
+        latest = {"state": initial_state}
+
+        async def invoke():
+            async for values in self.workflow.astream(initial_state, stream_mode="values"):
+                latest["state"] = values
+            return latest["state"]
+
         try:
-            # 检查取消状态
-            self._check_cancel()
-            
-            # 运行工作流
-            workflow_result = await self.workflow.ainvoke(initial_state)
-            
-            # LangGraph返回字典，需要转换为AgentState对象
-            if isinstance(workflow_result, dict):
-                # 创建新的AgentState对象并复制数据
-                final_state = AgentState(
-                    user_query=workflow_result.get('user_query', user_query),
-                    investment_debate_state=workflow_result.get('investment_debate_state', {}),
-                    risk_debate_state=workflow_result.get('risk_debate_state', {}),
-                    messages=workflow_result.get('messages', []),
-                    market_report=workflow_result.get('market_report', ''),
-                    sentiment_report=workflow_result.get('sentiment_report', ''),
-                    news_report=workflow_result.get('news_report', ''),
-                    fundamentals_report=workflow_result.get('fundamentals_report', ''),
-                    shareholder_report=workflow_result.get('shareholder_report', ''),  # 添加这一行
-                    investment_plan=workflow_result.get('investment_plan', ''),
-                    trader_investment_plan=workflow_result.get('trader_investment_plan', ''),
-                    final_trade_decision=workflow_result.get('final_trade_decision', ''),
-                    errors=workflow_result.get('errors', []),
-                    warnings=workflow_result.get('warnings', []),
-                    agent_execution_history=workflow_result.get('agent_execution_history', []),
-                    mcp_tool_calls=workflow_result.get('mcp_tool_calls', [])
-                )
-            else:
-                final_state = workflow_result
+            # 运行工作流（整体登记在取消范围内，取消会直接打断正在进行的调用）
+            workflow_result = await scope.run(invoke())
+            final_state = self._to_agent_state(workflow_result, user_query)
             
             print("✅ 分析流程完成")
             
@@ -603,7 +700,7 @@ class WorkflowOrchestrator:
             # 记录取消到进度跟踪器
             if self.progress_manager:
                 try:
-                    self.progress_manager.add_warning("分析已被用户取消")
+                    self.progress_manager.add_warning(scope.reason or CANCEL_REASON)
                     # 将会话状态标记为取消
                     self.progress_manager.session_data["status"] = "cancelled"
                     self.progress_manager._save_json()
@@ -614,17 +711,16 @@ class WorkflowOrchestrator:
                 except Exception:
                     pass
             
-            # 安全地添加取消信息
+            # 保留已完成节点的结果，并添加取消信息
+            partial_state = self._to_agent_state(latest["state"], user_query)
             try:
-                if hasattr(initial_state, 'add_warning'):
-                    initial_state.add_warning("分析已被用户取消")
-                elif isinstance(initial_state, dict):
-                    if 'warnings' not in initial_state:
-                        initial_state['warnings'] = []
-                    initial_state['warnings'].append("分析已被用户取消")
+                if hasattr(partial_state, 'add_warning'):
+                    partial_state.add_warning(scope.reason or CANCEL_REASON)
+                elif isinstance(partial_state, dict):
+                    partial_state.setdefault('warnings', []).append(scope.reason or CANCEL_REASON)
             except Exception:
                 pass
-            return initial_state
+            return partial_state
             
         except Exception as e:
             print(f"❌ 分析流程失败: {e}")
@@ -650,7 +746,39 @@ class WorkflowOrchestrator:
             except Exception:
                 pass
             return initial_state
+        finally:
+            self.active_scopes.discard(scope)
+            if watcher:
+                watcher.cancel()
     
+    def _to_agent_state(self, workflow_result, user_query: str) -> AgentState:
+        """LangGraph返回字典，需要转换为AgentState对象"""
+        if not isinstance(workflow_result, dict):
+            return workflow_result
+        # 创建新的AgentState对象并复制数据
+        return AgentState(
+            user_query=workflow_result.get('user_query', user_query),
+            investment_debate_state=workflow_result.get('investment_debate_state', {}),
+            risk_debate_state=workflow_result.get('risk_debate_state', {}),
+            messages=workflow_result.get('messages', []),
+            company_details=workflow_result.get('company_details', ''),
+            company_overview_report=workflow_result.get('company_overview_report', ''),
+            market_report=workflow_result.get('market_report', ''),
+            sentiment_report=workflow_result.get('sentiment_report', ''),
+            news_report=workflow_result.get('news_report', ''),
+            fundamentals_report=workflow_result.get('fundamentals_report', ''),
+            shareholder_report=workflow_result.get('shareholder_report', ''),  # 添加这一行
+            product_report=workflow_result.get('product_report', ''),
+            cached_analysts=workflow_result.get('cached_analysts', []),
+            investment_plan=workflow_result.get('investment_plan', ''),
+            trader_investment_plan=workflow_result.get('trader_investment_plan', ''),
+            final_trade_decision=workflow_result.get('final_trade_decision', ''),
+            errors=workflow_result.get('errors', []),
+            warnings=workflow_result.get('warnings', []),
+            agent_execution_history=workflow_result.get('agent_execution_history', []),
+            mcp_tool_calls=workflow_result.get('mcp_tool_calls', [])
+        )
+
     def _state_to_dict(self, state):
         """将AgentState对象转换为字典格式"""
         if isinstance(state, dict):
@@ -729,6 +857,7 @@ class WorkflowOrchestrator:
             "agents_count": len(self.agents),
             "max_debate_rounds": self.max_debate_rounds,
             "max_risk_debate_rounds": self.max_risk_debate_rounds,
+            "parallel_debate": self.parallel_debate,
             "debug_mode": self.debug_mode,
             "verbose_logging": self.verbose_logging,
             "mcp_tools_info": self.mcp_manager.get_tools_info(),
@@ -760,6 +889,15 @@ class WorkflowOrchestrator:
             self.max_risk_debate_rounds = risk_rounds
             print(f"🌀 风险辩论轮次已更新: {old_risk} → {risk_rounds}")
 
+    def set_parallel_debate(self, enabled: bool):
+        """切换并行/顺序辩论模式（重新编译工作流，用于下一次 run_analysis）。"""
+        enabled = bool(enabled)
+        if enabled == self.parallel_debate:
+            return
+        self.parallel_debate = enabled
+        self.workflow = self._create_workflow()
+        print(f"🌀 辩论模式已切换为: {'并行' if enabled else '顺序'}")
+
     def set_active_agents(self, active_agents: List[str]):
         """外部设置本轮启用的智能体集合"""
         if not active_agents: